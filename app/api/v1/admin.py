@@ -11,8 +11,9 @@ Enables LMS admins to:
 Pattern: LangChain Enterprise Best Practices
 """
 
+import asyncio
 import logging
-from typing import Optional
+from typing import List, Optional
 from uuid import uuid4
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, BackgroundTasks
 from pydantic import BaseModel, Field
@@ -58,67 +59,39 @@ class DocumentInfo(BaseModel):
 
 
 # =============================================================================
-# In-memory job tracking (replace with DB in production)
+# Durable job queue (ingestion_jobs table, processed by scripts/ingestion_worker.py)
 # =============================================================================
 
-_ingestion_jobs: dict = {}  # job_id -> DocumentStatus
+def _get_job_repository():
+    """Job queue repository, or 503 if the ingestion_jobs table is unavailable."""
+    from app.repositories.ingestion_job_repository import get_ingestion_job_repository
+    
+    repository = get_ingestion_job_repository()
+    if not repository.is_available():
+        raise HTTPException(
+            status_code=503,
+            detail="Ingestion queue unavailable. Run scripts/migrations/upgrade_ingestion_jobs_queue.sql"
+        )
+    return repository
 
 
-# =============================================================================
-# Background Ingestion Task
-# =============================================================================
+def _to_document_status(job) -> DocumentStatus:
+    return DocumentStatus(
+        job_id=job.job_id,
+        document_id=job.document_id,
+        status=job.status,
+        progress_percent=float(job.progress),
+        total_pages=job.total_pages,
+        processed_pages=job.processed_pages,
+        error=job.error
+    )
 
-async def _run_ingestion_background(
-    job_id: str,
-    document_id: str,
-    pdf_path: str,
-    create_neo4j_module: bool = True
-):
-    """
-    Background task for document ingestion.
-    
-    Steps:
-    1. Update job status to "processing"
-    2. Run multimodal ingestion
-    3. Create Module node in Neo4j (if enabled)
-    4. Update job status to "completed" or "failed"
-    """
-    from app.services.multimodal_ingestion_service import get_ingestion_service
-    from app.repositories.user_graph_repository import get_user_graph_repository
+
+async def _run_inline_worker():
+    """Process one queued job in the API process (INGESTION_INLINE_WORKER=true)."""
+    from app.services.ingestion_worker import IngestionWorker
     
-    try:
-        _ingestion_jobs[job_id]["status"] = "processing"
-        
-        # Run ingestion
-        ingestion_service = get_ingestion_service()
-        result = await ingestion_service.ingest_pdf(
-            pdf_path=pdf_path,
-            document_id=document_id,
-            resume=True
-        )
-        
-        # Update progress
-        _ingestion_jobs[job_id]["total_pages"] = result.total_pages
-        _ingestion_jobs[job_id]["processed_pages"] = result.successful_pages
-        _ingestion_jobs[job_id]["progress_percent"] = result.success_rate
-        
-        # Create Module node in Neo4j (Phase 4 + 6 integration)
-        if create_neo4j_module:
-            user_graph = get_user_graph_repository()
-            if user_graph.is_available():
-                user_graph.ensure_module_node(
-                    module_id=document_id,
-                    title=document_id.replace("_", " ").title()
-                )
-                logger.info(f"[ADMIN] Created Module node in Neo4j: {document_id}")
-        
-        _ingestion_jobs[job_id]["status"] = "completed"
-        logger.info(f"[ADMIN] Ingestion completed for {document_id}: {result.success_rate:.0%} success")
-        
-    except Exception as e:
-        _ingestion_jobs[job_id]["status"] = "failed"
-        _ingestion_jobs[job_id]["error"] = str(e)
-        logger.error(f"[ADMIN] Ingestion failed for {document_id}: {e}")
+    await IngestionWorker(worker_id="api-inline").run_once()
 
 
 # =============================================================================
@@ -137,62 +110,73 @@ async def upload_document(
     Upload and ingest a document into knowledge base.
     
     This endpoint:
-    1. Saves the uploaded PDF
-    2. Starts background ingestion
+    1. Saves the uploaded PDF to the shared upload directory
+    2. Enqueues a durable ingestion job (processed by ingestion workers)
     3. Returns job_id for status tracking
-    4. Optionally creates Module node in Neo4j
+    4. Optionally creates Module node in Neo4j (done by the worker)
     
     Use GET /admin/documents/{job_id} to check progress.
     """
+    import hashlib
     import os
-    import tempfile
+    
+    from app.core.config import settings
     
     # Validate file type
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
     
+    repository = _get_job_repository()
+    
     # Generate IDs
     job_id = str(uuid4())
     doc_id = document_id or file.filename.replace(".pdf", "").replace(" ", "_").lower()
     
-    # Save file temporarily
-    temp_dir = tempfile.gettempdir()
-    pdf_path = os.path.join(temp_dir, f"{doc_id}.pdf")
+    # Save file where workers can read it
+    upload_dir = os.path.expanduser(settings.ingestion_upload_dir)
+    pdf_path = os.path.abspath(os.path.join(upload_dir, f"{job_id}.pdf"))
     
-    try:
-        content = await file.read()
+    def _save(content: bytes) -> None:
+        os.makedirs(upload_dir, exist_ok=True)
         with open(pdf_path, "wb") as f:
             f.write(content)
+    
+    try:
+        content = await file.read()
+        await asyncio.to_thread(_save, content)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save file: {e}")
     
-    # Initialize job status
-    _ingestion_jobs[job_id] = {
-        "job_id": job_id,
-        "document_id": doc_id,
-        "status": "pending",
-        "progress_percent": 0.0,
-        "total_pages": 0,
-        "processed_pages": 0,
-        "error": None
-    }
+    try:
+        await asyncio.to_thread(
+            repository.enqueue,
+            document_id=doc_id,
+            filename=file.filename,
+            file_path=pdf_path,
+            uploaded_by=auth.user_id,
+            content_hash=hashlib.sha256(content).hexdigest(),
+            options={"resume": True, "create_module_node": create_module_node},
+            max_attempts=settings.ingestion_job_max_attempts,
+            job_id=job_id
+        )
+    except Exception as e:
+        try:
+            os.remove(pdf_path)
+        except OSError:
+            pass
+        logger.error(f"[ADMIN] Failed to enqueue ingestion job for {doc_id}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to enqueue ingestion job: {e}")
     
-    # Start background ingestion
-    background_tasks.add_task(
-        _run_ingestion_background,
-        job_id=job_id,
-        document_id=doc_id,
-        pdf_path=pdf_path,
-        create_neo4j_module=create_module_node
-    )
+    if settings.ingestion_inline_worker:
+        background_tasks.add_task(_run_inline_worker)
     
-    logger.info(f"[ADMIN] Document upload started: {doc_id} (job_id: {job_id})")
+    logger.info(f"[ADMIN] Document queued for ingestion: {doc_id} (job_id: {job_id})")
     
     return DocumentUploadResponse(
         job_id=job_id,
         document_id=doc_id,
         status="pending",
-        message=f"Ingestion started. Use GET /admin/documents/{job_id} to check status."
+        message=f"Ingestion queued. Use GET /admin/documents/{job_id} to check status."
     )
 
 
@@ -201,13 +185,28 @@ async def get_document_status(job_id: str, auth: RequireAuth):  # LMS Integratio
     """
     Check ingestion job status.
     
-    Returns progress information for a document ingestion job.
+    Returns page-level progress reported by the ingestion worker.
     """
-    if job_id not in _ingestion_jobs:
+    repository = _get_job_repository()
+    job = await asyncio.to_thread(repository.get, job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
     
-    job = _ingestion_jobs[job_id]
-    return DocumentStatus(**job)
+    return _to_document_status(job)
+
+
+@router.get("/jobs", response_model=List[DocumentStatus])
+async def list_ingestion_jobs(
+    auth: RequireAdmin,  # LMS Integration: Admin only
+    status: Optional[str] = None,
+    limit: int = 50
+):
+    """
+    List recent ingestion jobs (optionally filtered by status).
+    """
+    repository = _get_job_repository()
+    jobs = await asyncio.to_thread(repository.list_recent, status=status, limit=min(limit, 200))
+    return [_to_document_status(job) for job in jobs]
 
 
 @router.get("/documents", response_model=list)
@@ -288,3 +287,107 @@ async def delete_document(document_id: str, auth: RequireAdmin):  # LMS Integrat
     except Exception as e:
         logger.error(f"[ADMIN] Failed to delete document {document_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to delete: {e}")
+
+
+# =============================================================================
+# Cache Monitoring
+# =============================================================================
+
+@router.get("/cache/stats")
+async def get_cache_stats(auth: RequireAdmin):  # LMS Integration: Admin only
+    """
+    Get in-process cache statistics.
+    
+    Returns hit/miss/eviction metrics for every bounded LRU cache
+    (GraphRAG entities, Guardian decisions, insight embeddings, ...),
+    size / eviction / estimated memory of every session-state store and
+    in-flight RAG request coalescing counters.
+    """
+    from app.cache.inflight import get_all_inflight_stats
+    from app.cache.lru_cache import get_all_cache_stats
+    from app.cache.session_store import get_all_session_store_stats
+    
+    caches = get_all_cache_stats()
+    session_stores = get_all_session_store_stats()
+    return {
+        "status": "success",
+        "total_caches": len(caches),
+        "caches": caches,
+        "session_stores": session_stores,
+        "inflight": get_all_inflight_stats()
+    }
+
+
+# =============================================================================
+# LMS Event Outbox Monitoring
+# =============================================================================
+
+@router.get("/events/outbox/stats")
+async def get_event_outbox_stats(auth: RequireAdmin):  # LMS Integration: Admin only
+    """
+    Get LMS event outbox statistics.
+    
+    Returns the backlog (pending / in-flight / dead events, age of the
+    oldest pending event) and this instance's delivery counters and flush lag.
+    """
+    from app.services.event_outbox_worker import get_event_outbox_worker
+    
+    worker = get_event_outbox_worker()
+    if not worker.repository.is_available():
+        raise HTTPException(status_code=503, detail="LMS event outbox unavailable")
+    
+    backlog = await asyncio.to_thread(worker.repository.get_backlog_stats)
+    return {
+        "status": "success",
+        "backlog": backlog,
+        "worker": worker.get_stats()
+    }
+
+
+# =============================================================================
+# LLM Scheduler Monitoring
+# =============================================================================
+
+@router.get("/llm/stats")
+async def get_llm_stats(auth: RequireAdmin):  # LMS Integration: Admin only
+    """
+    Get LLM pool and scheduler statistics.
+    
+    Returns per-tier concurrency, in-flight calls, token budget, throttling
+    (429) counters and per-priority queue depth and wait times, plus the
+    average packed prompt-context tokens per call site and kind.
+    """
+    from app.engine.context_packer import get_context_packer
+    from app.engine.llm_pool import LLMPool
+    
+    return {
+        "status": "success",
+        **LLMPool.get_stats(),
+        "prompt_context": get_context_packer().get_stats()
+    }
+
+
+# =============================================================================
+# Memory Write Queue Monitoring
+# =============================================================================
+
+@router.get("/memory/queue/stats")
+async def get_memory_queue_stats(auth: RequireAdmin):  # LMS Integration: Admin only
+    """
+    Get post-turn memory write queue statistics.
+    
+    Returns this instance's queue depth, coalescing/spill counters and
+    enqueue -> processed lag, plus the spill-over table backlog when the
+    memory_write_queue table exists.
+    """
+    from app.services.memory_write_queue import get_memory_write_queue
+    
+    queue = get_memory_write_queue()
+    backlog = None
+    if queue.repository.is_available():
+        backlog = await asyncio.to_thread(queue.repository.get_backlog_stats)
+    return {
+        "status": "success",
+        "queue": queue.get_stats(),
+        "backlog": backlog
+    }
@@ -83,6 +83,14 @@ class MultimodalIngestionResponse(BaseModel):
     direct_pages: int = 0       # Pages processed via PyMuPDF direct extraction
     fallback_pages: int = 0     # Pages that fell back from direct to vision
     api_savings_percent: float = 0.0  # Estimated API cost savings
+    
+    # Streaming page source stats
+    rasterized_pages: int = 0   # Pages actually rendered to images
+    peak_rss_mb: float = 0.0    # Peak process RSS during ingestion
+    
+    # Incremental re-ingestion stats
+    unchanged_pages: int = 0    # Pages skipped (fingerprint unchanged)
+    deleted_chunks: int = 0     # Stale/orphaned chunks removed
 
 
 @router.post("/ingest-multimodal", response_model=MultimodalIngestionResponse)
@@ -176,7 +184,11 @@ async def ingest_multimodal_document(
             vision_pages=result.vision_pages,
             direct_pages=result.direct_pages,
             fallback_pages=result.fallback_pages,
-            api_savings_percent=result.api_savings_percent
+            api_savings_percent=result.api_savings_percent,
+            rasterized_pages=result.rasterized_pages,
+            peak_rss_mb=result.peak_rss_mb,
+            unchanged_pages=result.unchanged_pages,
+            deleted_chunks=result.deleted_chunks
         )
         
     except Exception as e:
@@ -14,6 +14,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
 from app.api.deps import RequireAuth
+from app.engine.semantic_memory import invalidate_insight_matrix
 from app.repositories.semantic_memory_repository import SemanticMemoryRepository
 
 logger = logging.getLogger(__name__)
@@ -140,6 +141,7 @@ async def delete_user_memory(
         success = repository.delete_memory(user_id, memory_id)
         
         if success:
+            invalidate_insight_matrix(user_id)
             logger.info(f"Admin deleted memory {memory_id} for user {user_id}")
             return DeleteMemoryResponse(
                 success=True,
@@ -18,6 +18,7 @@ from app.cache.models import CacheEntry, CacheConfig, CacheTier
 from app.cache.semantic_cache import SemanticResponseCache, get_semantic_cache
 from app.cache.cache_manager import CacheManager, get_cache_manager
 from app.cache.invalidation import CacheInvalidationManager, get_invalidation_manager
+from app.cache.lru_cache import LRUCache, LRUCacheStats, get_all_cache_stats
 
 __all__ = [
     "CacheEntry",
@@ -29,4 +30,7 @@ __all__ = [
     "get_cache_manager",
     "CacheInvalidationManager",
     "get_invalidation_manager",
+    "LRUCache",
+    "LRUCacheStats",
+    "get_all_cache_stats",
 ]
@@ -0,0 +1,331 @@
+"""
+In-flight Request Coalescing - Single-flight for whole RAG requests.
+
+The semantic response cache is only populated once a request completes,
+so when a class asks the same question within seconds every request ran
+the full CRAG pipeline. An InflightCoalescer keeps the requests currently
+being answered; a new request that matches one of them (same normalized
+query, or query embedding within the similarity threshold) becomes a
+follower and awaits the leader's result instead of starting its own.
+
+Properties:
+- Exact match on the normalized query, semantic match on embeddings
+  (cosine >= similarity_threshold, scanned over active flights only)
+- Followers get the leader's result, or None when the leader failed,
+  was cancelled or exceeded max_wait_seconds (they then run themselves)
+- Optional event replay: the leader publishes stream events, followers
+  replay them from the start and then follow live; a stream that goes
+  quiet for max_wait_seconds stops the follower (it then runs itself)
+- Metrics (leaders, followers, fallbacks), exported via
+  get_all_inflight_stats()
+
+Usage:
+    coalescer = InflightCoalescer("crag.answer", similarity_threshold=0.95)
+    flight, is_leader, similarity = coalescer.join(query, embedding)
+    if not is_leader:
+        shared = await coalescer.wait(flight)
+        if shared is not None:
+            return adapt(shared, similarity)
+    try:
+        result = await run_pipeline()
+    except BaseException as e:
+        coalescer.fail(flight, e)
+        raise
+    coalescer.complete(flight, result)
+
+Feature: semantic-cache
+"""
+
+import asyncio
+import logging
+import re
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.engine.keyword_matcher import normalize_text
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION = re.compile(r"[^\w\s]", re.UNICODE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class InflightStats:
+    """Statistics for an in-flight request coalescer."""
+    name: str
+    active: int = 0
+    leaders: int = 0
+    followers: int = 0
+    semantic_matches: int = 0  # Followers matched by embedding, not by text
+    follower_fallbacks: int = 0  # Followers that had to run the request themselves
+    leader_failures: int = 0
+
+    @property
+    def coalesce_rate(self) -> float:
+        """Share of requests served by another request's work."""
+        total = self.leaders + self.followers
+        return self.followers / total if total > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "name": self.name,
+            "active": self.active,
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "semantic_matches": self.semantic_matches,
+            "follower_fallbacks": self.follower_fallbacks,
+            "leader_failures": self.leader_failures,
+            "coalesce_rate": f"{self.coalesce_rate:.2%}",
+        }
+
+
+@dataclass(eq=False)
+class Flight:
+    """One in-flight request that followers can attach to."""
+    key: str
+    embedding: Optional[np.ndarray]
+    future: asyncio.Future
+    started_at: float = field(default_factory=time.monotonic)
+    followers: int = 0
+    events: List[Any] = field(default_factory=list)
+    closed: bool = False
+    _changed: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def publish(self, event: Any) -> None:
+        """Append a stream event for current and future followers."""
+        self.events.append(event)
+        self._changed.set()
+
+    def close(self) -> None:
+        """Mark the event stream finished."""
+        self.closed = True
+        self._changed.set()
+
+    async def replay(self, idle_timeout: Optional[float] = None) -> AsyncIterator[Any]:
+        """
+        Yield every published event from the start, then live ones until closed.
+
+        Raises:
+            asyncio.TimeoutError: No new event within idle_timeout seconds
+        """
+        index = 0
+        while True:
+            while index < len(self.events):
+                yield self.events[index]
+                index += 1
+            if self.closed:
+                return
+            self._changed.clear()
+            if index < len(self.events) or self.closed:
+                continue
+            await asyncio.wait_for(self._changed.wait(), timeout=idle_timeout)
+
+
+def normalize_query(query: str) -> str:
+    """NFC + lowercase, punctuation stripped, whitespace collapsed."""
+    text = _PUNCTUATION.sub(" ", normalize_text(query))
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _unit_vector(embedding: Optional[Sequence[float]]) -> Optional[np.ndarray]:
+    if embedding is None or len(embedding) == 0:
+        return None
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else None
+
+
+class InflightCoalescer:
+    """
+    Registry of in-flight requests keyed by normalized query and embedding.
+
+    Not thread-safe: used from the event loop only (no awaits while the
+    registry is mutated).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        similarity_threshold: float = 0.95,
+        max_wait_seconds: Optional[float] = 90.0,
+        register: bool = True
+    ):
+        """
+        Args:
+            name: Coalescer name (stats)
+            similarity_threshold: Min cosine similarity for a semantic match
+            max_wait_seconds: Followers stop waiting after this (None = no limit)
+            register: Export stats through get_all_inflight_stats()
+        """
+        self.name = name
+        self.similarity_threshold = similarity_threshold
+        self.max_wait_seconds = max_wait_seconds
+        self._flights: Dict[str, Flight] = {}
+        self._stats = InflightStats(name=name)
+
+        if register:
+            register_inflight_coalescer(self)
+
+    @staticmethod
+    def make_key(query: str, namespace: str = "") -> str:
+        """Coalescing key: namespace (e.g. user role) + normalized query."""
+        return f"{namespace}\x1f{normalize_query(query)}"
+
+    def _match(self, key: str, vector: Optional[np.ndarray]) -> Tuple[Optional[Flight], float]:
+        flight = self._flights.get(key)
+        if flight is not None:
+            return flight, 1.0
+        if vector is None:
+            return None, 0.0
+
+        namespace = key.split("\x1f", 1)[0]
+        best: Optional[Flight] = None
+        best_similarity = self.similarity_threshold
+        for candidate in self._flights.values():
+            if candidate.embedding is None or candidate.key.split("\x1f", 1)[0] != namespace:
+                continue
+            if candidate.embedding.shape != vector.shape:
+                continue
+            similarity = float(np.dot(candidate.embedding, vector))
+            if similarity >= best_similarity:
+                best, best_similarity = candidate, similarity
+        return best, best_similarity
+
+    def join(
+        self,
+        query: str,
+        embedding: Optional[Sequence[float]] = None,
+        namespace: str = ""
+    ) -> Tuple[Flight, bool, float]:
+        """
+        Attach to a matching in-flight request, or start a new one.
+
+        Args:
+            query: Request query
+            embedding: Query embedding (None = exact matching only)
+            namespace: Requests only coalesce within a namespace
+
+        Returns:
+            (flight, is_leader, similarity). The leader must call
+            complete() or fail().
+        """
+        key = self.make_key(query, namespace)
+        vector = _unit_vector(embedding)
+
+        flight, similarity = self._match(key, vector)
+        if flight is not None:
+            flight.followers += 1
+            self._stats.followers += 1
+            if similarity < 1.0:
+                self._stats.semantic_matches += 1
+            logger.info(
+                f"[INFLIGHT] {self.name}: joined in-flight request "
+                f"(similarity={similarity:.3f}, followers={flight.followers})"
+            )
+            return flight, False, similarity
+
+        flight = Flight(key=key, embedding=vector, future=asyncio.get_running_loop().create_future())
+        self._flights[key] = flight
+        self._stats.leaders += 1
+        return flight, True, 1.0
+
+    async def wait(self, flight: Flight) -> Optional[Any]:
+        """
+        Await the leader's result as a follower.
+
+        Returns:
+            The leader's result, or None if the follower should run the
+            request itself (leader failed, cancelled or too slow)
+        """
+        try:
+            return await asyncio.wait_for(asyncio.shield(flight.future), timeout=self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            reason = "timed out"
+        except asyncio.CancelledError:
+            if not flight.future.cancelled():
+                raise  # The follower itself was cancelled
+            reason = "leader cancelled"
+        except Exception as e:
+            reason = f"leader failed: {e}"
+        self._stats.follower_fallbacks += 1
+        logger.warning(f"[INFLIGHT] {self.name}: {reason}, running request independently")
+        return None
+
+    async def follow(self, flight: Flight) -> AsyncIterator[Any]:
+        """
+        Replay a flight's event stream as a subscriber.
+
+        Raises:
+            asyncio.TimeoutError: The leader published nothing for
+                max_wait_seconds; the subscriber should run the request itself
+        """
+        try:
+            async for event in flight.replay(idle_timeout=self.max_wait_seconds):
+                yield event
+        except asyncio.TimeoutError:
+            self._stats.follower_fallbacks += 1
+            logger.warning(f"[INFLIGHT] {self.name}: shared stream stalled, running request independently")
+            raise
+
+    def _retire(self, flight: Flight) -> None:
+        if self._flights.get(flight.key) is flight:
+            del self._flights[flight.key]
+        flight.close()
+
+    def complete(self, flight: Flight, result: Any) -> None:
+        """Publish the leader's result to all followers."""
+        self._retire(flight)
+        if not flight.future.done():
+            flight.future.set_result(result)
+        if flight.followers:
+            logger.info(
+                f"[INFLIGHT] {self.name}: served {flight.followers} follower(s) from one request "
+                f"({(time.monotonic() - flight.started_at) * 1000:.0f}ms)"
+            )
+
+    def fail(self, flight: Flight, error: BaseException) -> None:
+        """Release followers after the leader failed or was cancelled."""
+        self._retire(flight)
+        self._stats.leader_failures += 1
+        if flight.future.done():
+            return
+        if isinstance(error, asyncio.CancelledError):
+            flight.future.cancel()
+        else:
+            flight.future.set_exception(error)
+            flight.future.exception()  # Mark retrieved when nobody waits
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def get_stats(self) -> InflightStats:
+        """Snapshot of coalescing statistics."""
+        stats = InflightStats(**vars(self._stats))
+        stats.active = len(self._flights)
+        return stats
+
+
+# =============================================================================
+# Registry (admin API / monitoring)
+# =============================================================================
+
+_registry: "weakref.WeakValueDictionary[str, InflightCoalescer]" = weakref.WeakValueDictionary()
+
+
+def register_inflight_coalescer(coalescer: InflightCoalescer) -> None:
+    """Register a coalescer for stats export (latest wins on name clash)."""
+    _registry[coalescer.name] = coalescer
+
+
+def get_all_inflight_stats() -> List[Dict[str, Any]]:
+    """Stats for every live registered coalescer, sorted by name."""
+    return [
+        coalescer.get_stats().to_dict()
+        for _, coalescer in sorted(_registry.items())
+    ]
@@ -0,0 +1,258 @@
+"""
+Ingestion Result Cache - Persistent, content-addressed LLM result cache.
+
+Vision extraction and contextual enrichment are the most expensive calls in
+ingestion and used to re-run on every re-ingest, retry or chunking change.
+Results are stored on disk (SQLite) keyed by content hashes:
+
+- vision:  model + prompt version + hash(page image pixels)
+- context: model + prompt version + hash(chunk text) + hash(document context)
+
+A changed prompt or model produces new keys, so stale results are never
+served; old entries age out through size-bounded LRU eviction.
+
+CLI: python scripts/ingestion_cache.py {stats,list,clear,evict,warm}
+
+Feature: ingestion-result-cache
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KIND_VISION = "vision"
+KIND_CONTEXT = "context"
+
+
+def content_hash(*parts: Any) -> str:
+    """sha256 over the given parts (bytes are hashed raw, others as str)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def prompt_version(prompt: str) -> str:
+    """Short, stable version tag of a prompt template."""
+    return content_hash(prompt)[:12]
+
+
+class IngestionResultCache:
+    """
+    SQLite-backed, size-bounded cache of ingestion LLM results.
+
+    Values are JSON-serializable dicts. Thread-safe; every operation is a
+    short local SQLite transaction, cheap next to the API call it replaces.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        """
+        Args:
+            path: SQLite file path (parent directory is created)
+            max_bytes: Total payload budget before LRU eviction
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (kind, key)
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_entries_last_accessed ON entries(last_accessed)"
+        )
+        self._conn.commit()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+    def get(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached result (refreshes its LRU position)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM entries WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE entries SET last_accessed = ?, hits = hits + 1 WHERE kind = ? AND key = ?",
+                (time.time(), kind, key)
+            )
+            self._conn.commit()
+            self._hits += 1
+        return json.loads(row[0])
+
+    def put(self, kind: str, key: str, value: Dict[str, Any]) -> None:
+        """Store a result, evicting least recently used entries over budget."""
+        payload = json.dumps(value, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT size FROM entries WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO entries (kind, key, value, size, created_at, last_accessed, hits)
+                VALUES (?, ?, ?, ?, ?, ?, 0)
+                """,
+                (kind, key, payload, size, now, now)
+            )
+            self._conn.commit()
+            self._total_bytes += size - (previous[0] if previous else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict_locked()
+
+    async def aget(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        """get() off the event loop; a cache error is logged and reads as a miss."""
+        try:
+            return await asyncio.to_thread(self.get, kind, key)
+        except Exception as e:
+            logger.warning(f"[IngestionCache] Read failed ({kind}), calling the API: {e}")
+            return None
+
+    async def aput(self, kind: str, key: str, value: Dict[str, Any]) -> None:
+        """put() off the event loop; a cache error is logged, never raised."""
+        try:
+            await asyncio.to_thread(self.put, kind, key, value)
+        except Exception as e:
+            logger.warning(f"[IngestionCache] Write failed ({kind}): {e}")
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """Evict LRU entries down to max_bytes (default: configured budget)."""
+        with self._lock:
+            return self._evict_locked(max_bytes)
+
+    def _evict_locked(self, max_bytes: Optional[int] = None) -> int:
+        budget = self.max_bytes if max_bytes is None else max_bytes
+        total = self._total_bytes
+        if total <= budget:
+            return 0
+
+        evicted = 0
+        rows = self._conn.execute(
+            "SELECT kind, key, size FROM entries ORDER BY last_accessed ASC"
+        ).fetchall()
+        for kind, key, size in rows:
+            if total <= budget:
+                break
+            self._conn.execute("DELETE FROM entries WHERE kind = ? AND key = ?", (kind, key))
+            total -= size
+            evicted += 1
+        self._conn.commit()
+        self._total_bytes = total
+        if evicted:
+            logger.info(f"[IngestionCache] Evicted {evicted} entries (budget {budget} bytes)")
+        return evicted
+
+    def clear(self, kind: Optional[str] = None) -> int:
+        """Delete all entries (or all entries of one kind)."""
+        with self._lock:
+            if kind:
+                cursor = self._conn.execute("DELETE FROM entries WHERE kind = ?", (kind,))
+            else:
+                cursor = self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+            self._total_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()[0]
+            return cursor.rowcount
+
+    def list_entries(self, kind: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recently used entries (metadata only)."""
+        query = "SELECT kind, key, size, created_at, last_accessed, hits FROM entries"
+        params: tuple = ()
+        if kind:
+            query += " WHERE kind = ?"
+            params = (kind,)
+        query += " ORDER BY last_accessed DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, params + (limit,)).fetchall()
+        return [
+            {
+                "kind": row[0],
+                "key": row[1],
+                "size": row[2],
+                "created_at": row[3],
+                "last_accessed": row[4],
+                "hits": row[5],
+            }
+            for row in rows
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Entry counts and sizes per kind, plus this process's hit rate."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, COUNT(*), COALESCE(SUM(size), 0) FROM entries GROUP BY kind"
+            ).fetchall()
+        total_lookups = self._hits + self._misses
+        return {
+            "path": str(self.path),
+            "max_bytes": self.max_bytes,
+            "total_bytes": sum(row[2] for row in rows),
+            "kinds": {row[0]: {"entries": row[1], "bytes": row[2]} for row in rows},
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": f"{(self._hits / total_lookups if total_lookups else 0.0):.2%}",
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Singleton
+_ingestion_cache: Optional[IngestionResultCache] = None
+_ingestion_cache_failed = False
+
+
+def get_ingestion_cache() -> Optional[IngestionResultCache]:
+    """
+    Get or create the IngestionResultCache singleton.
+
+    Returns None when disabled or when the cache file cannot be opened
+    (ingestion then simply calls the APIs as before).
+    """
+    global _ingestion_cache, _ingestion_cache_failed
+    if not settings.ingestion_cache_enabled or _ingestion_cache_failed:
+        return None
+    if _ingestion_cache is None:
+        try:
+            _ingestion_cache = IngestionResultCache(
+                path=os.path.expanduser(settings.ingestion_cache_path),
+                max_bytes=settings.ingestion_cache_max_mb * 1024 * 1024
+            )
+            logger.info(f"[IngestionCache] Using {_ingestion_cache.path}")
+        except Exception as e:
+            logger.warning(f"[IngestionCache] Disabled, cannot open cache: {e}")
+            _ingestion_cache_failed = True
+            return None
+    return _ingestion_cache
@@ -0,0 +1,271 @@
+"""
+Bounded LRU + TTL Cache - Shared in-process cache component.
+
+Replaces ad-hoc module dict caches (manual expiry, unbounded growth,
+O(n log n) eviction by sorting) on request hot paths.
+
+Properties:
+- O(1) get/set/evict (OrderedDict, LRU order maintained on access)
+- Per-entry TTL, expired entries dropped lazily on access
+- Thread-safe (sync callers) and async-safe (no awaits while locked)
+- Optional single-flight: concurrent misses for the same key share ONE load
+- Hit/miss/eviction/expiration metrics, exported via the cache registry
+
+Usage:
+    cache = LRUCache("guardian.decisions", max_size=1000, ttl_seconds=3600)
+    cache.set(key, value)
+    value = cache.get(key)
+
+    # Single-flight async load
+    value = await cache.get_or_load(key, lambda: expensive_call(query))
+
+Feature: semantic-cache
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class _LoaderCancelled(Exception):
+    """The leader of a single-flight load was cancelled; followers retry."""
+
+
+@dataclass
+class LRUCacheStats:
+    """Statistics for a bounded LRU cache."""
+    name: str
+    size: int = 0
+    max_size: int = 0
+    ttl_seconds: Optional[float] = None
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    coalesced: int = 0  # Misses served by an in-flight load (single-flight)
+
+    @property
+    def hit_rate(self) -> float:
+        """Calculate cache hit rate."""
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "name": self.name,
+            "size": self.size,
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": f"{self.hit_rate:.2%}",
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "coalesced": self.coalesced,
+        }
+
+
+class LRUCache:
+    """
+    Bounded, TTL-aware LRU cache with metrics and single-flight loading.
+
+    Values of None are cached like any other value; use get_or_load's
+    cache_if to skip caching unwanted results (e.g. empty extractions).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_size: int = 1000,
+        ttl_seconds: Optional[float] = None,
+        register: bool = True
+    ):
+        """
+        Args:
+            name: Cache name (used in stats / admin API)
+            max_size: Max entries before least-recently-used eviction
+            ttl_seconds: Entry lifetime, None = no expiry
+            register: Export stats through get_all_cache_stats()
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+
+        self.name = name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+
+        self._data: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._stats = LRUCacheStats(name=name, max_size=max_size, ttl_seconds=ttl_seconds)
+
+        if register:
+            register_cache(self)
+
+    # ------------------------------------------------------------------
+    # Core operations
+    # ------------------------------------------------------------------
+
+    def _lookup(self, key: Hashable) -> Any:
+        """Get value or _MISSING. Caller holds the lock."""
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            return _MISSING
+        value, expires_at = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._data[key]
+            self._stats.expirations += 1
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value (refreshes LRU position), or default on miss/expiry."""
+        with self._lock:
+            value = self._lookup(key)
+            if value is _MISSING:
+                self._stats.misses += 1
+                return default
+            self._stats.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Insert or replace a value, evicting the LRU entry when full."""
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._stats.evictions += 1
+
+    def pop(self, key: Hashable) -> bool:
+        """Remove a key. Returns True if it was present."""
+        with self._lock:
+            return self._data.pop(key, _MISSING) is not _MISSING
+
+    def clear(self) -> int:
+        """Remove all entries. Returns number removed."""
+        with self._lock:
+            count = len(self._data)
+            self._data.clear()
+            return count
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._lookup(key) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # ------------------------------------------------------------------
+    # Single-flight loading
+    # ------------------------------------------------------------------
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        cache_if: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Get a value, loading it on miss.
+
+        Concurrent misses for the same key await the first caller's load
+        instead of each running the loader (single-flight). If that caller
+        is cancelled, a waiting caller takes over the load.
+
+        Args:
+            key: Cache key
+            loader: Zero-arg coroutine function producing the value
+            cache_if: Predicate deciding whether a loaded value is cached
+
+        Returns:
+            Cached or freshly loaded value (loader exceptions propagate
+            to every waiter; nothing is cached)
+        """
+        retry = False
+        while True:
+            with self._lock:
+                value = self._lookup(key)
+                if value is not _MISSING:
+                    if not retry:
+                        self._stats.hits += 1
+                    return value
+                if not retry:
+                    self._stats.misses += 1
+                pending = self._inflight.get(key)
+                if pending is None:
+                    pending = asyncio.get_running_loop().create_future()
+                    self._inflight[key] = pending
+                    break
+                if not retry:
+                    self._stats.coalesced += 1
+
+            try:
+                return await asyncio.shield(pending)
+            except _LoaderCancelled:
+                # The leader's request was cancelled, not ours: load again
+                retry = True
+
+        try:
+            value = await loader()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            if not pending.done():
+                if isinstance(e, asyncio.CancelledError):
+                    pending.set_exception(_LoaderCancelled())
+                else:
+                    pending.set_exception(e)
+                pending.exception()  # Mark retrieved when nobody waits
+            raise
+
+        if cache_if is None or cache_if(value):
+            self.set(key, value)
+        with self._lock:
+            self._inflight.pop(key, None)
+        if not pending.done():
+            pending.set_result(value)
+        return value
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> LRUCacheStats:
+        """Snapshot of cache statistics."""
+        with self._lock:
+            self._stats.size = len(self._data)
+            return LRUCacheStats(**vars(self._stats))
+
+
+# =============================================================================
+# Registry (admin API / monitoring)
+# =============================================================================
+
+_registry: "weakref.WeakValueDictionary[str, LRUCache]" = weakref.WeakValueDictionary()
+
+
+def register_cache(cache: LRUCache) -> None:
+    """Register a cache for stats export (latest cache wins on name clash)."""
+    _registry[cache.name] = cache
+
+
+def get_all_cache_stats() -> List[Dict[str, Any]]:
+    """Stats for every live registered cache, sorted by name."""
+    return [
+        cache.get_stats().to_dict()
+        for _, cache in sorted(_registry.items())
+    ]
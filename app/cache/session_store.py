@@ -0,0 +1,380 @@
+"""
+Bounded Session-State Store - Per-session / per-user state with eviction.
+
+Replaces plain ``Dict[session_id, state]`` attributes on long-lived
+singletons (SessionManager, MemorySummarizer, MemoryCompressionEngine),
+which kept the state of every session the process had ever seen.
+
+Properties:
+- Idle-time eviction: entries untouched for idle_ttl_seconds are dropped
+  (checked on every access, O(1) amortized, no background task)
+- Max-count eviction: least-recently-used entry dropped beyond max_size
+- Optional persistence: evicted entries are saved to a backend
+  (SessionStateRepository, Postgres) and transparently resumed on the
+  next access, so eviction only costs a DB round trip, not the state
+- Metrics: size, hits/misses, evictions, persisted/resumed counts and an
+  estimated memory footprint, exported via get_all_session_store_stats()
+
+Usage:
+    store = SessionStore("memory_summarizer.states", factory=lambda key: TieredMemoryState(),
+                         serializer=TieredMemoryState.to_dict,
+                         deserializer=TieredMemoryState.from_dict,
+                         backend=get_session_state_repository())
+    state = store.get_or_create(session_id)
+    state = await store.aget_or_create(session_id)   # from async code
+
+Feature: bounded-session-state
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, fields, is_dataclass
+from itertools import islice
+from typing import Any, Callable, Dict, Generic, List, Optional, Protocol, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+# Entries measured when estimating memory usage (most recently used first)
+_SIZE_SAMPLE = 32
+
+
+class SessionStateBackend(Protocol):
+    """Persistence for evicted-but-resumable entries."""
+
+    def is_available(self) -> bool: ...
+
+    def save(self, namespace: str, key: str, state: Dict[str, Any]) -> None: ...
+
+    def load(self, namespace: str, key: str) -> Optional[Dict[str, Any]]: ...
+
+    def delete(self, namespace: str, key: str) -> None: ...
+
+
+@dataclass
+class SessionStoreStats:
+    """Statistics for a bounded session-state store."""
+    name: str
+    size: int = 0
+    max_size: int = 0
+    idle_ttl_seconds: Optional[float] = None
+    hits: int = 0
+    misses: int = 0
+    created: int = 0
+    evicted_idle: int = 0
+    evicted_capacity: int = 0
+    persisted: int = 0
+    resumed: int = 0
+    estimated_bytes: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "name": self.name,
+            "size": self.size,
+            "max_size": self.max_size,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "created": self.created,
+            "evicted_idle": self.evicted_idle,
+            "evicted_capacity": self.evicted_capacity,
+            "persisted": self.persisted,
+            "resumed": self.resumed,
+            "estimated_bytes": self.estimated_bytes,
+        }
+
+
+def deep_sizeof(obj: Any, _seen: Optional[set] = None) -> int:
+    """Approximate memory footprint of an object graph (bytes)."""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif is_dataclass(obj) and not isinstance(obj, type):
+        size += sum(deep_sizeof(getattr(obj, f.name), seen) for f in fields(obj))
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+class SessionStore(Generic[V]):
+    """
+    Bounded, idle-evicting mapping of session/user key -> mutable state.
+
+    Values are returned by reference (callers mutate them in place, as with
+    the dicts this replaces). A persisted entry is snapshotted when it is
+    evicted, so mutations made before eviction are kept.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[str], V],
+        max_size: int = 10000,
+        idle_ttl_seconds: Optional[float] = 3600,
+        backend: Optional[SessionStateBackend] = None,
+        serializer: Optional[Callable[[V], Dict[str, Any]]] = None,
+        deserializer: Optional[Callable[[Dict[str, Any]], V]] = None,
+        register: bool = True
+    ):
+        """
+        Args:
+            name: Store name (stats / persistence namespace)
+            factory: Creates the state for a new key (called with the key)
+            max_size: Max resident entries before LRU eviction
+            idle_ttl_seconds: Evict entries idle this long (None = never)
+            backend: Persistence for evicted entries (None = drop them)
+            serializer: State -> JSON-able dict (required with backend)
+            deserializer: Dict -> state (required with backend)
+            register: Export stats through get_all_session_store_stats()
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        if backend is not None and (serializer is None or deserializer is None):
+            raise ValueError("serializer and deserializer are required with a backend")
+
+        self.name = name
+        self.max_size = max_size
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._factory = factory
+        self._backend = backend
+        self._serializer = serializer
+        self._deserializer = deserializer
+
+        # key -> (value, last_access); ordered by last access (oldest first)
+        self._data: "OrderedDict[str, Tuple[V, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = SessionStoreStats(name=name, max_size=max_size, idle_ttl_seconds=idle_ttl_seconds)
+
+        if register:
+            register_session_store(self)
+
+    @property
+    def persistent(self) -> bool:
+        """True if evicted entries are saved and resumable."""
+        return self._backend is not None and self._backend.is_available()
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+
+    def _evict_locked(self, now: float) -> List[Tuple[str, V]]:
+        """Pop idle and over-capacity entries. Caller holds the lock."""
+        evicted: List[Tuple[str, V]] = []
+        if self.idle_ttl_seconds is not None:
+            cutoff = now - self.idle_ttl_seconds
+            while self._data:
+                key, (value, last_access) = next(iter(self._data.items()))
+                if last_access > cutoff:
+                    break
+                self._data.popitem(last=False)
+                self._stats.evicted_idle += 1
+                evicted.append((key, value))
+        while len(self._data) > self.max_size:
+            key, (value, _) = self._data.popitem(last=False)
+            self._stats.evicted_capacity += 1
+            evicted.append((key, value))
+        return evicted
+
+    def _persist(self, evicted: List[Tuple[str, V]]) -> None:
+        """Save evicted entries to the backend (outside the lock)."""
+        if not evicted or not self.persistent:
+            return
+        for key, value in evicted:
+            try:
+                self._backend.save(self.name, key, self._serializer(value))
+                self._stats.persisted += 1
+            except Exception as e:
+                logger.warning(f"[SESSION_STORE] {self.name}: failed to persist {key}: {e}")
+
+    def _resume(self, key: str) -> Optional[V]:
+        """Load a previously evicted entry from the backend."""
+        if not self.persistent:
+            return None
+        try:
+            data = self._backend.load(self.name, key)
+            return self._deserializer(data) if data is not None else None
+        except Exception as e:
+            logger.warning(f"[SESSION_STORE] {self.name}: failed to resume {key}: {e}")
+            return None
+
+    def sweep(self) -> int:
+        """Evict idle entries now. Returns number evicted."""
+        with self._lock:
+            evicted = self._evict_locked(time.monotonic())
+        self._persist(evicted)
+        return len(evicted)
+
+    # ------------------------------------------------------------------
+    # Core operations
+    # ------------------------------------------------------------------
+
+    def _touch_locked(self, key: str, now: float) -> Optional[V]:
+        """Return a resident value and refresh its access time. Caller holds the lock."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value = entry[0]
+        self._data[key] = (value, now)
+        self._data.move_to_end(key)
+        return value
+
+    def get(self, key: str) -> Optional[V]:
+        """Get the state for a key (resuming it if persisted), or None."""
+        now = time.monotonic()
+        with self._lock:
+            evicted = self._evict_locked(now)
+            value = self._touch_locked(key, now)
+            if value is not None:
+                self._stats.hits += 1
+            else:
+                self._stats.misses += 1
+        self._persist(evicted)
+        if value is not None:
+            return value
+
+        resumed = self._resume(key)
+        if resumed is None:
+            return None
+        return self._adopt(key, resumed, resumed=True)
+
+    def get_or_create(self, key: str) -> V:
+        """Get the state for a key, resuming or creating it on miss."""
+        value = self.get(key)
+        if value is not None:
+            return value
+        return self._adopt(key, self._factory(key), resumed=False)
+
+    def _get_resident(self, key: str) -> Optional[V]:
+        """Return a resident, non-idle value (no eviction, no backend I/O), or None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if self.idle_ttl_seconds is not None and entry[1] <= now - self.idle_ttl_seconds:
+                return None
+            self._stats.hits += 1
+            return self._touch_locked(key, now)
+
+    async def aget(self, key: str) -> Optional[V]:
+        """
+        get() for async callers.
+
+        Resident hits are served inline; misses (which may resume from or
+        persist evictions to the backend) run in a worker thread.
+        """
+        if not self.persistent:
+            return self.get(key)
+        value = self._get_resident(key)
+        if value is not None:
+            return value
+        return await asyncio.to_thread(self.get, key)
+
+    async def aget_or_create(self, key: str) -> V:
+        """get_or_create() for async callers (backend I/O off the event loop)."""
+        if not self.persistent:
+            return self.get_or_create(key)
+        value = self._get_resident(key)
+        if value is not None:
+            return value
+        return await asyncio.to_thread(self.get_or_create, key)
+
+    def _adopt(self, key: str, value: V, resumed: bool) -> V:
+        """Insert a loaded/created value unless another caller won the race."""
+        now = time.monotonic()
+        with self._lock:
+            existing = self._touch_locked(key, now)
+            if existing is not None:
+                return existing
+            self._data[key] = (value, now)
+            if resumed:
+                self._stats.resumed += 1
+            else:
+                self._stats.created += 1
+            evicted = self._evict_locked(now)
+        self._persist(evicted)
+        return value
+
+    def set(self, key: str, value: V) -> None:
+        """Insert or replace the state for a key."""
+        now = time.monotonic()
+        with self._lock:
+            self._data[key] = (value, now)
+            self._data.move_to_end(key)
+            evicted = self._evict_locked(now)
+        self._persist(evicted)
+
+    def pop(self, key: str) -> bool:
+        """Forget a key (resident and persisted). Returns True if it was resident."""
+        with self._lock:
+            removed = self._data.pop(key, None) is not None
+        if self.persistent:
+            try:
+                self._backend.delete(self.name, key)
+            except Exception as e:
+                logger.warning(f"[SESSION_STORE] {self.name}: failed to delete {key}: {e}")
+        return removed
+
+    def clear(self) -> int:
+        """Drop all resident entries (persisted snapshots are kept)."""
+        with self._lock:
+            count = len(self._data)
+            self._data.clear()
+            return count
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> SessionStoreStats:
+        """Snapshot of store statistics (memory estimated from a sample)."""
+        with self._lock:
+            size = len(self._data)
+            sample = [value for value, _ in islice(reversed(self._data.values()), _SIZE_SAMPLE)]
+            stats = SessionStoreStats(**vars(self._stats))
+        stats.size = size
+        if sample:
+            per_entry = sum(deep_sizeof(value) for value in sample) / len(sample)
+            stats.estimated_bytes = int(per_entry * size)
+        return stats
+
+
+# =============================================================================
+# Registry (admin API / monitoring)
+# =============================================================================
+
+_registry: "weakref.WeakValueDictionary[str, SessionStore]" = weakref.WeakValueDictionary()
+
+
+def register_session_store(store: SessionStore) -> None:
+    """Register a store for stats export (latest store wins on name clash)."""
+    _registry[store.name] = store
+
+
+def get_all_session_store_stats() -> List[Dict[str, Any]]:
+    """Stats for every live registered store, sorted by name."""
+    return [
+        store.get_stats().to_dict()
+        for _, store in sorted(_registry.items())
+    ]
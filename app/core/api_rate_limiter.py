@@ -0,0 +1,158 @@
+"""
+Outbound API Rate Limiting - Async token buckets per external API.
+
+app/core/rate_limit.py protects our HTTP endpoints from clients; this module
+protects external APIs (Gemini vision/embeddings/LLM tiers, Supabase Storage)
+from us. Waiting is done with ``await asyncio.sleep`` so a throttled ingestion
+never blocks the event loop that also serves chat requests.
+
+Usage:
+    from app.core.api_rate_limiter import get_api_rate_limiter
+
+    await get_api_rate_limiter("vision").acquire()
+    response = await client.aio.models.generate_content(...)
+
+Feature: async-api-rate-limiting
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket with an awaitable acquire.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``
+    (the allowed burst). A caller that finds the bucket empty reserves its
+    tokens immediately (the balance goes negative) and sleeps until they
+    have refilled, so concurrent waiters are served in arrival order without
+    a lock and without binding to a particular event loop.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float = 1.0):
+        """
+        Args:
+            name: API name (for logs and stats)
+            rate: Tokens per second; <= 0 disables limiting
+            capacity: Maximum burst size in tokens
+        """
+        self.name = name
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._acquired = 0
+        self._throttled = 0
+        self._total_wait = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens only if available right now (never waits)."""
+        if not self.enabled:
+            return True
+        self._refill()
+        if self._tokens < tokens:
+            return False
+        self._tokens -= tokens
+        self._acquired += 1
+        return True
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Wait until ``tokens`` are available and take them.
+
+        Returns:
+            Seconds spent waiting (0.0 when not throttled)
+        """
+        if not self.enabled:
+            return 0.0
+
+        self._refill()
+        self._tokens -= tokens
+        self._acquired += 1
+        if self._tokens >= 0:
+            return 0.0
+
+        wait = -self._tokens / self.rate
+        self._throttled += 1
+        self._total_wait += wait
+        logger.debug(f"[RateLimiter:{self.name}] Throttling {wait:.2f}s")
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            # Give the reservation back so later callers don't wait for us
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + tokens)
+            self._acquired -= 1
+            raise
+        return wait
+
+    def get_stats(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "name": self.name,
+            "requests_per_minute": round(self.rate * 60, 2),
+            "burst": self.capacity,
+            "available_tokens": round(self._tokens, 2),
+            "acquired": self._acquired,
+            "throttled": self._throttled,
+            "total_wait_seconds": round(self._total_wait, 2),
+        }
+
+
+# API name -> (settings field with requests/minute, burst size)
+API_RATE_LIMITS: Dict[str, Tuple[str, float]] = {
+    "vision": ("vision_requests_per_minute", 1),
+    "embeddings": ("embedding_requests_per_minute", 20),
+    "llm_deep": ("llm_requests_per_minute", 10),
+    "llm_moderate": ("llm_requests_per_minute", 10),
+    "llm_light": ("llm_requests_per_minute", 10),
+    "storage": ("storage_requests_per_minute", 10),
+}
+
+_limiters: Dict[str, AsyncTokenBucket] = {}
+
+
+def get_api_rate_limiter(name: str) -> AsyncTokenBucket:
+    """
+    Get the shared limiter for an external API (created on first use).
+
+    All callers of the same API in this process draw from one bucket, so
+    background ingestion and chat share the quota instead of each assuming
+    they own it.
+
+    Raises:
+        KeyError: If ``name`` is not listed in API_RATE_LIMITS
+    """
+    limiter = _limiters.get(name)
+    if limiter is None:
+        setting, burst = API_RATE_LIMITS[name]
+        per_minute = getattr(settings, setting) if settings.api_rate_limits_enabled else 0
+        limiter = AsyncTokenBucket(name=name, rate=per_minute / 60.0, capacity=burst)
+        _limiters[name] = limiter
+    return limiter
+
+
+def get_all_rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats of every limiter created so far."""
+    return {name: limiter.get_stats() for name, limiter in _limiters.items()}
+
+
+def reset_api_rate_limiters() -> None:
+    """Drop all limiters (re-read from settings on next use). Used by tests."""
+    _limiters.clear()
@@ -36,7 +36,42 @@ class Settings(BaseSettings):
     # Rate Limiting
     rate_limit_requests: int = Field(default=100, description="Max requests per window")
     rate_limit_window_seconds: int = Field(default=60, description="Rate limit window in seconds")
-    
+
+    # Outbound API rate limits (async token buckets, app/core/api_rate_limiter.py)
+    api_rate_limits_enabled: bool = Field(default=True, description="Throttle calls to external APIs with shared token buckets")
+    vision_requests_per_minute: int = Field(default=10, description="Gemini Vision extraction requests per minute")
+    embedding_requests_per_minute: int = Field(default=1500, description="Gemini embedding requests per minute")
+    llm_requests_per_minute: int = Field(default=1000, description="LLM requests per minute, per thinking tier")
+    storage_requests_per_minute: int = Field(default=600, description="Supabase Storage requests per minute")
+    
+    # LLM request scheduler (app/engine/llm_scheduler.py): per-tier admission control
+    llm_scheduler_enabled: bool = Field(default=True, description="Queue LLM calls by priority with per-tier concurrency limits")
+    llm_concurrency_deep: int = Field(default=4, description="Max in-flight DEEP tier LLM calls")
+    llm_concurrency_moderate: int = Field(default=8, description="Max in-flight MODERATE tier LLM calls")
+    llm_concurrency_light: int = Field(default=8, description="Max in-flight LIGHT tier LLM calls")
+    llm_background_share: float = Field(default=0.5, description="Fraction of a tier's slots usable by background/ingestion calls")
+    llm_tokens_per_minute: int = Field(default=1_000_000, description="Token budget per tier per minute (0 = unlimited)")
+    llm_output_token_estimate: int = Field(default=1024, description="Output tokens assumed when admitting a call")
+    llm_max_retries: int = Field(default=2, description="Retries after a 429 (tier pauses for the retry-after delay)")
+    llm_max_retry_wait_seconds: float = Field(default=30.0, description="Fail instead of waiting longer than this for a retry")
+
+    # Token counting (app/engine/token_counter.py): shared encoder + cached counts
+    token_counter_cache_size: int = Field(default=20_000, description="Max cached token counts of immutable texts (memories, chunks)")
+    token_estimate_chars_per_token: float = Field(default=4.0, description="ASCII characters per Gemini token in the token estimate")
+    token_estimate_tokens_per_non_ascii_word: float = Field(default=1.5, description="Gemini tokens per non-ASCII (Vietnamese) word in the token estimate")
+
+    # Prompt context packing (app/engine/context_packer.py); budgets come from AdaptiveTokenBudget
+    context_dedup_threshold: float = Field(default=0.8, description="Share of a chunk's word 3-grams already in context above which it is dropped")
+    context_min_truncated_tokens: int = Field(default=48, description="Smallest leftover budget filled with a sentence-truncated segment")
+    context_history_min_tokens: int = Field(default=1500, description="Conversation-history tokens always packed, even when the adaptive budget is smaller (short follow-ups)")
+    rag_context_max_chunks: int = Field(default=5, description="Retrieved chunks offered to the context packer per RAG answer")
+
+    # Prompt prefix caching (app/engine/llm_pool.py): static persona prefix per role/tier
+    llm_explicit_cache_enabled: bool = Field(default=False, description="Store static system prompt prefixes as Gemini cached content (explicit caching)")
+    llm_explicit_cache_ttl_seconds: int = Field(default=3600, description="TTL of an explicit cached-content handle; renewed before expiry")
+    llm_explicit_cache_min_tokens: int = Field(default=1024, description="Skip explicit caching for prefixes shorter than the Gemini minimum")
+    prompt_reload_check_seconds: float = Field(default=2.0, description="Min seconds between persona YAML mtime checks for hot-reload (negative = off)")
+
     # Database - PostgreSQL (Local Docker)
     postgres_host: str = Field(default="localhost", description="PostgreSQL host")
     postgres_port: int = Field(default=5432, description="PostgreSQL port")
@@ -58,6 +93,16 @@ class Settings(BaseSettings):
     # LMS Callback Configuration (AI-LMS Integration v2.0)
     lms_callback_url: Optional[str] = Field(default=None, description="LMS callback URL for AI events")
     lms_callback_secret: Optional[str] = Field(default=None, description="Shared secret for callback authentication")
+    
+    # LMS event outbox (lms_event_outbox table + EventOutboxWorker)
+    lms_outbox_enabled: bool = Field(default=True, description="Queue LMS events in the durable outbox instead of sending inline")
+    lms_outbox_batch_size: int = Field(default=50, description="Events claimed per outbox flush")
+    lms_outbox_max_concurrency: int = Field(default=4, description="Max concurrent callback requests per worker")
+    lms_outbox_flush_interval_seconds: float = Field(default=1.0, description="Outbox poll interval when it is empty")
+    lms_outbox_max_attempts: int = Field(default=8, description="Delivery attempts before an event is marked dead")
+    lms_outbox_retry_base_seconds: float = Field(default=5.0, description="First retry delay (doubles per attempt)")
+    lms_outbox_retry_max_seconds: float = Field(default=900.0, description="Retry delay cap")
+    lms_outbox_stale_seconds: int = Field(default=120, description="Release events claimed by a worker for this long")
 
     
     @property
@@ -132,6 +177,29 @@ class Settings(BaseSettings):
     embedding_dimensions: int = Field(default=768, description="Embedding vector dimensions (MRL)")
     semantic_memory_enabled: bool = Field(default=True, description="Enable semantic memory v0.3")
     summarization_token_threshold: int = Field(default=2000, description="Token threshold for summarization")
+    insight_rank_similarity_weight: float = Field(default=0.5, description="Insight ranking weight of cosine similarity to the query")
+    insight_rank_category_weight: float = Field(default=0.3, description="Insight ranking bonus for priority categories (knowledge_gap, learning_style)")
+    insight_rank_recency_weight: float = Field(default=0.2, description="Insight ranking weight of recency (last accessed / created)")
+    insight_rank_recency_half_life_days: float = Field(default=14.0, description="Age in days at which an insight's recency score halves")
+    insight_access_flush_seconds: float = Field(default=5.0, description="Delay before batched last_accessed updates are written")
+
+    # Post-turn memory write queue (app/services/memory_write_queue.py + memory_write_queue table)
+    memory_queue_enabled: bool = Field(default=True, description="Queue post-turn memory writes instead of running them as FastAPI BackgroundTasks")
+    memory_queue_inline: bool = Field(default=True, description="Process queued memory writes in the API (False = spill every turn for scripts/memory_worker.py)")
+    memory_queue_max_concurrency: int = Field(default=4, description="Users processed concurrently by the memory write queue")
+    memory_queue_max_pending: int = Field(default=500, description="Turns held in memory before new turns spill to Postgres")
+    memory_queue_max_coalesce: int = Field(default=5, description="Consecutive turns of one session merged into one extraction call")
+    memory_queue_poll_seconds: float = Field(default=2.0, description="Interval between polls of the spilled-turn table")
+    memory_queue_max_attempts: int = Field(default=5, description="Processing attempts before a turn is marked dead")
+    memory_queue_retry_base_seconds: float = Field(default=10.0, description="First retry delay for failed turns (doubles per attempt)")
+    memory_queue_retry_max_seconds: float = Field(default=600.0, description="Retry delay cap for failed turns")
+    memory_queue_stale_seconds: int = Field(default=300, description="Release turns claimed by a worker for this long")
+
+    # Bounded in-process session state (app/cache/session_store.py)
+    session_store_max_sessions: int = Field(default=10000, description="Max resident sessions per session-state store")
+    session_store_idle_seconds: int = Field(default=3600, description="Evict session state idle for this long")
+    session_store_persist_evicted: bool = Field(default=False, description="Save evicted session state to Postgres and resume it on the next request")
+    session_store_retention_days: int = Field(default=7, description="Keep persisted session snapshots this long")
     
     # Unified Agent Settings (CHỈ THỊ KỸ THUẬT SỐ 13)
     use_unified_agent: bool = Field(default=True, description="Use Unified Agent (LLM-driven orchestration) instead of IntentClassifier")
@@ -187,6 +255,28 @@ class Settings(BaseSettings):
         description="Exit iteration loop early if HIGH confidence achieved"
     )
     
+    # Grading LLM calls: judge all uncertain docs in ONE streamed call
+    mini_judge_single_call: bool = Field(
+        default=True,
+        description="Mini-Judge grades all uncertain docs in one streamed LLM call (fallback: per-doc calls)"
+    )
+    grading_early_stop_relevant: int = Field(
+        default=2,
+        description="Stop grading once this many relevant docs are confirmed"
+    )
+    
+    # Query analysis fast path: local kNN classifier + memo cache, LLM only on low confidence
+    query_analyzer_local_enabled: bool = Field(default=True, description="Try local classifier before LLM query analysis")
+    query_analyzer_local_confidence: float = Field(default=0.75, description="Min local classifier confidence to skip LLM")
+    query_analyzer_cache_size: int = Field(default=2048, description="Max memoized query analyses (keyed by normalized query)")
+    query_classifier_history_path: str = Field(default="", description="JSONL file to persist LLM-labeled queries (empty = in-memory only)")
+    
+    # Speculative generation: overlap answer generation with grading
+    rag_speculative_generation: bool = Field(
+        default=True,
+        description="Start generation on first-pass docs while grading runs; cancel only if grading triggers a rewrite"
+    )
+    
     # Gemini 3.0 Thinking Level (Dec 2025)
     # Controls reasoning depth: minimal | low | medium | high
     gemini_thinking_level: str = Field(
@@ -255,6 +345,8 @@ class Settings(BaseSettings):
     cache_embedding_ttl: int = Field(default=3600, description="Embedding cache TTL in seconds (1 hour)")
     cache_max_response_entries: int = Field(default=10000, description="Maximum response cache entries")
     cache_log_operations: bool = Field(default=True, description="Log cache hit/miss operations")
+    rag_coalesce_inflight: bool = Field(default=True, description="Concurrent identical/near-identical RAG questions share one pipeline run")
+    rag_coalesce_max_wait_seconds: float = Field(default=90.0, description="Max time a coalesced request waits for the leading request before running itself")
     
     # Semantic Chunking Settings (Feature: semantic-chunking)
     chunk_size: int = Field(default=800, description="Target chunk size in characters")
@@ -270,6 +362,21 @@ class Settings(BaseSettings):
     min_text_length_for_direct: int = Field(default=100, description="Minimum text length for direct extraction")
     force_vision_mode: bool = Field(default=False, description="Force Vision extraction for all pages (bypass hybrid detection)")
     
+    # Persistent ingestion result cache (vision extraction + contextual enrichment)
+    ingestion_cache_enabled: bool = Field(default=True, description="Cache vision/context LLM results on disk across ingestions")
+    ingestion_cache_path: str = Field(default=".cache/ingestion_results.sqlite3", description="SQLite file for the ingestion result cache")
+    ingestion_cache_max_mb: int = Field(default=512, description="Size budget of the ingestion result cache (LRU eviction)")
+
+    # Durable ingestion queue (ingestion_jobs table + scripts/ingestion_worker.py)
+    ingestion_upload_dir: str = Field(default=".uploads/ingestion", description="Directory (shared with workers) for uploaded PDFs awaiting ingestion")
+    ingestion_worker_poll_seconds: float = Field(default=5.0, description="Worker poll interval when the queue is empty")
+    ingestion_job_stale_seconds: int = Field(default=600, description="Re-queue processing jobs without a heartbeat for this long")
+    ingestion_job_heartbeat_seconds: float = Field(default=30.0, description="Interval between worker heartbeats on a claimed job")
+    ingestion_job_max_attempts: int = Field(default=3, description="Claims per job before it is marked failed")
+    ingestion_inline_worker: bool = Field(default=False, description="Also run queued jobs inside the API process (single-process dev setups)")
+    document_cache_sync_enabled: bool = Field(default=True, description="Poll document_cache_versions so the API drops caches of documents re-ingested by the worker process")
+    document_cache_sync_interval_seconds: float = Field(default=5.0, description="Seconds between document_cache_versions polls")
+    
     # Vector Store
     chroma_host: str = Field(default="localhost", description="ChromaDB host")
     chroma_port: int = Field(default=8000, description="ChromaDB port")
@@ -12,6 +12,9 @@ Expected Improvement:
 - Simple queries: 512 tokens (vs 2048)
 - Token savings: 30-50%
 
+Each tier also sets ``context_tokens``, the prompt-context budget that
+ContextPacker fills (retrieved chunks, history, memory, entities).
+
 Feature: semantic-cache-phase3
 """
 
@@ -40,6 +43,7 @@ class TokenBudget:
     response_tokens: int
     total_budget: int
     reason: str
+    context_tokens: int = 4000  # Prompt context (chunks, history, memory) for ContextPacker
 
 
 # Pre-defined token allocations per tier
@@ -47,26 +51,31 @@ TOKEN_ALLOCATIONS = {
     BudgetTier.MINIMAL: {
         "thinking": 100,
         "response": 256,
+        "context": 1000,
         "description": "Greeting or very simple query"
     },
     BudgetTier.LIGHT: {
         "thinking": 200,
         "response": 512,
+        "context": 2000,
         "description": "Simple fact lookup"
     },
     BudgetTier.MODERATE: {
         "thinking": 400,
         "response": 1024,
+        "context": 4000,
         "description": "Analytical query"
     },
     BudgetTier.STANDARD: {
         "thinking": 500,
         "response": 2000,
+        "context": 6000,
         "description": "Multi-step reasoning"
     },
     BudgetTier.DEEP: {
         "thinking": 800,
         "response": 4096,
+        "context": 8000,
         "description": "Complex synthesis or teaching"
     },
 }
@@ -124,7 +133,8 @@ class AdaptiveTokenBudget:
             thinking_tokens=allocation["thinking"],
             response_tokens=allocation["response"],
             total_budget=allocation["thinking"] + allocation["response"],
-            reason=allocation["description"]
+            reason=allocation["description"],
+            context_tokens=allocation["context"]
         )
         
         logger.debug(
@@ -211,7 +221,8 @@ class AdaptiveTokenBudget:
             thinking_tokens=allocation["thinking"],
             response_tokens=allocation["response"],
             total_budget=allocation["thinking"] + allocation["response"],
-            reason=allocation["description"]
+            reason=allocation["description"],
+            context_tokens=allocation["context"]
         )
 
 
@@ -19,6 +19,7 @@ from langchain_core.messages import HumanMessage, SystemMessage
 
 from app.core.config import settings
 from app.engine.llm_pool import get_llm_moderate  # SOTA: Shared LLM Pool
+from app.engine.llm_scheduler import scheduled_ainvoke
 
 logger = logging.getLogger(__name__)
 
@@ -145,7 +146,7 @@ class AnswerVerifier:
                 ))
             ]
             
-            response = await self._llm.ainvoke(messages)
+            response = await scheduled_ainvoke(self._llm, messages)
             
             # SOTA FIX: Handle Gemini 2.5 Flash content block format
             from app.services.output_processor import extract_thinking_from_response
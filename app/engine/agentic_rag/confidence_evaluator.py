@@ -30,6 +30,7 @@ from collections import Counter
 import math
 
 from app.core.config import settings
+from app.engine.keyword_matcher import KeywordMatcher
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +55,9 @@ MARITIME_CORE_TERMS = {
     "rule", "quy tắc", "regulation",
 }
 
+# Compiled once; sorted for deterministic matched_terms order
+_MARITIME_TERM_MATCHER = KeywordMatcher(sorted(MARITIME_CORE_TERMS))
+
 # Rule number pattern for Vietnamese maritime law
 RULE_PATTERN = re.compile(r'điều\s*(\d+)', re.IGNORECASE)
 
@@ -338,8 +342,8 @@ class HybridConfidenceEvaluator:
         Returns:
             Tuple of (boost_score, matched_maritime_terms)
         """
-        query_lower = query.lower()
-        doc_lower = doc_content.lower()
+        query_lower = _MARITIME_TERM_MATCHER.normalize(query)
+        doc_lower = _MARITIME_TERM_MATCHER.normalize(doc_content)
         combined = query_lower + " " + doc_lower
         
         matched_terms = []
@@ -354,13 +358,10 @@ class HybridConfidenceEvaluator:
             matched_terms.append(f"Điều {list(query_rules)[0]}")
             boost += 0.5
         
-        # Check maritime vocabulary
-        maritime_matches = 0
-        for term in MARITIME_CORE_TERMS:
-            if term in combined:
-                maritime_matches += 1
-                if maritime_matches <= 5:  # Limit matched terms
-                    matched_terms.append(term)
+        # Check maritime vocabulary (single pass over query + document)
+        vocabulary_matches = _MARITIME_TERM_MATCHER.find_terms(combined, normalized=True)
+        maritime_matches = len(vocabulary_matches)
+        matched_terms.extend(vocabulary_matches[:5])  # Limit matched terms
         
         # Scale maritime matches (diminishing returns)
         if maritime_matches > 0:
@@ -16,11 +16,14 @@ Features:
 - Self-correction loop
 - Hallucination prevention
 - Confidence scoring
+- Speculative generation (overlaps step 5 with step 3)
 """
 
+import asyncio
 import logging
+import time
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Any, Tuple, AsyncGenerator
+from typing import List, Optional, Dict, Any, Set, Tuple, AsyncGenerator
 
 from app.engine.agentic_rag.query_analyzer import (
     QueryAnalyzer, QueryAnalysis, QueryComplexity, get_query_analyzer
@@ -45,6 +48,7 @@ from app.models.schemas import ReasoningTrace
 # SEMANTIC CACHE (SOTA 2025 - RAG Latency Optimization)
 # =============================================================================
 from app.cache.cache_manager import CacheManager, get_cache_manager
+from app.cache.inflight import Flight, InflightCoalescer
 from app.cache.models import CacheConfig
 from app.core.config import settings
 
@@ -75,6 +79,41 @@ class CorrectiveRAGResult:
         return self.confidence < 70
 
 
+@dataclass
+class SpeculationStats:
+    """
+    Statistics for speculative generation.
+    
+    A speculation is a HIT when grading confirms the first-pass documents
+    and the speculative answer is used; a MISS when grading triggers a
+    rewrite and the speculative answer is cancelled.
+    """
+    attempts: int = 0
+    hits: int = 0
+    misses: int = 0
+    failures: int = 0
+    saved_ms_total: float = 0.0
+    
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.attempts if self.attempts else 0.0
+    
+    @property
+    def avg_saved_ms(self) -> float:
+        return self.saved_ms_total / self.hits if self.hits else 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "attempts": self.attempts,
+            "hits": self.hits,
+            "misses": self.misses,
+            "failures": self.failures,
+            "hit_rate": f"{self.hit_rate:.2%}",
+            "saved_ms_total": round(self.saved_ms_total, 1),
+            "avg_saved_ms": round(self.avg_saved_ms, 1),
+        }
+
+
 class CorrectiveRAG:
     """
     Corrective RAG with self-correction loop.
@@ -160,6 +199,29 @@ class CorrectiveRAG:
             self._cache = None
             logger.info("[CRAG] Semantic cache disabled")
         
+        # ================================================================
+        # IN-FLIGHT COALESCING (concurrent identical questions share one run)
+        # ================================================================
+        if settings.rag_coalesce_inflight:
+            self._coalescer = InflightCoalescer(
+                "crag.answer",
+                similarity_threshold=settings.cache_similarity_threshold,
+                max_wait_seconds=settings.rag_coalesce_max_wait_seconds
+            )
+            self._stream_coalescer = InflightCoalescer(
+                "crag.stream", max_wait_seconds=settings.rag_coalesce_max_wait_seconds
+            )
+        else:
+            self._coalescer = None
+            self._stream_coalescer = None
+        self._stream_tasks: Set[asyncio.Task] = set()
+        
+        # ================================================================
+        # SPECULATIVE GENERATION (generate while grading runs)
+        # ================================================================
+        self._speculative_enabled = settings.rag_speculative_generation
+        self._speculation = SpeculationStats()
+        
         logger.info(f"CorrectiveRAG initialized (max_iter={max_iterations}, threshold={grade_threshold})")
     
     async def process(
@@ -208,7 +270,6 @@ class CorrectiveRAG:
                     # Use ThinkingAdapter for natural, context-aware responses
                     # Instead of returning raw cache (anti-pattern)
                     # ============================================================
-                    from app.engine.agentic_rag.thinking_adapter import get_thinking_adapter
                     from app.engine.agentic_rag.adaptive_router import get_adaptive_router
                     
                     # Get routing decision
@@ -219,27 +280,10 @@ class CorrectiveRAG:
                     
                     if routing.use_thinking_adapter:
                         # Adapt cached response with fresh thinking
-                        adapter = get_thinking_adapter()
-                        adapted = await adapter.adapt(
-                            query=query,
-                            cached_response=cache_result.value,
-                            context=context,
-                            similarity=cache_result.similarity
-                        )
-                        
-                        logger.info(
-                            f"[CRAG] ThinkingAdapter: {adapted.adaptation_time_ms:.0f}ms "
-                            f"(method={adapted.adaptation_method})"
-                        )
-                        
-                        return CorrectiveRAGResult(
-                            answer=adapted.answer,
-                            sources=cache_result.value.get("sources", []),
-                            iterations=0,
-                            confidence=cache_result.value.get("confidence", 0.9),
-                            reasoning_trace=None,
-                            thinking=adapted.thinking,
-                            thinking_content=f"[Cache-Augmented Generation]\n{adapted.thinking}"
+                        return await self._adapt_shared_answer(
+                            query, cache_result.value, context,
+                            similarity=cache_result.similarity,
+                            label="Cache-Augmented Generation"
                         )
                     else:
                         # Fallback for edge cases
@@ -262,6 +306,83 @@ class CorrectiveRAG:
         else:
             query_embedding = None
         
+        # ================================================================
+        # IN-FLIGHT COALESCING (cache is only filled once a request ends)
+        # ================================================================
+        flight: Optional[Flight] = None
+        if self._coalescer is not None:
+            flight, is_leader, similarity = self._coalescer.join(
+                query, query_embedding, namespace=context.get("user_role", "student")
+            )
+            if not is_leader:
+                shared = await self._coalescer.wait(flight)
+                if shared is not None:
+                    return await self._adapt_shared_answer(
+                        query, shared, context, similarity=similarity, label="Coalesced request"
+                    )
+                flight = None  # Leader failed: answer independently
+        
+        if flight is None:
+            return await self._run_pipeline(query, context, tracer, query_embedding)
+        
+        try:
+            result = await self._run_pipeline(query, context, tracer, query_embedding)
+        except BaseException as e:
+            self._coalescer.fail(flight, e)
+            raise
+        self._coalescer.complete(flight, {
+            "answer": result.answer,
+            "sources": result.sources,
+            "confidence": result.confidence,
+            "thinking": result.thinking
+        })
+        return result
+    
+    async def _adapt_shared_answer(
+        self,
+        query: str,
+        shared: Dict[str, Any],
+        context: Dict[str, Any],
+        similarity: float,
+        label: str
+    ) -> CorrectiveRAGResult:
+        """
+        Adapt an answer produced for another request (cache hit or
+        coalesced in-flight request) to this user's history and profile.
+        """
+        from app.engine.agentic_rag.thinking_adapter import get_thinking_adapter
+        
+        adapter = get_thinking_adapter()
+        adapted = await adapter.adapt(
+            query=query,
+            cached_response=shared,
+            context=context,
+            similarity=similarity
+        )
+        
+        logger.info(
+            f"[CRAG] ThinkingAdapter ({label}): {adapted.adaptation_time_ms:.0f}ms "
+            f"(method={adapted.adaptation_method})"
+        )
+        
+        return CorrectiveRAGResult(
+            answer=adapted.answer,
+            sources=shared.get("sources", []),
+            iterations=0,
+            confidence=shared.get("confidence", 0.9),
+            reasoning_trace=None,
+            thinking=adapted.thinking,
+            thinking_content=f"[{label}]\n{adapted.thinking}"
+        )
+    
+    async def _run_pipeline(
+        self,
+        query: str,
+        context: Dict[str, Any],
+        tracer: ReasoningTracer,
+        query_embedding: Optional[List[float]]
+    ) -> CorrectiveRAGResult:
+        """Steps 1-6 of process(): analyze, retrieve/grade/rewrite, generate, verify, cache."""
         # Step 1: Analyze query
         tracer.start_step(StepNames.QUERY_ANALYSIS, "Phân tích độ phức tạp câu hỏi")
         logger.info(f"[CRAG] Step 1: Analyzing query: '{query[:50]}...'")
@@ -280,138 +401,160 @@ class CorrectiveRAG:
         was_rewritten = False
         rewritten_query = None
         iterations = 0
+        speculative_task: Optional[asyncio.Task] = None
         
-        for iteration in range(self._max_iterations):
-            iterations = iteration + 1
-            
-            # Retrieval step
-            tracer.start_step(StepNames.RETRIEVAL, f"Tìm kiếm tài liệu (lần {iterations})")
-            logger.info(f"[CRAG] Step 2.{iterations}: Retrieving for '{current_query[:50]}...'")
-            
-            # Retrieve documents
-            documents = await self._retrieve(current_query, context)
-            
-            if not documents:
-                logger.warning(f"[CRAG] No documents retrieved")
-                tracer.end_step(result="Không tìm thấy tài liệu", confidence=0.0)
+        try:
+            for iteration in range(self._max_iterations):
+                iterations = iteration + 1
                 
-                if iteration < self._max_iterations - 1:
-                    # Try rewriting
-                    tracer.start_step(StepNames.QUERY_REWRITE, "Viết lại query do không có kết quả")
-                    current_query = await self._rewriter.rewrite(
-                        current_query, 
-                        "No documents found"
+                # Retrieval step
+                tracer.start_step(StepNames.RETRIEVAL, f"Tìm kiếm tài liệu (lần {iterations})")
+                logger.info(f"[CRAG] Step 2.{iterations}: Retrieving for '{current_query[:50]}...'")
+                
+                # Retrieve documents
+                documents = await self._retrieve(current_query, context)
+                
+                if not documents:
+                    logger.warning(f"[CRAG] No documents retrieved")
+                    tracer.end_step(result="Không tìm thấy tài liệu", confidence=0.0)
+                    
+                    if iteration < self._max_iterations - 1:
+                        # Try rewriting
+                        tracer.start_step(StepNames.QUERY_REWRITE, "Viết lại query do không có kết quả")
+                        current_query = await self._rewriter.rewrite(
+                            current_query, 
+                            "No documents found"
+                        )
+                        rewritten_query = current_query
+                        was_rewritten = True
+                        tracer.end_step(result=f"Query mới: {current_query[:50]}...", confidence=0.7)
+                        tracer.record_correction("Không tìm thấy tài liệu")
+                        continue
+                    break
+                else:
+                    tracer.end_step(
+                        result=f"Tìm thấy {len(documents)} tài liệu",
+                        confidence=0.8,
+                        details={"doc_count": len(documents)}
                     )
-                    rewritten_query = current_query
-                    was_rewritten = True
-                    tracer.end_step(result=f"Query mới: {current_query[:50]}...", confidence=0.7)
-                    tracer.record_correction("Không tìm thấy tài liệu")
-                    continue
-                break
-            else:
-                tracer.end_step(
-                    result=f"Tìm thấy {len(documents)} tài liệu",
-                    confidence=0.8,
-                    details={"doc_count": len(documents)}
-                )
-            
-            # Step 3: Grade documents (PHASE 3: Tiered grading with fast-pass)
-            tracer.start_step(StepNames.GRADING, "Đánh giá độ liên quan của tài liệu")
-            logger.info(f"[CRAG] Step 3.{iterations}: Grading {len(documents)} documents")
-            
-            # Ensure query_embedding for tiered grading
-            if query_embedding is None:
-                from app.engine.gemini_embedding import get_embeddings
-                embeddings = get_embeddings()
-                query_embedding = embeddings.embed_query(current_query)
-            
-            grading_result = await self._grader.grade_documents(
-                current_query, documents, query_embedding=query_embedding
-            )
-            
-            # SOTA: Normalize score to 0-1 confidence scale
-            normalized_confidence = grading_result.avg_score / 10.0
-            
-            # Check if good enough (use configurable threshold)
-            if grading_result.avg_score >= self._grade_threshold:
-                logger.info(
-                    f"[CRAG] Grade passed: {grading_result.avg_score:.1f}/10 "
-                    f"(confidence={normalized_confidence:.2f} >= {settings.rag_confidence_high:.2f})"
-                )
-                tracer.end_step(
-                    result=f"Điểm: {grading_result.avg_score:.1f}/10 - ĐẠT",
-                    confidence=normalized_confidence,
-                    details={"score": grading_result.avg_score, "passed": True, "confidence": normalized_confidence}
-                )
-                break
-            
-            # SOTA: Early exit if medium confidence and early_exit enabled
-            elif settings.rag_early_exit_on_high_confidence and normalized_confidence >= settings.rag_confidence_medium:
-                logger.info(
-                    f"[CRAG] MEDIUM confidence ({normalized_confidence:.2f}) - early exit enabled, proceeding to generation"
-                )
-                tracer.end_step(
-                    result=f"Điểm: {grading_result.avg_score:.1f}/10 - MEDIUM (early exit)",
-                    confidence=normalized_confidence,
-                    details={"score": grading_result.avg_score, "passed": False, "early_exit": True}
-                )
-                break
-            
-            else:
-                tracer.end_step(
-                    result=f"Điểm: {grading_result.avg_score:.1f}/10 - Cần cải thiện",
-                    confidence=normalized_confidence,
-                    details={"score": grading_result.avg_score, "passed": False}
-                )
-            
-            # ================================================================
-            # SOTA 2025: Early exit on relevant docs (LangGraph short-circuit)
-            # ================================================================
-            # Pattern: Trust the retriever. If we have ANY relevant doc, proceed
-            # Log showed: "avg_score=4.6 relevant=2/7" → 2 docs were enough!
-            # This saves ~40s by avoiding unnecessary rewrite + second iteration
-            # ================================================================
-            if grading_result.relevant_count >= 1:
-                logger.info(
-                    f"[CRAG] SOTA: Found {grading_result.relevant_count} relevant docs, "
-                    f"skipping rewrite (trust retriever pattern)"
+                
+                # Speculative generation on first-pass docs (overlaps with grading)
+                if self._speculative_enabled and iteration == 0:
+                    speculative_task = self._start_speculation(query, documents, context)
+                
+                # Step 3: Grade documents (PHASE 3: Tiered grading with fast-pass)
+                tracer.start_step(StepNames.GRADING, "Đánh giá độ liên quan của tài liệu")
+                logger.info(f"[CRAG] Step 3.{iterations}: Grading {len(documents)} documents")
+                
+                # Ensure query_embedding for tiered grading
+                if query_embedding is None:
+                    from app.engine.gemini_embedding import get_embeddings
+                    embeddings = get_embeddings()
+                    query_embedding = embeddings.embed_query(current_query)
+                
+                grading_result = await self._grader.grade_documents(
+                    current_query, documents, query_embedding=query_embedding
                 )
-                break
-            
-            # Step 4: Rewrite ONLY if ZERO relevant docs found
-            if iteration < self._max_iterations - 1:
-                tracer.start_step(StepNames.QUERY_REWRITE, "Viết lại query để cải thiện kết quả")
-                logger.info(f"[CRAG] Step 4.{iterations}: Rewriting query (score={grading_result.avg_score:.1f}, 0 relevant docs)")
+                logger.info(f"[CRAG] Grading used {grading_result.llm_calls} LLM call(s)")
+                
+                # SOTA: Normalize score to 0-1 confidence scale
+                normalized_confidence = grading_result.avg_score / 10.0
+                
+                # Check if good enough (use configurable threshold)
+                if grading_result.avg_score >= self._grade_threshold:
+                    logger.info(
+                        f"[CRAG] Grade passed: {grading_result.avg_score:.1f}/10 "
+                        f"(confidence={normalized_confidence:.2f} >= {settings.rag_confidence_high:.2f})"
+                    )
+                    tracer.end_step(
+                        result=f"Điểm: {grading_result.avg_score:.1f}/10 - ĐẠT",
+                        confidence=normalized_confidence,
+                        details={"score": grading_result.avg_score, "passed": True, "confidence": normalized_confidence}
+                    )
+                    break
+                
+                # SOTA: Early exit if medium confidence and early_exit enabled
+                elif settings.rag_early_exit_on_high_confidence and normalized_confidence >= settings.rag_confidence_medium:
+                    logger.info(
+                        f"[CRAG] MEDIUM confidence ({normalized_confidence:.2f}) - early exit enabled, proceeding to generation"
+                    )
+                    tracer.end_step(
+                        result=f"Điểm: {grading_result.avg_score:.1f}/10 - MEDIUM (early exit)",
+                        confidence=normalized_confidence,
+                        details={"score": grading_result.avg_score, "passed": False, "early_exit": True}
+                    )
+                    break
                 
-                if analysis.complexity == QueryComplexity.COMPLEX:
-                    # Decompose complex queries
-                    sub_queries = await self._rewriter.decompose(current_query)
-                    if len(sub_queries) > 1:
-                        # Use first sub-query
-                        current_query = sub_queries[0]
                 else:
-                    current_query = await self._rewriter.rewrite(
-                        current_query,
-                        grading_result.feedback
+                    tracer.end_step(
+                        result=f"Điểm: {grading_result.avg_score:.1f}/10 - Cần cải thiện",
+                        confidence=normalized_confidence,
+                        details={"score": grading_result.avg_score, "passed": False}
                     )
                 
-                rewritten_query = current_query
-                was_rewritten = True
-                tracer.end_step(
-                    result=f"Query mới: {current_query[:50]}...",
-                    confidence=0.8
-                )
-                tracer.record_correction(f"Không tìm thấy doc liên quan (score={grading_result.avg_score:.1f}/10)")
-        
-        # Step 5: Generate answer
-        tracer.start_step(StepNames.GENERATION, "Tạo câu trả lời từ context")
-        logger.info(f"[CRAG] Step 5: Generating answer")
-        # CHỈ THỊ SỐ 29: Unpack native_thinking from _generate()
-        answer, sources, native_thinking = await self._generate(query, documents, context)
+                # ================================================================
+                # SOTA 2025: Early exit on relevant docs (LangGraph short-circuit)
+                # ================================================================
+                # Pattern: Trust the retriever. If we have ANY relevant doc, proceed
+                # Log showed: "avg_score=4.6 relevant=2/7" → 2 docs were enough!
+                # This saves ~40s by avoiding unnecessary rewrite + second iteration
+                # ================================================================
+                if grading_result.relevant_count >= 1:
+                    logger.info(
+                        f"[CRAG] SOTA: Found {grading_result.relevant_count} relevant docs, "
+                        f"skipping rewrite (trust retriever pattern)"
+                    )
+                    break
+                
+                # Step 4: Rewrite ONLY if ZERO relevant docs found
+                if iteration < self._max_iterations - 1:
+                    if speculative_task is not None:
+                        self._cancel_speculation(speculative_task)
+                        speculative_task = None
+                    
+                    tracer.start_step(StepNames.QUERY_REWRITE, "Viết lại query để cải thiện kết quả")
+                    logger.info(f"[CRAG] Step 4.{iterations}: Rewriting query (score={grading_result.avg_score:.1f}, 0 relevant docs)")
+                    
+                    if analysis.complexity == QueryComplexity.COMPLEX:
+                        # Decompose complex queries
+                        sub_queries = await self._rewriter.decompose(current_query)
+                        if len(sub_queries) > 1:
+                            # Use first sub-query
+                            current_query = sub_queries[0]
+                    else:
+                        current_query = await self._rewriter.rewrite(
+                            current_query,
+                            grading_result.feedback
+                        )
+                    
+                    rewritten_query = current_query
+                    was_rewritten = True
+                    tracer.end_step(
+                        result=f"Query mới: {current_query[:50]}...",
+                        confidence=0.8
+                    )
+                    tracer.record_correction(f"Không tìm thấy doc liên quan (score={grading_result.avg_score:.1f}/10)")
+            
+            # Step 5: Generate answer
+            tracer.start_step(StepNames.GENERATION, "Tạo câu trả lời từ context")
+            logger.info(f"[CRAG] Step 5: Generating answer")
+            # CHỈ THỊ SỐ 29: Unpack native_thinking from _generate()
+            generated = None
+            if speculative_task is not None:
+                task, speculative_task = speculative_task, None
+                generated = await self._finish_speculation(task)
+        finally:
+            # Retrieval, grading or rewrite raised (or the request was cancelled)
+            if speculative_task is not None:
+                self._cancel_speculation(speculative_task, miss=False)
+        speculation_hit = generated is not None
+        if generated is None:
+            generated = await self._generate(query, documents, context)
+        answer, sources, native_thinking = generated
         tracer.end_step(
             result=f"Tạo câu trả lời dựa trên {len(sources)} nguồn",
             confidence=0.85,
-            details={"source_count": len(sources)}
+            details={"source_count": len(sources), "speculative": speculation_hit}
         )
         
         # ====================================================================
@@ -700,6 +843,157 @@ class CorrectiveRAG:
             logger.error(f"[CRAG] Generation failed: {e}")
             return f"Lỗi khi tạo câu trả lời: {e}", documents, None
     
+    # =========================================================================
+    # SPECULATIVE GENERATION
+    # Grading passes on the first iteration in the vast majority of requests
+    # ("trust retriever" early exit), so generation is started on the
+    # first-pass documents while grading runs. The speculative answer is
+    # kept unless grading triggers a rewrite.
+    # =========================================================================
+    def _start_speculation(
+        self,
+        query: str,
+        documents: List[Dict[str, Any]],
+        context: Dict[str, Any]
+    ) -> asyncio.Task:
+        """Start generation on first-pass documents in the background."""
+        async def _timed_generate():
+            gen_start = time.time()
+            result = await self._generate(query, documents, context)
+            return result, (time.time() - gen_start) * 1000
+        
+        self._speculation.attempts += 1
+        logger.info(f"[CRAG] Speculative generation started on {len(documents)} docs")
+        return asyncio.create_task(_timed_generate())
+    
+    def _cancel_speculation(self, task: asyncio.Task, miss: bool = True) -> None:
+        """
+        Cancel speculative generation.
+        
+        Args:
+            task: Speculative generation task
+            miss: True when grading triggered a rewrite; False when the
+                pipeline is abandoned (error, cancellation, client gone)
+        """
+        task.cancel()
+        if not miss:
+            logger.info("[CRAG] Speculative generation cancelled (pipeline did not finish)")
+            return
+        self._speculation.misses += 1
+        logger.info(
+            f"[CRAG] Speculation MISS (rewrite needed), "
+            f"hit_rate={self._speculation.hit_rate:.0%}"
+        )
+    
+    async def _finish_speculation(
+        self,
+        task: asyncio.Task
+    ) -> Optional[Tuple[str, List[Dict[str, Any]], Optional[str]]]:
+        """
+        Await the speculative answer after grading confirmed the documents.
+        
+        Returns:
+            Result of _generate(), or None if speculation failed
+        """
+        wait_start = time.time()
+        try:
+            result, gen_ms = await task
+        except Exception as e:
+            self._speculation.failures += 1
+            logger.warning(f"[CRAG] Speculative generation failed: {e}, regenerating")
+            return None
+        
+        # Serial latency would be grading + gen_ms; we only waited the remainder
+        waited_ms = (time.time() - wait_start) * 1000
+        saved_ms = max(0.0, gen_ms - waited_ms)
+        self._speculation.hits += 1
+        self._speculation.saved_ms_total += saved_ms
+        logger.info(
+            f"[CRAG] Speculation HIT: saved {saved_ms:.0f}ms "
+            f"(hit_rate={self._speculation.hit_rate:.0%})"
+        )
+        return result
+    
+    def _start_speculative_stream(
+        self,
+        question: str,
+        documents: List[Dict[str, Any]],
+        context: Dict[str, Any]
+    ) -> Tuple[asyncio.Task, asyncio.Queue]:
+        """
+        Start streaming generation into a buffer while grading runs.
+        
+        Tokens are only released to the client after grading confirms
+        the documents. A None sentinel marks the end of the stream.
+        """
+        knowledge_nodes, _ = self._build_generation_inputs(documents)
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async def _produce():
+            try:
+                async for chunk in self._rag._generate_response_streaming(
+                    question=question,
+                    nodes=knowledge_nodes,
+                    conversation_history=context.get("conversation_history", ""),
+                    user_role=context.get("user_role", "student"),
+                    entity_context=""
+                ):
+                    await queue.put(chunk)
+            finally:
+                await queue.put(None)
+        
+        self._speculation.attempts += 1
+        return asyncio.create_task(_produce()), queue
+    
+    def _build_generation_inputs(
+        self,
+        documents: List[Dict[str, Any]]
+    ) -> Tuple[List[Any], List[Dict[str, Any]]]:
+        """
+        Build KnowledgeNodes for generation and source data for the client.
+        
+        Returns:
+            Tuple of (knowledge_nodes, sources_data)
+        """
+        # SOTA PATTERN: Defensive defaults for data quality issues
+        # Following OpenAI/Anthropic pattern - graceful degradation, never crash
+        from app.models.knowledge_graph import KnowledgeNode, NodeType
+        
+        knowledge_nodes = []
+        sources_data = []
+        for i, doc in enumerate(documents):
+            content = doc.get("content", "")
+            
+            # Prepare source data for later
+            sources_data.append({
+                "title": doc.get("title", "Unknown"),
+                "content": content[:200] if content else "",
+                "page_number": doc.get("page_number"),
+                "image_url": doc.get("image_url"),
+                "document_id": doc.get("document_id"),
+                "bounding_boxes": doc.get("bounding_boxes")
+            })
+            
+            # CRITICAL: Use 'or' operator to handle empty strings
+            # doc.get("title", "X") returns '' if title is empty string
+            # doc.get("title") or "X" returns "X" if title is empty/None
+            knowledge_nodes.append(KnowledgeNode(
+                id=doc.get("node_id") or f"doc_{i}",
+                node_type=NodeType.REGULATION,
+                content=doc.get("content") or "No content",
+                title=doc.get("title") or f"Document {i+1}",
+                source=doc.get("document_id") or ""
+            ))
+        
+        return knowledge_nodes, sources_data
+    
+    def get_speculation_stats(self) -> Dict[str, Any]:
+        """Get speculative generation statistics (hit rate, latency saved)."""
+        return {
+            "enabled": self._speculative_enabled,
+            **self._speculation.to_dict()
+        }
+    
     # =========================================================================
     # V3 SOTA: Full CRAG Pipeline + True Token Streaming
     # Pattern: OpenAI Responses API + Claude Extended Thinking + Gemini astream
@@ -726,13 +1020,67 @@ class CorrectiveRAG:
         - Claude Interleaved Thinking (thinking blocks between steps)
         - LangChain LCEL RunnableParallel (parallel execution)
         
+        Identical concurrent questions from users without conversation
+        history share one pipeline run: followers replay the leader's
+        events (tokens included) from the start. If the shared run goes
+        quiet for rag_coalesce_max_wait_seconds before any answer token,
+        the subscriber runs the pipeline itself.
+        
         **Feature: p3-v3-full-crag-streaming**
         """
-        import time
-        import asyncio
-        # Note: get_reasoning_tracer and StepNames already imported at module level (line 37-39)
-        
         context = context or {}
+        if self._stream_coalescer is None or context.get("conversation_history"):
+            # History-dependent answers can't be adapted mid-stream
+            async for event in self._process_streaming(query, context):
+                yield event
+            return
+        
+        flight, is_leader, _ = self._stream_coalescer.join(
+            query, namespace=context.get("user_role", "student")
+        )
+        if is_leader:
+            # Detached so the leader's client disconnecting doesn't cut off followers
+            task = asyncio.create_task(self._publish_stream(flight, query, context))
+            self._stream_tasks.add(task)
+            task.add_done_callback(self._stream_tasks.discard)
+        
+        answer_started = False
+        try:
+            async for event in self._stream_coalescer.follow(flight):
+                if not is_leader and event.get("type") == "metadata":
+                    event = {**event, "content": {**event["content"], "coalesced": True}}
+                answer_started = answer_started or event.get("type") == "answer"
+                yield event
+        except asyncio.TimeoutError:
+            if answer_started:
+                # Restarting would repeat the answer tokens already sent
+                yield {"type": "error", "content": "Lỗi xử lý: quá thời gian chờ phản hồi"}
+                return
+            async for event in self._process_streaming(query, context):
+                yield event
+    
+    async def _publish_stream(self, flight: Flight, query: str, context: Dict[str, Any]) -> None:
+        """Run the streaming pipeline once, publishing events to every subscriber."""
+        try:
+            async for event in self._process_streaming(query, context):
+                flight.publish(event)
+        except Exception as e:
+            logger.error(f"[CRAG-V3] Shared stream failed: {e}")
+            flight.publish({"type": "error", "content": f"Lỗi xử lý: {e}"})
+            self._stream_coalescer.fail(flight, e)
+        except BaseException as e:
+            self._stream_coalescer.fail(flight, e)
+            raise
+        else:
+            self._stream_coalescer.complete(flight, None)
+    
+    async def _process_streaming(
+        self,
+        query: str,
+        context: Dict[str, Any]
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """The streaming pipeline behind process_streaming() (one run per call)."""
+        # Note: get_reasoning_tracer and StepNames already imported at module level (line 37-39)
         start_time = time.time()
         tracer = get_reasoning_tracer()
         
@@ -796,154 +1144,171 @@ class CorrectiveRAG:
             yield {"type": "error", "content": f"Lỗi tìm kiếm: {e}"}
             return
         
-        # ═══════════════════════════════════════════════════════════════════
-        # PHASE 3: Grading (CRAG core - quality control!)  
-        # ═══════════════════════════════════════════════════════════════════
-        yield {"type": "status", "content": "⚖️ Đang đánh giá chất lượng tài liệu..."}
-        
-        tracer.start_step(StepNames.GRADING, "Đánh giá độ liên quan của tài liệu")
-        logger.info("[CRAG-V3] Phase 3: Grading documents")
-        
+        # Speculative generation: buffer answer tokens while grading runs
+        speculative_task = None
+        speculative_queue = None
+        speculative_start = 0.0
         try:
-            # FIXED: Use grade_documents (not grade_batch)
-            grading_result = await self._grader.grade_documents(query, documents)
-            passed = grading_result.avg_score >= self._grade_threshold
-            grading_confidence = grading_result.relevant_count / len(documents) if documents else 0.5
-            
-            tracer.end_step(
-                result=f"Điểm: {grading_result.avg_score:.1f}/10 - {'ĐẠT' if passed else 'CHƯA ĐẠT'}",
-                confidence=grading_confidence,
-                details={
-                    "score": grading_result.avg_score,
-                    "passed": passed,
-                    "relevant_count": grading_result.relevant_count
-                }
-            )
+            if self._speculative_enabled and self._rag:
+                speculative_start = time.time()
+                speculative_task, speculative_queue = self._start_speculative_stream(
+                    query, documents, context
+                )
             
-            yield {
-                "type": "thinking",
-                "content": f"{'✅' if passed else '⚠️'} Điểm: {grading_result.avg_score:.1f}/10 - {'ĐẠT' if passed else 'CHƯA ĐẠT'}",
-                "step": "grading",
-                "details": {"score": grading_result.avg_score, "passed": passed}
-            }
+            # ═══════════════════════════════════════════════════════════════════
+            # PHASE 3: Grading (CRAG core - quality control!)  
+            # ═══════════════════════════════════════════════════════════════════
+            yield {"type": "status", "content": "⚖️ Đang đánh giá chất lượng tài liệu..."}
             
-        except Exception as e:
-            logger.error(f"[CRAG-V3] Grading failed: {e}")
-            yield {"type": "thinking", "content": f"⚠️ Bỏ qua đánh giá: {e}", "step": "grading"}
-            grading_result = None
-            passed = True  # Continue without grading
-        
-        # ═══════════════════════════════════════════════════════════════════
-        # PHASE 4: Query Rewrite (if grading failed)
-        # ═══════════════════════════════════════════════════════════════════
-        rewritten_query = None
-        if grading_result and not passed and self._rewriter:
-            yield {"type": "status", "content": "✍️ Tinh chỉnh câu hỏi..."}
+            tracer.start_step(StepNames.GRADING, "Đánh giá độ liên quan của tài liệu")
+            logger.info("[CRAG-V3] Phase 3: Grading documents")
             
             try:
-                rewrite_result = await self._rewriter.rewrite(query)
-                if rewrite_result.rewritten_query != query:
-                    rewritten_query = rewrite_result.rewritten_query
-                    logger.info(f"[CRAG-V3] Query rewritten: {rewritten_query[:50]}...")
-                    
-                    yield {
-                        "type": "thinking",
-                        "content": f"✍️ Đã tinh chỉnh câu hỏi",
-                        "step": "rewrite"
+                # FIXED: Use grade_documents (not grade_batch)
+                grading_result = await self._grader.grade_documents(query, documents)
+                passed = grading_result.avg_score >= self._grade_threshold
+                grading_confidence = grading_result.relevant_count / len(documents) if documents else 0.5
+                
+                tracer.end_step(
+                    result=f"Điểm: {grading_result.avg_score:.1f}/10 - {'ĐẠT' if passed else 'CHƯA ĐẠT'}",
+                    confidence=grading_confidence,
+                    details={
+                        "score": grading_result.avg_score,
+                        "passed": passed,
+                        "relevant_count": grading_result.relevant_count
                     }
-                    
-                    # Re-retrieve with rewritten query
-                    documents = await self._retrieve(rewritten_query, context)
-                    
+                )
+                
+                yield {
+                    "type": "thinking",
+                    "content": f"{'✅' if passed else '⚠️'} Điểm: {grading_result.avg_score:.1f}/10 - {'ĐẠT' if passed else 'CHƯA ĐẠT'}",
+                    "step": "grading",
+                    "details": {"score": grading_result.avg_score, "passed": passed}
+                }
+                
             except Exception as e:
-                logger.warning(f"[CRAG-V3] Rewrite failed: {e}")
-        
-        # ═══════════════════════════════════════════════════════════════════
-        # PHASE 5: Generation (TRUE streaming via astream!)
-        # ═══════════════════════════════════════════════════════════════════
-        yield {"type": "status", "content": "✍️ Đang tạo câu trả lời..."}
-        
-        tracer.start_step(StepNames.GENERATION, "Tạo câu trả lời từ context")
-        logger.info("[CRAG-V3] Phase 5: Generating response with streaming")
-        
-        gen_start_time = time.time()
-        
-        if not self._rag:
-            yield {"type": "answer", "content": "Không thể tạo câu trả lời do thiếu cấu hình."}
-            yield {"type": "done", "content": ""}
-            return
-        
-        try:
-            # Build context from documents
-            context_parts = []
-            sources_data = []
+                logger.error(f"[CRAG-V3] Grading failed: {e}")
+                yield {"type": "thinking", "content": f"⚠️ Bỏ qua đánh giá: {e}", "step": "grading"}
+                grading_result = None
+                passed = True  # Continue without grading
             
-            for doc in documents:
-                content = doc.get("content", "")
-                title = doc.get("title", "Unknown")
-                if content:
-                    context_parts.append(f"[{title}]: {content}")
+            # ═══════════════════════════════════════════════════════════════════
+            # PHASE 4: Query Rewrite (if grading failed)
+            # ═══════════════════════════════════════════════════════════════════
+            grading_done_at = time.time()
+            rewritten_query = None
+            if grading_result and not passed and self._rewriter:
+                if speculative_task is not None:
+                    self._cancel_speculation(speculative_task)
+                    speculative_task = None
                 
-                # Prepare source data for later
-                sources_data.append({
-                    "title": title,
-                    "content": content[:200] if content else "",
-                    "page_number": doc.get("page_number"),
-                    "image_url": doc.get("image_url"),
-                    "document_id": doc.get("document_id"),
-                    "bounding_boxes": doc.get("bounding_boxes")
-                })
-            
-            context_str = "\n\n".join(context_parts)
-            
-            # Get user context
-            user_context = context  # The dict passed to process_streaming
-            user_role = user_context.get("user_role", "student")
-            history = user_context.get("conversation_history", "")
-            
-            # SOTA PATTERN: Defensive defaults for data quality issues
-            # Following OpenAI/Anthropic pattern - graceful degradation, never crash
-            from app.models.knowledge_graph import KnowledgeNode, NodeType
+                yield {"type": "status", "content": "✍️ Tinh chỉnh câu hỏi..."}
+                
+                try:
+                    rewrite_result = await self._rewriter.rewrite(query)
+                    if rewrite_result.rewritten_query != query:
+                        rewritten_query = rewrite_result.rewritten_query
+                        logger.info(f"[CRAG-V3] Query rewritten: {rewritten_query[:50]}...")
+                        
+                        yield {
+                            "type": "thinking",
+                            "content": f"✍️ Đã tinh chỉnh câu hỏi",
+                            "step": "rewrite"
+                        }
+                        
+                        # Re-retrieve with rewritten query
+                        documents = await self._retrieve(rewritten_query, context)
+                        
+                except Exception as e:
+                    logger.warning(f"[CRAG-V3] Rewrite failed: {e}")
             
-            knowledge_nodes = []
-            for i, doc in enumerate(documents):
-                # CRITICAL: Use 'or' operator to handle empty strings
-                # doc.get("title", "X") returns '' if title is empty string
-                # doc.get("title") or "X" returns "X" if title is empty/None
-                node = KnowledgeNode(
-                    id=doc.get("node_id") or f"doc_{i}",
-                    node_type=NodeType.REGULATION,
-                    content=doc.get("content") or "No content",
-                    title=doc.get("title") or f"Document {i+1}",
-                    source=doc.get("document_id") or ""
-                )
-                knowledge_nodes.append(node)
+            # ═══════════════════════════════════════════════════════════════════
+            # PHASE 5: Generation (TRUE streaming via astream!)
+            # ═══════════════════════════════════════════════════════════════════
+            yield {"type": "status", "content": "✍️ Đang tạo câu trả lời..."}
             
-            # Stream tokens from RAGAgent
-            # FIXED: Removed invalid 'context' param, pass nodes correctly
-            token_count = 0
-            async for chunk in self._rag._generate_response_streaming(
-                question=rewritten_query or query,
-                nodes=knowledge_nodes,
-                conversation_history=history,
-                user_role=user_role,
-                entity_context=""
-            ):
-                token_count += 1
-                yield {"type": "answer", "content": chunk}
+            tracer.start_step(StepNames.GENERATION, "Tạo câu trả lời từ context")
+            logger.info("[CRAG-V3] Phase 5: Generating response with streaming")
             
-            gen_duration = (time.time() - gen_start_time) * 1000
-            tracer.end_step(
-                result=f"Tạo câu trả lời: {token_count} tokens",
-                confidence=0.85,
-                details={"token_count": token_count, "duration_ms": gen_duration}
-            )
+            gen_start_time = time.time()
             
-            logger.info(f"[CRAG-V3] Generation complete: {token_count} tokens in {gen_duration:.0f}ms")
+            if not self._rag:
+                yield {"type": "answer", "content": "Không thể tạo câu trả lời do thiếu cấu hình."}
+                yield {"type": "done", "content": ""}
+                return
             
-        except Exception as e:
-            logger.error(f"[CRAG-V3] Generation failed: {e}")
-            yield {"type": "answer", "content": f"Lỗi khi tạo câu trả lời: {e}"}
+            try:
+                knowledge_nodes, sources_data = self._build_generation_inputs(documents)
+                
+                # Get user context
+                user_context = context  # The dict passed to process_streaming
+                user_role = user_context.get("user_role", "student")
+                history = user_context.get("conversation_history", "")
+                
+                token_count = 0
+                speculation_hit = False
+                if speculative_task is not None:
+                    # Grading confirmed the documents: release buffered tokens
+                    # Time saved = generation time already elapsed when grading ended
+                    while True:
+                        chunk = await speculative_queue.get()
+                        if chunk is None:
+                            break
+                        token_count += 1
+                        yield {"type": "answer", "content": chunk}
+                    try:
+                        await speculative_task
+                        speculation_hit = True
+                    except Exception as e:
+                        self._speculation.failures += 1
+                        if token_count:
+                            # Part of the answer is already out: end it there
+                            logger.warning(f"[CRAG-V3] Speculative stream failed after {token_count} chunks: {e}")
+                        else:
+                            logger.warning(f"[CRAG-V3] Speculative stream failed: {e}, regenerating")
+                    
+                    if speculation_hit:
+                        saved_ms = (min(grading_done_at, time.time()) - speculative_start) * 1000
+                        self._speculation.hits += 1
+                        self._speculation.saved_ms_total += saved_ms
+                        logger.info(
+                            f"[CRAG-V3] Speculation HIT: saved {saved_ms:.0f}ms "
+                            f"(hit_rate={self._speculation.hit_rate:.0%})"
+                        )
+                
+                if token_count == 0 and not speculation_hit:
+                    # Stream tokens from RAGAgent
+                    # FIXED: Removed invalid 'context' param, pass nodes correctly
+                    async for chunk in self._rag._generate_response_streaming(
+                        question=rewritten_query or query,
+                        nodes=knowledge_nodes,
+                        conversation_history=history,
+                        user_role=user_role,
+                        entity_context=""
+                    ):
+                        token_count += 1
+                        yield {"type": "answer", "content": chunk}
+                
+                gen_duration = (time.time() - gen_start_time) * 1000
+                tracer.end_step(
+                    result=f"Tạo câu trả lời: {token_count} tokens",
+                    confidence=0.85,
+                    details={
+                        "token_count": token_count,
+                        "duration_ms": gen_duration,
+                        "speculative": speculation_hit
+                    }
+                )
+                
+                logger.info(f"[CRAG-V3] Generation complete: {token_count} tokens in {gen_duration:.0f}ms")
+                
+            except Exception as e:
+                logger.error(f"[CRAG-V3] Generation failed: {e}")
+                yield {"type": "answer", "content": f"Lỗi khi tạo câu trả lời: {e}"}
+        finally:
+            # Client disconnected (GeneratorExit) or the pipeline raised
+            if speculative_task is not None and not speculative_task.done():
+                speculative_task.cancel()
         
         # ═══════════════════════════════════════════════════════════════════
         # PHASE 6: Finalize (sources + metadata)
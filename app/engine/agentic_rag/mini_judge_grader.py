@@ -15,16 +15,21 @@ Root Cause Fix:
 Expected Improvement:
 - Before: 10 docs × UNCERTAIN → 8 LLM calls (20% saved)
 - After: 10 docs × Mini-Judge → 3-4 LLM calls (60-70% saved)
+- Single-call mode: all docs in 1 streamed LLM call, early stop
+  once enough relevant docs are confirmed
 
 Feature: semantic-cache-phase3.5
 """
 
 import asyncio
+import json
 import logging
-from dataclasses import dataclass
+import re
+from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional, Tuple
 
 from app.engine.llm_pool import get_llm_light
+from app.engine.llm_scheduler import scheduled_ainvoke, scheduled_astream
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +43,28 @@ class MiniJudgeResult:
     confidence: str  # "high", "medium", "low"
     reason: str
     latency_ms: float
+    score: Optional[float] = None  # 0-10, only set by single-call mode
+
+
+@dataclass
+class MiniJudgeBatchResult:
+    """
+    Result from a batched Mini-Judge run.
+    
+    `results` only contains documents that were actually judged; documents
+    skipped by early stop are listed in `skipped_indices`.
+    """
+    results: List[MiniJudgeResult] = field(default_factory=list)
+    judged_indices: List[int] = field(default_factory=list)
+    skipped_indices: List[int] = field(default_factory=list)
+    llm_calls: int = 0
+    early_stopped: bool = False
+    fallback_used: bool = False
+    latency_ms: float = 0.0
+    
+    @property
+    def relevant_count(self) -> int:
+        return sum(1 for r in self.results if r.is_relevant)
 
 
 @dataclass
@@ -55,6 +82,10 @@ class MiniJudgeConfig:
     # Fallback behavior
     on_error: str = "uncertain"  # "relevant", "irrelevant", "uncertain"
     
+    # Single-call mode: all docs judged in one streamed LLM call
+    batch_timeout_seconds: float = 8.0
+    batch_max_doc_chars: int = 500
+    
     enabled: bool = True
 
 
@@ -120,6 +151,88 @@ Instructions:
 
 Answer:"""
     
+    def _build_batch_prompt(self, query: str, documents: List[Dict[str, Any]]) -> str:
+        """Build single-call prompt that asks for one JSON verdict per line."""
+        query_truncated = query[:self._config.max_query_chars]
+        docs_text = "\n\n".join(
+            f"[{i}]\n{doc.get('content', doc.get('text', ''))[:self._config.batch_max_doc_chars]}"
+            for i, doc in enumerate(documents)
+        )
+        
+        return f"""Determine for EACH document whether it is RELEVANT to answer the user's question.
+
+Question: {query_truncated}
+
+Documents:
+{docs_text}
+
+Instructions:
+- Output exactly one JSON object per line, one line per document, in document order
+- Format: {{"i": <index>, "relevant": true/false, "score": 0-10, "reason": "<max 10 words>"}}
+- "relevant" = document contains information to answer the question
+- score: 9-10 answers directly, 7-8 strongly related, 5-6 partial, 0-4 off-topic
+- No markdown, no extra text
+
+Verdicts:"""
+    
+    @staticmethod
+    def _extract_text(raw_content: Any) -> str:
+        """
+        Extract plain text from a response/chunk content.
+        
+        CHỈ THỊ SỐ 31 v4: Gemini 3 Flash can return content as list or string.
+        Following Google GenAI SDK patterns for safe content extraction.
+        """
+        if isinstance(raw_content, list):
+            text_parts = []
+            for part in raw_content:
+                if isinstance(part, str):
+                    text_parts.append(part)
+                elif isinstance(part, dict):
+                    # Skip thinking blocks, keep text parts
+                    if part.get("type", "text") == "text" and "text" in part:
+                        text_parts.append(part["text"])
+                elif hasattr(part, 'text'):
+                    text_parts.append(part.text)
+            return ''.join(text_parts)
+        return str(raw_content) if raw_content is not None else ""
+    
+    _VERDICT_LINE = re.compile(r"\{.*\}")
+    
+    def _parse_verdict_line(
+        self,
+        line: str,
+        documents: List[Dict[str, Any]]
+    ) -> Optional[Tuple[int, bool, float, str]]:
+        """
+        Parse one streamed verdict line.
+        
+        Returns:
+            (doc_index, is_relevant, score, reason) or None if not a verdict
+        """
+        match = self._VERDICT_LINE.search(line)
+        if not match:
+            return None
+        try:
+            data = json.loads(match.group(0))
+            doc_idx = int(data.get("i", data.get("doc_index", -1)))
+        except (ValueError, TypeError):
+            return None
+        if not 0 <= doc_idx < len(documents):
+            return None
+        
+        is_relevant = data.get("relevant", data.get("is_relevant"))
+        if isinstance(is_relevant, str):
+            is_relevant = is_relevant.strip().lower() in ("true", "yes")
+        try:
+            score = max(0.0, min(10.0, float(data.get("score", 8.5 if is_relevant else 2.0))))
+        except (ValueError, TypeError):
+            score = 8.5 if is_relevant else 2.0
+        if is_relevant is None:
+            is_relevant = score >= 7.0
+        
+        return doc_idx, bool(is_relevant), score, str(data.get("reason", ""))[:80]
+    
     async def _judge_single(
         self,
         query: str,
@@ -139,28 +252,13 @@ Answer:"""
             
             # Add timeout
             response = await asyncio.wait_for(
-                self._llm.ainvoke(prompt),
+                scheduled_ainvoke(self._llm, prompt),
                 timeout=self._config.timeout_seconds
             )
             
             # CHỈ THỊ SỐ 31 v4: Handle Gemini 3 response.content types
-            # Gemini 3 Flash can return content as list or string
-            # Following Google GenAI SDK patterns for safe content extraction
-            raw_content = response.content
-            if isinstance(raw_content, list):
-                # Extract text from list of content parts
-                text_parts = []
-                for part in raw_content:
-                    if isinstance(part, str):
-                        text_parts.append(part)
-                    elif hasattr(part, 'text'):
-                        text_parts.append(part.text)
-                    elif isinstance(part, dict) and 'text' in part:
-                        text_parts.append(part['text'])
-                result_text = ' '.join(text_parts).strip().lower()
-            else:
-                result_text = str(raw_content).strip().lower()
-                
+            result_text = self._extract_text(response.content).strip().lower()
+            
             latency_ms = (time.time() - start_time) * 1000
             
             # Parse response
@@ -273,6 +371,153 @@ Answer:"""
         
         return results
     
+    async def judge_batch(
+        self,
+        query: str,
+        documents: List[Dict[str, Any]],
+        stop_after_relevant: Optional[int] = None
+    ) -> MiniJudgeBatchResult:
+        """
+        Judge all documents in ONE streamed LLM call.
+        
+        Verdicts are parsed line by line while the response streams. Once
+        `stop_after_relevant` documents are confirmed relevant the stream is
+        closed and the remaining documents are reported as skipped.
+        
+        Falls back to per-document calls for any document whose verdict
+        could not be parsed (malformed output, timeout, API error).
+        
+        Args:
+            query: User query string
+            documents: List of document dicts with 'content' field
+            stop_after_relevant: Early-stop target (None = judge all docs)
+            
+        Returns:
+            MiniJudgeBatchResult with verdicts and LLM call count
+        """
+        import time
+        
+        if not documents:
+            return MiniJudgeBatchResult()
+        
+        if stop_after_relevant is not None and stop_after_relevant <= 0:
+            # Target already reached upstream - no LLM call needed
+            return MiniJudgeBatchResult(
+                skipped_indices=list(range(len(documents))),
+                early_stopped=True
+            )
+        
+        if not self._config.enabled:
+            results = await self.pre_grade_batch(query, documents)
+            return MiniJudgeBatchResult(
+                results=results,
+                judged_indices=list(range(len(documents)))
+            )
+        
+        self._ensure_llm()
+        start_time = time.time()
+        
+        verdicts: Dict[int, MiniJudgeResult] = {}
+        relevant_count = 0
+        early_stopped = False
+        
+        def _consume(line: str) -> bool:
+            """Record a verdict line. Returns True when early-stop target is hit."""
+            nonlocal relevant_count
+            parsed = self._parse_verdict_line(line, documents)
+            if parsed is None:
+                return False
+            doc_idx, is_relevant, score, reason = parsed
+            if doc_idx in verdicts:
+                return False
+            doc = documents[doc_idx]
+            verdicts[doc_idx] = MiniJudgeResult(
+                document_id=doc.get("id", doc.get("node_id", f"doc_{doc_idx}")),
+                content_preview=doc.get("content", "")[:100],
+                is_relevant=is_relevant,
+                confidence="high",
+                reason=f"Mini-Judge batch: {reason}",
+                latency_ms=(time.time() - start_time) * 1000,
+                score=score
+            )
+            if is_relevant:
+                relevant_count += 1
+            return (
+                stop_after_relevant is not None
+                and relevant_count >= stop_after_relevant
+            )
+        
+        stream = None
+        try:
+            prompt = self._build_batch_prompt(query, documents)
+            buffer = ""
+            
+            async with asyncio.timeout(self._config.batch_timeout_seconds):
+                stream = scheduled_astream(self._llm, prompt)
+                async for chunk in stream:
+                    buffer += self._extract_text(chunk.content)
+                    *lines, buffer = buffer.split("\n")
+                    if any(_consume(line) for line in lines):
+                        early_stopped = True
+                        break
+                else:
+                    early_stopped = _consume(buffer)
+                    
+        except TimeoutError:
+            logger.warning(
+                f"[MiniJudge] Batch call timed out after {len(verdicts)}/{len(documents)} verdicts"
+            )
+        except Exception as e:
+            logger.warning(f"[MiniJudge] Batch call failed: {e}")
+        finally:
+            if stream is not None and hasattr(stream, "aclose"):
+                try:
+                    await stream.aclose()
+                except Exception:
+                    pass
+        
+        llm_calls = 1
+        fallback_used = False
+        judged_indices = sorted(verdicts)
+        skipped_indices: List[int] = []
+        
+        missing = [i for i in range(len(documents)) if i not in verdicts]
+        if missing and early_stopped:
+            skipped_indices = missing
+        elif missing:
+            # Parse failure / truncated stream → per-doc fallback for the rest
+            logger.warning(
+                f"[MiniJudge] Batch returned {len(verdicts)}/{len(documents)} verdicts, "
+                f"falling back to per-doc calls for {len(missing)} docs"
+            )
+            fallback_used = True
+            fallback_results = await self.pre_grade_batch(
+                query, [documents[i] for i in missing]
+            )
+            llm_calls += len(missing)
+            for i, result in zip(missing, fallback_results):
+                verdicts[i] = result
+            judged_indices = sorted(verdicts)
+        
+        latency_ms = (time.time() - start_time) * 1000
+        batch = MiniJudgeBatchResult(
+            results=[verdicts[i] for i in judged_indices],
+            judged_indices=judged_indices,
+            skipped_indices=skipped_indices,
+            llm_calls=llm_calls,
+            early_stopped=early_stopped,
+            fallback_used=fallback_used,
+            latency_ms=latency_ms
+        )
+        
+        logger.info(
+            f"[MiniJudge] Single-call judged {len(judged_indices)}/{len(documents)} docs "
+            f"in {latency_ms:.0f}ms: RELEVANT={batch.relevant_count}, "
+            f"early_stop={early_stopped}, fallback={fallback_used}, llm_calls={llm_calls}"
+        )
+        
+        return batch
+    
     def get_docs_for_full_grading(
         self,
         documents: List[Dict[str, Any]],
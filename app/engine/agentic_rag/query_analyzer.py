@@ -8,18 +8,25 @@ Features:
 - Multi-step detection
 - Verification requirements
 - Query decomposition suggestions
+- Fast path: memo cache + local kNN classifier, LLM only on low confidence
 """
 
 import logging
-from dataclasses import dataclass, field
+import time
+from dataclasses import dataclass, field, replace
 from typing import List, Optional
 from enum import Enum
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
+from app.cache.lru_cache import LRUCache
 from app.core.config import settings
 from app.engine.llm_pool import get_llm_light  # SOTA: Shared LLM Pool
+from app.engine.agentic_rag.query_classifier import (
+    LabeledQuery, get_local_query_classifier, normalize_query
+)
+from app.engine.llm_scheduler import scheduled_ainvoke
 
 logger = logging.getLogger(__name__)
 
@@ -87,6 +94,22 @@ class QueryAnalyzer:
         """Initialize with Gemini LLM."""
         self._llm = None
         self._init_llm()
+        
+        # Fast path: memo cache (normalized query → analysis) + local classifier
+        self._cache = LRUCache("query_analyzer.analyses", max_size=settings.query_analyzer_cache_size)
+        self._local_enabled = settings.query_analyzer_local_enabled
+        self._local_confidence = settings.query_analyzer_local_confidence
+        self._classifier = get_local_query_classifier() if self._local_enabled else None
+        
+        # Metrics: LLM-bypass rate and per-path latency
+        self._stats = {
+            "requests": 0,
+            "cache_hits": 0,
+            "local_hits": 0,
+            "llm_calls": 0,
+            "local_ms_total": 0.0,
+            "llm_ms_total": 0.0,
+        }
     
     def _init_llm(self):
         """Initialize Gemini LLM for analysis with LIGHT tier thinking."""
@@ -102,12 +125,87 @@ class QueryAnalyzer:
         """
         Analyze query complexity.
         
+        Order: memo cache → local classifier (if confident) → LLM.
+        LLM results are memoized and fed back to the local classifier.
+        
         Args:
             query: User query to analyze
             
         Returns:
             QueryAnalysis with complexity and recommendations
         """
+        self._stats["requests"] += 1
+        key = normalize_query(query)
+        
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._stats["cache_hits"] += 1
+            return replace(cached, original_query=query)
+        
+        start_time = time.time()
+        local = self._local_analysis(query)
+        if local is not None:
+            self._stats["local_hits"] += 1
+            self._stats["local_ms_total"] += (time.time() - start_time) * 1000
+            self._remember(key, local)
+            return local
+        
+        start_time = time.time()
+        analysis = await self._llm_analysis(query)
+        self._stats["llm_ms_total"] += (time.time() - start_time) * 1000
+        return analysis
+    
+    def _local_analysis(self, query: str) -> Optional[QueryAnalysis]:
+        """
+        Analyze with the local kNN classifier.
+        
+        Returns:
+            QueryAnalysis if local confidence is high enough, else None
+        """
+        if not self._classifier:
+            return None
+        
+        prediction = self._classifier.classify(query)
+        if prediction is None:
+            return None
+        
+        rule_based = self._rule_based_analysis(query)
+        confidence = prediction.confidence
+        # Rule-based indicators ("so sánh", "giải thích", ...) act as a second vote
+        if rule_based.complexity.value == prediction.complexity:
+            confidence = min(1.0, confidence + 0.1)
+        else:
+            confidence *= 0.7
+        
+        if confidence < self._local_confidence:
+            logger.debug(
+                f"[QueryAnalyzer] Local confidence {confidence:.2f} < "
+                f"{self._local_confidence:.2f}, using LLM"
+            )
+            return None
+        
+        logger.info(
+            f"[QueryAnalyzer] Local fast path: {prediction.complexity} "
+            f"(confidence={confidence:.2f}, neighbors={prediction.neighbor_count})"
+        )
+        return QueryAnalysis(
+            original_query=query,
+            complexity=QueryComplexity(prediction.complexity),
+            requires_multi_step=prediction.requires_multi_step,
+            requires_verification=prediction.requires_verification,
+            is_maritime_related=prediction.is_maritime_related,
+            detected_topics=rule_based.detected_topics or prediction.topics,
+            confidence=confidence
+        )
+    
+    def _remember(self, key: str, analysis: QueryAnalysis) -> None:
+        """Memoize analysis by normalized query (LRU bounded)."""
+        if not key:
+            return
+        self._cache.set(key, analysis)
+    
+    async def _llm_analysis(self, query: str) -> QueryAnalysis:
+        """Analyze with the LIGHT tier LLM (falls back to rule-based)."""
         if not self._llm:
             # Fallback to rule-based analysis
             return self._rule_based_analysis(query)
@@ -119,7 +217,8 @@ class QueryAnalyzer:
                 HumanMessage(content=ANALYSIS_PROMPT.format(query=query))
             ]
             
-            response = await self._llm.ainvoke(messages)
+            self._stats["llm_calls"] += 1
+            response = await scheduled_ainvoke(self._llm, messages)
             
             # SOTA FIX: Handle Gemini 2.5 Flash content block format
             from app.services.output_processor import extract_thinking_from_response
@@ -138,7 +237,7 @@ class QueryAnalyzer:
             
             data = json.loads(content)
             
-            return QueryAnalysis(
+            analysis = QueryAnalysis(
                 original_query=query,
                 complexity=QueryComplexity(data.get("complexity", "moderate")),
                 requires_multi_step=data.get("requires_multi_step", False),
@@ -149,6 +248,20 @@ class QueryAnalyzer:
                 confidence=data.get("confidence", 0.8)
             )
             
+            # Memoize + learn from the LLM label
+            self._remember(normalize_query(query), analysis)
+            if self._classifier:
+                self._classifier.add_example(LabeledQuery(
+                    query=query,
+                    complexity=analysis.complexity.value,
+                    is_maritime_related=analysis.is_maritime_related,
+                    requires_verification=analysis.requires_verification,
+                    requires_multi_step=analysis.requires_multi_step,
+                    topics=analysis.detected_topics,
+                ))
+            
+            return analysis
+            
         except Exception as e:
             logger.warning(f"LLM analysis failed, using rule-based: {e}")
             return self._rule_based_analysis(query)
@@ -217,6 +330,21 @@ class QueryAnalyzer:
     def is_available(self) -> bool:
         """Check if LLM is available."""
         return self._llm is not None
+    
+    def get_stats(self) -> dict:
+        """Get analysis statistics (LLM-bypass rate, latency per path)."""
+        requests = self._stats["requests"]
+        bypassed = self._stats["cache_hits"] + self._stats["local_hits"]
+        llm_calls = self._stats["llm_calls"]
+        local_hits = self._stats["local_hits"]
+        return {
+            **{k: v for k, v in self._stats.items() if not k.endswith("_ms_total")},
+            "llm_bypass_rate": f"{(bypassed / requests if requests else 0.0):.2%}",
+            "avg_local_ms": round(self._stats["local_ms_total"] / local_hits, 2) if local_hits else 0.0,
+            "avg_llm_ms": round(self._stats["llm_ms_total"] / llm_calls, 1) if llm_calls else 0.0,
+            "cache_entries": len(self._cache),
+            "labeled_examples": self._classifier.example_count if self._classifier else 0,
+        }
 
 
 # Singleton
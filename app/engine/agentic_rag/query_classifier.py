@@ -0,0 +1,259 @@
+"""
+Local Query Classifier - Fast path for QueryAnalyzer.
+
+Classifies query complexity / maritime relevance WITHOUT an LLM call using
+k-nearest-neighbour search over labeled historical queries.
+
+Pattern References:
+- Semantic Router (Aurelio AI): Route by similarity to labeled utterances
+- FrugalGPT (Chen et al. 2023): LLM cascade - cheap model first, LLM on low confidence
+
+Similarity:
+- Character trigram sets (diacritic-preserving, works for Vietnamese + English)
+- Cosine over binary trigram sets via inverted index (~1ms for 2000 examples)
+
+Labeled examples:
+- Seed set: query_examples.jsonl (hand-labeled)
+- Online: every LLM analysis is added as a new labeled example
+  (optionally persisted to settings.query_classifier_history_path)
+
+Feature: query-analyzer-fast-path
+"""
+
+import json
+import logging
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SEED_EXAMPLES_PATH = Path(__file__).parent / "query_examples.jsonl"
+
+_PUNCTUATION = re.compile(r"[^\w\s]", re.UNICODE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query for caching and similarity.
+
+    Lowercases, applies NFC (Vietnamese diacritics are kept - "tàu" and "tau"
+    are different words), strips punctuation and collapses whitespace.
+    """
+    text = unicodedata.normalize("NFC", query).lower()
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _trigrams(normalized: str) -> Set[str]:
+    """Character trigrams with word-boundary padding."""
+    padded = f" {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class LabeledQuery:
+    """A labeled historical query."""
+    query: str
+    complexity: str
+    is_maritime_related: bool
+    requires_verification: bool
+    requires_multi_step: bool = False
+    topics: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        return {
+            "query": self.query,
+            "complexity": self.complexity,
+            "is_maritime_related": self.is_maritime_related,
+            "requires_verification": self.requires_verification,
+            "requires_multi_step": self.requires_multi_step,
+            "topics": self.topics,
+        }
+
+
+@dataclass
+class LocalPrediction:
+    """Prediction from the local classifier."""
+    complexity: str
+    is_maritime_related: bool
+    requires_verification: bool
+    requires_multi_step: bool
+    topics: List[str]
+    confidence: float  # 0-1: top similarity × label agreement
+    top_similarity: float
+    neighbor_count: int
+
+
+class LocalQueryClassifier:
+    """
+    kNN classifier over labeled historical queries.
+
+    Usage:
+        classifier = LocalQueryClassifier()
+        prediction = classifier.classify("Quy tắc 15 là gì?")
+        if prediction and prediction.confidence >= 0.75:
+            # Use local prediction, skip LLM
+
+        # After an LLM analysis, learn from it
+        classifier.add_example(LabeledQuery(...))
+    """
+
+    def __init__(
+        self,
+        k: int = 5,
+        min_similarity: float = 0.35,
+        vote_window: float = 0.15,
+        max_examples: int = 5000,
+        history_path: Optional[str] = None
+    ):
+        self._k = k
+        self._min_similarity = min_similarity
+        self._vote_window = vote_window
+        self._max_examples = max_examples
+        self._history_path = Path(history_path) if history_path else None
+
+        self._examples: List[LabeledQuery] = []
+        self._gram_sizes: List[int] = []
+        self._index: Dict[str, List[int]] = defaultdict(list)
+        self._known: Set[str] = set()
+
+        self._load(SEED_EXAMPLES_PATH)
+        if self._history_path:
+            self._load(self._history_path)
+
+        logger.info(f"[QueryClassifier] Loaded {len(self._examples)} labeled examples")
+
+    def _load(self, path: Path) -> None:
+        """Load labeled examples from a JSONL file (missing file = no-op)."""
+        if not path.exists():
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    self._index_example(LabeledQuery(
+                        query=data["query"],
+                        complexity=data.get("complexity", "moderate"),
+                        is_maritime_related=data.get("is_maritime_related", True),
+                        requires_verification=data.get("requires_verification", False),
+                        requires_multi_step=data.get("requires_multi_step", False),
+                        topics=data.get("topics", []),
+                    ))
+        except Exception as e:
+            logger.warning(f"[QueryClassifier] Failed to load {path}: {e}")
+
+    def _index_example(self, example: LabeledQuery) -> bool:
+        normalized = normalize_query(example.query)
+        if not normalized or normalized in self._known:
+            return False
+        if len(self._examples) >= self._max_examples:
+            return False
+
+        idx = len(self._examples)
+        grams = _trigrams(normalized)
+        self._examples.append(example)
+        self._gram_sizes.append(len(grams))
+        self._known.add(normalized)
+        for gram in grams:
+            self._index[gram].append(idx)
+        return True
+
+    def add_example(self, example: LabeledQuery) -> None:
+        """Add a labeled query (e.g. an LLM analysis) to the example bank."""
+        if not self._index_example(example):
+            return
+        if self._history_path:
+            try:
+                self._history_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self._history_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(example.to_dict(), ensure_ascii=False) + "\n")
+            except Exception as e:
+                logger.debug(f"[QueryClassifier] Failed to persist example: {e}")
+
+    def classify(self, query: str) -> Optional[LocalPrediction]:
+        """
+        Predict analysis labels from the k most similar labeled queries.
+
+        Returns:
+            LocalPrediction, or None when no neighbour is similar enough
+        """
+        normalized = normalize_query(query)
+        if not normalized or not self._examples:
+            return None
+
+        grams = _trigrams(normalized)
+        overlaps: Counter = Counter()
+        for gram in grams:
+            for idx in self._index.get(gram, ()):
+                overlaps[idx] += 1
+        if not overlaps:
+            return None
+
+        query_size = len(grams)
+        scored = sorted(
+            (
+                (count / math.sqrt(query_size * self._gram_sizes[idx]), idx)
+                for idx, count in overlaps.items()
+            ),
+            reverse=True
+        )
+        if scored[0][0] < self._min_similarity:
+            return None
+        # Only neighbours close to the best match vote (drops weak, noisy labels)
+        vote_floor = max(self._min_similarity, scored[0][0] - self._vote_window)
+        neighbors = [(sim, self._examples[idx]) for sim, idx in scored[:self._k] if sim >= vote_floor]
+
+        total = sum(sim for sim, _ in neighbors)
+
+        def vote(attr) -> tuple:
+            weights: Dict = defaultdict(float)
+            for sim, example in neighbors:
+                weights[getattr(example, attr)] += sim
+            winner = max(weights, key=weights.get)
+            return winner, weights[winner] / total
+
+        complexity, complexity_agreement = vote("complexity")
+        is_maritime, maritime_agreement = vote("is_maritime_related")
+        requires_verification, _ = vote("requires_verification")
+        requires_multi_step, _ = vote("requires_multi_step")
+
+        top_similarity = neighbors[0][0]
+        return LocalPrediction(
+            complexity=complexity,
+            is_maritime_related=is_maritime,
+            requires_verification=requires_verification,
+            requires_multi_step=requires_multi_step,
+            topics=list(neighbors[0][1].topics),
+            confidence=top_similarity * min(complexity_agreement, maritime_agreement),
+            top_similarity=top_similarity,
+            neighbor_count=len(neighbors),
+        )
+
+    @property
+    def example_count(self) -> int:
+        return len(self._examples)
+
+
+# Singleton
+_classifier: Optional[LocalQueryClassifier] = None
+
+
+def get_local_query_classifier() -> LocalQueryClassifier:
+    """Get or create LocalQueryClassifier singleton."""
+    global _classifier
+    if _classifier is None:
+        _classifier = LocalQueryClassifier(
+            history_path=settings.query_classifier_history_path or None
+        )
+    return _classifier
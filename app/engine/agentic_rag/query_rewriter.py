@@ -17,6 +17,7 @@ from langchain_core.messages import HumanMessage, SystemMessage
 
 from app.core.config import settings
 from app.engine.llm_pool import get_llm_light  # SOTA: Shared LLM Pool
+from app.engine.llm_scheduler import scheduled_ainvoke
 
 logger = logging.getLogger(__name__)
 
@@ -98,7 +99,7 @@ class QueryRewriter:
                 ))
             ]
             
-            response = await self._llm.ainvoke(messages)
+            response = await scheduled_ainvoke(self._llm, messages)
             
             # SOTA FIX: Handle Gemini 2.5 Flash content block format
             from app.services.output_processor import extract_thinking_from_response
@@ -133,7 +134,7 @@ class QueryRewriter:
                 HumanMessage(content=EXPAND_PROMPT.format(query=query))
             ]
             
-            response = await self._llm.ainvoke(messages)
+            response = await scheduled_ainvoke(self._llm, messages)
             
             # SOTA FIX: Handle Gemini 2.5 Flash content block format
             from app.services.output_processor import extract_thinking_from_response
@@ -162,7 +163,7 @@ class QueryRewriter:
                 HumanMessage(content=DECOMPOSE_PROMPT.format(query=query))
             ]
             
-            response = await self._llm.ainvoke(messages)
+            response = await scheduled_ainvoke(self._llm, messages)
             
             # SOTA FIX: Handle Gemini 2.5 Flash content block format
             from app.services.output_processor import extract_thinking_from_response
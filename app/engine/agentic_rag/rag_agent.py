@@ -14,7 +14,9 @@ Feature: sparse-search-migration
 **Validates: Requirements 4.1, 4.2, 4.4, 8.3**
 """
 
+import asyncio
 import logging
+from contextlib import aclosing
 from dataclasses import dataclass
 from typing import List, Optional, Tuple
 
@@ -39,6 +41,10 @@ from app.models.knowledge_graph import (
 )
 from app.repositories.neo4j_knowledge_repository import Neo4jKnowledgeRepository
 from app.engine.rrf_reranker import HybridSearchResult
+from app.engine.llm_pool import LLMPool, ThinkingTier
+from app.engine.llm_scheduler import get_llm_scheduler, scheduled_astream
+from app.engine.agentic_rag.adaptive_token_budget import get_adaptive_token_budget
+from app.engine.context_packer import ContextSegment, get_context_packer
 
 # Lazy import to avoid circular dependency with app.services
 # HybridSearchService is imported in __init__ method
@@ -329,7 +335,9 @@ class RAGAgent:
             expanded_nodes = await self._expand_context(nodes)
             citations = await self._kg.get_citations(nodes)
             # CHỈ THỊ SỐ 29: Unpack tuple with native_thinking
-            content, native_thinking = self._generate_response(question, expanded_nodes, conversation_history, user_role, entity_context)
+            content, native_thinking = await asyncio.to_thread(
+                self._generate_response, question, expanded_nodes, conversation_history, user_role, entity_context
+            )
             return RAGResponse(content=content, citations=citations, is_fallback=False, native_thinking=native_thinking)
         
         # Convert hybrid results to KnowledgeNodes for compatibility
@@ -343,7 +351,9 @@ class RAGAgent:
         
         # Generate response content with entity context
         # CHỈ THỊ SỐ 29: Unpack tuple with native_thinking
-        content, native_thinking = self._generate_response(
+        # Off the event loop: synthesis (and explicit cache creation) block
+        content, native_thinking = await asyncio.to_thread(
+            self._generate_response,
             question, expanded_nodes, conversation_history, user_role, entity_context
         )
         
@@ -663,6 +673,60 @@ class RAGAgent:
         # See README.md: "Neo4j: Reserved for future Learning Graph (LMS integration)"
         return list(nodes)
     
+    def _pack_context(
+        self,
+        question: str,
+        nodes: List[KnowledgeNode],
+        conversation_history: str = "",
+        entity_context: str = ""
+    ) -> Tuple[str, str, str, List[str]]:
+        """
+        Fit retrieved chunks, history and entity context into the turn's token budget.
+        
+        Chunks are prioritized by retrieval rank and overlapping chunks are
+        dropped; truncated history keeps its most recent lines. The budget
+        is AdaptiveTokenBudget.context_tokens for the question, with
+        CONTEXT_HISTORY_MIN_TOKENS of history guaranteed on top.
+        
+        Returns:
+            Tuple of (chunk_context, conversation_history, entity_context, sources)
+            limited to what was packed
+            
+        **Feature: context-packer**
+        """
+        chunk_segments = [
+            ContextSegment(
+                f"### {node.title}\n{node.content}",
+                kind="chunks",
+                priority=1.0 - 0.1 * rank,
+                dedupe=True
+            )
+            for rank, node in enumerate(nodes[:settings.rag_context_max_chunks])
+        ]
+        entity_segment = ContextSegment(entity_context, kind="entities", priority=0.55)
+        history_segment = ContextSegment(
+            conversation_history, kind="history", priority=0.5, keep="tail",
+            min_tokens=settings.context_history_min_tokens
+        )
+        
+        budget = get_adaptive_token_budget().get_budget(question).context_tokens
+        packed = get_context_packer().pack(
+            chunk_segments + [entity_segment, history_segment], budget, label="rag"
+        )
+        selected = {id(segment) for segment in packed.segments}
+        
+        sources = [
+            f"- {node.title} ({node.source})"
+            for node, segment in zip(nodes, chunk_segments)
+            if id(segment) in selected and node.source
+        ]
+        return (
+            packed.join("chunks"),
+            history_segment.text if id(history_segment) in selected else "",
+            entity_segment.text if id(entity_segment) in selected else "",
+            sources
+        )
+    
     def _generate_response(
         self, 
         question: str, 
@@ -693,16 +757,10 @@ class RAGAgent:
         if not nodes:
             return "I couldn't find specific information about that topic.", None
         
-        # Build context from retrieved nodes
-        context_parts = []
-        sources = []
-        
-        for node in nodes[:3]:  # Top 3 most relevant
-            context_parts.append(f"### {node.title}\n{node.content}")
-            if node.source:
-                sources.append(f"- {node.title} ({node.source})")
-        
-        context = "\n\n".join(context_parts)
+        # Build context from retrieved nodes (token-budgeted with history and entities)
+        context, packed_history, entity_context, sources = self._pack_context(
+            question, nodes, conversation_history, entity_context
+        )
         
         # If no LLM, return formatted raw content
         if not self._llm:
@@ -717,9 +775,9 @@ class RAGAgent:
         # CHỈ THỊ SỐ 29 v9: Vietnamese thinking instruction from YAML
         # SOTA 2025: Use PromptLoader for persona and thinking rules
         
-        # Get base prompt from YAML (includes persona, style, thinking instruction)
-        base_prompt = self._prompt_loader.build_system_prompt(
-            role=user_role,
+        # Get base prompt from YAML: static persona prefix + per-turn part
+        static_prompt, dynamic_prompt = self._prompt_loader.build_prompt_parts(
+            user_role,
             user_name=None,  # Will be injected by caller if available
             is_follow_up=bool(conversation_history)
         )
@@ -759,17 +817,17 @@ NHIỆM VỤ:
 - Nếu có NGỮ CẢNH THỰC THỂ, tham chiếu các điều luật liên quan
 - Trả lời bằng tiếng Việt"""
         
-        # Combine: base (from YAML) + thinking + role rules
-        system_prompt = f"{base_prompt}\n\n{thinking_instruction}\n{role_rules}"
+        # Combine: static persona + thinking + role rules (stable per role), then per-turn part
+        static_prompt = f"{static_prompt}\n\n{thinking_instruction}\n{role_rules}"
 
 
         # Build user prompt with history and entity context
         history_section = ""
-        if conversation_history:
+        if packed_history:
             history_section = f"""
 ---
 LỊCH SỬ HỘI THOẠI (Gần nhất):
-{conversation_history}
+{packed_history}
 ---
 """
 
@@ -794,12 +852,12 @@ CÂU HỎI HIỆN TẠI:
 Hãy trả lời câu hỏi dựa trên thông tin trên."""
 
         try:
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=user_prompt)
-            ]
+            llm, messages = self._generation_messages(
+                f"rag:{user_role}", static_prompt, dynamic_prompt, user_prompt
+            )
             
-            response = self._llm.invoke(messages)
+            response = llm.invoke(messages)
+            get_llm_scheduler().record_prompt_usage(response, ThinkingTier.MODERATE)
             
             # CHỈ THỊ SỐ 29: Extract native thinking from Gemini response
             # Lazy import to avoid circular dependency (as documented at line 23-24)
@@ -904,15 +962,9 @@ Hãy trả lời câu hỏi dựa trên thông tin trên."""
             return
         
         # Build context from retrieved nodes (same as _generate_response)
-        context_parts = []
-        sources = []
-        
-        for node in nodes[:3]:
-            context_parts.append(f"### {node.title}\n{node.content}")
-            if node.source:
-                sources.append(f"- {node.title} ({node.source})")
-        
-        context = "\n\n".join(context_parts)
+        context, packed_history, entity_context, sources = self._pack_context(
+            question, nodes, conversation_history, entity_context
+        )
         
         if not self._llm:
             logger.info("[STREAMING] No LLM available, yielding raw content")
@@ -922,8 +974,8 @@ Hãy trả lời câu hỏi dựa trên thông tin trên."""
             return
         
         # Build prompts (same as _generate_response)
-        base_prompt = self._prompt_loader.build_system_prompt(
-            role=user_role,
+        static_prompt, dynamic_prompt = self._prompt_loader.build_prompt_parts(
+            user_role,
             user_name=None,
             is_follow_up=bool(conversation_history)
         )
@@ -947,11 +999,11 @@ QUY TẮC:
 - Súc tích, chuyên nghiệp
 - Trả lời bằng tiếng Việt"""
         
-        system_prompt = f"{base_prompt}\n\n{thinking_instruction}\n{role_rules}"
+        static_prompt = f"{static_prompt}\n\n{thinking_instruction}\n{role_rules}"
         
         history_section = ""
-        if conversation_history:
-            history_section = f"\n---\nLỊCH SỬ HỘI THOẠI:\n{conversation_history}\n---\n"
+        if packed_history:
+            history_section = f"\n---\nLỊCH SỬ HỘI THOẠI:\n{packed_history}\n---\n"
         
         entity_section = ""
         if entity_context:
@@ -968,20 +1020,23 @@ CÂU HỎI HIỆN TẠI:
 Hãy trả lời câu hỏi dựa trên thông tin trên."""
 
         try:
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=user_prompt)
-            ]
+            # Creating an explicit cache handle is a blocking API call
+            llm, messages = await asyncio.to_thread(
+                self._generation_messages,
+                f"rag_stream:{user_role}", static_prompt, dynamic_prompt, user_prompt
+            )
             
             logger.info("[STREAMING] Starting token-by-token generation...")
             
             # P3 SOTA: Use astream() for true streaming
-            async for chunk in self._llm.astream(messages):
-                # Extract text content from chunk
-                # Handle Gemini 3 Flash thinking blocks (list of content blocks)
-                content = self._extract_content_from_chunk(chunk)
-                if content:
-                    yield content
+            # aclosing: release the scheduler slot even if the consumer stops early
+            async with aclosing(scheduled_astream(llm, messages, tier=ThinkingTier.MODERATE)) as stream:
+                async for chunk in stream:
+                    # Extract text content from chunk
+                    # Handle Gemini 3 Flash thinking blocks (list of content blocks)
+                    content = self._extract_content_from_chunk(chunk)
+                    if content:
+                        yield content
             
             # After streaming completes, yield sources
             if sources:
@@ -993,6 +1048,34 @@ Hãy trả lời câu hỏi dựa trên thông tin trên."""
             logger.error(f"[STREAMING] LLM synthesis failed: {e}")
             yield f"Lỗi xử lý: {str(e)}"
     
+    def _generation_messages(
+        self,
+        cache_key: str,
+        static_prompt: str,
+        dynamic_prompt: str,
+        user_prompt: str
+    ) -> Tuple[object, list]:
+        """
+        LLM and messages for synthesis, static system prefix first.
+        
+        The static prefix is identical for every request of a role, so Gemini
+        implicit caching applies to it. With LLM_EXPLICIT_CACHE_ENABLED it is
+        served from a cached-content handle instead and only the per-turn part
+        is sent (Gemini rejects a system instruction next to cached content).
+        
+        Returns:
+            Tuple of (llm, messages)
+        """
+        # Explicit caching is Gemini-only (OpenAI fallback has no cached_content)
+        if hasattr(self._llm, "cached_content"):
+            cache_name = LLMPool.get_cached_prefix(ThinkingTier.MODERATE, cache_key, static_prompt)
+            if cache_name:
+                human_prompt = f"{dynamic_prompt}\n{user_prompt}" if dynamic_prompt else user_prompt
+                return self._llm.bind(cached_content=cache_name), [HumanMessage(content=human_prompt)]
+        
+        system_prompt = f"{static_prompt}\n{dynamic_prompt}" if dynamic_prompt else static_prompt
+        return self._llm, [SystemMessage(content=system_prompt), HumanMessage(content=user_prompt)]
+    
     def _extract_content_from_chunk(self, chunk) -> str:
         """
         Extract text content from LLM streaming chunk.
@@ -18,6 +18,7 @@ from langchain_core.messages import HumanMessage, SystemMessage
 
 from app.core.config import settings
 from app.engine.llm_pool import get_llm_moderate  # SOTA: Shared LLM Pool
+from app.engine.llm_scheduler import scheduled_ainvoke
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +41,7 @@ class GradingResult:
     avg_score: float = 0.0
     relevant_count: int = 0
     feedback: str = ""
+    llm_calls: int = 0  # Grading LLM calls spent on this query
     
     def __post_init__(self):
         if self.grades:
@@ -162,6 +164,13 @@ class RetrievalGrader:
         """
         self._llm = None
         self._threshold = threshold
+        
+        # Metrics: grading LLM calls per query (target: <= 1)
+        self._graded_queries = 0
+        self._total_llm_calls = 0
+        self._single_call_queries = 0
+        self._early_stops = 0
+        
         self._init_llm()
     
     def _init_llm(self):
@@ -205,7 +214,7 @@ class RetrievalGrader:
                 ))
             ]
             
-            response = await self._llm.ainvoke(messages)
+            response = await scheduled_ainvoke(self._llm, messages)
             
             # SOTA FIX: Handle Gemini 2.5 Flash content block format
             # When thinking_enabled=True, response.content may be list, not string
@@ -333,10 +342,48 @@ class RetrievalGrader:
         relevant_docs = []
         relevant_results = []
         uncertain_docs = []
-        
-        if needs_mini_judge_docs:
-            judge_results = await mini_judge.pre_grade_batch(query, needs_mini_judge_docs)
+        llm_calls = 0
+        single_call_done = False
+        early_stop_target = settings.grading_early_stop_relevant
+        
+        if needs_mini_judge_docs and settings.mini_judge_single_call:
+            # ================================================================
+            # SINGLE-CALL MODE: all uncertain docs in one streamed LLM call,
+            # early stop once enough relevant docs are confirmed.
+            # Replaces N Mini-Judge calls + 1 batch grading call.
+            # ================================================================
+            batch = await mini_judge.judge_batch(
+                query,
+                needs_mini_judge_docs,
+                stop_after_relevant=early_stop_target - len(high_conf_docs)
+            )
+            llm_calls += batch.llm_calls
+            self._single_call_queries += 1
+            if batch.early_stopped:
+                self._early_stops += 1
             
+            if not batch.fallback_used:
+                single_call_done = True
+                for doc, result in zip(
+                    (needs_mini_judge_docs[i] for i in batch.judged_indices),
+                    batch.results
+                ):
+                    if result.is_relevant:
+                        relevant_docs.append(doc)
+                    grades.append(DocumentGrade(
+                        document_id=result.document_id,
+                        content_preview=result.content_preview,
+                        score=result.score if result.score is not None else (8.5 if result.is_relevant else 2.0),
+                        is_relevant=result.is_relevant,
+                        reason=f"[Mini-Judge] {result.reason}"
+                    ))
+            else:
+                judge_results = batch.results
+        elif needs_mini_judge_docs:
+            judge_results = await mini_judge.pre_grade_batch(query, needs_mini_judge_docs)
+            llm_calls += len(needs_mini_judge_docs)
+        
+        if needs_mini_judge_docs and not single_call_done:
             for doc, result in zip(needs_mini_judge_docs, judge_results):
                 if result.is_relevant and result.confidence in ("high", "medium"):
                     relevant_docs.append(doc)
@@ -363,8 +410,9 @@ class RetrievalGrader:
         # This early exit saves 19s when fast evaluators find 2+ relevant docs
         # ====================================================================
         fast_path_relevant_count = len(high_conf_docs) + len(relevant_docs)
+        llm_full_count = 0
         
-        if fast_path_relevant_count >= 2:
+        if fast_path_relevant_count >= early_stop_target:
             # SOTA: Sufficient relevant docs from fast-path - skip LLM batch
             logger.info(
                 f"[GRADER] SOTA Early Exit: {fast_path_relevant_count} relevant docs "
@@ -372,17 +420,20 @@ class RetrievalGrader:
             )
         elif uncertain_docs:
             # Only grade when truly uncertain (0-1 relevant from fast-path)
+            llm_full_count = min(len(uncertain_docs), 5)
             llm_grades = await self.batch_grade_documents(query, uncertain_docs[:5])
             grades.extend(llm_grades)
+            llm_calls += 1
         
         logger.info(
             f"[GRADER] Summary: {len(documents)} docs → "
             f"Hybrid HIGH={len(high_conf_docs)}, Mini-Judge={len(relevant_docs)}, "
-            f"LLM Full={0 if fast_path_relevant_count >= 2 else min(len(uncertain_docs), 5)} "
-            f"(saved {len(high_conf_docs) + len(relevant_docs)} LLM calls)"
+            f"LLM Full={llm_full_count}, grading_llm_calls={llm_calls}"
         )
         
-        result = GradingResult(query=query, grades=grades)
+        result = GradingResult(query=query, grades=grades, llm_calls=llm_calls)
+        self._graded_queries += 1
+        self._total_llm_calls += llm_calls
         
         # ====================================================================
         # SOTA FIX: Direct rule-based feedback (NO LLM call!)
@@ -443,7 +494,7 @@ class RetrievalGrader:
                 ))
             ]
             
-            response = await self._llm.ainvoke(messages)
+            response = await scheduled_ainvoke(self._llm, messages)
             grades = self._parse_batch_response(response.content, documents)
             
             logger.info(f"[GRADER] Batch graded {len(grades)} docs in 1 LLM call (SOTA)")
@@ -587,7 +638,7 @@ class RetrievalGrader:
                 ))
             ]
             
-            response = await self._llm.ainvoke(messages)
+            response = await scheduled_ainvoke(self._llm, messages)
             
             # SOTA FIX: Handle Gemini 2.5 Flash content block format
             from app.services.output_processor import extract_thinking_from_response
@@ -625,6 +676,19 @@ class RetrievalGrader:
     def is_available(self) -> bool:
         """Check if LLM is available."""
         return self._llm is not None
+    
+    def get_stats(self) -> dict:
+        """Get grading statistics (LLM calls per query)."""
+        return {
+            "graded_queries": self._graded_queries,
+            "total_llm_calls": self._total_llm_calls,
+            "avg_llm_calls_per_query": (
+                round(self._total_llm_calls / self._graded_queries, 2)
+                if self._graded_queries else 0.0
+            ),
+            "single_call_queries": self._single_call_queries,
+            "early_stops": self._early_stops,
+        }
 
 
 # Singleton
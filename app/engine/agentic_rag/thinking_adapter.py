@@ -21,6 +21,7 @@ from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
 from app.engine.llm_pool import get_llm_light
+from app.engine.llm_scheduler import scheduled_ainvoke
 
 logger = logging.getLogger(__name__)
 
@@ -135,7 +136,7 @@ class ThinkingAdapter:
             
             # Use LIGHT tier for speed (~2-3s) with adaptive budget
             # Note: LangChain LLMs handle max_tokens via generation_config
-            response = await self._llm.ainvoke(prompt)
+            response = await scheduled_ainvoke(self._llm, prompt)
             
             # Parse response
             thinking, adapted_answer = self._parse_response(response.content)
@@ -17,7 +17,9 @@ from dataclasses import dataclass
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage
 
+from app.cache.ingestion_cache import KIND_CONTEXT, content_hash, get_ingestion_cache, prompt_version
 from app.core.config import settings
+from app.engine.llm_scheduler import LLMPriority, scheduled_ainvoke
 
 if TYPE_CHECKING:
     from app.services.chunking_service import ChunkResult
@@ -109,24 +111,42 @@ class ContextEnricher:
         Returns:
             EnrichmentResult with context and enriched content
         """
+        # Persistent result cache: chunk hash + document context hash + prompt
+        cache = get_ingestion_cache()
+        cache_key = content_hash(
+            settings.google_model,
+            prompt_version(CONTEXT_PROMPT_TEMPLATE),
+            content_hash(chunk_content[:1500]),
+            content_hash(document_title, page_number, total_pages)
+        )
+        
         try:
-            llm = self._ensure_llm()
-            
-            # Build prompt
-            prompt = CONTEXT_PROMPT_TEMPLATE.format(
-                document_title=document_title,
-                page_number=page_number,
-                total_pages=total_pages,
-                chunk_content=chunk_content[:1500]  # Limit chunk size in prompt
-            )
-            
-            # Generate context
-            response = await llm.ainvoke([HumanMessage(content=prompt)])
-            
-            # SOTA FIX: Handle Gemini 2.5 Flash content block format
-            from app.services.output_processor import extract_thinking_from_response
-            text_content, _ = extract_thinking_from_response(response.content)
-            context = text_content.strip()
+            cached = await cache.aget(KIND_CONTEXT, cache_key) if cache else None
+            if cached is not None:
+                context = cached["context"]
+            else:
+                llm = self._ensure_llm()
+                
+                # Build prompt
+                prompt = CONTEXT_PROMPT_TEMPLATE.format(
+                    document_title=document_title,
+                    page_number=page_number,
+                    total_pages=total_pages,
+                    chunk_content=chunk_content[:1500]  # Limit chunk size in prompt
+                )
+                
+                # Generate context (ingestion priority on the light-tier quota)
+                response = await scheduled_ainvoke(
+                    llm, [HumanMessage(content=prompt)], tier="light", priority=LLMPriority.INGESTION
+                )
+                
+                # SOTA FIX: Handle Gemini 2.5 Flash content block format
+                from app.services.output_processor import extract_thinking_from_response
+                text_content, _ = extract_thinking_from_response(response.content)
+                context = text_content.strip()
+                
+                if cache and context:
+                    await cache.aput(KIND_CONTEXT, cache_key, {"context": context})
             
             # Create enriched content: [Context]\n\n[Original]
             contextual_content = f"[Context: {context}]\n\n{chunk_content}"
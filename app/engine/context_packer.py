@@ -0,0 +1,277 @@
+"""
+Context Packer - Token-budgeted prompt context assembly.
+
+RAG generation, the unified agent and the chat context builder used to
+concatenate retrieved chunks, history, semantic memory and entity context
+as unbounded strings, so prompt size (and Gemini latency and cost) varied
+wildly per turn. Callers now hand prioritized ContextSegments to
+ContextPacker.pack() with a token budget (AdaptiveTokenBudget.context_tokens):
+
+- Greedy fill by marginal value: priority x novelty (share of a segment
+  not already covered by selected segments), re-evaluated after each pick
+- Overlapping chunks (word 3-gram containment >= CONTEXT_DEDUP_THRESHOLD)
+  are dropped as duplicates
+- A segment that does not fit is cut on sentence boundaries, keeping the
+  head (documents) or the tail (history), if at least
+  CONTEXT_MIN_TRUNCATED_TOKENS remain
+- A segment's min_tokens are reserved for it whatever its priority (the
+  budget is raised to cover reservations), so history always keeps
+  CONTEXT_HISTORY_MIN_TOKENS even when the adaptive budget is small
+- Every pack reports a per-kind token breakdown (logged, aggregated in
+  get_stats() for GET /api/v1/admin/llm/stats)
+
+Token counts use TokenCounter.estimate (Gemini-calibrated, no tokenizer).
+
+Usage:
+    packer = get_context_packer()
+    packed = packer.pack([
+        ContextSegment(chunk, kind="chunks", priority=1.0, dedupe=True),
+        ContextSegment(history, kind="history", priority=0.6, keep="tail"),
+    ], budget=budget.context_tokens, label="rag")
+    context = packed.join("chunks")
+
+Feature: context-packer
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.engine.token_counter import get_token_counter
+
+logger = logging.getLogger(__name__)
+
+# Sentence-sized pieces; joining all pieces gives back the original text
+_SENTENCE = re.compile(r".*?(?:[.!?…](?=\s|$)|\n|$)", re.S)
+_WORD = re.compile(r"\w+")
+
+TRUNCATION_MARK = "…"
+
+
+@dataclass
+class ContextSegment:
+    """One piece of prompt context competing for the token budget."""
+    text: str
+    kind: str  # Breakdown bucket: "chunks", "history", "memory", "entities", ...
+    priority: float = 0.5  # Value of the whole segment; higher is packed first
+    keep: str = "head"  # End that survives truncation: "head" or "tail" (history)
+    dedupe: bool = False  # Drop if mostly covered by an already selected dedupe segment
+    min_tokens: int = 0  # Reserved for this segment (up to its size), on top of a smaller budget
+    tokens: int = 0  # Filled by the packer
+    truncated: bool = False
+
+
+@dataclass
+class PackedContext:
+    """Segments selected for one prompt, in input order."""
+    segments: List[ContextSegment]
+    budget: int
+    used_tokens: int = 0
+    breakdown: Dict[str, int] = field(default_factory=dict)
+    dropped: int = 0
+    deduplicated: int = 0
+    truncated: int = 0
+
+    def texts(self, kind: str) -> List[str]:
+        """Selected texts of one kind, in input order."""
+        return [s.text for s in self.segments if s.kind == kind]
+
+    def join(self, kind: str, separator: str = "\n\n") -> str:
+        """Selected texts of one kind joined into one string."""
+        return separator.join(self.texts(kind))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the per-turn breakdown."""
+        return {
+            "budget": self.budget,
+            "used_tokens": self.used_tokens,
+            "breakdown": dict(self.breakdown),
+            "dropped": self.dropped,
+            "deduplicated": self.deduplicated,
+            "truncated": self.truncated,
+        }
+
+
+class ContextPacker:
+    """Fit prioritized context segments into a token budget."""
+
+    def __init__(
+        self,
+        dedup_threshold: Optional[float] = None,
+        min_truncated_tokens: Optional[int] = None
+    ):
+        """
+        Args:
+            dedup_threshold: Containment above which a segment is a duplicate
+            min_truncated_tokens: Smallest remainder worth filling with a truncated segment
+        """
+        self._dedup_threshold = dedup_threshold or settings.context_dedup_threshold
+        self._min_truncated_tokens = min_truncated_tokens or settings.context_min_truncated_tokens
+        self._counter = get_token_counter()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def pack(self, segments: List[ContextSegment], budget: int, label: str = "prompt") -> PackedContext:
+        """
+        Select and truncate segments to fit ``budget`` tokens.
+
+        Args:
+            segments: Candidate segments (empty texts are ignored)
+            budget: Token budget for all segments together (raised to
+                cover the segments' min_tokens reservations)
+            label: Call site name for logs and stats
+
+        Returns:
+            PackedContext with the selected segments in input order
+        """
+        candidates = [s for s in segments if s.text and s.text.strip()]
+        for segment in candidates:
+            segment.tokens = self._counter.estimate(segment.text)
+        shingles = [self._shingles(s.text) if s.dedupe else None for s in candidates]
+
+        # Reserved tokens are held back from other segments until the owner is packed
+        reserved = {
+            i: min(segment.tokens, segment.min_tokens)
+            for i, segment in enumerate(candidates) if segment.min_tokens > 0
+        }
+        budget = max(budget, sum(reserved.values()))
+
+        packed = PackedContext(segments=[], budget=budget)
+        selected: List[int] = []
+        pending = list(range(len(candidates)))
+        remaining = budget - sum(reserved.values())
+
+        while pending:
+            best, best_value = None, -1.0
+            for i in list(pending):
+                novelty = self._novelty(i, selected, shingles)
+                if novelty <= 1.0 - self._dedup_threshold:
+                    pending.remove(i)
+                    remaining += reserved.pop(i, 0)
+                    packed.deduplicated += 1
+                    continue
+                value = candidates[i].priority * novelty
+                if value > best_value:
+                    best, best_value = i, value
+            if best is None:
+                break
+            pending.remove(best)
+
+            segment = candidates[best]
+            remaining += reserved.pop(best, 0)
+            if segment.tokens > remaining:
+                if remaining < self._min_truncated_tokens or not self._truncate(segment, remaining):
+                    packed.dropped += 1
+                    continue
+                packed.truncated += 1
+            selected.append(best)
+            remaining -= segment.tokens
+
+        packed.segments = [candidates[i] for i in sorted(selected)]
+        for segment in packed.segments:
+            packed.breakdown[segment.kind] = packed.breakdown.get(segment.kind, 0) + segment.tokens
+        packed.used_tokens = sum(packed.breakdown.values())
+
+        self._record(label, packed)
+        logger.info(
+            f"[CONTEXT_PACKER] {label}: {packed.used_tokens}/{budget} tokens {packed.breakdown} "
+            f"(dropped={packed.dropped}, dedup={packed.deduplicated}, truncated={packed.truncated})"
+        )
+        return packed
+
+    def _novelty(self, index: int, selected: List[int], shingles: List[Optional[set]]) -> float:
+        """Share of a dedupe segment's 3-grams not in any selected dedupe segment."""
+        own = shingles[index]
+        if not own:
+            return 1.0
+        covered = 0.0
+        for j in selected:
+            other = shingles[j]
+            if other:
+                covered = max(covered, len(own & other) / len(own))
+        return 1.0 - covered
+
+    @staticmethod
+    def _shingles(text: str) -> set:
+        """Word 3-grams (lowercased) of a text."""
+        words = _WORD.findall(text.lower())
+        if len(words) < 3:
+            return {tuple(words)} if words else set()
+        return {tuple(words[i:i + 3]) for i in range(len(words) - 2)}
+
+    def _truncate(self, segment: ContextSegment, max_tokens: int) -> bool:
+        """
+        Cut a segment to whole sentences within ``max_tokens``.
+
+        Returns:
+            False if not even one sentence fits (segment unchanged)
+        """
+        pieces = [p for p in _SENTENCE.findall(segment.text) if p]
+        if segment.keep == "tail":
+            pieces.reverse()
+
+        kept, used = [], self._counter.estimate(TRUNCATION_MARK)
+        for piece in pieces:
+            cost = self._counter.estimate(piece)
+            if used + cost > max_tokens:
+                break
+            kept.append(piece)
+            used += cost
+
+        if not "".join(kept).strip():
+            return False
+        if segment.keep == "tail":
+            kept.reverse()
+            text = TRUNCATION_MARK + " " + "".join(kept).lstrip()
+        else:
+            text = "".join(kept).rstrip() + " " + TRUNCATION_MARK
+        segment.text = text
+        segment.tokens = self._counter.estimate(text)
+        segment.truncated = True
+        return True
+
+    def _record(self, label: str, packed: PackedContext) -> None:
+        """Aggregate per-call-site token usage."""
+        stats = self._stats.setdefault(label, {
+            "packs": 0, "budget_tokens": 0, "used_tokens": 0,
+            "dropped": 0, "deduplicated": 0, "truncated": 0, "tokens_by_kind": {}
+        })
+        stats["packs"] += 1
+        stats["budget_tokens"] += packed.budget
+        stats["used_tokens"] += packed.used_tokens
+        stats["dropped"] += packed.dropped
+        stats["deduplicated"] += packed.deduplicated
+        stats["truncated"] += packed.truncated
+        for kind, tokens in packed.breakdown.items():
+            stats["tokens_by_kind"][kind] = stats["tokens_by_kind"].get(kind, 0) + tokens
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Average prompt-context tokens per pack, by call site and kind."""
+        result = {}
+        for label, stats in self._stats.items():
+            packs = stats["packs"]
+            result[label] = {
+                "packs": packs,
+                "avg_used_tokens": round(stats["used_tokens"] / packs, 1),
+                "avg_budget_tokens": round(stats["budget_tokens"] / packs, 1),
+                "avg_tokens_by_kind": {
+                    kind: round(tokens / packs, 1) for kind, tokens in stats["tokens_by_kind"].items()
+                },
+                "dropped": stats["dropped"],
+                "deduplicated": stats["deduplicated"],
+                "truncated": stats["truncated"],
+            }
+        return result
+
+
+# Singleton instance
+_context_packer: Optional[ContextPacker] = None
+
+
+def get_context_packer() -> ContextPacker:
+    """Get or create the shared ContextPacker."""
+    global _context_packer
+    if _context_packer is None:
+        _context_packer = ContextPacker()
+    return _context_packer
@@ -9,18 +9,36 @@ Phân tích ngữ cảnh hội thoại để:
 3. Phát hiện giải thích dở dang (incomplete explanations)
 4. Gợi ý proactive behavior cho AI
 
+Phân tích tăng dần (incremental): ConversationState của mỗi session (lưu
+trong SessionState) giữ topic/keyword của các tin nhắn gần nhất; mỗi lượt
+chỉ xử lý các tin nhắn mới, không quét lại toàn bộ history.
+
 **Feature: maritime-ai-tutor**
 **Spec: CHỈ THỊ KỸ THUẬT SỐ 21**
 """
 
+import hashlib
 import logging
 import re
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 from enum import Enum
 
+from app.engine.keyword_matcher import KeywordMatcher
+
 logger = logging.getLogger(__name__)
 
+# Messages (3 exchanges) used for the current topic and recent keywords
+RECENT_WINDOW = 6
+
+# Patterns of an AI explanation, for proactive continuation offers
+EXPLANATION_PATTERNS = [
+    re.compile(r"quy tắc\s+(\d+)"),
+    re.compile(r"rule\s+(\d+)"),
+    re.compile(r"điều\s+(\d+)"),
+    re.compile(r"về\s+(.+?)(?:\.|,|:)"),
+]
+
 
 class QuestionType(str, Enum):
     """Types of questions based on context dependency."""
@@ -62,6 +80,81 @@ class ConversationContext:
     proactive_hints: List[str] = field(default_factory=list)
 
 
+@dataclass
+class ConversationState:
+    """
+    Rolling analysis state of one session (cached in SessionState).
+    
+    ConversationAnalyzer.analyze() folds in only the messages added since
+    the previous call, so per-turn cost is O(new messages).
+    """
+    # Messages folded in so far
+    message_count: int = 0
+    
+    # Fingerprints of the last RECENT_WINDOW folded messages (aligns the next history window)
+    fingerprints: List[str] = field(default_factory=list)
+    
+    # Matched topic keywords of the last RECENT_WINDOW messages:
+    # {"terms": [...], "topics": {topic: [...]}} per message
+    recent: List[Dict[str, Any]] = field(default_factory=list)
+    
+    # Latest user message and its question type
+    last_user_message: Optional[str] = None
+    question_type: QuestionType = QuestionType.STANDALONE
+    
+    # Latest user message with different content than last_user_message
+    previous_user_message: Optional[str] = None
+    
+    # Explanation topic of the last AI message, and of the last AI message
+    # before the newest message
+    assistant_topic: Optional[str] = None
+    assistant_topic_before_last: Optional[str] = None
+    
+    def reset(self) -> None:
+        """Forget everything (history no longer continues this state)."""
+        self.__dict__.update(ConversationState().__dict__)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for session-state persistence."""
+        return {
+            "message_count": self.message_count,
+            "fingerprints": list(self.fingerprints),
+            "recent": list(self.recent),
+            "last_user_message": self.last_user_message,
+            "question_type": self.question_type.value,
+            "previous_user_message": self.previous_user_message,
+            "assistant_topic": self.assistant_topic,
+            "assistant_topic_before_last": self.assistant_topic_before_last,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConversationState":
+        """Restore a persisted state."""
+        return cls(
+            message_count=data.get("message_count", 0),
+            fingerprints=list(data.get("fingerprints", [])),
+            recent=list(data.get("recent", [])),
+            last_user_message=data.get("last_user_message"),
+            question_type=QuestionType(data.get("question_type", QuestionType.STANDALONE.value)),
+            previous_user_message=data.get("previous_user_message"),
+            assistant_topic=data.get("assistant_topic"),
+            assistant_topic_before_last=data.get("assistant_topic_before_last"),
+        )
+
+
+def _message_field(msg: Any, name: str) -> str:
+    """Role or content of a message object or dict."""
+    if isinstance(msg, dict):
+        return msg.get(name, '')
+    return getattr(msg, name, '')
+
+
+def _fingerprint(msg: Any) -> str:
+    """Stable identity of a message (persisted with the state)."""
+    key = f"{_message_field(msg, 'role')}\x00{_message_field(msg, 'content')}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+
+
 class ConversationAnalyzer:
     """
     Analyzes conversation history to provide context for ambiguous questions.
@@ -118,14 +211,21 @@ class ConversationAnalyzer:
         """Initialize analyzer."""
         self._compiled_follow_up = [re.compile(p, re.IGNORECASE) for p in self.FOLLOW_UP_PATTERNS]
         self._compiled_standalone = [re.compile(p, re.IGNORECASE) for p in self.STANDALONE_PATTERNS]
+        self._topic_matcher = KeywordMatcher(self.MARITIME_TOPICS)
         logger.info("ConversationAnalyzer initialized")
     
-    def analyze(self, messages: List[Any]) -> ConversationContext:
+    def analyze(
+        self,
+        messages: List[Any],
+        state: Optional[ConversationState] = None
+    ) -> ConversationContext:
         """
         Analyze conversation history and extract context.
         
         Args:
             messages: List of message objects with 'role' and 'content' attributes
+            state: Session's rolling state; only messages it has not seen are
+                processed and it is updated in place (None = analyze from scratch)
             
         Returns:
             ConversationContext with extracted information
@@ -135,29 +235,23 @@ class ConversationAnalyzer:
         if not messages:
             return context
         
-        # Get last user message
-        last_user_msg = None
-        for msg in reversed(messages):
-            role = getattr(msg, 'role', msg.get('role', '')) if isinstance(msg, dict) else msg.role
-            if role == "user":
-                last_user_msg = getattr(msg, 'content', msg.get('content', '')) if isinstance(msg, dict) else msg.content
-                break
+        if state is None:
+            state = ConversationState()
+        self.update_state(state, messages)
         
-        if not last_user_msg:
+        if not state.last_user_message:
             return context
         
-        # Detect question type
-        context.question_type = self._detect_question_type(last_user_msg)
+        # Question type of the last user message (detected when it was folded in)
+        context.question_type = state.question_type
         
-        # Extract current topic from conversation
-        context.current_topic = self._extract_current_topic(messages)
-        
-        # Extract keywords from recent messages
-        context.recent_keywords = self._extract_keywords(messages[-6:])  # Last 3 exchanges
+        # Current topic and keywords from recent messages
+        context.current_topic = self._current_topic(state)
+        context.recent_keywords = self._recent_keywords(state)
         
         # If ambiguous, try to infer context
         if context.question_type in [QuestionType.AMBIGUOUS, QuestionType.FOLLOW_UP]:
-            context.inferred_context = self._infer_context(last_user_msg, messages)
+            context.inferred_context = self._infer_context(state, context.current_topic)
             context.confidence = self._calculate_confidence(context)
             
             # Add proactive hints
@@ -168,7 +262,7 @@ class ConversationAnalyzer:
         
         # Check for incomplete explanations
         context.should_offer_continuation, context.last_explanation_topic = \
-            self._detect_incomplete_explanation(messages)
+            self._detect_incomplete_explanation(state)
         
         logger.info(f"[ANALYZER] Question type: {context.question_type.value}, "
                    f"Topic: {context.current_topic}, "
@@ -176,6 +270,73 @@ class ConversationAnalyzer:
         
         return context
     
+    def update_state(self, state: ConversationState, messages: List[Any]) -> ConversationState:
+        """
+        Fold the messages of ``messages`` not yet seen by ``state`` into it.
+        
+        ``messages`` is the session's history window; the last folded message
+        is located from the end, so the cost is proportional to the new
+        messages. If the window does not contain it (history reset or
+        edited), the state is rebuilt from the whole window.
+        """
+        new_messages = self._unseen_messages(state, messages)
+        if new_messages is None:
+            logger.debug("[ANALYZER] History does not continue the session state, rebuilding")
+            state.reset()
+            new_messages = messages
+        
+        for msg in new_messages:
+            self._fold_message(state, msg)
+        return state
+    
+    def _unseen_messages(self, state: ConversationState, messages: List[Any]) -> Optional[List[Any]]:
+        """Messages after the last folded one, or None if it is not in ``messages``."""
+        if not state.fingerprints:
+            return list(messages)
+        
+        # Window not slid yet: the last folded message is at message_count - 1
+        hint = state.message_count - 1
+        if hint < len(messages) and self._aligned_at(state, messages, hint):
+            return list(messages[hint + 1:])
+        
+        # Window slid: find the last folded message from the end
+        for i in range(min(hint, len(messages) - 1), -1, -1):
+            if self._aligned_at(state, messages, i):
+                return list(messages[i + 1:])
+        return None
+    
+    @staticmethod
+    def _aligned_at(state: ConversationState, messages: List[Any], index: int) -> bool:
+        """Whether messages[..index] ends with the folded messages (as far as both go back)."""
+        depth = min(len(state.fingerprints), index + 1)
+        for offset in range(depth):
+            if _fingerprint(messages[index - offset]) != state.fingerprints[-1 - offset]:
+                return False
+        return True
+    
+    def _fold_message(self, state: ConversationState, msg: Any) -> None:
+        """Update the rolling state with one new message."""
+        role = _message_field(msg, 'role')
+        content = _message_field(msg, 'content') or ''
+        
+        scan = self._topic_matcher.scan(content)
+        state.recent.append({"terms": scan.terms, "topics": scan.categories})
+        del state.recent[:-RECENT_WINDOW]
+        
+        if role == "user":
+            if state.last_user_message is not None and content.lower() != state.last_user_message.lower():
+                state.previous_user_message = state.last_user_message
+            state.last_user_message = content
+            state.question_type = self._detect_question_type(content)
+        
+        state.assistant_topic_before_last = state.assistant_topic
+        if role == "assistant":
+            state.assistant_topic = self._explanation_topic(content)
+        
+        state.message_count += 1
+        state.fingerprints.append(_fingerprint(msg))
+        del state.fingerprints[:-RECENT_WINDOW]
+    
     def _detect_question_type(self, message: str) -> QuestionType:
         """Detect the type of question based on patterns."""
         message_lower = message.lower().strip()
@@ -200,20 +361,16 @@ class ConversationAnalyzer:
         
         return QuestionType.STANDALONE
     
-    def _extract_current_topic(self, messages: List[Any]) -> Optional[str]:
-        """Extract the current topic being discussed."""
-        # Look at recent messages for topic keywords
-        recent_text = ""
-        for msg in messages[-6:]:  # Last 3 exchanges
-            content = getattr(msg, 'content', msg.get('content', '')) if isinstance(msg, dict) else msg.content
-            recent_text += " " + content.lower()
-        
-        # Find matching topics
-        topic_scores = {}
-        for topic, keywords in self.MARITIME_TOPICS.items():
-            score = sum(1 for kw in keywords if kw in recent_text)
-            if score > 0:
-                topic_scores[topic] = score
+    def _current_topic(self, state: ConversationState) -> Optional[str]:
+        """The current topic being discussed (recent messages)."""
+        # Score = distinct keywords of the topic present, topics in registration order
+        matched: Dict[str, set] = {}
+        for record in state.recent:
+            for topic, terms in record["topics"].items():
+                matched.setdefault(topic, set()).update(terms)
+        topic_scores = {
+            topic: len(matched[topic]) for topic in self._topic_matcher.category_names if topic in matched
+        }
         
         if topic_scores:
             # Return topic with highest score
@@ -222,51 +379,32 @@ class ConversationAnalyzer:
         
         return None
     
-    def _extract_keywords(self, messages: List[Any]) -> List[str]:
-        """Extract important keywords from recent messages."""
+    def _recent_keywords(self, state: ConversationState) -> List[str]:
+        """Important keywords from recent messages."""
         keywords = []
         
-        for msg in messages:
-            content = getattr(msg, 'content', msg.get('content', '')) if isinstance(msg, dict) else msg.content
-            content_lower = content.lower()
-            
-            # Extract maritime keywords
-            for topic_keywords in self.MARITIME_TOPICS.values():
-                for kw in topic_keywords:
-                    if kw in content_lower and kw not in keywords:
-                        keywords.append(kw)
+        for record in state.recent:
+            for kw in record["terms"]:
+                if kw not in keywords:
+                    keywords.append(kw)
         
         return keywords[:10]  # Limit to 10 keywords
     
-    def _infer_context(self, current_message: str, messages: List[Any]) -> Optional[str]:
+    def _infer_context(self, state: ConversationState, topic: Optional[str]) -> Optional[str]:
         """
         Infer context for ambiguous questions.
         
         This is the key function for understanding follow-up questions.
         """
-        if len(messages) < 2:
+        if state.message_count < 2:
             return None
         
-        # Get the previous user message and AI response
-        prev_user_msg = None
-        prev_ai_msg = None
-        
-        for i in range(len(messages) - 1, -1, -1):
-            msg = messages[i]
-            role = getattr(msg, 'role', msg.get('role', '')) if isinstance(msg, dict) else msg.role
-            content = getattr(msg, 'content', msg.get('content', '')) if isinstance(msg, dict) else msg.content
-            
-            if role == "assistant" and prev_ai_msg is None:
-                prev_ai_msg = content
-            elif role == "user" and prev_user_msg is None and content.lower() != current_message.lower():
-                prev_user_msg = content
-                break
-        
+        prev_user_msg = state.previous_user_message
         if not prev_user_msg:
             return None
         
         # Build inferred context
-        current_lower = current_message.lower()
+        current_lower = state.last_user_message.lower()
         
         # Pattern: "Còn X thì sao?" -> X is related to previous topic
         if any(p.search(current_lower) for p in self._compiled_follow_up):
@@ -277,7 +415,6 @@ class ConversationAnalyzer:
             inferred = f"Câu hỏi này nối tiếp từ câu hỏi trước: '{prev_user_msg[:100]}'. "
             
             # Add topic context
-            topic = self._extract_current_topic(messages)
             if topic:
                 topic_name = {
                     "navigation_lights": "đèn tín hiệu hàng hải",
@@ -314,47 +451,35 @@ class ConversationAnalyzer:
         
         return min(confidence, 1.0)
     
-    def _detect_incomplete_explanation(self, messages: List[Any]) -> tuple[bool, Optional[str]]:
+    def _detect_incomplete_explanation(self, state: ConversationState) -> tuple[bool, Optional[str]]:
         """
         Detect if AI was explaining something and got interrupted.
         
         Returns:
             (should_offer_continuation, last_explanation_topic)
         """
-        if len(messages) < 3:
+        if state.message_count < 3:
             return False, None
         
-        # Look for patterns indicating incomplete explanation
+        # Last AI message before the current one was explaining something
         # E.g., AI was explaining Rule 15, user asked about something else
-        
-        last_ai_msg = None
-        for msg in reversed(messages[:-1]):  # Exclude current message
-            role = getattr(msg, 'role', msg.get('role', '')) if isinstance(msg, dict) else msg.role
-            if role == "assistant":
-                last_ai_msg = getattr(msg, 'content', msg.get('content', '')) if isinstance(msg, dict) else msg.content
-                break
-        
-        if not last_ai_msg:
-            return False, None
-        
-        # Check if AI was explaining something
-        explanation_patterns = [
-            r"quy tắc\s+(\d+)",
-            r"rule\s+(\d+)",
-            r"điều\s+(\d+)",
-            r"về\s+(.+?)(?:\.|,|:)",
-        ]
-        
-        for pattern in explanation_patterns:
-            match = re.search(pattern, last_ai_msg.lower())
-            if match:
-                topic = match.group(1) if match.lastindex else match.group(0)
-                # Check if current question is about a different topic
-                # (This is a simplified check)
-                return True, topic
+        # (This is a simplified check)
+        topic = state.assistant_topic_before_last
+        if topic:
+            return True, topic
         
         return False, None
     
+    @staticmethod
+    def _explanation_topic(ai_message: str) -> Optional[str]:
+        """Topic an AI message was explaining (rule number or 'về X'), if any."""
+        message_lower = ai_message.lower()
+        for pattern in EXPLANATION_PATTERNS:
+            match = pattern.search(message_lower)
+            if match:
+                return match.group(1) if match.lastindex else match.group(0)
+        return None
+    
     def build_context_prompt(self, context: ConversationContext) -> str:
         """
         Build a context prompt to inject into AI's thinking.
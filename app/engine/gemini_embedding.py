@@ -9,11 +9,13 @@ Features:
 
 Requirements: 1.1, 1.2, 1.3, 1.4, 1.5
 """
+import asyncio
 import logging
 from typing import List, Optional
 
 import numpy as np
 
+from app.core.api_rate_limiter import get_api_rate_limiter
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -48,6 +50,9 @@ class GeminiOptimizedEmbeddings:
     TASK_TYPE_QUERY = "RETRIEVAL_QUERY"
     TASK_TYPE_SIMILARITY = "SEMANTIC_SIMILARITY"
     
+    # Max texts per batchEmbedContents request
+    MAX_BATCH_SIZE = 100
+    
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -155,11 +160,45 @@ class GeminiOptimizedEmbeddings:
             logger.error(f"Embedding failed for task_type={task_type}: {e}")
             raise
     
+    def _embed_contents(
+        self,
+        texts: List[str],
+        task_type: str
+    ) -> List[List[float]]:
+        """
+        Embed several texts in ONE API request (batchEmbedContents).
+        
+        Args:
+            texts: Texts to embed (at most MAX_BATCH_SIZE)
+            task_type: RETRIEVAL_QUERY, RETRIEVAL_DOCUMENT or SEMANTIC_SIMILARITY
+            
+        Returns:
+            Normalized embedding vectors, in input order
+        """
+        from google.genai import types
+        
+        response = self.client.models.embed_content(
+            model=self._model_name,
+            contents=texts,
+            config=types.EmbedContentConfig(
+                task_type=task_type,
+                output_dimensionality=self._dimensions
+            )
+        )
+        
+        if len(response.embeddings) != len(texts):
+            raise ValueError(
+                f"Batch embedding returned {len(response.embeddings)} vectors for {len(texts)} texts"
+            )
+        return [self._normalize(e.values) for e in response.embeddings]
+    
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         """
         Embed multiple documents for storage.
         
         Uses RETRIEVAL_DOCUMENT task type for optimal retrieval performance.
+        Texts are sent in batches of MAX_BATCH_SIZE (one API request per
+        batch); a failed batch is retried text by text.
         
         Args:
             texts: List of document texts to embed
@@ -173,22 +212,47 @@ class GeminiOptimizedEmbeddings:
             return []
         
         results = []
-        for i, text in enumerate(texts):
-            try:
-                embedding = self._embed_content(text, self.TASK_TYPE_DOCUMENT)
-                results.append(embedding)
-                
-                if (i + 1) % 10 == 0:
-                    logger.debug(f"Embedded {i + 1}/{len(texts)} documents")
-                    
-            except Exception as e:
-                logger.error(f"Failed to embed document {i}: {e}")
-                # Return zero vector as fallback
-                results.append([0.0] * self._dimensions)
+        for start in range(0, len(texts), self.MAX_BATCH_SIZE):
+            batch = texts[start:start + self.MAX_BATCH_SIZE]
+            if len(batch) > 1:
+                try:
+                    results.extend(self._embed_contents(batch, self.TASK_TYPE_DOCUMENT))
+                    continue
+                except Exception as e:
+                    logger.warning(f"Batch embedding of {len(batch)} documents failed, embedding one by one: {e}")
+            
+            for i, text in enumerate(batch, start=start):
+                try:
+                    results.append(self._embed_content(text, self.TASK_TYPE_DOCUMENT))
+                except Exception as e:
+                    logger.error(f"Failed to embed document {i}: {e}")
+                    # Return zero vector as fallback
+                    results.append([0.0] * self._dimensions)
         
         logger.info(f"Embedded {len(results)} documents with {self._dimensions} dimensions")
         return results
     
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Async version of embed_documents.
+        
+        Waits on the shared "embeddings" rate limiter once per batch request,
+        then runs the sync SDK calls in a worker thread.
+        
+        Args:
+            texts: List of document texts to embed
+        
+        Returns:
+            List of normalized embedding vectors, in input order
+        """
+        if not texts:
+            return []
+        
+        limiter = get_api_rate_limiter("embeddings")
+        for _ in range(0, len(texts), self.MAX_BATCH_SIZE):
+            await limiter.acquire()
+        return await asyncio.to_thread(self.embed_documents, texts)
+        
     def embed_query(self, text: str) -> List[float]:
         """
         Embed a search query.
@@ -211,8 +275,8 @@ class GeminiOptimizedEmbeddings:
         """
         Async version of embed_query for compatibility with async code.
         
-        Note: Currently wraps sync method. Google GenAI SDK supports async
-        but we keep sync for simplicity and compatibility.
+        Waits on the shared "embeddings" rate limiter, then runs the sync
+        SDK call in a worker thread so the event loop is never blocked.
         
         Args:
             text: Query text to embed
@@ -220,7 +284,8 @@ class GeminiOptimizedEmbeddings:
         Returns:
             Normalized embedding vector (768 dimensions)
         """
-        return self.embed_query(text)
+        await get_api_rate_limiter("embeddings").acquire()
+        return await asyncio.to_thread(self.embed_query, text)
     
     def embed_for_similarity(self, text: str) -> List[float]:
         """
@@ -25,7 +25,9 @@ import time
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Literal, Optional
 
+from app.cache.lru_cache import LRUCache
 from app.core.config import settings
+from app.engine.llm_scheduler import scheduled_ainvoke
 
 logger = logging.getLogger(__name__)
 
@@ -148,7 +150,11 @@ class GuardianAgent:
         self._config = config or GuardianConfig()
         self._fallback = fallback_guardrails
         self._llm = None
-        self._cache: Dict[str, tuple] = {}  # hash -> (decision, timestamp)
+        self._cache = LRUCache(
+            "guardian.decisions",
+            max_size=1000,
+            ttl_seconds=self._config.cache_ttl_seconds
+        )  # hash -> decision
         
         self._init_llm()
         logger.info("GuardianAgent initialized")
@@ -337,7 +343,7 @@ class GuardianAgent:
         )
         
         try:
-            response = await self._llm.ainvoke(prompt)
+            response = await scheduled_ainvoke(self._llm, prompt)
             
             # SOTA FIX: Handle Gemini 2.5 Flash content block format
             from app.services.output_processor import extract_thinking_from_response
@@ -439,41 +445,26 @@ class GuardianAgent:
         """
         cache_key = self._hash_message(message)
         
-        if cache_key in self._cache:
-            decision, timestamp = self._cache[cache_key]
-            
-            # Check TTL
-            if time.time() - timestamp < self._config.cache_ttl_seconds:
-                logger.debug(f"GuardianAgent: Cache hit for '{message[:30]}...'")
-                # Return a copy with cached flag
-                return GuardianDecision(
-                    action=decision.action,
-                    reason=decision.reason,
-                    custom_pronouns=decision.custom_pronouns,
-                    confidence=decision.confidence,
-                    used_llm=decision.used_llm,
-                    cached=True
-                )
-            else:
-                # Expired, remove from cache
-                del self._cache[cache_key]
+        decision = self._cache.get(cache_key)
+        
+        if decision is not None:
+            logger.debug(f"GuardianAgent: Cache hit for '{message[:30]}...'")
+            # Return a copy with cached flag
+            return GuardianDecision(
+                action=decision.action,
+                reason=decision.reason,
+                custom_pronouns=decision.custom_pronouns,
+                confidence=decision.confidence,
+                used_llm=decision.used_llm,
+                cached=True
+            )
         
         return None
     
     def _cache_decision(self, message: str, decision: GuardianDecision):
         """Cache a decision for future use."""
         cache_key = self._hash_message(message)
-        self._cache[cache_key] = (decision, time.time())
-        
-        # Limit cache size
-        if len(self._cache) > 1000:
-            # Remove oldest entries
-            oldest_keys = sorted(
-                self._cache.keys(),
-                key=lambda k: self._cache[k][1]
-            )[:100]
-            for key in oldest_keys:
-                del self._cache[key]
+        self._cache.set(cache_key, decision)  # LRU-bounded, O(1) eviction
     
     def _hash_message(self, message: str) -> str:
         """Hash message for cache key."""
@@ -16,6 +16,8 @@ from typing import List, Optional, Protocol, Set
 
 from pydantic import BaseModel, Field
 
+from app.engine.keyword_matcher import KeywordMatcher
+
 logger = logging.getLogger(__name__)
 
 
@@ -52,6 +54,16 @@ HARMFUL_PATTERNS: Set[str] = {
     "kill", "murder", "suicide", "self-harm",
 }
 
+# Safety-critical misinformation indicators in AI output
+SAFETY_MISINFORMATION_KEYWORDS: List[str] = ["always safe", "never dangerous", "100% safe", "no risk"]
+
+# Unprofessional language (whole words)
+UNPROFESSIONAL_WORDS: List[str] = ["lol", "lmao", "wtf", "omg"]
+
+# Compiled once (sorted for deterministic issue order)
+_HARMFUL_MATCHER = KeywordMatcher(sorted(HARMFUL_PATTERNS))
+_SAFETY_MATCHER = KeywordMatcher(SAFETY_MISINFORMATION_KEYWORDS)
+
 # Prompt injection patterns
 INJECTION_PATTERNS: List[str] = [
     r"ignore\s+(previous|all)\s+instructions",
@@ -141,12 +153,10 @@ class Guardrails:
         **Validates: Requirements 7.1**
         """
         issues = []
-        message_lower = message.lower()
         
-        # Check for harmful content
-        for pattern in HARMFUL_PATTERNS:
-            if pattern in message_lower:
-                issues.append(f"Potentially harmful content detected: {pattern}")
+        # Check for harmful content (single pass over the message)
+        for pattern in _HARMFUL_MATCHER.find_terms(message):
+            issues.append(f"Potentially harmful content detected: {pattern}")
         
         # Check for prompt injection
         if self.detect_prompt_injection(message):
@@ -188,18 +198,16 @@ class Guardrails:
         **Validates: Requirements 7.2, 7.3**
         """
         issues = []
-        response_lower = response.lower()
+        response_lower = _SAFETY_MATCHER.normalize(response)
         
         # Check for safety-critical misinformation indicators
-        safety_keywords = ["always safe", "never dangerous", "100% safe", "no risk"]
-        for keyword in safety_keywords:
-            if keyword in response_lower:
-                issues.append(f"Potential safety misinformation: {keyword}")
+        for keyword in _SAFETY_MATCHER.find_terms(response_lower, normalized=True):
+            issues.append(f"Potential safety misinformation: {keyword}")
         
         # Check for unprofessional language
-        unprofessional = ["lol", "lmao", "wtf", "omg"]
-        for word in unprofessional:
-            if word in response_lower.split():
+        response_words = set(response_lower.split())
+        for word in UNPROFESSIONAL_WORDS:
+            if word in response_words:
                 issues.append(f"Unprofessional language: {word}")
         
         if issues:
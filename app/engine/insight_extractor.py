@@ -12,6 +12,7 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 
 from app.core.config import settings
 from app.models.semantic_memory import Insight, InsightCategory
+from app.engine.llm_scheduler import LLMPriority, scheduled_ainvoke
 
 logger = logging.getLogger(__name__)
 
@@ -65,7 +66,7 @@ class InsightExtractor:
             prompt = self._build_insight_prompt(message, conversation_history or [])
             
             # Call LLM
-            response = await self._llm.ainvoke(prompt)
+            response = await scheduled_ainvoke(self._llm, prompt, priority=LLMPriority.BACKGROUND)
             
             # SOTA FIX: Handle Gemini 2.5 Flash content block format
             from app.services.output_processor import extract_thinking_from_response
@@ -3,14 +3,18 @@ Insight Validator - CHỈ THỊ KỸ THUẬT SỐ 23 CẢI TIẾN
 Validate and process insights before storage.
 
 SOTA Upgrade: Embedding-based semantic similarity for duplicate detection.
+Vectorized: a user's stored insights are held as one normalized float32
+matrix (InsightMatrix), so duplicate and contradiction candidates for a
+whole batch of new insights come from a single matrix product.
 
 Requirements: 5.1, 5.2, 5.3, 5.4
 """
 import logging
 import numpy as np
 from dataclasses import dataclass
-from typing import List, Optional, TYPE_CHECKING
+from typing import Iterable, List, Optional, Sequence, Tuple, TYPE_CHECKING
 
+from app.cache.lru_cache import LRUCache
 from app.models.semantic_memory import Insight, InsightCategory
 
 if TYPE_CHECKING:
@@ -21,6 +25,12 @@ logger = logging.getLogger(__name__)
 # SOTA Thresholds
 DUPLICATE_SIMILARITY_THRESHOLD = 0.85  # Cosine similarity for duplicates
 CONTRADICTION_SIMILARITY_THRESHOLD = 0.70  # Lower threshold for contradictions
+JACCARD_DUPLICATE_THRESHOLD = 0.6  # Fallback without embeddings (0.6 Jaccard ≈ 0.85 cosine)
+
+# Words ignored by the Jaccard fallback
+JACCARD_COMMON_WORDS = frozenset({
+    "user", "người", "dùng", "học", "tập", "là", "có", "và", "the", "a", "an", "is", "has", "and"
+})
 
 
 @dataclass
@@ -31,6 +41,119 @@ class ValidationResult:
     action: Optional[str] = None  # "store", "merge", "update", "reject"
     target_insight: Optional[Insight] = None  # For merge/update operations
     similarity_score: Optional[float] = None  # SOTA: Include similarity score
+    embedding: Optional[np.ndarray] = None  # Normalized vector of the validated insight (reused for storage)
+
+
+def normalize_rows(vectors) -> np.ndarray:
+    """
+    Stack vectors as float32 rows scaled to unit L2 norm.
+    
+    Zero rows (failed embeddings) stay zero, so they score 0 against everything.
+    """
+    matrix = np.array(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def jaccard_matrix(
+    texts_a: Sequence[str],
+    texts_b: Sequence[str],
+    ignore_words: Iterable[str] = ()
+) -> np.ndarray:
+    """
+    Pairwise Jaccard similarity of word sets, computed as one matrix product.
+    
+    Each text becomes a binary row over the shared vocabulary; intersections
+    are A @ B.T and unions |a| + |b| - intersection.
+    
+    Returns:
+        Array of shape (len(texts_a), len(texts_b)); 0.0 where a set is empty
+    """
+    ignore = set(ignore_words)
+    sets_a = [set(t.lower().split()) - ignore for t in texts_a]
+    sets_b = [set(t.lower().split()) - ignore for t in texts_b]
+    
+    vocabulary = {}
+    for words in sets_a + sets_b:
+        for word in words:
+            vocabulary.setdefault(word, len(vocabulary))
+    
+    def incidence(sets: List[set]) -> np.ndarray:
+        rows = np.zeros((len(sets), len(vocabulary)), dtype=np.float32)
+        for i, words in enumerate(sets):
+            rows[i, [vocabulary[w] for w in words]] = 1.0
+        return rows
+    
+    a, b = incidence(sets_a), incidence(sets_b)
+    intersection = a @ b.T
+    union = a.sum(axis=1)[:, None] + b.sum(axis=1)[None, :] - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+
+class InsightMatrix:
+    """
+    A user's stored insights with their embeddings as one float32 matrix.
+    
+    Row i of ``vectors`` is the unit-length embedding of ``insights[i]``,
+    so cosine similarity against every insight is a single matrix-vector
+    product. ``vectors`` is None when no embeddings are available (the
+    validator then falls back to Jaccard similarity).
+    """
+    
+    def __init__(self, insights: Optional[List[Insight]] = None, vectors=None):
+        self.insights: List[Insight] = list(insights or [])
+        self.vectors: Optional[np.ndarray] = (
+            normalize_rows(vectors) if vectors is not None and self.insights else None
+        )
+        if self.vectors is not None and len(self.vectors) != len(self.insights):
+            raise ValueError(f"{len(self.vectors)} vectors for {len(self.insights)} insights")
+    
+    def __len__(self) -> int:
+        return len(self.insights)
+    
+    @property
+    def has_vectors(self) -> bool:
+        """True if similarities can be computed from embeddings."""
+        return not self.insights or self.vectors is not None
+    
+    def similarities(self, queries) -> np.ndarray:
+        """Cosine similarity of each query vector against every row (shape q × n)."""
+        queries = normalize_rows(queries)
+        if self.vectors is None:
+            return np.zeros((len(queries), 0), dtype=np.float32)
+        return queries @ self.vectors.T
+    
+    def add(self, insight: Insight, vector) -> None:
+        """Append a newly stored insight."""
+        if not self.has_vectors or vector is None:
+            self.vectors = None
+        else:
+            row = normalize_rows(vector)
+            self.vectors = row if self.vectors is None else np.vstack([self.vectors, row])
+        self.insights.append(insight)
+    
+    def replace(self, insight_id, insight: Insight, vector=None) -> bool:
+        """
+        Replace the insight with ``insight_id`` (content update after a contradiction).
+        
+        Args:
+            insight_id: ID of the stored insight
+            insight: New insight (keeps ``insight_id``)
+            vector: New embedding; None keeps the stored one (metadata-only merge)
+        
+        Returns:
+            True if the insight was found
+        """
+        for i, existing in enumerate(self.insights):
+            if existing.id is not None and existing.id == insight_id:
+                self.insights[i] = insight
+                if vector is not None and self.vectors is not None:
+                    self.vectors[i] = normalize_rows(vector)[0]
+                return True
+        return False
 
 
 class InsightValidator:
@@ -46,39 +169,39 @@ class InsightValidator:
             embeddings: Optional embeddings model for SOTA semantic similarity
         """
         self._embeddings = embeddings
-        self._embedding_cache = {}  # Cache embeddings for efficiency
+        # Cache normalized embeddings of validated texts (bounded LRU)
+        self._embedding_cache = LRUCache("insight_validator.embeddings", max_size=2048)
+    
+    def embed_texts(self, texts: List[str]) -> Optional[np.ndarray]:
+        """
+        Embed texts as normalized float32 rows.
         
-    def _compute_embedding(self, text: str) -> Optional[np.ndarray]:
-        """Compute embedding for text with caching."""
-        if not self._embeddings:
-            return None
-            
-        # Check cache first
-        cache_key = hash(text[:100])  # Use first 100 chars as key
-        if cache_key in self._embedding_cache:
-            return self._embedding_cache[cache_key]
+        Cached texts are reused; all cache misses go out in ONE
+        embed_documents call.
         
-        try:
-            embedding = self._embeddings.embed_documents([text])[0]
-            embedding_array = np.array(embedding)
-            self._embedding_cache[cache_key] = embedding_array
-            return embedding_array
-        except Exception as e:
-            logger.warning(f"Failed to compute embedding: {e}")
+        Returns:
+            Array of shape (len(texts), dimensions), or None without embeddings
+        """
+        if not self._embeddings or not texts:
             return None
-    
-    def _cosine_similarity(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
-        """Compute cosine similarity between two vectors."""
-        if vec1 is None or vec2 is None:
-            return 0.0
-        
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
         
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
-            
-        return float(np.dot(vec1, vec2) / (norm1 * norm2))
+        rows = [self._embedding_cache.get(text) for text in texts]
+        missing = [i for i, row in enumerate(rows) if row is None]
+        if missing:
+            try:
+                vectors = normalize_rows(self._embeddings.embed_documents([texts[i] for i in missing]))
+            except Exception as e:
+                logger.warning(f"Failed to compute embeddings: {e}")
+                return None
+            for i, vector in zip(missing, vectors):
+                rows[i] = vector
+                if vector.any():  # Never cache zero-vector fallbacks
+                    self._embedding_cache.set(texts[i], vector)
+        return np.vstack(rows)
+    
+    def build_matrix(self, insights: List[Insight]) -> InsightMatrix:
+        """Build an InsightMatrix for insights that have no stored embeddings."""
+        return InsightMatrix(insights, self.embed_texts([i.content for i in insights]))
     
     def validate(self, insight: Insight, existing_insights: List[Insight] = None) -> ValidationResult:
         """
@@ -87,19 +210,92 @@ class InsightValidator:
         Args:
             insight: Insight to validate
             existing_insights: List of existing insights for duplicate/contradiction detection
-            
+        
         Returns:
             ValidationResult with action to take and similarity score
         """
-        existing_insights = existing_insights or []
-        
-        # 1. Basic validation
         basic_result = self._validate_basic(insight)
         if not basic_result.is_valid:
             return basic_result
+        return self.validate_batch([insight], self.build_matrix(existing_insights or []))[0]
+    
+    def validate_batch(self, insights: List[Insight], matrix: InsightMatrix) -> List[ValidationResult]:
+        """
+        Validate several new insights against a user's insight matrix at once.
+        
+        The valid insights are embedded in one request and scored against
+        the stored insights AND each other with a single matrix product.
+        Insights are then decided in order; one decided "store" becomes a
+        candidate for the insights after it, as if it had been stored already.
+        The matrix itself is not modified.
+        
+        Args:
+            insights: New insights, in extraction order
+            matrix: The user's stored insights with their embeddings
+        
+        Returns:
+            One ValidationResult per insight (``embedding`` set when available)
+        """
+        results = [self._validate_basic(insight) for insight in insights]
+        pending = [k for k, result in enumerate(results) if result.is_valid]
+        if not pending:
+            return results
+        
+        new_insights = [insights[k] for k in pending]
+        candidates = matrix.insights + new_insights
+        scores, new_vectors = self._score(new_insights, matrix)
+        semantic = new_vectors is not None
+        
+        categories = np.array([c.category.value for c in candidates])
+        sub_topics = np.array([(c.sub_topic or "").lower() for c in candidates])
+        active = np.zeros(len(candidates), dtype=bool)
+        active[:len(matrix)] = True
+        
+        for row, k in enumerate(pending):
+            insight = insights[k]
+            same_category = active & (categories == insight.category.value)
+            result = self._decide(insight, candidates, scores[row], same_category, sub_topics, semantic)
+            if semantic:
+                result.embedding = new_vectors[row]
+            if result.action == "store":
+                active[len(matrix) + row] = True
+            results[k] = result
+        
+        return results
+    
+    def _score(
+        self,
+        new_insights: List[Insight],
+        matrix: InsightMatrix
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Similarity of each new insight to every stored and every new insight.
+        
+        Returns:
+            (scores of shape q × (n + q), normalized new vectors or None when
+            falling back to Jaccard similarity)
+        """
+        contents = [i.content for i in new_insights]
+        new_vectors = self.embed_texts(contents) if matrix.has_vectors else None
+        
+        if new_vectors is not None:
+            stacked = new_vectors if matrix.vectors is None else np.vstack([matrix.vectors, new_vectors])
+            return new_vectors @ stacked.T, new_vectors
         
-        # 2. Check for duplicates (SOTA: embedding similarity)
-        duplicate, similarity_score = self.find_duplicate(insight, existing_insights)
+        candidates = [i.content for i in matrix.insights] + contents
+        return jaccard_matrix(contents, candidates, JACCARD_COMMON_WORDS), None
+    
+    def _decide(
+        self,
+        insight: Insight,
+        candidates: List[Insight],
+        scores: np.ndarray,
+        same_category: np.ndarray,
+        sub_topics: np.ndarray,
+        semantic: bool
+    ) -> ValidationResult:
+        """Pick merge / update / store for one insight from its similarity row."""
+        duplicate, similarity_score = self._best_duplicate(candidates, scores, same_category, semantic)
         if duplicate:
             return ValidationResult(
                 is_valid=True,
@@ -109,8 +305,7 @@ class InsightValidator:
                 similarity_score=similarity_score
             )
         
-        # 3. Check for contradictions
-        contradiction = self.detect_contradiction(insight, existing_insights)
+        contradiction = self._find_contradiction(insight, candidates, scores, same_category, sub_topics)
         if contradiction:
             return ValidationResult(
                 is_valid=True,
@@ -119,14 +314,12 @@ class InsightValidator:
                 target_insight=contradiction
             )
         
-        # 4. All good, store as new
         return ValidationResult(
             is_valid=True,
             reason="Valid new insight",
             action="store",
             similarity_score=similarity_score if similarity_score > 0 else None
         )
-
     
     def _validate_basic(self, insight: Insight) -> ValidationResult:
         """Validate basic insight properties."""
@@ -227,27 +420,11 @@ class InsightValidator:
         Returns:
             Tuple of (duplicate_insight, similarity_score)
         """
-        best_match = None
-        best_score = 0.0
-        
-        for existing_insight in existing:
-            # Same category check is mandatory
-            if existing_insight.category != insight.category:
-                continue
-            
-            # Check content similarity using embeddings
-            is_similar, score = self._is_similar_content(
-                insight.content, 
-                existing_insight.content
-            )
-            
-            # Track best match
-            if score > best_score:
-                best_score = score
-                if is_similar:
-                    best_match = existing_insight
-        
-        return (best_match, best_score)
+        if not existing:
+            return (None, 0.0)
+        scores, semantic = self._score_against(insight, existing)
+        same_category = np.array([e.category == insight.category for e in existing])
+        return self._best_duplicate(existing, scores, same_category, semantic)
     
     def detect_contradiction(
         self,
@@ -260,66 +437,61 @@ class InsightValidator:
         Contradictions occur when:
         1. Same category and sub_topic
         2. Content expresses opposite meaning
-        """
-        for existing_insight in existing:
-            # Same category check
-            if existing_insight.category != insight.category:
-                continue
-            
-            # Same sub_topic check
-            if (insight.sub_topic and existing_insight.sub_topic and 
-                insight.sub_topic.lower() == existing_insight.sub_topic.lower()):
-                # Check for contradiction
-                if self._is_contradicting_content(insight.content, existing_insight.content):
-                    return existing_insight
         
-        return None
-    
-    def _is_similar_content(self, content1: str, content2: str, threshold: float = None) -> tuple[bool, float]:
-        """
-        Check if two contents are semantically similar (SOTA: embedding-based).
-        
-        Uses cosine similarity of embeddings when available, falls back to Jaccard.
-        
-        Args:
-            content1: First content string
-            content2: Second content string
-            threshold: Similarity threshold (default: DUPLICATE_SIMILARITY_THRESHOLD)
-            
-        Returns:
-            Tuple of (is_similar, similarity_score)
+        Candidates are tried most similar first.
         """
-        threshold = threshold or DUPLICATE_SIMILARITY_THRESHOLD
+        if not existing or not insight.sub_topic:
+            return None
+        scores, _ = self._score_against(insight, existing)
+        same_category = np.array([e.category == insight.category for e in existing])
+        sub_topics = np.array([(e.sub_topic or "").lower() for e in existing])
+        return self._find_contradiction(insight, existing, scores, same_category, sub_topics)
+    
+    def _score_against(self, insight: Insight, existing: List[Insight]) -> Tuple[np.ndarray, bool]:
+        """Similarity row of one insight against a list of insights (one product)."""
+        matrix = self.build_matrix(existing)
+        scores, new_vectors = self._score([insight], matrix)
+        return scores[0, :len(existing)], new_vectors is not None
+    
+    def _best_duplicate(
+        self,
+        candidates: List[Insight],
+        scores: np.ndarray,
+        same_category: np.ndarray,
+        semantic: bool
+    ) -> Tuple[Optional[Insight], float]:
+        """Most similar same-category candidate, if it clears the duplicate threshold."""
+        if not same_category.any():
+            return (None, 0.0)
+        
+        masked = np.where(same_category, scores[:len(same_category)], -np.inf)
+        best = int(np.argmax(masked))
+        best_score = max(float(masked[best]), 0.0)
+        
+        if semantic:
+            logger.debug(f"Embedding similarity: {best_score:.3f} (threshold: {DUPLICATE_SIMILARITY_THRESHOLD})")
+            is_duplicate = best_score >= DUPLICATE_SIMILARITY_THRESHOLD
+        else:
+            is_duplicate = best_score > JACCARD_DUPLICATE_THRESHOLD
+        return (candidates[best] if is_duplicate else None, best_score)
+    
+    def _find_contradiction(
+        self,
+        insight: Insight,
+        candidates: List[Insight],
+        scores: np.ndarray,
+        same_category: np.ndarray,
+        sub_topics: np.ndarray
+    ) -> Optional[Insight]:
+        """First same-category, same-sub_topic candidate (most similar first) that contradicts."""
+        if not insight.sub_topic:
+            return None
         
-        # SOTA: Try embedding-based similarity first
-        if self._embeddings:
-            emb1 = self._compute_embedding(content1)
-            emb2 = self._compute_embedding(content2)
-            
-            if emb1 is not None and emb2 is not None:
-                similarity = self._cosine_similarity(emb1, emb2)
-                logger.debug(f"Embedding similarity: {similarity:.3f} (threshold: {threshold})")
-                return (similarity >= threshold, similarity)
-        
-        # Fallback: Jaccard similarity (legacy)
-        words1 = set(content1.lower().split())
-        words2 = set(content2.lower().split())
-        
-        # Remove common words
-        common_words = {"user", "người", "dùng", "học", "tập", "là", "có", "và", "the", "a", "an", "is", "has", "and"}
-        words1 = words1 - common_words
-        words2 = words2 - common_words
-        
-        if not words1 or not words2:
-            return (False, 0.0)
-        
-        # Calculate Jaccard similarity
-        intersection = len(words1.intersection(words2))
-        union = len(words1.union(words2))
-        similarity = intersection / union if union > 0 else 0
-        
-        # Lower threshold for fallback (0.6 Jaccard ≈ 0.85 cosine)
-        return (similarity > 0.6, similarity)
+        same_topic = np.flatnonzero(same_category & (sub_topics == insight.sub_topic.lower()))
+        for j in same_topic[np.argsort(-scores[same_topic], kind="stable")]:
+            if self._is_contradicting_content(insight.content, candidates[j].content):
+                return candidates[j]
+        return None
     
     def _is_contradicting_content(self, content1: str, content2: str) -> bool:
         """Check if two contents contradict each other."""
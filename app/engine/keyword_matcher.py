@@ -0,0 +1,238 @@
+"""
+Keyword Matcher - Precompiled multi-pattern matching for static keyword lists.
+
+Analyzers (RRF title boost, confidence evaluator, conversation analyzer,
+page analyzer, guardrails) used to scan text with one ``kw in text.lower()``
+check per keyword. KeywordMatcher prepares a whole vocabulary once and
+answers "which terms / categories occur in this text" with one
+normalization and one call:
+
+- Large vocabularies (> SUBSTRING_SCAN_MAX_TERMS) are compiled into a
+  trie-shaped regex, an Aho-Corasick style automaton run by the C regex
+  engine: cost grows with text length only, not with the term count.
+- Small vocabularies use CPython's substring search per term, which on
+  Vietnamese text beats the regex automaton up to roughly 40 terms.
+
+Matching semantics are exactly the old substring checks: a term matches
+wherever it occurs, including inside other terms ("đèn" in "đèn đỏ") and
+overlapping ones. Text and keywords are NFC-normalized and lowercased, so
+Vietnamese typed with decomposed diacritics (NFD, common on macOS/iOS
+keyboards) matches too; ``fold_diacritics=True`` additionally ignores
+accents ("den do" matches "đèn đỏ").
+
+Usage:
+    matcher = KeywordMatcher({"lights": ["đèn", "đèn đỏ"], "rules": ["rule"]})
+    scan = matcher.scan("Đèn đỏ theo Rule 21")
+    scan.terms        # ['đèn', 'đèn đỏ', 'rule']
+    scan.categories   # {'lights': ['đèn', 'đèn đỏ'], 'rules': ['rule']}
+
+Benchmark: python scripts/benchmark_keyword_matcher.py
+
+Feature: keyword-matcher
+"""
+
+import logging
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Up to this many terms a per-term substring search is faster than the
+# compiled trie (measured with scripts/benchmark_keyword_matcher.py)
+SUBSTRING_SCAN_MAX_TERMS = 40
+
+
+def normalize_text(text: str, fold_diacritics: bool = False) -> str:
+    """
+    Canonical form used for matching: NFC + lowercase.
+
+    Args:
+        text: Input text
+        fold_diacritics: Also strip accents and map đ -> d
+
+    Returns:
+        Normalized text
+    """
+    if fold_diacritics:
+        decomposed = unicodedata.normalize("NFD", text.lower())
+        stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+        return stripped.replace("đ", "d")
+    # normalize() has its own quick check; already-NFC text is returned as is
+    return unicodedata.normalize("NFC", text).lower()
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Regex source matching the longest of ``words`` at a position."""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # Greedy optional: prefer the longer term, fall back to the shorter one
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+@dataclass
+class KeywordScan:
+    """Result of one KeywordMatcher.scan() call."""
+    terms: List[str] = field(default_factory=list)  # Matched keywords, registration order
+    categories: Dict[str, List[str]] = field(default_factory=dict)  # Category -> matched keywords
+
+    def __bool__(self) -> bool:
+        return bool(self.terms)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self.terms
+
+    def category_counts(self) -> Dict[str, int]:
+        """Number of distinct matched keywords per category."""
+        return {category: len(terms) for category, terms in self.categories.items()}
+
+
+class KeywordMatcher:
+    """
+    Immutable, precompiled matcher for a keyword vocabulary.
+
+    Small vocabularies are scanned term by term. Large ones use a compiled
+    regex that finds leftmost-longest, non-overlapping matches at C speed;
+    terms such a scan can hide are recovered without rescanning: terms
+    contained in a matched term are implied by it, and the few terms that
+    can start inside a match and end past it are checked directly.
+    """
+
+    def __init__(
+        self,
+        keywords: Union[Iterable[str], Mapping[str, Iterable[str]]],
+        fold_diacritics: bool = False
+    ):
+        """
+        Args:
+            keywords: Keyword list, or mapping of category -> keywords
+                (a keyword may belong to several categories)
+            fold_diacritics: Match ignoring Vietnamese accents
+        """
+        self.fold_diacritics = fold_diacritics
+
+        if isinstance(keywords, Mapping):
+            groups = [(category, list(words)) for category, words in keywords.items()]
+        else:
+            groups = [(None, list(keywords))]
+
+        # normalized form -> (registration index, original keyword, categories)
+        self._order: Dict[str, int] = {}
+        self._original: Dict[str, str] = {}
+        self._categories: Dict[str, List[str]] = {}
+        self.category_names: List[str] = [category for category, _ in groups if category is not None]
+
+        for category, words in groups:
+            for word in words:
+                key = normalize_text(word, fold_diacritics)
+                if not key:
+                    continue
+                if key not in self._order:
+                    self._order[key] = len(self._order)
+                    self._original[key] = word
+                    self._categories[key] = []
+                if category is not None and category not in self._categories[key]:
+                    self._categories[key].append(category)
+
+        self.keywords: List[str] = [self._original[key] for key in self._order]
+        self._keys = tuple(self._order)
+        self._pattern = None
+        if len(self._keys) > SUBSTRING_SCAN_MAX_TERMS:
+            self._compile_trie()
+
+    def _compile_trie(self) -> None:
+        """Build the trie regex and the overlap tables used to keep it exact."""
+        # Terms implied by a matched term (it contains them)
+        self._contained: Dict[str, List[str]] = {
+            key: [other for other in self._order if other != key and other in key]
+            for key in self._order
+        }
+        # Terms that can start inside a match of another term and end past
+        # it (prefix == that term's proper suffix): a non-overlapping scan
+        # may skip them, so they are checked directly when that term matched
+        prefixes: Dict[str, List[str]] = {}
+        for key in self._order:
+            for i in range(1, len(key)):
+                prefixes.setdefault(key[:i], []).append(key)
+        self._partners: Dict[str, List[str]] = {}
+        for key in self._order:
+            partners = {other for i in range(1, len(key)) for other in prefixes.get(key[i:], ())}
+            partners.discard(key)
+            self._partners[key] = sorted(partners, key=self._order.__getitem__)
+
+        self._pattern = re.compile(_trie_pattern(self._order))
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def normalize(self, text: str) -> str:
+        """Normalize text the way this matcher does (reuse across scans)."""
+        return normalize_text(text, self.fold_diacritics)
+
+    def _find_keys(self, normalized: str) -> List[str]:
+        if not normalized:
+            return []
+        if self._pattern is None:
+            return [key for key in self._keys if key in normalized]
+        matched = set(self._pattern.findall(normalized))
+        found = set(matched)
+        for key in matched:
+            found.update(self._contained[key])
+        for key in matched:
+            for other in self._partners[key]:
+                if other not in found and other in normalized:
+                    found.add(other)
+        return sorted(found, key=self._order.__getitem__)
+
+    def scan(self, text: str, normalized: bool = False) -> KeywordScan:
+        """
+        Find every keyword occurring in ``text`` in one pass.
+
+        Args:
+            text: Text to scan
+            normalized: Text is already normalize()d (skip normalization)
+
+        Returns:
+            KeywordScan with matched terms and categories
+        """
+        keys = self._find_keys(text if normalized else self.normalize(text))
+        categories: Dict[str, List[str]] = {}
+        for key in keys:
+            for category in self._categories[key]:
+                categories.setdefault(category, []).append(self._original[key])
+        # Keep category registration order
+        categories = {c: categories[c] for c in self.category_names if c in categories}
+        return KeywordScan(terms=[self._original[key] for key in keys], categories=categories)
+
+    def find_terms(self, text: str, normalized: bool = False) -> List[str]:
+        """Matched keywords in registration order (no category bookkeeping)."""
+        keys = self._find_keys(text if normalized else self.normalize(text))
+        return [self._original[key] for key in keys]
+
+    def first_match(self, text: str, normalized: bool = False) -> Optional[str]:
+        """First keyword in registration order that occurs in ``text``, or None."""
+        terms = self.find_terms(text, normalized)
+        return terms[0] if terms else None
+
+    def contains_any(self, text: str, normalized: bool = False) -> bool:
+        """True if any keyword occurs in ``text`` (stops at the first hit)."""
+        if not normalized:
+            text = self.normalize(text)
+        if self._pattern is None:
+            return any(key in text for key in self._keys)
+        return self._pattern.search(text) is not None
@@ -9,12 +9,20 @@ Key Features:
 - All components share the same instances
 - Memory usage: ~120MB vs ~600MB (5x reduction)
 - Gemini 3 Flash (Dec 2025): 3× faster inference than Gemini 2.5
+- Calls are admitted by the per-tier priority scheduler
+  (app/engine/llm_scheduler.py: scheduled_ainvoke / scheduled_astream)
+- Optional explicit context caching: the static system prompt prefix of a
+  role (PromptLoader.build_static_prompt) is stored once per tier as Gemini
+  cached content and reused through get_cached_prefix()
 
 Reference: MEMORY_OVERFLOW_SOTA_ANALYSIS.md, RAG_LATENCY_PHASE4_SOTA_ANALYSIS.md
 """
 
+import hashlib
 import logging
-from typing import Dict, Optional
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
 from functools import lru_cache
 
 from langchain_google_genai import ChatGoogleGenerativeAI
@@ -67,6 +75,15 @@ class LLMPool:
     _pool: Dict[str, ChatGoogleGenerativeAI] = {}
     _initialized: bool = False
     
+    # Explicit cached-content handles: (tier, key) -> (prefix sha256, cache name, renew_at)
+    _prefix_caches: Dict[Tuple[str, str], Tuple[str, str, float]] = {}
+    # Failed creations: (tier, key) -> (prefix sha256, retry_at)
+    _prefix_cache_failures: Dict[Tuple[str, str], Tuple[str, float]] = {}
+    # Creations in flight (outside the lock): (tier, key) -> prefix sha256
+    _prefix_cache_pending: Dict[Tuple[str, str], str] = {}
+    _prefix_cache_lock = threading.Lock()
+    _genai_client: Any = None
+    
     @classmethod
     def initialize(cls) -> None:
         """
@@ -161,6 +178,114 @@ class LLMPool:
         
         return cls._pool[tier]
     
+    @classmethod
+    def tier_of(cls, llm) -> Optional[str]:
+        """
+        Tier of a shared instance, or of a binding of one
+        (bind_tools / with_config), for the LLM scheduler.
+        
+        Returns:
+            Tier name, or None if llm is not a pool instance
+        """
+        for candidate in (llm, getattr(llm, "bound", None)):
+            if candidate is None:
+                continue
+            for tier, instance in cls._pool.items():
+                if instance is candidate:
+                    return tier
+        return None
+    
+    @classmethod
+    def get_cached_prefix(cls, tier: str, key: str, prefix: str) -> Optional[str]:
+        """
+        Explicit cached-content handle holding ``prefix`` as system instruction.
+        
+        Bind it to a Gemini LLM with ``llm.bind(cached_content=name)``. Gemini
+        rejects requests that set both cached content and a system instruction,
+        so with a handle the caller sends only the per-request part of the
+        prompt, not as a SystemMessage. Creating or renewing the handle is a
+        blocking API call: call this from a worker thread in async code.
+        
+        Args:
+            tier: Thinking tier of the calling LLM
+            key: Stable name of the prefix (e.g. "rag:student")
+            prefix: Static system prompt prefix
+            
+        Returns:
+            Cached content name, or None when explicit caching is disabled, the
+            prefix is below the Gemini minimum or the cache could not be created
+        """
+        if not settings.llm_explicit_cache_enabled:
+            return None
+        return cls._cached_prefix_name(tier, key, prefix)
+    
+    @classmethod
+    def _cached_prefix_name(cls, tier: str, key: str, prefix: str) -> Optional[str]:
+        """
+        Live cached-content name for a prefix, creating or renewing it if needed.
+        
+        Blocking (Gemini API call on a miss): async callers run it in a
+        worker thread. Concurrent callers do not wait for a creation in
+        flight; they use the previous handle, or no handle.
+        """
+        from app.engine.token_counter import get_token_counter
+        
+        if get_token_counter().estimate(prefix) < settings.llm_explicit_cache_min_tokens:
+            return None
+        
+        digest = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        ttl = settings.llm_explicit_cache_ttl_seconds
+        slot = (tier, key)
+        with cls._prefix_cache_lock:
+            now = time.time()
+            entry = cls._prefix_caches.get(slot)
+            current = entry[1] if entry and entry[0] == digest else None
+            if current and now < entry[2]:
+                return current
+            failure = cls._prefix_cache_failures.get(slot)
+            if failure and failure[0] == digest and now < failure[1]:
+                return None
+            if cls._prefix_cache_pending.get(slot) == digest:
+                # Another request is creating it; a due-for-renewal handle is still live
+                return current
+            cls._prefix_cache_pending[slot] = digest
+        
+        # Network call outside the lock: other slots and requests are not held up
+        try:
+            name = cls._create_cached_content(tier, key, prefix, ttl)
+        except Exception as e:
+            logger.warning(f"[LLM_POOL] Explicit cache for {key}/{tier} failed: {e}")
+            with cls._prefix_cache_lock:
+                cls._prefix_cache_failures[slot] = (digest, time.time() + ttl)
+                cls._prefix_cache_pending.pop(slot, None)
+            return None
+        
+        with cls._prefix_cache_lock:
+            # Renew a little before Gemini drops the handle
+            cls._prefix_caches[slot] = (digest, name, time.time() + ttl - min(60, ttl / 10))
+            cls._prefix_cache_failures.pop(slot, None)
+            cls._prefix_cache_pending.pop(slot, None)
+        logger.info(f"[LLM_POOL] Cached static prefix {key}/{tier} as {name}")
+        return name
+    
+    @classmethod
+    def _create_cached_content(cls, tier: str, key: str, prefix: str, ttl: int) -> str:
+        """Create a Gemini cached content holding ``prefix`` as system instruction."""
+        from google import genai
+        from google.genai import types
+        
+        if cls._genai_client is None:
+            cls._genai_client = genai.Client(api_key=settings.google_api_key)
+        cache = cls._genai_client.caches.create(
+            model=settings.google_model,
+            config=types.CreateCachedContentConfig(
+                display_name=f"prompt-prefix-{key}-{tier}",
+                system_instruction=prefix,
+                ttl=f"{ttl}s",
+            ),
+        )
+        return cache.name
+    
     @classmethod
     def is_initialized(cls) -> bool:
         """Check if the pool has been initialized."""
@@ -168,11 +293,15 @@ class LLMPool:
     
     @classmethod
     def get_stats(cls) -> dict:
-        """Get pool statistics for monitoring."""
+        """Get pool statistics for monitoring (including scheduler queues)."""
+        from app.engine.llm_scheduler import get_llm_scheduler
+        
         return {
             "initialized": cls._initialized,
             "instance_count": len(cls._pool),
             "tiers": list(cls._pool.keys()),
+            "prefix_caches": sorted(f"{key}/{tier}" for tier, key in cls._prefix_caches),
+            "scheduler": get_llm_scheduler().get_stats(),
         }
 
 
@@ -0,0 +1,552 @@
+"""
+LLM Request Scheduler - Admission control for the shared LLM pool.
+
+LLMPool hands out 3 shared Gemini instances; without admission control,
+background work (insight/fact extraction, summarization, ingestion
+enrichment) competed equally with user-facing generation for quota, and a
+quota spike 429'd everything. Every LLM call now goes through a per-tier
+scheduler:
+
+- Per-tier concurrency limits (LLM_CONCURRENCY_DEEP / _MODERATE / _LIGHT)
+- Priority classes: INTERACTIVE > BACKGROUND > INGESTION, strict
+  head-of-line order; non-interactive calls may only use
+  LLM_BACKGROUND_SHARE of a tier's slots, so chat always has headroom
+- Token-budget-aware queueing: a per-tier tokens-per-minute bucket is
+  charged with an estimate at admission and reconciled with the
+  response's usage_metadata
+- Prompt caching: prompt tokens and Gemini cache-read tokens per tier,
+  reported as cached_token_ratio (see PromptLoader.build_static_prompt)
+- Retry-after-aware backoff: a 429 pauses the whole tier for the delay
+  the API asked for (or exponential backoff) and the call is retried
+- Metrics: in-flight, queue depth and wait times per priority, throttles
+
+Usage:
+    from app.engine.llm_scheduler import LLMPriority, scheduled_ainvoke
+
+    response = await scheduled_ainvoke(llm, messages)                      # interactive
+    response = await scheduled_ainvoke(llm, prompt, priority=LLMPriority.BACKGROUND)
+
+    async with aclosing(scheduled_astream(llm, messages)) as stream:   # releases the slot
+        async for chunk in stream:                                      # even on early exit
+            ...
+
+    with llm_priority(LLMPriority.INGESTION):    # default for nested calls
+        await ingest(...)
+
+Feature: llm-scheduler
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import re
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.api_rate_limiter import get_api_rate_limiter
+from app.core.config import settings
+from app.engine.token_counter import get_token_counter
+
+logger = logging.getLogger(__name__)
+
+
+class LLMPriority(IntEnum):
+    """Admission priority (lower value is served first)."""
+    INTERACTIVE = 0  # User is waiting on the response
+    BACKGROUND = 1   # Post-response work (memory, insights, summaries)
+    INGESTION = 2    # Document ingestion / enrichment
+
+
+_priority_var: ContextVar[LLMPriority] = ContextVar("llm_priority", default=LLMPriority.INTERACTIVE)
+
+
+@contextmanager
+def llm_priority(priority: LLMPriority):
+    """Set the default priority for LLM calls made in this context."""
+    token = _priority_var.set(priority)
+    try:
+        yield
+    finally:
+        _priority_var.reset(token)
+
+
+def current_llm_priority() -> LLMPriority:
+    """Priority used when a call does not pass one explicitly."""
+    return _priority_var.get()
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+_RETRY_HINTS = (
+    re.compile(r"retry[_ ]?delay['\"]?\s*[:=]?\s*['\"]?(\d+(?:\.\d+)?)s", re.IGNORECASE),
+    re.compile(r"retry (?:in|after) (\d+(?:\.\d+)?)\s*s", re.IGNORECASE),
+    re.compile(r"seconds:\s*(\d+)", re.IGNORECASE),
+)
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """
+    Classify an LLM error as quota / rate limiting.
+
+    Returns:
+        None if the error is not a rate limit; otherwise the delay the API
+        asked for, or 0.0 when it gave no hint
+    """
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    message = str(error)
+    is_rate_limit = (
+        code == 429
+        or type(error).__name__ in ("ResourceExhausted", "RateLimitError")
+        or "RESOURCE_EXHAUSTED" in message
+        or re.search(r"\b429\b", message) is not None
+    )
+    if not is_rate_limit:
+        return None
+    for pattern in _RETRY_HINTS:
+        match = pattern.search(message)
+        if match:
+            return float(match.group(1))
+    return 0.0
+
+
+def estimate_tokens(llm_input: Any) -> int:
+    """Gemini-calibrated prompt token estimate for str / messages / prompt values."""
+    counter = get_token_counter()
+    if isinstance(llm_input, str):
+        return counter.estimate(llm_input)
+    if isinstance(llm_input, (list, tuple)):
+        return counter.estimate_many(str(getattr(item, "content", item)) for item in llm_input)
+    return counter.estimate(str(llm_input))
+
+
+def _usage_tokens(response: Any) -> Optional[int]:
+    """Total tokens reported by a LangChain AIMessage, if any."""
+    usage = getattr(response, "usage_metadata", None)
+    if isinstance(usage, dict) and usage.get("total_tokens"):
+        return int(usage["total_tokens"])
+    return None
+
+
+def _prompt_usage(response: Any) -> Tuple[int, int]:
+    """(prompt tokens, cache-read prompt tokens) reported by an AIMessage or stream chunk."""
+    usage = getattr(response, "usage_metadata", None)
+    if not isinstance(usage, dict):
+        return 0, 0
+    details = usage.get("input_token_details") or {}
+    return int(usage.get("input_tokens") or 0), int(details.get("cache_read") or 0)
+
+
+# =============================================================================
+# Scheduler
+# =============================================================================
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    tokens: int = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+
+
+class _TierState:
+    """Slots, token bucket, pause and queue of one pool tier."""
+
+    def __init__(self, tier: str, concurrency: int, tokens_per_minute: int, background_share: float):
+        self.tier = tier
+        self.concurrency = max(1, concurrency)
+        self.background_limit = max(1, int(self.concurrency * background_share))
+        self.capacity = float(max(tokens_per_minute, 0))
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.in_flight = 0
+        self.in_flight_background = 0
+        self.paused_until = 0.0
+        self.waiters: List[_Waiter] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+        # Metrics (indexed by priority)
+        self.admitted = [0] * len(LLMPriority)
+        self.wait_total = [0.0] * len(LLMPriority)
+        self.wait_max = [0.0] * len(LLMPriority)
+        self.throttled = 0
+        self.retries = 0
+        self.tokens_used = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+
+    def refill(self, now: float) -> None:
+        if self.rate > 0:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def blocked_for(self, waiter: _Waiter, now: float) -> Optional[float]:
+        """None if the waiter can start now, else seconds until it might (inf = wait for a slot)."""
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.in_flight >= self.concurrency:
+            return float("inf")
+        if waiter.priority != LLMPriority.INTERACTIVE and self.in_flight_background >= self.background_limit:
+            return float("inf")
+        if self.rate > 0:
+            needed = min(waiter.tokens, self.capacity)
+            if self.tokens < needed:
+                return (needed - self.tokens) / self.rate
+        return None
+
+
+class LLMTicket:
+    """Admission handed to a caller; reconciles the token estimate on exit."""
+
+    def __init__(self, state: Optional[_TierState], estimated_tokens: int):
+        self._state = state
+        self.estimated_tokens = estimated_tokens
+        self._recorded = False
+
+    def record_usage(self, tokens: Optional[int]) -> None:
+        """Report actual tokens used (None = keep the estimate)."""
+        if self._state is None or self._recorded:
+            return
+        self._recorded = True
+        actual = self.estimated_tokens if tokens is None else tokens
+        self._state.tokens_used += actual
+        if self._state.rate > 0:
+            self._state.tokens = min(self._state.capacity, self._state.tokens + self.estimated_tokens - actual)
+
+
+class LLMScheduler:
+    """Per-tier priority admission control for LLM calls."""
+
+    def __init__(
+        self,
+        concurrency: Optional[Dict[str, int]] = None,
+        tokens_per_minute: Optional[int] = None,
+        background_share: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        max_retry_wait_seconds: Optional[float] = None,
+        retry_base_seconds: float = 2.0,
+        enabled: Optional[bool] = None
+    ):
+        """
+        Args:
+            concurrency: Max in-flight calls per tier (default: settings)
+            tokens_per_minute: Token budget per tier, 0 = unlimited
+            background_share: Fraction of a tier's slots usable by
+                BACKGROUND / INGESTION calls
+            max_retries: Retries after a 429
+            max_retry_wait_seconds: Give up instead of waiting longer than this
+            retry_base_seconds: Backoff when a 429 carries no retry-after hint
+                (doubles per attempt)
+            enabled: False = pass calls straight through
+        """
+        self.concurrency = concurrency or {
+            "deep": settings.llm_concurrency_deep,
+            "moderate": settings.llm_concurrency_moderate,
+            "light": settings.llm_concurrency_light,
+        }
+        self.tokens_per_minute = (
+            tokens_per_minute if tokens_per_minute is not None else settings.llm_tokens_per_minute
+        )
+        self.background_share = (
+            background_share if background_share is not None else settings.llm_background_share
+        )
+        self.max_retries = max_retries if max_retries is not None else settings.llm_max_retries
+        self.max_retry_wait_seconds = (
+            max_retry_wait_seconds if max_retry_wait_seconds is not None
+            else settings.llm_max_retry_wait_seconds
+        )
+        self.retry_base_seconds = retry_base_seconds
+        self.enabled = enabled if enabled is not None else settings.llm_scheduler_enabled
+        self._tiers: Dict[str, _TierState] = {}
+        self._seq = itertools.count()
+
+    def _state(self, tier: str) -> _TierState:
+        state = self._tiers.get(tier)
+        if state is None:
+            state = _TierState(
+                tier,
+                self.concurrency.get(tier, max(self.concurrency.values())),
+                self.tokens_per_minute,
+                self.background_share,
+            )
+            self._tiers[tier] = state
+        return state
+
+    # ------------------------------------------------------------------
+    # Admission
+    # ------------------------------------------------------------------
+
+    def _dispatch(self, state: _TierState) -> None:
+        """Admit queued callers in priority order while the tier has capacity."""
+        if state.timer is not None:
+            state.timer.cancel()
+            state.timer = None
+
+        now = time.monotonic()
+        state.refill(now)
+        while state.waiters:
+            head = state.waiters[0]
+            if head.future.done():  # Cancelled while queued
+                heapq.heappop(state.waiters)
+                continue
+            delay = state.blocked_for(head, now)
+            if delay is not None:
+                if delay != float("inf"):
+                    state.timer = asyncio.get_running_loop().call_later(delay, self._dispatch, state)
+                return
+            heapq.heappop(state.waiters)
+            state.in_flight += 1
+            if head.priority != LLMPriority.INTERACTIVE:
+                state.in_flight_background += 1
+            if state.rate > 0:
+                state.tokens -= head.tokens
+            waited = now - head.enqueued_at
+            state.admitted[head.priority] += 1
+            state.wait_total[head.priority] += waited
+            state.wait_max[head.priority] = max(state.wait_max[head.priority], waited)
+            head.future.set_result(None)
+
+    def _release(self, state: _TierState, priority: LLMPriority) -> None:
+        state.in_flight -= 1
+        if priority != LLMPriority.INTERACTIVE:
+            state.in_flight_background -= 1
+        self._dispatch(state)
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        tier: str,
+        priority: Optional[LLMPriority] = None,
+        estimated_tokens: int = 0
+    ) -> AsyncIterator[LLMTicket]:
+        """
+        Wait for admission to a tier, hold the slot for the block.
+
+        Args:
+            tier: Pool tier (deep / moderate / light)
+            priority: Defaults to the context priority (llm_priority())
+            estimated_tokens: Tokens charged against the tier budget
+        """
+        if not self.enabled:
+            yield LLMTicket(None, estimated_tokens)
+            return
+
+        state = self._state(tier)
+        priority = LLMPriority(priority if priority is not None else current_llm_priority())
+        waiter = _Waiter(
+            priority=priority,
+            seq=next(self._seq),
+            tokens=estimated_tokens,
+            future=asyncio.get_running_loop().create_future(),
+            enqueued_at=time.monotonic(),
+        )
+        heapq.heappush(state.waiters, waiter)
+        self._dispatch(state)
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release(state, priority)  # Admitted just before cancellation
+            else:
+                waiter.future.cancel()
+                self._dispatch(state)
+            raise
+
+        ticket = LLMTicket(state, estimated_tokens)
+        try:
+            yield ticket
+        finally:
+            ticket.record_usage(None)
+            self._release(state, priority)
+
+    def _throttle(self, tier: str, delay: float) -> None:
+        """Pause a tier after a 429 so queued calls stop hitting the quota."""
+        state = self._state(tier)
+        state.throttled += 1
+        state.paused_until = max(state.paused_until, time.monotonic() + delay)
+        logger.warning(f"[LLM_SCHEDULER] {tier} tier rate limited, pausing {delay:.1f}s")
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+
+    async def ainvoke(
+        self,
+        runnable: Any,
+        llm_input: Any,
+        tier: Optional[str] = None,
+        priority: Optional[LLMPriority] = None,
+        **kwargs
+    ) -> Any:
+        """
+        ``await runnable.ainvoke(llm_input)`` under admission control,
+        retrying rate-limit errors after the delay the API asked for.
+        """
+        tier = tier or _tier_of(runnable)
+        estimated = estimate_tokens(llm_input) + settings.llm_output_token_estimate
+        attempt = 0
+        while True:
+            async with self.slot(tier, priority, estimated) as ticket:
+                await get_api_rate_limiter(f"llm_{tier}").acquire()
+                try:
+                    response = await runnable.ainvoke(llm_input, **kwargs)
+                except Exception as e:
+                    hint = retry_after_seconds(e)
+                    if hint is None or not self.enabled:
+                        raise
+                    ticket.record_usage(0)
+                    delay = hint or self.retry_base_seconds * (2 ** attempt)
+                    self._throttle(tier, delay)
+                    if attempt >= self.max_retries or delay > self.max_retry_wait_seconds:
+                        raise
+                    attempt += 1
+                    self._state(tier).retries += 1
+                    continue
+                ticket.record_usage(_usage_tokens(response))
+                self.record_prompt_usage(response, tier)
+                return response
+
+    async def astream(
+        self,
+        runnable: Any,
+        llm_input: Any,
+        tier: Optional[str] = None,
+        priority: Optional[LLMPriority] = None,
+        **kwargs
+    ) -> AsyncIterator[Any]:
+        """
+        ``runnable.astream(llm_input)`` holding one slot for the whole stream (no retry).
+
+        The slot is released when the stream is exhausted or closed. A caller
+        that may stop iterating early must close the generator, e.g.
+        ``async with contextlib.aclosing(scheduled_astream(...)) as stream``;
+        an abandoned generator holds its slot until it is garbage collected.
+        """
+        tier = tier or _tier_of(runnable)
+        estimated = estimate_tokens(llm_input) + settings.llm_output_token_estimate
+        async with self.slot(tier, priority, estimated):
+            await get_api_rate_limiter(f"llm_{tier}").acquire()
+            stream = runnable.astream(llm_input, **kwargs)
+            try:
+                async for chunk in stream:
+                    self.record_prompt_usage(chunk, tier)
+                    yield chunk
+            finally:
+                # Close the provider stream before the slot is released
+                if hasattr(stream, "aclose"):
+                    await stream.aclose()
+
+    def record_prompt_usage(self, response: Any, tier: Optional[str] = None) -> None:
+        """
+        Add a response's prompt and cache-read tokens to its tier's totals.
+
+        Called for every scheduled call; unscheduled ``invoke`` callers may
+        report their responses here too. Stream chunks carry per-chunk deltas.
+        """
+        prompt_tokens, cached_tokens = _prompt_usage(response)
+        if prompt_tokens or cached_tokens:
+            state = self._state(tier or "moderate")
+            state.prompt_tokens += prompt_tokens
+            state.cached_tokens += cached_tokens
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-tier queue depth, in-flight calls, wait times and throttling."""
+        now = time.monotonic()
+        tiers = {}
+        for tier, state in sorted(self._tiers.items()):
+            state.refill(now)
+            queued = [0] * len(LLMPriority)
+            for waiter in state.waiters:
+                if not waiter.future.done():
+                    queued[waiter.priority] += 1
+            tiers[tier] = {
+                "concurrency": state.concurrency,
+                "background_limit": state.background_limit,
+                "in_flight": state.in_flight,
+                "queue_depth": sum(queued),
+                "tokens_available": int(state.tokens) if state.rate > 0 else None,
+                "tokens_used": state.tokens_used,
+                "paused_for_seconds": round(max(0.0, state.paused_until - now), 3),
+                "throttled": state.throttled,
+                "retries": state.retries,
+                "prompt_tokens": state.prompt_tokens,
+                "cached_tokens": state.cached_tokens,
+                "cached_token_ratio": round(
+                    state.cached_tokens / state.prompt_tokens, 3
+                ) if state.prompt_tokens else 0.0,
+                "priorities": {
+                    priority.name.lower(): {
+                        "queued": queued[priority],
+                        "admitted": state.admitted[priority],
+                        "avg_wait_ms": round(
+                            state.wait_total[priority] / state.admitted[priority] * 1000, 1
+                        ) if state.admitted[priority] else 0.0,
+                        "max_wait_ms": round(state.wait_max[priority] * 1000, 1),
+                    }
+                    for priority in LLMPriority
+                },
+            }
+        return {"enabled": self.enabled, "tiers": tiers}
+
+
+def _tier_of(runnable: Any) -> str:
+    """Pool tier of a shared instance (or a binding of it); moderate otherwise."""
+    from app.engine.llm_pool import LLMPool
+
+    return LLMPool.tier_of(runnable) or "moderate"
+
+
+# =============================================================================
+# Singleton
+# =============================================================================
+
+_scheduler: Optional[LLMScheduler] = None
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Get or create the process-wide LLMScheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = LLMScheduler()
+    return _scheduler
+
+
+def reset_llm_scheduler() -> None:
+    """Drop the scheduler (tests / settings reload)."""
+    global _scheduler
+    _scheduler = None
+
+
+async def scheduled_ainvoke(
+    runnable: Any,
+    llm_input: Any,
+    tier: Optional[str] = None,
+    priority: Optional[LLMPriority] = None,
+    **kwargs
+) -> Any:
+    """Shortcut for get_llm_scheduler().ainvoke(...)."""
+    return await get_llm_scheduler().ainvoke(runnable, llm_input, tier=tier, priority=priority, **kwargs)
+
+
+def scheduled_astream(
+    runnable: Any,
+    llm_input: Any,
+    tier: Optional[str] = None,
+    priority: Optional[LLMPriority] = None,
+    **kwargs
+) -> AsyncIterator[Any]:
+    """Shortcut for get_llm_scheduler().astream(...); close it if not exhausted."""
+    return get_llm_scheduler().astream(runnable, llm_input, tier=tier, priority=priority, **kwargs)
@@ -14,12 +14,16 @@ Features:
 import logging
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage
 
+from app.cache.session_store import SessionStore
 from app.core.config import settings
+from app.engine.llm_scheduler import LLMPriority, scheduled_ainvoke
+from app.engine.token_counter import get_token_counter
+from app.repositories.session_state_repository import get_session_state_backend
 
 logger = logging.getLogger(__name__)
 
@@ -87,8 +91,32 @@ class CompressedMemory:
         return " | ".join(parts) if parts else ""
     
     def estimate_tokens(self) -> int:
-        """Estimate token count (rough: 4 chars per token)."""
-        return len(self.to_context_string()) // 4
+        """Estimate token count (Gemini-calibrated, see TokenCounter.estimate)."""
+        return get_token_counter().estimate(self.to_context_string())
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for session-state persistence."""
+        return {
+            "core_summary": self.core_summary,
+            "key_facts": dict(self.key_facts),
+            "recent_topics": list(self.recent_topics),
+            "user_state": self.user_state,
+            "total_messages_processed": self.total_messages_processed,
+            "last_compression": self.last_compression.isoformat() if self.last_compression else None,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CompressedMemory":
+        """Restore a persisted compressed memory."""
+        last_compression = data.get("last_compression")
+        return cls(
+            core_summary=data.get("core_summary", ""),
+            key_facts=dict(data.get("key_facts") or {}),
+            recent_topics=list(data.get("recent_topics") or []),
+            user_state=data.get("user_state"),
+            total_messages_processed=data.get("total_messages_processed", 0),
+            last_compression=datetime.fromisoformat(last_compression) if last_compression else None,
+        )
 
 
 COMPRESSION_PROMPT = """Bạn là Memory Compression AI. Nén thông tin sau thành dạng siêu ngắn gọn.
@@ -143,8 +171,22 @@ class MemoryCompressionEngine:
     def __init__(self):
         """Initialize compression engine."""
         self._llm = None
-        self._memories: Dict[str, CompressedMemory] = {}  # user_id -> memory
-        self._stats: Dict[str, CompressionStats] = {}  # user_id -> stats
+        # Bounded per-user stores (idle + max-count eviction)
+        self._memories: SessionStore[CompressedMemory] = SessionStore(  # user_id -> memory
+            "memory_compression.memories",
+            factory=lambda user_id: CompressedMemory(),
+            max_size=settings.session_store_max_sessions,
+            idle_ttl_seconds=settings.session_store_idle_seconds,
+            backend=get_session_state_backend(),
+            serializer=CompressedMemory.to_dict,
+            deserializer=CompressedMemory.from_dict,
+        )
+        self._stats: SessionStore[CompressionStats] = SessionStore(  # user_id -> stats
+            "memory_compression.stats",
+            factory=lambda user_id: CompressionStats(),
+            max_size=settings.session_store_max_sessions,
+            idle_ttl_seconds=settings.session_store_idle_seconds,
+        )
         self._init_llm()
     
     def _init_llm(self):
@@ -163,15 +205,15 @@ class MemoryCompressionEngine:
     
     def get_memory(self, user_id: str) -> CompressedMemory:
         """Get or create compressed memory for user."""
-        if user_id not in self._memories:
-            self._memories[user_id] = CompressedMemory()
-        return self._memories[user_id]
+        return self._memories.get_or_create(user_id)
+    
+    async def aget_memory(self, user_id: str) -> CompressedMemory:
+        """get_memory() for async callers (resuming memory may hit the database)."""
+        return await self._memories.aget_or_create(user_id)
     
     def get_stats(self, user_id: str) -> CompressionStats:
         """Get compression stats for user."""
-        if user_id not in self._stats:
-            self._stats[user_id] = CompressionStats()
-        return self._stats[user_id]
+        return self._stats.get_or_create(user_id)
     
     async def compress_context(
         self,
@@ -192,17 +234,17 @@ class MemoryCompressionEngine:
         Returns:
             Tuple of (compressed_context_string, stats)
         """
-        memory = self.get_memory(user_id)
+        memory = await self.aget_memory(user_id)
         stats = self.get_stats(user_id)
         
         # Calculate original token count
         original_text = self._build_original_text(raw_messages, user_facts, summaries)
-        stats.original_tokens = len(original_text) // 4  # Rough estimate
+        stats.original_tokens = get_token_counter().estimate(original_text)
         
         if not self._llm:
             # Fallback: simple truncation
             compressed = self._simple_compress(raw_messages, user_facts)
-            stats.compressed_tokens = len(compressed) // 4
+            stats.compressed_tokens = get_token_counter().estimate(compressed)
             return compressed, stats
         
         try:
@@ -219,7 +261,7 @@ class MemoryCompressionEngine:
             
             # Calculate compressed token count
             compressed_str = memory.to_context_string()
-            stats.compressed_tokens = len(compressed_str) // 4
+            stats.compressed_tokens = get_token_counter().estimate(compressed_str)
             stats.summaries_created += 1
             
             logger.info(f"[COMPRESSION] {stats}")
@@ -229,7 +271,7 @@ class MemoryCompressionEngine:
         except Exception as e:
             logger.error(f"Compression failed: {e}")
             compressed = self._simple_compress(raw_messages, user_facts)
-            stats.compressed_tokens = len(compressed) // 4
+            stats.compressed_tokens = get_token_counter().estimate(compressed)
             return compressed, stats
     
     def _build_original_text(
@@ -260,7 +302,9 @@ class MemoryCompressionEngine:
         """Use LLM to compress text."""
         prompt = COMPRESSION_PROMPT.format(input_text=text[:3000])  # Limit input
         
-        response = await self._llm.ainvoke([HumanMessage(content=prompt)])
+        response = await scheduled_ainvoke(
+            self._llm, [HumanMessage(content=prompt)], tier="light", priority=LLMPriority.BACKGROUND
+        )
         
         # SOTA FIX: Handle Gemini 2.5 Flash content block format
         from app.services.output_processor import extract_thinking_from_response
@@ -313,7 +357,9 @@ class MemoryCompressionEngine:
         try:
             # Group similar facts and merge
             prompt = FACT_MERGE_PROMPT.format(facts="\n".join(facts))
-            response = await self._llm.ainvoke([HumanMessage(content=prompt)])
+            response = await scheduled_ainvoke(
+                self._llm, [HumanMessage(content=prompt)], tier="light", priority=LLMPriority.BACKGROUND
+            )
             
             # SOTA FIX: Handle Gemini 2.5 Flash content block format
             from app.services.output_processor import extract_thinking_from_response
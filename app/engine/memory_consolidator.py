@@ -10,10 +10,13 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Optional
 
+import numpy as np
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 from app.core.config import settings
 from app.models.semantic_memory import Insight, InsightCategory
+from app.engine.insight_validator import jaccard_matrix
+from app.engine.llm_scheduler import LLMPriority, scheduled_ainvoke
 
 logger = logging.getLogger(__name__)
 
@@ -77,7 +80,7 @@ class MemoryConsolidator:
             prompt = self._build_consolidation_prompt(insights)
             
             # Call LLM for consolidation
-            response = await self._llm.ainvoke(prompt)
+            response = await scheduled_ainvoke(self._llm, prompt, priority=LLMPriority.BACKGROUND)
             
             # SOTA FIX: Handle Gemini 2.5 Flash content block format
             from app.services.output_processor import extract_thinking_from_response
@@ -241,28 +244,33 @@ Hãy consolidate một cách thông minh để giữ lại thông tin quan trọ
                 reverse=True
             )
             # Add most recent originals that weren't consolidated
-            for original in sorted_originals[:remaining_slots]:
-                # Check if this insight wasn't already represented in consolidated
-                if not any(self._is_similar_insight(original, cons) for cons in consolidated):
-                    consolidated.append(original)
+            consolidated.extend(self._unrepresented(sorted_originals[:remaining_slots], consolidated))
         
         return consolidated[:self.TARGET_COUNT]
     
-    def _is_similar_insight(self, insight1: Insight, insight2: Insight) -> bool:
-        """Check if two insights are similar (to avoid duplication)."""
-        # Same category and similar content
-        if insight1.category != insight2.category:
-            return False
-        
-        # Simple content similarity check
-        words1 = set(insight1.content.lower().split())
-        words2 = set(insight2.content.lower().split())
+    def _unrepresented(self, originals: List[Insight], consolidated: List[Insight]) -> List[Insight]:
+        """
+        Originals not similar to any consolidated insight (nor to an original kept before them).
         
-        if not words1 or not words2:
-            return False
+        Similar = same category and word-set Jaccard > 0.5; all pairs are
+        scored with one matrix product instead of a pairwise loop.
+        """
+        if not originals:
+            return []
         
-        intersection = len(words1.intersection(words2))
-        union = len(words1.union(words2))
-        similarity = intersection / union if union > 0 else 0
+        candidates = consolidated + originals
+        similarity = jaccard_matrix(
+            [o.content for o in originals],
+            [c.content for c in candidates]
+        )
+        categories = np.array([c.category.value for c in candidates])
         
-        return similarity > 0.5  # 50% similarity threshold
+        active = np.zeros(len(candidates), dtype=bool)
+        active[:len(consolidated)] = True
+        kept = []
+        for row, original in enumerate(originals):
+            same_category = active & (categories == original.category.value)
+            if not (similarity[row][same_category] > 0.5).any():  # 50% similarity threshold
+                kept.append(original)
+                active[len(consolidated) + row] = True
+        return kept
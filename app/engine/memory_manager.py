@@ -20,6 +20,8 @@ from dataclasses import dataclass
 from enum import Enum
 
 from app.core.config import settings
+from app.engine.llm_scheduler import LLMPriority, scheduled_ainvoke
+from app.engine.semantic_memory import invalidate_insight_matrix
 
 logger = logging.getLogger(__name__)
 
@@ -147,7 +149,7 @@ class MemoryManager:
                     else:
                         # Same type but different value - CONFLICT -> UPDATE
                         logger.info(f"[MEMORY MANAGER] Conflict detected: '{mem_fact_value}' vs '{new_fact_value}', updating")
-                        await self._do_update(mem.get("id"), new_fact, fact_type)
+                        await self._do_update(user_id, mem.get("id"), new_fact, fact_type)
                         return MemoryDecision(
                             action=MemoryAction.UPDATE,
                             reason=f"Đã cập nhật: '{mem_fact_value}' -> '{new_fact_value}'",
@@ -164,7 +166,7 @@ class MemoryManager:
                 
             elif decision.action == MemoryAction.UPDATE:
                 logger.info(f"[MEMORY MANAGER] LLM Judge: UPDATE - {decision.reason}")
-                await self._do_update(decision.target_id, new_fact, fact_type)
+                await self._do_update(user_id, decision.target_id, new_fact, fact_type)
                 
             elif decision.action == MemoryAction.INSERT:
                 logger.info(f"[MEMORY MANAGER] LLM Judge: INSERT - {decision.reason}")
@@ -267,7 +269,7 @@ TARGET_ID: [ID của ký ức cần update, nếu UPDATE]
 REASON: [Giải thích ngắn gọn]
 """
             
-            response = await self._llm.ainvoke(prompt)
+            response = await scheduled_ainvoke(self._llm, prompt, priority=LLMPriority.BACKGROUND)
             
             # SOTA FIX: Handle Gemini 2.5 Flash content block format
             from app.services.output_processor import extract_thinking_from_response
@@ -333,6 +335,7 @@ REASON: [Giải thích ngắn gọn]
     
     async def _do_update(
         self,
+        user_id: str,
         target_id: str,
         new_content: str,
         fact_type: str
@@ -346,7 +349,7 @@ REASON: [Giải thích ngắn gọn]
             embedding = self._semantic_memory._embeddings.embed_documents([new_content])[0]
             
             # Update via repository
-            return self._semantic_memory._repository.update_fact(
+            updated = self._semantic_memory._repository.update_fact(
                 fact_id=target_id,
                 content=new_content,
                 embedding=embedding,
@@ -356,6 +359,10 @@ REASON: [Giải thích ngắn gọn]
                     "confidence": 0.95
                 }
             )
+            if updated:
+                # The target may be a cached insight row
+                invalidate_insight_matrix(user_id)
+            return updated
         except Exception as e:
             logger.error(f"Memory update failed: {e}")
             return False
@@ -12,11 +12,14 @@ CHỈ THỊ KỸ THUẬT SỐ 16: MEMORY COMPRESSION
 """
 
 import logging
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 
+from app.cache.session_store import SessionStore
 from app.core.config import settings
+from app.engine.llm_scheduler import LLMPriority, scheduled_ainvoke
+from app.repositories.session_state_repository import get_session_state_backend
 
 logger = logging.getLogger(__name__)
 
@@ -82,6 +85,27 @@ class TieredMemoryState:
             if summary.user_state:
                 return summary.user_state
         return None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for session-state persistence."""
+        data = asdict(self)
+        for summary in data["summaries"]:
+            summary["created_at"] = summary["created_at"].isoformat()
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TieredMemoryState":
+        """Restore a persisted memory state."""
+        summaries = [
+            ConversationSummary(**{**summary, "created_at": datetime.fromisoformat(summary["created_at"])})
+            for summary in data.get("summaries", [])
+        ]
+        return cls(
+            raw_messages=list(data.get("raw_messages", [])),
+            summaries=summaries,
+            user_facts=list(data.get("user_facts", [])),
+            total_messages_processed=data.get("total_messages_processed", 0),
+        )
 
 
 class MemorySummarizer:
@@ -98,7 +122,16 @@ class MemorySummarizer:
     def __init__(self):
         """Initialize MemorySummarizer."""
         self._llm = None
-        self._states: Dict[str, TieredMemoryState] = {}  # session_id -> state
+        # Bounded store (idle + max-count eviction) instead of an ever-growing dict
+        self._states: SessionStore[TieredMemoryState] = SessionStore(  # session_id -> state
+            "memory_summarizer.states",
+            factory=lambda session_id: TieredMemoryState(),
+            max_size=settings.session_store_max_sessions,
+            idle_ttl_seconds=settings.session_store_idle_seconds,
+            backend=get_session_state_backend(),
+            serializer=TieredMemoryState.to_dict,
+            deserializer=TieredMemoryState.from_dict,
+        )
         
         self._init_llm()
     
@@ -118,9 +151,11 @@ class MemorySummarizer:
     
     def get_state(self, session_id: str) -> TieredMemoryState:
         """Get or create memory state for a session."""
-        if session_id not in self._states:
-            self._states[session_id] = TieredMemoryState()
-        return self._states[session_id]
+        return self._states.get_or_create(session_id)
+    
+    async def aget_state(self, session_id: str) -> TieredMemoryState:
+        """get_state() for async callers (resuming state may hit the database)."""
+        return await self._states.aget_or_create(session_id)
     
     def add_message(
         self,
@@ -162,7 +197,7 @@ class MemorySummarizer:
         content: str
     ) -> TieredMemoryState:
         """Async version of add_message with summarization."""
-        state = self.get_state(session_id)
+        state = await self.aget_state(session_id)
         
         state.raw_messages.append({
             "role": role,
@@ -203,7 +238,7 @@ class MemorySummarizer:
     
     async def _trigger_summarization_async(self, session_id: str) -> None:
         """Trigger async summarization."""
-        state = self.get_state(session_id)
+        state = await self.aget_state(session_id)
         
         if not self._llm:
             state.raw_messages = state.raw_messages[-6:]
@@ -247,7 +282,7 @@ class MemorySummarizer:
         prompt = self._build_summary_prompt(messages)
         
         try:
-            response = await self._llm.ainvoke(prompt)
+            response = await scheduled_ainvoke(self._llm, prompt, priority=LLMPriority.BACKGROUND)
             
             # SOTA FIX: Handle Gemini 2.5 Flash content block format
             from app.services.output_processor import extract_thinking_from_response
@@ -325,7 +360,7 @@ TOPICS: [chủ đề 1, chủ đề 2]"""
         Returns:
             Formatted summary string, or None if no summaries exist
         """
-        state = self.get_state(session_id)
+        state = await self.aget_state(session_id)
         
         # If no summaries yet, return None
         if not state.summaries:
@@ -388,8 +423,7 @@ TOPICS: [chủ đề 1, chủ đề 2]"""
     
     def clear_session(self, session_id: str) -> None:
         """Clear memory state for a session."""
-        if session_id in self._states:
-            del self._states[session_id]
+        self._states.pop(session_id)
     
     def is_available(self) -> bool:
         """Check if summarizer is available."""
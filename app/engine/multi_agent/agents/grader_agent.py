@@ -16,6 +16,7 @@ from app.core.config import settings
 from app.engine.llm_factory import create_rag_llm
 from app.engine.multi_agent.state import AgentState
 from app.engine.agents import GRADER_AGENT_CONFIG, AgentConfig
+from app.engine.llm_scheduler import scheduled_ainvoke
 
 logger = logging.getLogger(__name__)
 
@@ -139,7 +140,7 @@ class GraderAgentNode:
                 ))
             ]
             
-            response = await self._llm.ainvoke(messages)
+            response = await scheduled_ainvoke(self._llm, messages)
             
             # SOTA FIX: Handle Gemini 2.5 Flash content block format
             from app.services.output_processor import extract_thinking_from_response
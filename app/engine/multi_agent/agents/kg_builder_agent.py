@@ -20,6 +20,7 @@ from langchain_core.messages import HumanMessage, SystemMessage
 from app.core.config import settings
 from app.engine.multi_agent.state import AgentState
 from app.engine.agents import KG_BUILDER_AGENT_CONFIG, AgentConfig
+from app.engine.llm_scheduler import scheduled_ainvoke
 
 logger = logging.getLogger(__name__)
 
@@ -145,7 +146,7 @@ Trích xuất entities và relations."""
                 HumanMessage(content=user_content)
             ]
             
-            result: ExtractionOutput = await self._structured_llm.ainvoke(messages)
+            result: ExtractionOutput = await scheduled_ainvoke(self._structured_llm, messages)
             
             logger.info(f"Extracted {len(result.entities)} entities, {len(result.relations)} relations")
             return result
@@ -32,6 +32,7 @@ from app.engine.tools.rag_tools import (
 )
 # SOTA 2025: PromptLoader for YAML-driven persona (CrewAI pattern)
 from app.prompts.prompt_loader import get_prompt_loader
+from app.engine.llm_scheduler import scheduled_ainvoke
 
 logger = logging.getLogger(__name__)
 
@@ -116,14 +117,16 @@ class TutorAgentNode:
         pronoun_style = context.get("pronoun_style")  # From SessionState
         user_facts = context.get("user_facts", [])
         
-        # Build base prompt from YAML
-        base_prompt = self._prompt_loader.build_system_prompt(
-            role=user_role,
+        # Static persona + tool rules first (byte-identical per role, cacheable
+        # by Gemini), per-user data after them
+        static_prompt, dynamic_prompt = self._prompt_loader.build_prompt_parts(
+            user_role,
             user_name=user_name,
             user_facts=user_facts,
             is_follow_up=is_follow_up,
             recent_phrases=recent_phrases,
-            pronoun_style=pronoun_style
+            pronoun_style=pronoun_style,
+            lms_course=context.get("lms_course")
         )
         
         # Build context string for query
@@ -131,10 +134,10 @@ class TutorAgentNode:
             f"- {k}: {v}" for k, v in context.items() if v and k not in ["user_facts", "pronoun_style", "recent_phrases"]
         ]) or "Không có thông tin bổ sung"
         
-        # Append tool instruction and context
-        full_prompt = f"""{base_prompt}
+        full_prompt = f"""{static_prompt}
 
 {TOOL_INSTRUCTION}
+{dynamic_prompt}
 
 ## Ngữ cảnh học viên:
 {context_str}
@@ -259,7 +262,7 @@ class TutorAgentNode:
             logger.info(f"[TUTOR_AGENT] ReAct iteration {iteration + 1}/{max_iterations}")
             
             # THINK: LLM reasons and decides action
-            response = await self._llm_with_tools.ainvoke(messages)
+            response = await scheduled_ainvoke(self._llm_with_tools, messages)
             
             # Check if LLM wants to call tools
             if not response.tool_calls:
@@ -332,7 +335,7 @@ class TutorAgentNode:
         # If we exhausted iterations without final response, generate one
         if not final_response:
             try:
-                final_msg = await self._llm.ainvoke(messages)
+                final_msg = await scheduled_ainvoke(self._llm, messages)
                 final_response, llm_thinking = self._extract_content_with_thinking(final_msg.content)
             except Exception as e:
                 logger.error(f"[TUTOR_AGENT] Final generation error: {e}")
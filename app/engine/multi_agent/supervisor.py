@@ -19,6 +19,7 @@ from app.core.config import settings
 from app.engine.llm_pool import get_llm_light  # SOTA: Shared LLM Pool
 from app.engine.multi_agent.state import AgentState
 from app.engine.agents import SUPERVISOR_AGENT_CONFIG, AgentConfig
+from app.engine.llm_scheduler import scheduled_ainvoke
 
 logger = logging.getLogger(__name__)
 
@@ -113,7 +114,7 @@ class SupervisorAgent:
                 ))
             ]
             
-            response = await self._llm.ainvoke(messages)
+            response = await scheduled_ainvoke(self._llm, messages)
             
             # SOTA FIX: Handle Gemini 2.5 Flash content block format
             from app.services.output_processor import extract_thinking_from_response
@@ -208,7 +209,7 @@ class SupervisorAgent:
                 ))
             ]
             
-            response = await self._llm.ainvoke(messages)
+            response = await scheduled_ainvoke(self._llm, messages)
             
             # SOTA FIX: Handle Gemini 2.5 Flash content block format
             from app.services.output_processor import extract_thinking_from_response
@@ -15,6 +15,8 @@ import re
 from dataclasses import dataclass, field
 from typing import List, Optional, TYPE_CHECKING
 
+from app.engine.keyword_matcher import KeywordMatcher
+
 if TYPE_CHECKING:
     import fitz
 
@@ -110,6 +112,8 @@ class PageAnalyzer:
         
         # Compile regex patterns for efficiency
         self._table_regex = [re.compile(p, re.IGNORECASE) for p in self.table_patterns]
+        self._diagram_matcher = KeywordMatcher(self.diagram_keywords)
+        self._maritime_matcher = KeywordMatcher(self.maritime_keywords)
         
         logger.info(
             f"PageAnalyzer initialized: {len(self.table_patterns)} table patterns, "
@@ -143,7 +147,7 @@ class PageAnalyzer:
             # Extract text for analysis
             text = page.get_text()
             result.text_length = len(text)
-            text_lower = text.lower()
+            text_lower = self._diagram_matcher.normalize(text)
             
             # Check for table patterns
             for pattern in self._table_regex:
@@ -153,18 +157,16 @@ class PageAnalyzer:
                     break
             
             # Check for diagram keywords
-            for keyword in self.diagram_keywords:
-                if keyword.lower() in text_lower:
-                    result.has_diagrams = True
-                    result.detection_reasons.append(f"Diagram keyword found: '{keyword}'")
-                    break
+            keyword = self._diagram_matcher.first_match(text_lower, normalized=True)
+            if keyword:
+                result.has_diagrams = True
+                result.detection_reasons.append(f"Diagram keyword found: '{keyword}'")
             
             # Check for maritime signal keywords
-            for keyword in self.maritime_keywords:
-                if keyword.lower() in text_lower:
-                    result.has_maritime_signals = True
-                    result.detection_reasons.append(f"Maritime keyword found: '{keyword}'")
-                    break
+            keyword = self._maritime_matcher.first_match(text_lower, normalized=True)
+            if keyword:
+                result.has_maritime_signals = True
+                result.detection_reasons.append(f"Maritime keyword found: '{keyword}'")
             
             # Determine recommended method
             if result.is_visual_content:
@@ -222,11 +224,11 @@ class PageAnalyzer:
         Returns:
             Dict with detection results
         """
-        text_lower = text.lower()
+        text_lower = self._diagram_matcher.normalize(text)
         
         has_tables = any(p.search(text) for p in self._table_regex)
-        has_diagrams = any(kw.lower() in text_lower for kw in self.diagram_keywords)
-        has_maritime = any(kw.lower() in text_lower for kw in self.maritime_keywords)
+        has_diagrams = self._diagram_matcher.contains_any(text_lower, normalized=True)
+        has_maritime = self._maritime_matcher.contains_any(text_lower, normalized=True)
         
         return {
             'has_tables': has_tables,
@@ -13,8 +13,21 @@ import re
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Set
 
+from app.engine.keyword_matcher import KeywordMatcher, normalize_text
+
 logger = logging.getLogger(__name__)
 
+# Topic keywords for title matching (compiled once)
+_TOPIC_KEYWORD_MATCHER = KeywordMatcher([
+    'crossing', 'cắt hướng',
+    'visibility', 'tầm nhìn', 'restricted',
+    'overtaking', 'vượt',
+    'head-on', 'đối đầu', 'meeting',
+    'safe speed', 'tốc độ an toàn',
+    'look-out', 'cảnh giới',
+    'collision', 'va chạm',
+])
+
 
 @dataclass
 class HybridSearchResult:
@@ -186,7 +199,7 @@ class RRFReranker:
             Set of lowercase keywords
         """
         keywords = set()
-        query_lower = query.lower()
+        query_lower = normalize_text(query)
         
         # Extract rule/chapter numbers with context
         rule_patterns = [
@@ -205,20 +218,8 @@ class RRFReranker:
                     keywords.add(f"rule {match}")
                     keywords.add(f"rule{match}")
         
-        # Extract topic keywords
-        topic_keywords = [
-            'crossing', 'cắt hướng',
-            'visibility', 'tầm nhìn', 'restricted',
-            'overtaking', 'vượt',
-            'head-on', 'đối đầu', 'meeting',
-            'safe speed', 'tốc độ an toàn',
-            'look-out', 'cảnh giới',
-            'collision', 'va chạm',
-        ]
-        
-        for kw in topic_keywords:
-            if kw in query_lower:
-                keywords.add(kw)
+        # Extract topic keywords (single pass over the query)
+        keywords.update(_TOPIC_KEYWORD_MATCHER.find_terms(query_lower, normalized=True))
         
         return keywords
     
@@ -8,19 +8,28 @@ Refactored from monolithic semantic_memory.py into modular components:
 - core.py: SemanticMemoryEngine (Facade)
 - context.py: ContextRetriever (context/insights retrieval)
 - extraction.py: FactExtractor (fact extraction/storage)
+- access_tracker.py: AccessTracker (batched, deferred last_accessed writes)
 
 Usage:
     from app.engine.semantic_memory import SemanticMemoryEngine
     engine = SemanticMemoryEngine()
 """
 
-from .core import SemanticMemoryEngine, get_semantic_memory_engine
+from .core import (
+    SemanticMemoryEngine,
+    get_semantic_memory_engine,
+    invalidate_insight_matrix,
+)
+from .access_tracker import AccessTracker, flush_access_trackers
 from .context import ContextRetriever
 from .extraction import FactExtractor
 
 __all__ = [
     "SemanticMemoryEngine",
     "get_semantic_memory_engine",
+    "invalidate_insight_matrix",
     "ContextRetriever",
     "FactExtractor",
+    "AccessTracker",
+    "flush_access_trackers",
 ]
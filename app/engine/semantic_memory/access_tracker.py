@@ -0,0 +1,118 @@
+"""
+Deferred last_accessed Tracking for Semantic Memory
+
+Insight retrieval used to await one UPDATE per returned insight on the
+request path. AccessTracker collects the IDs of retrieved memories and
+writes them in one batched UPDATE (``id = ANY(...)``) from a background
+task a few seconds later; repeated reads of the same insight inside the
+window collapse into a single write.
+
+last_accessed only feeds recency ranking and consolidation, so a lost
+batch (process crash, DB error) costs a little ranking freshness, never
+correctness.
+
+Feature: insight-ranking
+"""
+import asyncio
+import logging
+import weakref
+from typing import Any, Dict, Iterable, Optional, Set
+from uuid import UUID
+
+from app.repositories.semantic_memory_repository import SemanticMemoryRepository
+
+logger = logging.getLogger(__name__)
+
+_trackers: "weakref.WeakSet[AccessTracker]" = weakref.WeakSet()
+
+
+class AccessTracker:
+    """
+    Batches last_accessed bumps into one deferred UPDATE per flush window.
+
+    Used from the event loop only.
+    """
+
+    def __init__(
+        self,
+        repository: SemanticMemoryRepository,
+        flush_delay_seconds: float = 5.0,
+        max_pending: int = 500
+    ):
+        """
+        Args:
+            repository: Repository providing touch_last_accessed()
+            flush_delay_seconds: Wait this long after the first mark before writing
+            max_pending: Flush immediately once this many IDs are pending
+        """
+        self._repository = repository
+        self.flush_delay_seconds = flush_delay_seconds
+        self.max_pending = max_pending
+        self._pending: Set[UUID] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._stats = {"marked": 0, "flushes": 0, "rows_updated": 0, "errors": 0}
+        _trackers.add(self)
+
+    @property
+    def pending(self) -> int:
+        """Number of IDs waiting to be written."""
+        return len(self._pending)
+
+    def mark(self, memory_ids: Iterable[Optional[UUID]]) -> None:
+        """Record memories as accessed now; written by the next flush."""
+        new_ids = {memory_id for memory_id in memory_ids if memory_id}
+        if not new_ids:
+            return
+        self._pending |= new_ids
+        self._stats["marked"] += len(new_ids)
+
+        if self._flush_task is not None and not self._flush_task.done():
+            if len(self._pending) < self.max_pending:
+                return
+        try:
+            delay = 0.0 if len(self._pending) >= self.max_pending else self.flush_delay_seconds
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later(delay))
+        except RuntimeError:
+            # No running loop (sync caller): write now
+            self._write(self._take())
+
+    async def _flush_later(self, delay: float) -> None:
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await self.flush()
+
+    def _take(self) -> Set[UUID]:
+        batch, self._pending = self._pending, set()
+        return batch
+
+    def _write(self, batch: Set[UUID]) -> None:
+        if not batch:
+            return
+        try:
+            updated = self._repository.touch_last_accessed(list(batch))
+            self._stats["flushes"] += 1
+            self._stats["rows_updated"] += updated
+            logger.debug(f"[ACCESS] Updated last_accessed for {updated}/{len(batch)} memories")
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"[ACCESS] Failed to write last_accessed batch ({len(batch)} ids): {e}")
+
+    async def flush(self) -> None:
+        """Write all pending IDs now (one UPDATE, off the event loop)."""
+        await asyncio.to_thread(self._write, self._take())
+
+    async def close(self) -> None:
+        """Cancel the scheduled flush and write what is pending (shutdown)."""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus current pending size."""
+        return {**self._stats, "pending": len(self._pending)}
+
+
+async def flush_access_trackers() -> None:
+    """Write pending last_accessed batches of every live tracker (app shutdown)."""
+    for tracker in list(_trackers):
+        await tracker.close()
@@ -7,10 +7,13 @@ Extracted from semantic_memory.py for better modularity.
 
 Requirements: 2.2, 2.4, 4.3, 4.4
 """
+import asyncio
 import logging
-from typing import List, Optional
+from typing import Callable, List, Optional
 from datetime import datetime
+from uuid import UUID
 
+from app.core.config import settings
 from app.models.semantic_memory import (
     InsightCategory,
     MemoryType,
@@ -20,6 +23,7 @@ from app.models.semantic_memory import (
 )
 from app.repositories.semantic_memory_repository import SemanticMemoryRepository
 from app.engine.gemini_embedding import GeminiOptimizedEmbeddings
+from app.engine.token_counter import get_token_counter
 
 logger = logging.getLogger(__name__)
 
@@ -140,18 +144,22 @@ class ContextRetriever:
         user_id: str,
         query: str,
         limit: int = 10,
-        update_last_accessed_callback=None
+        on_accessed: Optional[Callable[[List[UUID]], None]] = None
     ) -> List[Insight]:
         """
-        Retrieve insights with category prioritization.
+        Retrieve the insights most useful for a query.
         
-        Prioritizes knowledge_gap and learning_style categories.
+        Ranked in one SQL query by a blend of similarity to the query,
+        category priority (knowledge_gap, learning_style) and recency.
+        Falls back to category-then-recency ordering in Python if the
+        ranking query fails.
         
         Args:
             user_id: User ID
             query: Query for context
             limit: Maximum insights to return
-            update_last_accessed_callback: Optional callback to update last_accessed
+            on_accessed: Called once with the returned insight IDs
+                (non-blocking, e.g. AccessTracker.mark)
             
         Returns:
             List of prioritized Insight objects
@@ -159,90 +167,95 @@ class ContextRetriever:
         **Validates: Requirements 4.3, 4.4**
         """
         try:
-            # Get all insights
-            all_insights = await self._get_user_insights(user_id)
+            ranked = await self._rank_user_insights(user_id, query, limit)
+            if ranked is None:
+                ranked = self._prioritize(await self._get_user_insights(user_id))[:limit]
             
-            if not all_insights:
-                return []
+            if on_accessed and ranked:
+                on_accessed([insight.id for insight in ranked if insight.id])
             
-            # Separate by priority
-            priority_insights = []
-            other_insights = []
-            
-            for insight in all_insights:
-                if insight.category in self.PRIORITY_CATEGORIES:
-                    priority_insights.append(insight)
-                else:
-                    other_insights.append(insight)
-            
-            # Sort each group by last_accessed (most recent first)
-            priority_insights.sort(
-                key=lambda x: x.last_accessed or x.created_at or datetime.min,
-                reverse=True
-            )
-            other_insights.sort(
-                key=lambda x: x.last_accessed or x.created_at or datetime.min,
-                reverse=True
-            )
-            
-            # Combine with priority first
-            result = priority_insights + other_insights
-            
-            # Update last_accessed for retrieved insights
-            if update_last_accessed_callback:
-                for insight in result[:limit]:
-                    if insight.id:
-                        await update_last_accessed_callback(insight.id)
-            
-            return result[:limit]
+            return ranked
             
         except Exception as e:
             logger.error(f"Failed to retrieve prioritized insights: {e}")
             return []
     
+    async def _rank_user_insights(self, user_id: str, query: str, limit: int) -> Optional[List[Insight]]:
+        """Rank insights in the database (off the event loop); None if ranking is unavailable."""
+        query_embedding = None
+        if query and settings.insight_rank_similarity_weight > 0:
+            try:
+                query_embedding = await self._embeddings.aembed_query(query)
+            except Exception as e:
+                logger.warning(f"Query embedding failed, ranking insights without similarity: {e}")
+        
+        memories = await asyncio.to_thread(
+            self._repository.rank_insights,
+            user_id=user_id,
+            query_embedding=query_embedding,
+            priority_categories=[c.value for c in self.PRIORITY_CATEGORIES],
+            limit=limit,
+            similarity_weight=settings.insight_rank_similarity_weight,
+            category_weight=settings.insight_rank_category_weight,
+            recency_weight=settings.insight_rank_recency_weight,
+            recency_half_life_days=settings.insight_rank_recency_half_life_days
+        )
+        if memories is None:
+            return None
+        return self._to_insights(user_id, memories)
+    
+    def _prioritize(self, insights: List[Insight]) -> List[Insight]:
+        """Priority categories first, each group most recently accessed first."""
+        def recency(insight: Insight) -> datetime:
+            return insight.last_accessed or insight.created_at or datetime.min
+        
+        priority_insights = [i for i in insights if i.category in self.PRIORITY_CATEGORIES]
+        other_insights = [i for i in insights if i.category not in self.PRIORITY_CATEGORIES]
+        priority_insights.sort(key=recency, reverse=True)
+        other_insights.sort(key=recency, reverse=True)
+        return priority_insights + other_insights
+    
     async def _get_user_insights(self, user_id: str) -> List[Insight]:
         """Get all insights for a user."""
         try:
             # Get insight memories from repository
-            insight_memories = self._repository.search_similar(
-                user_id=user_id,
-                query_embedding=[0.0] * 768,  # Dummy embedding
-                limit=100,
-                threshold=0.0,
-                memory_types=[MemoryType.INSIGHT]
+            insight_memories = await asyncio.to_thread(
+                self._repository.get_user_insights, user_id, limit=100
             )
-            
-            # Convert to Insight objects
-            insights = []
-            for mem in insight_memories:
-                try:
-                    insight = Insight(
-                        id=mem.id,
-                        user_id=user_id,
-                        content=mem.content,
-                        category=InsightCategory(mem.metadata.get("category", "general")),
-                        confidence=mem.metadata.get("confidence", 0.5),
-                        created_at=mem.created_at,
-                        last_accessed=mem.metadata.get("last_accessed")
-                    )
-                    insights.append(insight)
-                except Exception as e:
-                    logger.debug(f"Skipping invalid insight: {e}")
-                    continue
-            
-            return insights
+            return self._to_insights(user_id, insight_memories)
             
         except Exception as e:
             logger.error(f"Failed to get user insights: {e}")
             return []
     
+    def _to_insights(self, user_id: str, memories: List[SemanticMemorySearchResult]) -> List[Insight]:
+        """Convert insight memories to Insight objects, skipping invalid ones."""
+        insights = []
+        for mem in memories:
+            try:
+                category = mem.metadata.get("insight_category") or mem.metadata.get("category", "general")
+                insight = Insight(
+                    id=mem.id,
+                    user_id=user_id,
+                    content=mem.content,
+                    category=InsightCategory(category),
+                    sub_topic=mem.metadata.get("sub_topic"),
+                    confidence=mem.metadata.get("confidence", 0.5),
+                    created_at=mem.created_at,
+                    last_accessed=mem.last_accessed or mem.metadata.get("last_accessed")
+                )
+                insights.append(insight)
+            except Exception as e:
+                logger.debug(f"Skipping invalid insight: {e}")
+                continue
+        
+        return insights
+    
     def _estimate_tokens(
         self,
         memories: List[SemanticMemorySearchResult],
         facts: List[SemanticMemorySearchResult]
     ) -> int:
-        """Estimate token count for context."""
-        total_chars = sum(len(m.content) for m in memories)
-        total_chars += sum(len(f.content) for f in facts)
-        # Rough estimate: 1 token ≈ 4 characters for Vietnamese/English mix
-        return total_chars // 4
+        """Token count for context (stored memories are immutable: counts are cached)."""
+        contents = [m.content for m in memories] + [f.content for f in facts]
+        return sum(get_token_counter().count_many(contents))
@@ -11,9 +11,10 @@ Requirements: 2.2, 2.4, 3.1, 3.2, 3.3, 3.4, 4.1, 4.2, 4.3
 """
 import json
 import logging
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime, timedelta
 
+from app.cache.lru_cache import LRUCache
 from app.core.config import settings
 from app.engine.gemini_embedding import GeminiOptimizedEmbeddings
 from app.models.semantic_memory import (
@@ -32,8 +33,11 @@ from app.models.semantic_memory import (
     UserFactExtraction,
 )
 from app.repositories.semantic_memory_repository import SemanticMemoryRepository
+from app.engine.llm_scheduler import LLMPriority, scheduled_ainvoke
+from app.engine.token_counter import get_token_counter
 
 # Import specialized modules
+from .access_tracker import AccessTracker
 from .context import ContextRetriever
 from .extraction import FactExtractor
 
@@ -65,6 +69,7 @@ class SemanticMemoryEngine:
     MAX_INSIGHTS = 50  # Hard limit for insights
     CONSOLIDATION_THRESHOLD = 40  # Trigger consolidation at this count
     PRESERVE_DAYS = 7  # Preserve memories accessed within 7 days
+    INSIGHT_MATRIX_TTL_SECONDS = 300  # Per-user insight matrix lifetime (picks up external edits)
     
     # Priority categories for retrieval
     PRIORITY_CATEGORIES = [InsightCategory.KNOWLEDGE_GAP, InsightCategory.LEARNING_STYLE]
@@ -91,11 +96,17 @@ class SemanticMemoryEngine:
         # Initialize specialized modules
         self._context_retriever = ContextRetriever(self._embeddings, self._repository)
         self._fact_extractor = FactExtractor(self._embeddings, self._repository, llm)
+        self._access_tracker = AccessTracker(
+            self._repository,
+            flush_delay_seconds=settings.insight_access_flush_seconds
+        )
         
         # Insight Engine v0.5 components (lazy initialization)
         self._insight_extractor = None
         self._insight_validator = None
         self._memory_consolidator = None
+        # Per-user InsightMatrix, shared by every engine in the process
+        self._insight_matrices = _insight_matrices
         
         logger.info("SemanticMemoryEngine initialized (v0.5 - Refactored)")
     
@@ -177,9 +188,10 @@ class SemanticMemoryEngine:
         limit: int = 10
     ) -> List[Insight]:
         """
-        Retrieve insights with category prioritization.
+        Retrieve insights ranked by query similarity, category priority and recency.
         
-        Delegates to ContextRetriever.retrieve_insights_prioritized()
+        Delegates to ContextRetriever.retrieve_insights_prioritized();
+        last_accessed of the returned insights is written in a deferred batch.
         
         **Validates: Requirements 4.3, 4.4**
         """
@@ -187,7 +199,7 @@ class SemanticMemoryEngine:
             user_id=user_id,
             query=query,
             limit=limit,
-            update_last_accessed_callback=self.update_last_accessed
+            on_accessed=self._access_tracker.mark
         )
     
     async def get_user_facts(self, user_id: str) -> dict:
@@ -343,6 +355,15 @@ class SemanticMemoryEngine:
         """
         Store an interaction (message + response) as semantic memories.
         
+        Batched write path, per turn:
+        - 1 LLM call for fact extraction (if extract_facts)
+        - 1 embedding request for message + response + all extracted facts
+        - 1 DB transaction (repository.save_turn): multi-row insert of the
+          messages, set-based fact upsert, eviction only if facts were added
+        
+        Previously: 2 + N embedding requests and 2 + up to 5N DB round-trips
+        (N = extracted facts).
+        
         Args:
             user_id: User ID
             message: User's message
@@ -355,36 +376,85 @@ class SemanticMemoryEngine:
             
         Requirements: 2.1
         """
+        return await self.store_interactions(
+            user_id, [(message, response)], session_id, extract_facts
+        )
+    
+    async def store_interactions(
+        self,
+        user_id: str,
+        turns: List[Tuple[str, str]],
+        session_id: Optional[str] = None,
+        extract_facts: bool = True
+    ) -> bool:
+        """
+        Store consecutive turns of one session with the same call budget as
+        a single turn: one fact extraction over all user messages, one
+        embedding request and one transaction.
+        
+        Args:
+            user_id: User ID
+            turns: (message, response) pairs, oldest first
+            session_id: Optional session ID
+            extract_facts: Whether to extract user facts
+            
+        Returns:
+            True if storage successful
+        """
+        if not turns:
+            return True
+        
         try:
-            # Store user message
-            message_embedding = self._embeddings.embed_documents([message])[0]
-            message_memory = SemanticMemoryCreate(
-                user_id=user_id,
-                content=f"User: {message}",
-                embedding=message_embedding,
-                memory_type=MemoryType.MESSAGE,
-                importance=0.5,
-                session_id=session_id
+            selected = []
+            if extract_facts:
+                try:
+                    extraction = await self._fact_extractor.extract_user_facts(
+                        user_id, "\n".join(message for message, _ in turns)
+                    )
+                    selected = self._fact_extractor.select_facts(extraction.facts)
+                except Exception as e:
+                    logger.warning(f"Fact extraction skipped for interaction: {e}")
+            
+            texts = [text for turn in turns for text in turn]
+            texts += [fact.to_content() for fact, _ in selected]
+            embeddings = await self._embeddings.aembed_documents(texts)
+            
+            contents = [
+                content
+                for message, response in turns
+                for content in (f"User: {message}", f"AI: {response}")
+            ]
+            token_counts = get_token_counter().count_many(contents)
+            memories = [
+                SemanticMemoryCreate(
+                    user_id=user_id,
+                    content=content,
+                    embedding=embedding,
+                    memory_type=MemoryType.MESSAGE,
+                    importance=0.5,
+                    session_id=session_id,
+                    token_count=token_count
+                )
+                for content, embedding, token_count in zip(contents, embeddings, token_counts)
+            ]
+            fact_memories = self._fact_extractor.build_fact_memories(
+                user_id, selected, embeddings[2 * len(turns):], session_id
             )
-            self._repository.save_memory(message_memory)
             
-            # Store AI response
-            response_embedding = self._embeddings.embed_documents([response])[0]
-            response_memory = SemanticMemoryCreate(
-                user_id=user_id,
-                content=f"AI: {response}",
-                embedding=response_embedding,
-                memory_type=MemoryType.MESSAGE,
-                importance=0.5,
-                session_id=session_id
+            counts = self._repository.save_turn(
+                memories,
+                fact_memories,
+                similarity_threshold=settings.fact_similarity_threshold,
+                max_facts=self.MAX_USER_FACTS,
+                user_id=user_id
             )
-            self._repository.save_memory(response_memory)
+            if counts is None:
+                return False
             
-            # Extract and store user facts if enabled
-            if extract_facts:
-                await self._extract_and_store_facts(user_id, message, session_id)
-            
-            logger.debug(f"Stored interaction for user {user_id}")
+            logger.debug(
+                f"Stored {len(turns)} interaction(s) for user {user_id}: 1 embedding request "
+                f"({len(texts)} texts), 1 transaction {counts}"
+            )
             return True
             
         except Exception as e:
@@ -395,25 +465,17 @@ class SemanticMemoryEngine:
     
     def count_tokens(self, text: str) -> int:
         """
-        Count tokens in text using tiktoken.
+        Count tokens in text using the shared TokenCounter (tiktoken, cached).
         
         Args:
-            text: Text to count tokens for
+            text: Text to count tokens for (treated as immutable, count is cached)
             
         Returns:
-            Estimated token count
+            Token count (estimate if tiktoken is unavailable)
             
         Requirements: 3.1
         """
-        try:
-            import tiktoken
-            encoding = tiktoken.get_encoding("cl100k_base")
-            return len(encoding.encode(text))
-        except ImportError:
-            return len(text) // 4
-        except Exception as e:
-            logger.warning(f"Token counting failed: {e}")
-            return len(text) // 4
+        return get_token_counter().count(text, cache=True)
     
     def count_session_tokens(
         self,
@@ -423,24 +485,13 @@ class SemanticMemoryEngine:
         """
         Count total tokens for a session's messages.
         
+        Sums the token_count stored with each message (one indexed
+        aggregate, no re-tokenization).
+        
         Requirements: 3.1
         """
         try:
-            messages = self._repository.search_similar(
-                user_id=user_id,
-                query_embedding=[0.0] * 768,
-                limit=1000,
-                threshold=0.0,
-                memory_types=[MemoryType.MESSAGE]
-            )
-            
-            total_tokens = 0
-            for msg in messages:
-                if msg.metadata.get("session_id") == session_id:
-                    total_tokens += self.count_tokens(msg.content)
-            
-            return total_tokens
-            
+            return self._repository.sum_session_tokens(user_id, session_id)
         except Exception as e:
             logger.error(f"Failed to count session tokens: {e}")
             return 0
@@ -540,25 +591,16 @@ class SemanticMemoryEngine:
         user_id: str,
         session_id: str
     ) -> List[SemanticMemorySearchResult]:
-        """Get all messages for a session."""
+        """Get all messages for a session (chronological)."""
         try:
-            all_memories = self._repository.search_similar(
+            return self._repository.list_memories(
                 user_id=user_id,
-                query_embedding=[0.0] * 768,
+                memory_types=[MemoryType.MESSAGE],
+                session_id=session_id,
                 limit=1000,
-                threshold=0.0,
-                memory_types=[MemoryType.MESSAGE]
+                newest_first=False
             )
             
-            session_messages = [
-                m for m in all_memories
-                if m.metadata.get("session_id") == session_id
-            ]
-            
-            session_messages.sort(key=lambda x: x.created_at)
-            
-            return session_messages
-            
         except Exception as e:
             logger.error(f"Failed to get session messages: {e}")
             return []
@@ -586,7 +628,7 @@ Format your response as JSON:
 Return ONLY valid JSON:"""
         
         try:
-            response = await self._llm.ainvoke(prompt)
+            response = await scheduled_ainvoke(self._llm, prompt, priority=LLMPriority.BACKGROUND)
             
             # SOTA FIX: Handle Gemini 2.5 Flash content block format
             from app.services.output_processor import extract_thinking_from_response
@@ -687,33 +729,50 @@ Return ONLY valid JSON:"""
             if not insights:
                 return []
             
-            # Step 2: Get existing insights for validation
-            existing_insights = await self._get_user_insights(user_id)
-            
-            # Step 3: Validate and process each insight
+            # Step 2: Validate the whole batch against the user's insight matrix
+            # (stored embeddings, one matrix product - no re-embedding)
             stored_insights = []
-            for insight in insights:
-                if self._insight_validator:
-                    result = self._insight_validator.validate(insight, existing_insights)
-                    
+            if self._insight_validator:
+                matrix = await self._get_insight_matrix(user_id)
+                results = self._insight_validator.validate_batch(insights, matrix)
+                
+                # Step 3: Process each insight
+                for insight, result in zip(insights, results):
                     if not result.is_valid:
                         logger.debug(f"Insight rejected: {result.reason}")
                         continue
                     
                     if result.action == "merge":
-                        await self._merge_insight(insight, result.target_insight)
-                        stored_insights.append(insight)
+                        merged = await self._merge_insight(insight, result.target_insight)
+                        if merged:
+                            matrix.replace(merged.id, merged)
+                            stored_insights.append(insight)
+                            continue
                         
                     elif result.action == "update":
-                        await self._update_insight_with_evolution(insight, result.target_insight)
-                        stored_insights.append(insight)
-                        
-                    elif result.action == "store":
-                        await self._store_insight(insight, session_id)
-                        stored_insights.append(insight)
-                        existing_insights.append(insight)
-                else:
-                    # No validator, just store
+                        updated = await self._update_insight_with_evolution(
+                            insight, result.target_insight, embedding=result.embedding
+                        )
+                        if updated:
+                            matrix.replace(updated.id, updated, result.embedding)
+                            stored_insights.append(insight)
+                            continue
+                    
+                    if result.action != "store":
+                        # Merge/update failed: if the target row was deleted
+                        # outside this engine, the cached matrix is stale and
+                        # the insight is stored as new instead of being lost
+                        if not self._merge_target_missing(user_id, result.target_insight):
+                            stored_insights.append(insight)
+                            continue
+                        matrix = await self._reload_insight_matrix(user_id)
+                    
+                    if await self._store_insight(insight, session_id, embedding=result.embedding):
+                        matrix.add(insight, result.embedding)
+                    stored_insights.append(insight)
+            else:
+                # No validator, just store
+                for insight in insights:
                     await self._store_insight(insight, session_id)
                     stored_insights.append(insight)
             
@@ -728,68 +787,151 @@ Return ONLY valid JSON:"""
             logger.error(f"Failed to extract and store insights: {e}")
             return []
     
+    async def _get_insight_matrix(self, user_id: str):
+        """
+        Get the user's InsightMatrix, loading it from stored embeddings on a miss.
+        
+        Only legacy rows without a stored embedding are embedded (one batch call).
+        """
+        matrix = self._insight_matrices.get(user_id)
+        if matrix is not None:
+            return matrix
+        
+        from app.engine.insight_validator import InsightMatrix
+        
+        memories = self._repository.list_memories_with_embeddings(
+            user_id,
+            memory_types=[MemoryType.INSIGHT],
+            limit=self.MAX_INSIGHTS
+        )
+        
+        insights, vectors = [], []
+        for mem in memories:
+            insight = self._memory_to_insight(user_id, mem)
+            if insight:
+                insights.append(insight)
+                vectors.append(mem.embedding)
+        
+        dimensions = self._embeddings.dimensions
+        missing = [i for i, vector in enumerate(vectors) if len(vector) != dimensions]
+        if missing:
+            embedded = self._insight_validator.embed_texts([insights[i].content for i in missing])
+            if embedded is None:
+                vectors = None
+            else:
+                for i, vector in zip(missing, embedded):
+                    vectors[i] = vector
+        
+        matrix = InsightMatrix(insights, vectors if insights else None)
+        self._insight_matrices.set(user_id, matrix)
+        return matrix
+    
+    async def _reload_insight_matrix(self, user_id: str):
+        """Drop the user's cached InsightMatrix and load it again."""
+        self.invalidate_insight_matrix(user_id)
+        return await self._get_insight_matrix(user_id)
+    
+    def _merge_target_missing(self, user_id: str, target: Optional[Insight]) -> bool:
+        """True if a merge/update target is no longer stored (deleted since the matrix was cached)."""
+        if target is None or target.id is None:
+            return True
+        if self._repository.get_by_id(target.id, user_id) is not None:
+            return False
+        logger.info(f"Insight {target.id} no longer exists for user {user_id}, storing new insight")
+        return True
+    
+    def invalidate_insight_matrix(self, user_id: str) -> None:
+        """Drop the cached InsightMatrix after the user's insights changed."""
+        invalidate_insight_matrix(user_id)
+    
+    def _memory_to_insight(self, user_id: str, mem) -> Optional[Insight]:
+        """Convert a stored INSIGHT memory to an Insight (None if invalid)."""
+        if not mem.metadata.get("insight_category"):
+            return None
+        try:
+            return Insight(
+                id=mem.id,
+                user_id=user_id,
+                content=mem.content,
+                category=InsightCategory(mem.metadata.get("insight_category")),
+                sub_topic=mem.metadata.get("sub_topic"),
+                confidence=mem.metadata.get("confidence", 0.8),
+                source_messages=mem.metadata.get("source_messages", []),
+                created_at=mem.created_at,
+                evolution_notes=mem.metadata.get("evolution_notes", [])
+            )
+        except (ValueError, KeyError) as e:
+            logger.debug(f"Skipping invalid insight: {e}")
+            return None
+    
     async def _get_user_insights(self, user_id: str) -> List[Insight]:
         """Get all insights for a user."""
         try:
-            memories = self._repository.get_user_facts(
-                user_id=user_id,
-                limit=self.MAX_INSIGHTS,
-                deduplicate=False
+            memories = self._repository.list_memories(
+                user_id,
+                memory_types=[MemoryType.INSIGHT],
+                limit=self.MAX_INSIGHTS
             )
             
             insights = []
             for mem in memories:
-                if mem.metadata.get("insight_category"):
-                    try:
-                        insight = Insight(
-                            id=mem.id,
-                            user_id=user_id,
-                            content=mem.content,
-                            category=InsightCategory(mem.metadata.get("insight_category")),
-                            sub_topic=mem.metadata.get("sub_topic"),
-                            confidence=mem.metadata.get("confidence", 0.8),
-                            source_messages=mem.metadata.get("source_messages", []),
-                            created_at=mem.created_at,
-                            evolution_notes=mem.metadata.get("evolution_notes", [])
-                        )
-                        insights.append(insight)
-                    except (ValueError, KeyError) as e:
-                        logger.debug(f"Skipping invalid insight: {e}")
+                insight = self._memory_to_insight(user_id, mem)
+                if insight:
+                    insights.append(insight)
             
             return insights
-            
+        
         except Exception as e:
             logger.error(f"Failed to get user insights: {e}")
             return []
     
-    async def _store_insight(self, insight: Insight, session_id: Optional[str] = None) -> bool:
-        """Store a new insight."""
+    async def _store_insight(
+        self,
+        insight: Insight,
+        session_id: Optional[str] = None,
+        embedding: Optional[List[float]] = None
+    ) -> bool:
+        """
+        Store a new insight (sets ``insight.id`` on success).
+        
+        Args:
+            insight: Insight to store
+            session_id: Optional session ID
+            embedding: Embedding computed during validation (skips re-embedding)
+        """
         try:
-            embedding = self._embeddings.embed_documents([insight.content])[0]
+            if embedding is None:
+                embedding = self._embeddings.embed_documents([insight.content])[0]
             
             memory = SemanticMemoryCreate(
                 user_id=insight.user_id,
                 content=insight.content,
-                embedding=embedding,
+                embedding=[float(x) for x in embedding],
                 memory_type=MemoryType.INSIGHT,
                 importance=insight.confidence,
                 metadata=insight.to_metadata(),
                 session_id=session_id
             )
             
-            self._repository.save_memory(memory)
+            saved = self._repository.save_memory(memory)
+            if saved is None:
+                return False
+            insight.id = saved.id
             return True
-            
+        
         except Exception as e:
             logger.error(f"Failed to store insight: {e}")
             return False
     
-    async def _merge_insight(self, new_insight: Insight, existing_insight: Insight) -> bool:
+    async def _merge_insight(self, new_insight: Insight, existing_insight: Insight) -> Optional[Insight]:
         """
         Merge new insight with existing one - metadata only, preserve embedding.
         
         SOTA Fix: Use explicit update_metadata_only() API instead of
         passing embedding=None to update_fact().
+        
+        Returns:
+            The merged insight, or None on failure
         """
         try:
             new_confidence = (existing_insight.confidence + new_insight.confidence) / 2
@@ -797,41 +939,64 @@ Return ONLY valid JSON:"""
             evolution_notes = existing_insight.evolution_notes.copy() if existing_insight.evolution_notes else []
             evolution_notes.append(f"Merged with similar insight: {new_insight.content[:50]}...")
             
+            merged = existing_insight.model_copy(update={
+                "confidence": new_confidence,
+                "evolution_notes": evolution_notes
+            })
+            
             # SOTA FIX: Use correct API for metadata-only update
-            return self._repository.update_metadata_only(
+            if self._repository.update_metadata_only(
                 fact_id=existing_insight.id,
-                metadata={
-                    **existing_insight.to_metadata(),
-                    "confidence": new_confidence,
-                    "evolution_notes": evolution_notes
-                }
-            )
-            
+                metadata=merged.to_metadata()
+            ):
+                return merged
+            return None
+        
         except Exception as e:
             logger.error(f"Failed to merge insight: {e}")
-            return False
+            return None
     
-    async def _update_insight_with_evolution(self, new_insight: Insight, existing_insight: Insight) -> bool:
-        """Update existing insight with evolution note (for contradictions)."""
+    async def _update_insight_with_evolution(
+        self,
+        new_insight: Insight,
+        existing_insight: Insight,
+        embedding: Optional[List[float]] = None
+    ) -> Optional[Insight]:
+        """
+        Update existing insight with evolution note (for contradictions).
+        
+        Args:
+            new_insight: Contradicting insight that replaces the content
+            existing_insight: Stored insight to update
+            embedding: Embedding of new_insight computed during validation
+        
+        Returns:
+            The updated insight (keeps the existing ID), or None on failure
+        """
         try:
-            embedding = self._embeddings.embed_documents([new_insight.content])[0]
+            if embedding is None:
+                embedding = self._embeddings.embed_documents([new_insight.content])[0]
             
             evolution_notes = existing_insight.evolution_notes.copy() if existing_insight.evolution_notes else []
             evolution_notes.append(f"Updated from: {existing_insight.content[:50]}...")
             
-            return self._repository.update_fact(
+            updated = new_insight.model_copy(update={
+                "id": existing_insight.id,
+                "evolution_notes": evolution_notes
+            })
+            
+            if self._repository.update_fact(
                 fact_id=existing_insight.id,
                 content=new_insight.content,
-                embedding=embedding,
-                metadata={
-                    **new_insight.to_metadata(),
-                    "evolution_notes": evolution_notes
-                }
-            )
-            
+                embedding=[float(x) for x in embedding],
+                metadata=updated.to_metadata()
+            ):
+                return updated
+            return None
+        
         except Exception as e:
             logger.error(f"Failed to update insight with evolution: {e}")
-            return False
+            return None
     
     async def enforce_hard_limit(self, user_id: str) -> bool:
         """
@@ -877,6 +1042,7 @@ Return ONLY valid JSON:"""
             
             excess = current_count - self.MAX_INSIGHTS
             deleted = self._repository.delete_oldest_facts(user_id, excess)
+            self.invalidate_insight_matrix(user_id)
             
             logger.info(f"FIFO eviction for user {user_id}: deleted {deleted} insights")
             return deleted
@@ -886,6 +1052,25 @@ Return ONLY valid JSON:"""
             return 0
 
 
+# Per-user InsightMatrix (stored insights + normalized embeddings). Process-wide:
+# get_semantic_memory_engine() returns a new engine per call.
+_insight_matrices = LRUCache(
+    "semantic_memory.insight_matrices",
+    max_size=1000,
+    ttl_seconds=SemanticMemoryEngine.INSIGHT_MATRIX_TTL_SECONDS
+)
+
+
+def invalidate_insight_matrix(user_id: str) -> None:
+    """
+    Drop a user's cached InsightMatrix.
+    
+    Call after insight rows are updated or deleted outside
+    SemanticMemoryEngine (admin deletes, MemoryManager updates).
+    """
+    _insight_matrices.pop(user_id)
+
+
 # Factory function
 def get_semantic_memory_engine() -> SemanticMemoryEngine:
     """Get a configured SemanticMemoryEngine instance."""
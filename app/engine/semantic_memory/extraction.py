@@ -9,7 +9,7 @@ Requirements: 4.1, 4.2, 4.3
 """
 import json
 import logging
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from app.core.config import settings
 from app.engine.llm_factory import create_extraction_llm
@@ -28,6 +28,7 @@ from app.models.semantic_memory import (
 )
 from app.repositories.semantic_memory_repository import SemanticMemoryRepository
 from app.engine.gemini_embedding import GeminiOptimizedEmbeddings
+from app.engine.llm_scheduler import LLMPriority, scheduled_ainvoke
 
 logger = logging.getLogger(__name__)
 
@@ -86,10 +87,12 @@ class FactExtractor:
         Extract user facts from a message using LLM.
         
         v0.4 Update (CHỈ THỊ 23):
-        - Uses store_user_fact_upsert() for upsert logic
         - Validates fact_type before storing
         - Enforces memory cap
         
+        All facts are embedded in one request and upserted in one
+        transaction (repository.upsert_user_facts).
+        
         Args:
             user_id: User ID
             message: Message to extract facts from
@@ -111,24 +114,27 @@ class FactExtractor:
             if not extraction.has_facts:
                 return []
             
-            # Store each fact using upsert logic (v0.4)
-            stored_facts = []
-            for fact in extraction.facts:
-                fact_content = fact.to_content()
-                
-                # Use upsert method which handles validation, dedup, and capping
-                success = await self.store_user_fact_upsert(
-                    user_id=user_id,
-                    fact_content=fact_content,
-                    fact_type=fact.fact_type.value,
-                    confidence=fact.confidence,
-                    session_id=session_id
-                )
-                
-                if success:
-                    stored_facts.append(fact)
+            selected = self.select_facts(extraction.facts)
+            if not selected:
+                return []
+            
+            # One embedding request and one upsert transaction for all facts
+            embeddings = await self._embeddings.aembed_documents(
+                [fact.to_content() for fact, _ in selected]
+            )
+            fact_memories = self.build_fact_memories(user_id, selected, embeddings, session_id)
             
-            logger.info(f"Extracted and stored {len(stored_facts)} facts for user {user_id}")
+            counts = self._repository.upsert_user_facts(
+                user_id=user_id,
+                facts=fact_memories,
+                similarity_threshold=settings.fact_similarity_threshold,
+                max_facts=self.MAX_USER_FACTS
+            )
+            if counts is None:
+                return []
+            
+            stored_facts = [fact for fact, _ in selected]
+            logger.info(f"Extracted and stored {len(stored_facts)} facts for user {user_id}: {counts}")
             return stored_facts
             
         except RuntimeError as e:
@@ -166,7 +172,7 @@ class FactExtractor:
         
         try:
             prompt = self._build_fact_extraction_prompt(message)
-            response = await self._llm.ainvoke(prompt)
+            response = await scheduled_ainvoke(self._llm, prompt, priority=LLMPriority.BACKGROUND)
             
             # SOTA FIX: Handle Gemini 2.5 Flash content block format
             from app.services.output_processor import extract_thinking_from_response
@@ -290,6 +296,65 @@ class FactExtractor:
             logger.error(f"Failed to store/update user fact: {e}")
             return False
     
+    def select_facts(self, facts: List[UserFact]) -> List[Tuple[UserFact, str]]:
+        """
+        Validate extracted facts for batched storage.
+        
+        Drops invalid/ignored fact types and keeps only the last fact per
+        validated type, matching what sequential upserts would leave behind.
+        
+        Args:
+            facts: Extracted UserFact objects
+            
+        Returns:
+            (fact, validated_type) pairs in extraction order
+        """
+        by_type = {}
+        for fact in facts:
+            validated_type = self._validate_fact_type(fact.fact_type.value)
+            if validated_type is None:
+                logger.debug(f"Fact type '{fact.fact_type.value}' is invalid/ignored, skipping storage")
+                continue
+            by_type.pop(validated_type, None)
+            by_type[validated_type] = fact
+        return [(fact, fact_type) for fact_type, fact in by_type.items()]
+    
+    def build_fact_memories(
+        self,
+        user_id: str,
+        selected: List[Tuple[UserFact, str]],
+        embeddings: List[List[float]],
+        session_id: Optional[str] = None
+    ) -> List[SemanticMemoryCreate]:
+        """
+        Build USER_FACT memories from select_facts() output and their embeddings.
+        
+        Args:
+            user_id: User ID
+            selected: (fact, validated_type) pairs
+            embeddings: One embedding per selected fact, same order
+            session_id: Optional session ID
+            
+        Returns:
+            SemanticMemoryCreate objects ready for upsert_user_facts()
+        """
+        return [
+            SemanticMemoryCreate(
+                user_id=user_id,
+                content=fact.to_content(),
+                embedding=embedding,
+                memory_type=MemoryType.USER_FACT,
+                importance=fact.confidence,
+                metadata={
+                    "fact_type": fact_type,
+                    "confidence": fact.confidence,
+                    "source": "explicit_save"
+                },
+                session_id=session_id
+            )
+            for (fact, fact_type), embedding in zip(selected, embeddings)
+        ]
+    
     async def store_as_triple(
         self,
         user_id: str,
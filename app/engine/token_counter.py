@@ -0,0 +1,183 @@
+"""
+Token Counter - Shared tokenizer and token-counting service.
+
+Token counts were computed ad hoc: SemanticMemoryEngine.count_tokens called
+tiktoken.get_encoding() on every invocation (a BPE file load, and a
+download attempt per call when offline), while context, compression and
+scheduler code each used their own ``len(text) // 4``. One service now:
+
+- Loads the tiktoken encoder ONCE (lazily, thread-safe); if it cannot be
+  loaded, the failure is remembered and counts fall back to the estimate
+- Counts batches with one encode_ordinary_batch call for the cache misses
+- Caches counts of immutable strings (memories, chunks) in a bounded LRU
+  keyed by (length, hash) so the cached texts themselves are not retained
+- Gives a cheap, Gemini-calibrated estimate: Gemini's SentencePiece
+  vocabulary encodes a Vietnamese syllable in ~1-2 tokens where cl100k
+  needs 2-4, so non-ASCII words are counted per word, ASCII text per
+  TOKEN_ESTIMATE_CHARS_PER_TOKEN characters
+
+Usage:
+    from app.engine.token_counter import get_token_counter
+
+    counter = get_token_counter()
+    counter.count(memory.content, cache=True)     # tiktoken cl100k count
+    counter.count_many(chunk_texts)               # batch, cached
+    counter.estimate(prompt)                      # Gemini-calibrated, no tokenizer
+
+Feature: token-counter
+"""
+
+import logging
+import math
+import re
+import threading
+from typing import Iterable, List, Optional
+
+from app.cache.lru_cache import LRUCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# A word containing at least one non-ASCII character (Vietnamese syllable, etc.)
+_NON_ASCII_WORD = re.compile(r"\S*[^\x00-\x7f]\S*")
+
+
+class TokenCounter:
+    """
+    Shared token counter: one encoder, cached counts, calibrated estimates.
+
+    ``count`` / ``count_many`` return tiktoken counts (cl100k_base), or the
+    estimate when tiktoken is unavailable. ``estimate`` never tokenizes.
+    """
+
+    ENCODING_NAME = "cl100k_base"
+
+    def __init__(
+        self,
+        encoding_name: Optional[str] = None,
+        cache_size: Optional[int] = None,
+        chars_per_token: Optional[float] = None,
+        tokens_per_non_ascii_word: Optional[float] = None
+    ):
+        """
+        Args:
+            encoding_name: tiktoken encoding (default cl100k_base)
+            cache_size: Max cached counts (default TOKEN_COUNTER_CACHE_SIZE)
+            chars_per_token: ASCII characters per token for the estimate
+            tokens_per_non_ascii_word: Tokens per non-ASCII word for the estimate
+        """
+        self._encoding_name = encoding_name or self.ENCODING_NAME
+        self._chars_per_token = chars_per_token or settings.token_estimate_chars_per_token
+        self._tokens_per_non_ascii_word = (
+            tokens_per_non_ascii_word or settings.token_estimate_tokens_per_non_ascii_word
+        )
+        self._cache = LRUCache(
+            "token_counter.counts",
+            max_size=cache_size or settings.token_counter_cache_size
+        )
+        self._encoder = None
+        self._encoder_failed = False
+        self._lock = threading.Lock()
+
+    @property
+    def encoder(self):
+        """The tiktoken encoder, loaded once; None if it cannot be loaded."""
+        if self._encoder is None and not self._encoder_failed:
+            with self._lock:
+                if self._encoder is None and not self._encoder_failed:
+                    try:
+                        import tiktoken
+                        self._encoder = tiktoken.get_encoding(self._encoding_name)
+                        logger.info(f"[TOKENS] Loaded tiktoken encoding {self._encoding_name}")
+                    except Exception as e:
+                        self._encoder_failed = True
+                        logger.warning(f"[TOKENS] tiktoken unavailable, using estimates: {e}")
+        return self._encoder
+
+    def count(self, text: str, cache: bool = False) -> int:
+        """
+        Count tokens in one text.
+
+        Args:
+            text: Text to count
+            cache: Cache the count (only for immutable strings such as
+                stored memories or document chunks)
+
+        Returns:
+            Token count
+        """
+        if not text:
+            return 0
+        if cache:
+            return self.count_many([text])[0]
+        return self._encode_counts([text])[0]
+
+    def count_many(self, texts: Iterable[str], cache: bool = True) -> List[int]:
+        """
+        Count tokens for several texts; misses are encoded in one batch call.
+
+        Args:
+            texts: Texts to count
+            cache: Read and store counts in the shared cache
+
+        Returns:
+            Token counts in input order
+        """
+        texts = list(texts)
+        if not cache:
+            return self._encode_counts(texts)
+
+        keys = [(len(text), hash(text)) for text in texts]
+        counts = [self._cache.get(key) for key in keys]
+        missing = [i for i, count in enumerate(counts) if count is None]
+        if missing:
+            for i, count in zip(missing, self._encode_counts([texts[i] for i in missing])):
+                counts[i] = count
+                self._cache.set(keys[i], count)
+        return counts
+
+    def estimate(self, text: str) -> int:
+        """
+        Gemini-calibrated token estimate without running a tokenizer.
+
+        Non-ASCII words (Vietnamese syllables) cost
+        TOKEN_ESTIMATE_TOKENS_PER_NON_ASCII_WORD each; all other characters
+        cost 1 / TOKEN_ESTIMATE_CHARS_PER_TOKEN.
+        """
+        if not text:
+            return 0
+        non_ascii_words = _NON_ASCII_WORD.findall(text)
+        other_chars = len(text) - sum(len(word) for word in non_ascii_words)
+        return math.ceil(
+            other_chars / self._chars_per_token
+            + len(non_ascii_words) * self._tokens_per_non_ascii_word
+        )
+
+    def estimate_many(self, texts: Iterable[str]) -> int:
+        """Total estimate for several texts."""
+        return sum(self.estimate(text) for text in texts)
+
+    def _encode_counts(self, texts: List[str]) -> List[int]:
+        """tiktoken counts (one batch call), or estimates without an encoder."""
+        encoder = self.encoder
+        if encoder is None:
+            return [self.estimate(text) for text in texts]
+        try:
+            if len(texts) == 1:
+                return [len(encoder.encode_ordinary(texts[0]))]
+            return [len(tokens) for tokens in encoder.encode_ordinary_batch(texts)]
+        except Exception as e:
+            logger.warning(f"[TOKENS] Token counting failed, using estimates: {e}")
+            return [self.estimate(text) for text in texts]
+
+
+# Singleton instance
+_token_counter: Optional[TokenCounter] = None
+
+
+def get_token_counter() -> TokenCounter:
+    """Get or create the shared TokenCounter."""
+    global _token_counter
+    if _token_counter is None:
+        _token_counter = TokenCounter()
+    return _token_counter
@@ -77,6 +77,10 @@ from app.engine.tools import (
     tool_list_memories,
     tool_clear_all_memories
 )
+from app.engine.llm_scheduler import scheduled_ainvoke
+from app.engine.agentic_rag.adaptive_token_budget import get_adaptive_token_budget
+from app.engine.context_packer import ContextSegment, get_context_packer
+from app.engine.token_counter import get_token_counter
 
 logger = logging.getLogger(__name__)
 
@@ -335,7 +339,8 @@ class UnifiedAgent:
         name_usage_count: int = 0,
         total_responses: int = 0,
         pronoun_style: Optional[Dict[str, str]] = None,
-        conversation_context: Optional[Any] = None  # CHỈ THỊ SỐ 21: Deep Reasoning
+        conversation_context: Optional[Any] = None,  # CHỈ THỊ SỐ 21: Deep Reasoning
+        lms_course: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Process a message using Manual ReAct pattern.
@@ -351,6 +356,8 @@ class UnifiedAgent:
         CHỈ THỊ SỐ 21: Deep Reasoning
         - conversation_context: ConversationContext với incomplete topics và proactive hints
         
+        lms_course: Current LMS course name (per-user part of the system prompt)
+        
         Note: Tool calling is handled by LLM via SYSTEM_PROMPT guidance.
         The LLM decides when to call tools based on the persona configuration.
         """
@@ -384,7 +391,8 @@ class UnifiedAgent:
                 name_usage_count=name_usage_count,
                 total_responses=total_responses,
                 pronoun_style=pronoun_style,  # CHỈ THỊ SỐ 20
-                conversation_context=conversation_context  # CHỈ THỊ SỐ 21
+                conversation_context=conversation_context,  # CHỈ THỊ SỐ 21
+                lms_course=lms_course
             )
             
             # Let LLM decide when to call tools via ReAct pattern
@@ -414,7 +422,8 @@ class UnifiedAgent:
         name_usage_count: int = 0,
         total_responses: int = 0,
         pronoun_style: Optional[Dict[str, str]] = None,
-        conversation_context: Optional[Any] = None  # CHỈ THỊ SỐ 21
+        conversation_context: Optional[Any] = None,  # CHỈ THỊ SỐ 21
+        lms_course: Optional[str] = None
     ) -> List:
         """
         Build message list with SystemMessage for ReAct.
@@ -446,7 +455,8 @@ class UnifiedAgent:
                     is_follow_up=is_follow_up,
                     name_usage_count=name_usage_count,
                     total_responses=total_responses,
-                    pronoun_style=pronoun_style  # CHỈ THỊ SỐ 20
+                    pronoun_style=pronoun_style,  # CHỈ THỊ SỐ 20
+                    lms_course=lms_course
                 )
                 logger.debug(f"[PromptLoader] Built dynamic prompt for role={user_role}, user={user_name}, follow_up={is_follow_up}, pronoun={pronoun_style}")
             except Exception as e:
@@ -483,12 +493,38 @@ class UnifiedAgent:
         messages = [SystemMessage(content=system_prompt)]
         
         if conversation_history:
-            for msg in conversation_history[-10:]:
-                role, content = msg.get("role", ""), msg.get("content", "")
-                if role == "user":
-                    messages.append(HumanMessage(content=content))
-                elif role == "assistant":
-                    messages.append(AIMessage(content=content))
+            # Last 10 messages, packed into the turn's context budget. Only a
+            # contiguous newest-first run is kept (the oldest kept message may
+            # be truncated), so turns never come out of order. Short follow-ups
+            # get a MINIMAL budget from the query heuristic; history has a floor.
+            recent = [
+                msg for msg in conversation_history[-10:]
+                if msg.get("role", "") in ("user", "assistant")
+            ]
+            budget = max(
+                get_adaptive_token_budget().get_budget(message).context_tokens,
+                settings.context_history_min_tokens
+            )
+            counter = get_token_counter()
+            segments: List[ContextSegment] = []
+            used = 0
+            for age, msg in enumerate(reversed(recent)):
+                segment = ContextSegment(
+                    msg.get("content", ""),
+                    kind=msg["role"],
+                    priority=1.0 - 0.05 * age,
+                    keep="tail"
+                )
+                segments.insert(0, segment)
+                used += counter.estimate(segment.text)
+                if used >= budget:
+                    break  # Oldest kept message is truncated (or dropped) by the packer
+            packed = get_context_packer().pack(segments, budget, label="unified_history")
+            for segment in packed.segments:
+                if segment.kind == "user":
+                    messages.append(HumanMessage(content=segment.text))
+                else:
+                    messages.append(AIMessage(content=segment.text))
         
         messages.append(HumanMessage(content=message))
         return messages
@@ -520,7 +556,7 @@ class UnifiedAgent:
             
             # Call LLM with tools
             tracer.start_step(StepNames.GENERATION, f"LLM Iteration {iteration + 1}")
-            response = await self._llm_with_tools.ainvoke(messages)
+            response = await scheduled_ainvoke(self._llm_with_tools, messages)
             tool_calls = getattr(response, 'tool_calls', [])
             
             logger.debug(f"[ReAct] Tool calls: {len(tool_calls)}")
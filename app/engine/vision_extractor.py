@@ -11,6 +11,7 @@ MIGRATION NOTE (12/2025):
 - Migrated from google-generativeai (deprecated 31/8/2025) to google-genai SDK
 - google-genai>=1.53.0 provides unified API for embeddings + vision
 """
+import asyncio
 import logging
 import re
 import time
@@ -22,6 +23,8 @@ from google import genai
 from google.genai import types
 from PIL import Image
 
+from app.cache.ingestion_cache import KIND_VISION, content_hash, get_ingestion_cache, prompt_version
+from app.core.api_rate_limiter import get_api_rate_limiter
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -73,10 +76,6 @@ OUTPUT FORMAT:
 - Sử dụng bullet points cho danh sách
 - Mô tả hình ảnh trong block [Hình: ...]"""
 
-    # Rate limiting
-    MAX_REQUESTS_PER_MINUTE = 10
-    REQUEST_INTERVAL = 60.0 / MAX_REQUESTS_PER_MINUTE  # 6 seconds between requests
-    
     def __init__(
         self,
         model: Optional[str] = None,
@@ -95,7 +94,9 @@ OUTPUT FORMAT:
         
         # Initialize google-genai client (new unified SDK)
         self._client = None
-        self._last_request_time = 0.0
+        
+        # Shared async token bucket (settings.vision_requests_per_minute)
+        self._rate_limiter = get_api_rate_limiter("vision")
     
     @property
     def client(self) -> genai.Client:
@@ -104,14 +105,11 @@ OUTPUT FORMAT:
             self._client = genai.Client(api_key=self.api_key)
         return self._client
     
-    def _rate_limit(self):
-        """Apply rate limiting between requests"""
-        elapsed = time.time() - self._last_request_time
-        if elapsed < self.REQUEST_INTERVAL:
-            sleep_time = self.REQUEST_INTERVAL - elapsed
-            logger.debug(f"Rate limiting: sleeping {sleep_time:.2f}s")
-            time.sleep(sleep_time)
-        self._last_request_time = time.time()
+    async def _rate_limit(self):
+        """Apply rate limiting between requests (awaits, never blocks the loop)"""
+        waited = await self._rate_limiter.acquire()
+        if waited:
+            logger.debug(f"Rate limiting: waited {waited:.2f}s")
     
     async def extract_from_url(self, image_url: str) -> ExtractionResult:
         """
@@ -127,10 +125,10 @@ OUTPUT FORMAT:
         
         try:
             # Apply rate limiting
-            self._rate_limit()
+            await self._rate_limit()
             
             # Generate content from image URL using new SDK
-            response = self.client.models.generate_content(
+            response = await self.client.aio.models.generate_content(
                 model=self.model_name,
                 contents=[
                     types.Content(
@@ -178,17 +176,28 @@ OUTPUT FORMAT:
         """
         start_time = time.time()
         
+        # Persistent result cache: same pixels + model + prompt = same extraction
+        cache = get_ingestion_cache()
+        
         try:
+            if cache:
+                # Pixel hashing and SQLite reads run off the event loop
+                cache_key = await asyncio.to_thread(self.cache_key, image)
+                cached = await cache.aget(KIND_VISION, cache_key)
+                if cached is not None:
+                    result = self._analyze_extraction(cached["text"])
+                    result.processing_time = time.time() - start_time
+                    logger.info(f"Vision cache HIT: {len(result.text)} chars, no API call")
+                    return result
+            
             # Apply rate limiting
-            self._rate_limit()
+            await self._rate_limit()
             
-            # Convert PIL Image to bytes for new SDK
-            buffer = io.BytesIO()
-            image.save(buffer, format="JPEG", quality=85)
-            image_bytes = buffer.getvalue()
+            # Convert PIL Image to bytes for new SDK (CPU-bound, off the loop)
+            image_bytes = await asyncio.to_thread(self._encode_jpeg, image)
             
             # Generate content from image bytes using new SDK
-            response = self.client.models.generate_content(
+            response = await self.client.aio.models.generate_content(
                 model=self.model_name,
                 contents=[
                     types.Content(
@@ -212,6 +221,9 @@ OUTPUT FORMAT:
                 f"tables={result.has_tables}, diagrams={result.has_diagrams}"
             )
             
+            if cache and text:
+                await cache.aput(KIND_VISION, cache_key, {"text": text, "model": self.model_name})
+            
             return result
             
         except Exception as e:
@@ -223,6 +235,27 @@ OUTPUT FORMAT:
                 processing_time=time.time() - start_time
             )
     
+    @staticmethod
+    def _encode_jpeg(image: Image.Image) -> bytes:
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=85)
+        return buffer.getvalue()
+    
+    def cache_key(self, image: Image.Image) -> str:
+        """
+        Content-addressed cache key for an image extraction.
+        
+        Hashes raw pixels (independent of JPEG encoder details) together
+        with model name and extraction prompt version.
+        """
+        return content_hash(
+            self.model_name,
+            prompt_version(self.MARITIME_EXTRACTION_PROMPT),
+            image.mode,
+            image.size,
+            image.tobytes()
+        )
+    
     def _analyze_extraction(self, text: str) -> ExtractionResult:
         """
         Analyze extracted text for tables, diagrams, and headings.
@@ -4,6 +4,7 @@ Requirements: 1.1
 
 Clean Architecture + Agentic RAG + Long-term Memory
 """
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
@@ -125,6 +126,57 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # This eliminates ~10 additional LLM instance creations
     logger.info("ℹ️ ChatService will initialize on first request (memory optimized)")
     
+    # 4. LMS event outbox worker (Feature: lms-event-outbox)
+    #    Flushes queued AI events to LMS_CALLBACK_URL in batches
+    outbox_stop = asyncio.Event()
+    outbox_task = None
+    if settings.lms_callback_url and settings.lms_outbox_enabled:
+        try:
+            from app.services.event_outbox_worker import get_event_outbox_worker
+            outbox_worker = get_event_outbox_worker()
+            if outbox_worker.repository.is_available():
+                outbox_task = asyncio.create_task(outbox_worker.run(outbox_stop))
+                logger.info("✅ LMS event outbox worker started")
+            else:
+                logger.warning("⚠️ LMS event outbox unavailable, events will be sent inline")
+        except Exception as e:
+            logger.warning(f"⚠️ LMS event outbox worker failed to start: {e}")
+    
+    # 5. Memory write queue (Feature: memory-write-queue)
+    #    Post-turn insight/fact extraction, summarization and profile stats
+    memory_queue = None
+    if settings.memory_queue_enabled:
+        try:
+            from app.services.memory_write_queue import get_memory_write_queue
+            memory_queue = get_memory_write_queue()
+            if not memory_queue.inline and not memory_queue.repository.is_available():
+                logger.warning("⚠️ memory_write_queue table unavailable, processing memory writes in the API")
+                memory_queue.inline = True
+            memory_queue.start()
+            logger.info(
+                f"✅ Memory write queue started "
+                f"({'inline' if memory_queue.inline else 'spilling to scripts/memory_worker.py'})"
+            )
+        except Exception as e:
+            memory_queue = None
+            logger.warning(f"⚠️ Memory write queue failed to start, using BackgroundTasks: {e}")
+    
+    # 6. Cross-process cache invalidation (Feature: semantic-cache)
+    #    Drops caches of documents re-ingested by scripts/ingestion_worker.py
+    cache_sync_stop = asyncio.Event()
+    cache_sync_task = None
+    if settings.document_cache_sync_enabled:
+        try:
+            from app.services.document_cache_sync import get_document_cache_sync
+            cache_sync = get_document_cache_sync()
+            if cache_sync.repository.is_available():
+                cache_sync_task = asyncio.create_task(cache_sync.run(cache_sync_stop))
+                logger.info("✅ Document cache sync started")
+            else:
+                logger.warning("⚠️ document_cache_versions unavailable, re-ingested documents rely on cache TTLs")
+        except Exception as e:
+            logger.warning(f"⚠️ Document cache sync failed to start: {e}")
+    
     logger.info(f"🚀 {settings.app_name} started successfully")
     
     yield
@@ -132,6 +184,40 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # Shutdown - Close Neo4j driver explicitly (Requirements: 2.1, 2.2)
     logger.info("Shutting down Maritime AI Service...")
     
+    # Stop the outbox worker after its current batch (undelivered events stay queued)
+    if outbox_task is not None:
+        outbox_stop.set()
+        try:
+            await asyncio.wait_for(outbox_task, timeout=15)
+            from app.services.event_callback_service import get_event_callback_service
+            await get_event_callback_service().close()
+            logger.info("✅ LMS event outbox worker stopped")
+        except Exception as e:
+            logger.error(f"❌ Failed to stop LMS event outbox worker: {e}")
+    
+    if cache_sync_task is not None:
+        cache_sync_stop.set()
+        try:
+            await asyncio.wait_for(cache_sync_task, timeout=5)
+            logger.info("✅ Document cache sync stopped")
+        except Exception as e:
+            logger.error(f"❌ Failed to stop document cache sync: {e}")
+    
+    # Finish in-flight memory batches; queued turns spill to memory_write_queue
+    if memory_queue is not None:
+        try:
+            await memory_queue.stop()
+            logger.info("✅ Memory write queue stopped")
+        except Exception as e:
+            logger.error(f"❌ Failed to stop memory write queue: {e}")
+    
+    # Write pending insight last_accessed batches before the DB engine closes
+    try:
+        from app.engine.semantic_memory import flush_access_trackers
+        await flush_access_trackers()
+    except Exception as e:
+        logger.error(f"❌ Failed to flush insight access batches: {e}")
+    
     if neo4j_repo is not None:
         try:
             neo4j_repo.close()
@@ -182,6 +182,7 @@ class SemanticMemoryCreate(BaseModel):
     importance: float = Field(default=0.5, ge=0.0, le=1.0)
     metadata: Dict[str, Any] = Field(default_factory=dict)
     session_id: Optional[str] = None
+    token_count: Optional[int] = None  # Stored for per-session token sums (None = estimate)
     
     @field_validator("content")
     @classmethod
@@ -206,6 +207,7 @@ class SemanticMemorySearchResult(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
     created_at: datetime
     updated_at: Optional[datetime] = None  # Added for insights
+    last_accessed: Optional[datetime] = None  # Set by insight ranking
     
     class Config:
         from_attributes = True
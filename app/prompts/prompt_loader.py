@@ -11,6 +11,14 @@ CHỈ THỊ KỸ THUẬT SỐ 20: PRONOUN ADAPTATION
 - AI thích ứng xưng hô theo user
 - Lọc bỏ xưng hô tục tĩu/nhạy cảm
 
+PRECOMPILED PERSONAS
+- Mỗi role được compile thành PersonaTemplate khi load (static prompt prefix,
+  empathy keyword matchers); mỗi request chỉ render phần per-user
+- _shared.yaml được load 1 lần (memoized)
+- Hot-reload: file YAML thay đổi (mtime) -> tự reload, kiểm tra tối đa mỗi
+  PROMPT_RELOAD_CHECK_SECONDS giây
+- Benchmark: python scripts/benchmark_prompt_loader.py
+
 **Feature: maritime-ai-tutor**
 **Spec: CHỈ THỊ KỸ THUẬT SỐ 16, 20**
 """
@@ -18,11 +26,16 @@ CHỈ THỊ KỸ THUẬT SỐ 20: PRONOUN ADAPTATION
 import logging
 import os
 import re
+import time
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
 
 import yaml
 
+from app.core.config import settings
+from app.engine.keyword_matcher import KeywordMatcher
+
 logger = logging.getLogger(__name__)
 
 
@@ -142,6 +155,21 @@ def get_pronoun_instruction(pronoun_style: Optional[Dict[str, str]]) -> str:
     return instruction
 
 
+# Empathy keyword groups checked by detect_empathy_needed(), in order
+EMPATHY_KEYWORD_GROUPS = (
+    ("frustration_keywords", "frustration keyword"),
+    ("basic_needs_keywords", "basic need"),
+    ("work_pressure_keywords", "work pressure"),  # teacher/admin
+)
+
+
+@dataclass(frozen=True)
+class PersonaTemplate:
+    """A role's persona compiled once at load time."""
+    static_prompt: str  # User-independent system prompt prefix
+    empathy_matchers: Tuple[Tuple[str, KeywordMatcher], ...] = ()  # (log label, matcher)
+
+
 class PromptLoader:
     """
     Load and manage persona configurations from YAML files.
@@ -165,6 +193,10 @@ class PromptLoader:
             self._prompts_dir = Path(__file__).parent
         
         self._personas: Dict[str, Dict[str, Any]] = {}
+        self._templates: Dict[str, PersonaTemplate] = {}
+        self._shared_config: Dict[str, Any] = {}
+        self._file_mtimes: Dict[Path, Optional[float]] = {}
+        self._next_reload_check = 0.0
         self._load_personas()
     
     def _load_personas(self) -> None:
@@ -196,58 +228,122 @@ class PromptLoader:
             except Exception as e:
                 logger.warning(f"PromptLoader: Could not list directory: {e}")
         
+        # Mtimes are recorded before each read, so a file written while it is
+        # being read still looks changed on the next check
+        shared_path = self._prompts_dir / "base" / "_shared.yaml"
+        file_mtimes = {shared_path: self._file_mtime(shared_path)}
+        
         # Load shared base config first (for inheritance)
         shared_config = self._load_shared_config()
         
+        personas: Dict[str, Dict[str, Any]] = {}
         loaded_count = 0
         
+        # On hot reload, a file that fails to parse (invalid or half-written)
+        # keeps the persona loaded before it instead of a default / no persona
+        previous = self._personas
+        
         # Load legacy files first
         for role, filename in legacy_files.items():
             filepath = self._prompts_dir / filename
+            file_mtimes[filepath] = self._file_mtime(filepath)
             if filepath.exists():
                 try:
-                    with open(filepath, "r", encoding="utf-8") as f:
-                        self._personas[role] = yaml.safe_load(f)
+                    personas[role] = self._read_yaml(filepath)
                     logger.info(f"✅ Loaded persona for role '{role}' from {filename}")
                     loaded_count += 1
                 except Exception as e:
                     logger.error(f"❌ Failed to load {filename}: {e}")
-                    self._personas[role] = self._get_default_persona()
+                    if role in previous:
+                        logger.warning(f"Keeping previously loaded persona for role '{role}'")
+                        personas[role] = previous[role]
+                    else:
+                        personas[role] = self._get_default_persona()
             else:
                 logger.warning(f"⚠️ Persona file not found: {filepath} - using default")
-                self._personas[role] = self._get_default_persona()
+                personas[role] = self._get_default_persona()
         
         # Load new agent personas with inheritance
         for agent_id, filename in new_agent_files.items():
             filepath = self._prompts_dir / filename
+            file_mtimes[filepath] = self._file_mtime(filepath)
             if filepath.exists():
                 try:
-                    with open(filepath, "r", encoding="utf-8") as f:
-                        agent_config = yaml.safe_load(f)
+                    agent_config = self._read_yaml(filepath)
                     
                     # Apply inheritance from shared config
                     if agent_config.get("extends"):
                         agent_config = self._merge_with_base(agent_config, shared_config)
                     
-                    self._personas[agent_id] = agent_config
+                    personas[agent_id] = agent_config
                     logger.info(f"✅ Loaded agent persona '{agent_id}' from {filename}")
                     loaded_count += 1
                 except Exception as e:
                     logger.error(f"❌ Failed to load {filename}: {e}")
-        
+                    if agent_id in previous:
+                        logger.warning(f"Keeping previously loaded persona for agent '{agent_id}'")
+                        personas[agent_id] = previous[agent_id]
+        
+        # Precompile every role, then swap everything at once so concurrent
+        # requests never see a half-loaded state during hot-reload
+        templates = {role: self._compile_template(persona) for role, persona in personas.items()}
+        
+        self._personas = personas
+        self._templates = templates
+        self._shared_config = shared_config or {}
+        self._file_mtimes = file_mtimes
         logger.info(f"PromptLoader: Loaded {loaded_count} persona files")
     
+    @staticmethod
+    def _read_yaml(path: Path) -> Dict[str, Any]:
+        """Parse a persona YAML file; anything but a mapping is an error."""
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f)
+        if not isinstance(data, dict):
+            raise ValueError(f"expected a mapping, got {type(data).__name__}")
+        return data
+    
+    @staticmethod
+    def _file_mtime(path: Path) -> Optional[float]:
+        """Modification time of a file, None if missing."""
+        try:
+            return path.stat().st_mtime
+        except OSError:
+            return None
+    
+    def _reload_if_changed(self) -> None:
+        """
+        Hot-reload personas when a YAML file changed on disk.
+        
+        Checks file mtimes at most every PROMPT_RELOAD_CHECK_SECONDS
+        (negative disables the check).
+        """
+        interval = settings.prompt_reload_check_seconds
+        if interval < 0:
+            return
+        now = time.monotonic()
+        if now < self._next_reload_check:
+            return
+        self._next_reload_check = now + interval
+        
+        for path, mtime in self._file_mtimes.items():
+            if self._file_mtime(path) != mtime:
+                logger.info(f"PromptLoader: {path.name} changed, reloading personas")
+                self.reload()
+                return
+    
     def _load_shared_config(self) -> Dict[str, Any]:
         """Load shared base configuration for inheritance."""
         shared_path = self._prompts_dir / "base" / "_shared.yaml"
         if shared_path.exists():
             try:
-                with open(shared_path, "r", encoding="utf-8") as f:
-                    config = yaml.safe_load(f)
+                config = self._read_yaml(shared_path)
                 logger.info("✅ Loaded shared base config from base/_shared.yaml")
                 return config
             except Exception as e:
                 logger.error(f"❌ Failed to load shared config: {e}")
+                # Hot reload: keep the shared config loaded before
+                return self._shared_config
         return {}
     
     def _merge_with_base(
@@ -293,8 +389,22 @@ class PromptLoader:
         Returns:
             Persona configuration dict
         """
+        self._reload_if_changed()
         return self._personas.get(role, self._personas.get("student", {}))
     
+    def get_template(self, role: str) -> PersonaTemplate:
+        """
+        Get the precompiled persona template for a role.
+        
+        Unknown roles fall back to the student persona, like get_persona().
+        """
+        self._reload_if_changed()
+        template = self._templates.get(role) or self._templates.get("student")
+        if template is None:
+            template = self._compile_template(self._get_default_persona())
+            self._templates["student"] = template
+        return template
+    
     def _replace_template_variables(
         self,
         text: str,
@@ -344,12 +454,16 @@ class PromptLoader:
         is_follow_up: bool = False,
         name_usage_count: int = 0,
         total_responses: int = 0,
-        pronoun_style: Optional[Dict[str, str]] = None
+        pronoun_style: Optional[Dict[str, str]] = None,
+        lms_course: Optional[str] = None
     ) -> str:
         """
         Build system prompt from persona configuration.
         
         Supports both tutor.yaml and assistant.yaml formats with full YAML structure.
+        The prompt is the role's static prefix (build_static_prompt) followed by
+        the per-user section (build_dynamic_prompt), so Gemini can reuse the
+        cached prefix across users and turns.
         
         Args:
             role: User role (student, teacher, admin)
@@ -361,14 +475,77 @@ class PromptLoader:
             name_usage_count: Number of times user's name has been used
             total_responses: Total number of responses in session
             pronoun_style: Dict with adapted pronoun style (CHỈ THỊ SỐ 20)
+            lms_course: Current LMS course name
             
         Returns:
             Complete system prompt string with template variables replaced
             
         **Validates: Requirements 1.2, 7.1, 7.3, 6.2**
         """
-        persona = self.get_persona(role)
+        static_prompt, dynamic_prompt = self.build_prompt_parts(
+            role,
+            user_name=user_name,
+            conversation_summary=conversation_summary,
+            user_facts=user_facts,
+            recent_phrases=recent_phrases,
+            is_follow_up=is_follow_up,
+            name_usage_count=name_usage_count,
+            total_responses=total_responses,
+            pronoun_style=pronoun_style,
+            lms_course=lms_course
+        )
+        if not dynamic_prompt:
+            return static_prompt
+        return f"{static_prompt}\n{dynamic_prompt}"
+    
+    def build_prompt_parts(self, role: str, **user_context: Any) -> Tuple[str, str]:
+        """
+        Build the system prompt as (static prefix, per-user suffix).
         
+        Callers that add their own static instructions (tool rules, thinking
+        rules) insert them between the two parts to keep the prefix stable.
+        
+        Args:
+            role: User role (student, teacher, admin)
+            **user_context: Keyword arguments of build_dynamic_prompt
+            
+        Returns:
+            Tuple of (static_prompt, dynamic_prompt)
+        """
+        return self.build_static_prompt(role), self.build_dynamic_prompt(role, **user_context)
+    
+    def build_static_prompt(self, role: str) -> str:
+        """
+        Build the user-independent part of the system prompt for a role.
+        
+        Persona, style, reasoning rules, directives, anti-repetition rules,
+        tool usage and few-shot examples. The result is byte-identical for
+        every request of the same role (precompiled at load time), which makes
+        it a reusable prefix for Gemini implicit and explicit context caching.
+        
+        Args:
+            role: User role (student, teacher, admin)
+            
+        Returns:
+            Static system prompt prefix
+        """
+        return self.get_template(role).static_prompt
+    
+    def _compile_template(self, persona: Dict[str, Any]) -> PersonaTemplate:
+        """Compile a persona config into its PersonaTemplate."""
+        empathy_patterns = persona.get('empathy_patterns') or {}
+        empathy_matchers = tuple(
+            (label, KeywordMatcher(empathy_patterns[key]))
+            for key, label in EMPATHY_KEYWORD_GROUPS
+            if empathy_patterns.get(key)
+        )
+        return PersonaTemplate(
+            static_prompt=self._compile_static_prompt(persona),
+            empathy_matchers=empathy_matchers
+        )
+    
+    def _compile_static_prompt(self, persona: Dict[str, Any]) -> str:
+        """Render the static system prompt prefix of a persona (see build_static_prompt)."""
         # Build prompt sections
         sections = []
         
@@ -486,8 +663,9 @@ class PromptLoader:
             if directives.get('dos'):
                 sections.append("\nNÊN LÀM:")
                 for rule in directives['dos']:
-                    # Replace template variables like {{user_name}}
-                    rule = self._replace_template_variables(rule, user_name)
+                    # {{user_name}} stays generic here; the real name is in
+                    # the per-user section at the end of the prompt
+                    rule = self._replace_template_variables(rule)
                     sections.append(f"- {rule}")
             
             if directives.get('donts'):
@@ -504,13 +682,81 @@ class PromptLoader:
                     for rule in rules:
                         sections.append(f"- {rule}")
         
+        # ============================================================
+        # CRITICAL: ANTI-REPETITION RULES (QUAN TRỌNG NHẤT)
+        # ============================================================
+        sections.append("\n" + "="*60)
+        sections.append("⚠️ QUY TẮC BẮT BUỘC - KHÔNG ĐƯỢC VI PHẠM ⚠️")
+        sections.append("="*60)
+        sections.append("1. TUYỆT ĐỐI KHÔNG bắt đầu câu trả lời bằng 'À,' hoặc 'À, ' hoặc 'À '")
+        sections.append("   - Đây là thói quen XẤU, nghe không chuyên nghiệp")
+        sections.append("   - Thay vào đó, bắt đầu trực tiếp bằng tên quy tắc hoặc nội dung")
+        sections.append("2. Khi trả lời nhiều câu hỏi liên tiếp về quy tắc:")
+        sections.append("   - Câu 1: Bắt đầu bằng '**Quy tắc X** - ...' hoặc 'Về vấn đề này...'")
+        sections.append("   - Câu 2: Bắt đầu bằng 'Quy tắc này cũng quan trọng...' hoặc 'Tiếp theo...'")
+        sections.append("   - Câu 3: Bắt đầu bằng 'Nói về **Quy tắc X**...' hoặc 'Chuyển sang...'")
+        sections.append("3. KHÔNG lặp lại cùng một cách mở đầu trong 3 câu liên tiếp")
+        sections.append("="*60)
+        
+        # ============================================================
+        # TOOLS INSTRUCTION (Required for ReAct Agent)
+        # ============================================================
+        sections.append("\n--- SỬ DỤNG CÔNG CỤ (TOOLS) ---")
+        sections.append("- Hỏi về luật hàng hải, quy tắc, tàu biển -> BẮT BUỘC gọi `tool_maritime_search`. ĐỪNG bịa.")
+        sections.append("- User giới thiệu tên/tuổi/trường/nghề -> Gọi `tool_save_user_info` để ghi nhớ.")
+        sections.append("- Cần biết tên user -> Gọi `tool_get_user_info`.")
+        sections.append("- Chào hỏi xã giao, than vãn -> Trả lời trực tiếp, KHÔNG cần tool.")
+        
+        # ============================================================
+        # FEW-SHOT EXAMPLES (from YAML few_shot_examples)
+        # ============================================================
+        examples = persona.get('few_shot_examples', [])
+        if examples:
+            sections.append("\n--- VÍ DỤ CÁCH TRẢ LỜI ---")
+            for ex in examples[:4]:  # Limit to 4 examples
+                context = ex.get('context', '')
+                user_msg = ex.get('user', '')
+                ai_msg = ex.get('ai', '')
+                if user_msg and ai_msg:
+                    sections.append(f"\n[{context}]")
+                    sections.append(f"User: {user_msg}")
+                    sections.append(f"AI: {ai_msg}")
+        
+        return "\n".join(sections)
+    
+    def build_dynamic_prompt(
+        self,
+        role: str,
+        user_name: Optional[str] = None,
+        conversation_summary: Optional[str] = None,
+        user_facts: Optional[List[str]] = None,
+        recent_phrases: Optional[List[str]] = None,
+        is_follow_up: bool = False,
+        name_usage_count: int = 0,
+        total_responses: int = 0,
+        pronoun_style: Optional[Dict[str, str]] = None,
+        lms_course: Optional[str] = None
+    ) -> str:
+        """
+        Build the per-user part of the system prompt (goes after the static prefix).
+        
+        User info from Memory and LMS, conversation summary, variation hints
+        and addressing rules. Arguments as in build_system_prompt().
+        
+        Returns:
+            Per-user prompt suffix (may be empty)
+        """
+        sections = []
+        
         # ============================================================
         # USER CONTEXT (from Memory - CRITICAL for personalization)
         # ============================================================
-        if user_name or user_facts:
+        if user_name or user_facts or lms_course:
             sections.append("\n--- THÔNG TIN NGƯỜI DÙNG (từ Memory) ---")
             if user_name:
                 sections.append(f"- Tên: **{user_name}**")
+            if lms_course:
+                sections.append(f"- Khóa học hiện tại: {lms_course}")
             if user_facts:
                 for fact in user_facts[:5]:  # Limit to 5 facts
                     sections.append(f"- {fact}")
@@ -563,46 +809,6 @@ class PromptLoader:
             sections.append("- Nếu người dùng dùng cách xưng hô khác (mình/cậu, em/anh...) thì THÍCH ỨNG THEO")
             sections.append("- KHÔNG cứng nhắc giữ 'tôi/bạn' nếu user đã đổi cách xưng hô")
         
-        # ============================================================
-        # CRITICAL: ANTI-REPETITION RULES (QUAN TRỌNG NHẤT)
-        # ============================================================
-        sections.append("\n" + "="*60)
-        sections.append("⚠️ QUY TẮC BẮT BUỘC - KHÔNG ĐƯỢC VI PHẠM ⚠️")
-        sections.append("="*60)
-        sections.append("1. TUYỆT ĐỐI KHÔNG bắt đầu câu trả lời bằng 'À,' hoặc 'À, ' hoặc 'À '")
-        sections.append("   - Đây là thói quen XẤU, nghe không chuyên nghiệp")
-        sections.append("   - Thay vào đó, bắt đầu trực tiếp bằng tên quy tắc hoặc nội dung")
-        sections.append("2. Khi trả lời nhiều câu hỏi liên tiếp về quy tắc:")
-        sections.append("   - Câu 1: Bắt đầu bằng '**Quy tắc X** - ...' hoặc 'Về vấn đề này...'")
-        sections.append("   - Câu 2: Bắt đầu bằng 'Quy tắc này cũng quan trọng...' hoặc 'Tiếp theo...'")
-        sections.append("   - Câu 3: Bắt đầu bằng 'Nói về **Quy tắc X**...' hoặc 'Chuyển sang...'")
-        sections.append("3. KHÔNG lặp lại cùng một cách mở đầu trong 3 câu liên tiếp")
-        sections.append("="*60)
-        
-        # ============================================================
-        # TOOLS INSTRUCTION (Required for ReAct Agent)
-        # ============================================================
-        sections.append("\n--- SỬ DỤNG CÔNG CỤ (TOOLS) ---")
-        sections.append("- Hỏi về luật hàng hải, quy tắc, tàu biển -> BẮT BUỘC gọi `tool_maritime_search`. ĐỪNG bịa.")
-        sections.append("- User giới thiệu tên/tuổi/trường/nghề -> Gọi `tool_save_user_info` để ghi nhớ.")
-        sections.append("- Cần biết tên user -> Gọi `tool_get_user_info`.")
-        sections.append("- Chào hỏi xã giao, than vãn -> Trả lời trực tiếp, KHÔNG cần tool.")
-        
-        # ============================================================
-        # FEW-SHOT EXAMPLES (from YAML few_shot_examples)
-        # ============================================================
-        examples = persona.get('few_shot_examples', [])
-        if examples:
-            sections.append("\n--- VÍ DỤ CÁCH TRẢ LỜI ---")
-            for ex in examples[:4]:  # Limit to 4 examples
-                context = ex.get('context', '')
-                user_msg = ex.get('user', '')
-                ai_msg = ex.get('ai', '')
-                if user_msg and ai_msg:
-                    sections.append(f"\n[{context}]")
-                    sections.append(f"User: {user_msg}")
-                    sections.append(f"AI: {ai_msg}")
-        
         return "\n".join(sections)
     
     def get_fact_extraction_hints(self, role: str) -> Dict[str, List[str]]:
@@ -638,8 +844,8 @@ class PromptLoader:
         Returns:
             Thinking instruction string, or default if not found.
         """
-        # Load shared config from _shared.yaml
-        shared_config = self._load_shared_config()
+        self._reload_if_changed()
+        shared_config = self._shared_config
         
         if shared_config and 'thinking' in shared_config:
             thinking_cfg = shared_config['thinking']
@@ -660,7 +866,8 @@ class PromptLoader:
         Returns:
             Empathy instruction string, or empty if not found.
         """
-        shared_config = self._load_shared_config()
+        self._reload_if_changed()
+        shared_config = self._shared_config
         
         if shared_config and 'empathy' in shared_config:
             empathy_cfg = shared_config['empathy']
@@ -683,33 +890,10 @@ class PromptLoader:
             
         **Validates: Requirements 1.2**
         """
-        persona = self.get_persona(role)
-        empathy_patterns = persona.get('empathy_patterns', {})
-        
-        if not empathy_patterns:
-            return False
-        
-        message_lower = message.lower()
-        
-        # Check frustration keywords
-        frustration_keywords = empathy_patterns.get('frustration_keywords', [])
-        for keyword in frustration_keywords:
-            if keyword.lower() in message_lower:
-                logger.debug(f"Empathy needed: frustration keyword '{keyword}' detected")
-                return True
-        
-        # Check basic needs keywords
-        basic_needs = empathy_patterns.get('basic_needs_keywords', [])
-        for keyword in basic_needs:
-            if keyword.lower() in message_lower:
-                logger.debug(f"Empathy needed: basic need '{keyword}' detected")
-                return True
-        
-        # Check work pressure keywords (for teacher/admin)
-        work_pressure = empathy_patterns.get('work_pressure_keywords', [])
-        for keyword in work_pressure:
-            if keyword.lower() in message_lower:
-                logger.debug(f"Empathy needed: work pressure '{keyword}' detected")
+        for label, matcher in self.get_template(role).empathy_matchers:
+            keyword = matcher.first_match(message)
+            if keyword:
+                logger.debug(f"Empathy needed: {label} '{keyword}' detected")
                 return True
         
         return False
@@ -801,8 +985,7 @@ class PromptLoader:
         return empathy_responses.get(empathy_type)
     
     def reload(self) -> None:
-        """Reload all persona files."""
-        self._personas = {}
+        """Reload all persona files (also done automatically when a file changes)."""
         self._load_personas()
         logger.info("Reloaded all persona configurations")
 
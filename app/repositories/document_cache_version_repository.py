@@ -0,0 +1,130 @@
+"""
+Document Cache Version Repository - Cross-process cache invalidation signal.
+
+Ingestion (scripts/ingestion_worker.py) and the API run in different
+processes, and each keeps its own in-memory response, retrieval and
+GraphRAG entity caches. After re-ingesting a document the worker bumps its
+row in ``document_cache_versions``
+(scripts/migrations/create_document_cache_versions_table.sql); API
+processes poll for rows with a version above the last one they saw and
+invalidate their own caches (app/services/document_cache_sync.py).
+
+Feature: semantic-cache
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DocumentCacheVersion:
+    """One row of the document_cache_versions table."""
+    document_id: str
+    content_hash: str
+    version: int
+
+
+class DocumentCacheVersionRepository:
+    """Repository for document_cache_versions (PostgreSQL, SHARED engine)."""
+
+    def __init__(self):
+        """Initialize repository with SHARED database connection."""
+        self._session_factory = None
+        self._available = False
+        self._init_connection()
+
+    def _init_connection(self):
+        """Initialize database connection using SHARED engine."""
+        try:
+            from app.core.database import get_shared_session_factory
+
+            self._session_factory = get_shared_session_factory()
+            with self._session_factory() as session:
+                session.execute(text("SELECT 1 FROM document_cache_versions LIMIT 1"))
+            self._available = True
+            logger.info("Document cache version repository using SHARED database engine")
+        except Exception as e:
+            logger.warning(
+                f"Cross-process cache invalidation unavailable "
+                f"(run create_document_cache_versions_table.sql?): {e}"
+            )
+            self._available = False
+
+    def is_available(self) -> bool:
+        """Check if repository is available."""
+        return self._available
+
+    def bump(self, document_id: str, content_hash: str) -> int:
+        """
+        Record a new edition of a document.
+
+        Returns:
+            The document's new version
+        """
+        with self._session_factory() as session:
+            row = session.execute(
+                text("""
+                    INSERT INTO document_cache_versions (document_id, content_hash, updated_at)
+                    VALUES (:document_id, :content_hash, NOW())
+                    ON CONFLICT (document_id)
+                    DO UPDATE SET content_hash = EXCLUDED.content_hash,
+                                  version = nextval('document_cache_version_seq'),
+                                  updated_at = NOW()
+                    RETURNING version
+                """),
+                {"document_id": document_id, "content_hash": content_hash}
+            ).fetchone()
+            session.commit()
+        return row.version
+
+    def latest_version(self) -> int:
+        """Highest version recorded so far (0 if none)."""
+        with self._session_factory() as session:
+            row = session.execute(
+                text("SELECT COALESCE(MAX(version), 0) AS version FROM document_cache_versions")
+            ).fetchone()
+        return row.version
+
+    def changed_since(
+        self,
+        version: int,
+        lookback_seconds: float = 0.0,
+        limit: int = 500
+    ) -> List[DocumentCacheVersion]:
+        """
+        Documents bumped after ``version``, oldest first.
+
+        Sequence values are taken before commit, so a bump can become
+        visible after a higher version was already read; rows updated in
+        the last ``lookback_seconds`` are returned again to cover that.
+        """
+        with self._session_factory() as session:
+            rows = session.execute(
+                text("""
+                    SELECT document_id, content_hash, version
+                    FROM document_cache_versions
+                    WHERE version > :version
+                    OR updated_at > NOW() - (:lookback * INTERVAL '1 second')
+                    ORDER BY version
+                    LIMIT :limit
+                """),
+                {"version": version, "lookback": lookback_seconds, "limit": limit}
+            ).fetchall()
+        return [DocumentCacheVersion(row.document_id, row.content_hash, row.version) for row in rows]
+
+
+# Singleton instance
+_document_cache_version_repo: Optional[DocumentCacheVersionRepository] = None
+
+
+def get_document_cache_version_repository() -> DocumentCacheVersionRepository:
+    """Get or create DocumentCacheVersionRepository singleton."""
+    global _document_cache_version_repo
+    if _document_cache_version_repo is None:
+        _document_cache_version_repo = DocumentCacheVersionRepository()
+    return _document_cache_version_repo
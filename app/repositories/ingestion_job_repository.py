@@ -0,0 +1,372 @@
+"""
+Ingestion Job Repository - Durable ingestion work queue.
+
+Backs the admin document upload flow with the ``ingestion_jobs`` table
+(scripts/migrations/create_ingestion_jobs_table.sql +
+upgrade_ingestion_jobs_queue.sql) instead of an in-process dict:
+
+- The API enqueues a job and returns immediately
+- Workers (python scripts/ingestion_worker.py) claim jobs with
+  FOR UPDATE SKIP LOCKED, so any number of them can poll concurrently
+- Workers heartbeat on a timer and report page-level progress; jobs
+  whose worker died are re-queued (or failed after max_attempts)
+- Progress, completion and failure only apply while the reporting worker
+  still owns the claim, so a worker whose job was re-queued cannot
+  overwrite the new owner's state
+
+Feature: durable-ingestion-queue
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+JOB_PENDING = "pending"
+JOB_PROCESSING = "processing"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+_JOB_COLUMNS = """
+    id, document_id, filename, status, progress, total_pages, processed_pages,
+    error_message, file_path, options, result, attempts, max_attempts,
+    worker_id, uploaded_by, created_at, started_at, heartbeat_at, completed_at
+"""
+
+
+@dataclass
+class IngestionJob:
+    """One row of the ingestion_jobs queue."""
+    job_id: str
+    document_id: str
+    filename: str
+    status: str
+    file_path: str
+    uploaded_by: str
+    progress: int = 0
+    total_pages: int = 0
+    processed_pages: int = 0
+    error: Optional[str] = None
+    options: Dict[str, Any] = field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+    attempts: int = 0
+    max_attempts: int = 3
+    worker_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    @classmethod
+    def from_row(cls, row) -> "IngestionJob":
+        options = row.options or {}
+        result = row.result
+        if isinstance(options, str):
+            options = json.loads(options)
+        if isinstance(result, str):
+            result = json.loads(result)
+        return cls(
+            job_id=str(row.id),
+            document_id=row.document_id,
+            filename=row.filename,
+            status=row.status,
+            file_path=row.file_path,
+            uploaded_by=row.uploaded_by,
+            progress=row.progress or 0,
+            total_pages=row.total_pages or 0,
+            processed_pages=row.processed_pages or 0,
+            error=row.error_message,
+            options=options,
+            result=result,
+            attempts=row.attempts or 0,
+            max_attempts=row.max_attempts or 0,
+            worker_id=row.worker_id,
+            created_at=row.created_at,
+            started_at=row.started_at,
+            heartbeat_at=row.heartbeat_at,
+            completed_at=row.completed_at,
+        )
+
+
+class IngestionJobRepository:
+    """
+    Repository for the ingestion_jobs queue (PostgreSQL, SHARED engine).
+
+    All methods are short single-statement transactions; claiming is a
+    single UPDATE ... WHERE id = (SELECT ... FOR UPDATE SKIP LOCKED) so two
+    workers can never claim the same job.
+    """
+
+    def __init__(self):
+        """Initialize repository with SHARED database connection."""
+        self._session_factory = None
+        self._available = False
+        self._init_connection()
+
+    def _init_connection(self):
+        """Initialize database connection using SHARED engine."""
+        try:
+            from app.core.database import get_shared_session_factory
+
+            self._session_factory = get_shared_session_factory()
+            with self._session_factory() as session:
+                session.execute(text("SELECT 1 FROM ingestion_jobs LIMIT 1"))
+            self._available = True
+            logger.info("Ingestion job repository using SHARED database engine")
+        except Exception as e:
+            logger.warning(f"Ingestion job repository unavailable (run ingestion_jobs migrations?): {e}")
+            self._available = False
+
+    def is_available(self) -> bool:
+        """Check if repository is available."""
+        return self._available
+
+    def enqueue(
+        self,
+        document_id: str,
+        filename: str,
+        file_path: str,
+        uploaded_by: str,
+        content_hash: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+        max_attempts: int = 3,
+        job_id: Optional[str] = None
+    ) -> IngestionJob:
+        """
+        Add a pending job to the queue.
+
+        Args:
+            document_id: Knowledge base document identifier
+            filename: Original upload filename
+            file_path: PDF location readable by the workers
+            uploaded_by: User ID of the admin
+            content_hash: sha256 of the PDF
+            options: Keyword arguments for ingest_pdf plus worker flags
+            max_attempts: Claims allowed before the job is failed
+            job_id: Pre-generated job ID (default: new UUID)
+
+        Returns:
+            The created job
+        """
+        with self._session_factory() as session:
+            row = session.execute(
+                text(f"""
+                    INSERT INTO ingestion_jobs
+                    (id, document_id, filename, category, status, file_path, content_hash,
+                     uploaded_by, options, max_attempts)
+                    VALUES (:id, :document_id, :filename, 'multimodal', :status, :file_path,
+                            :content_hash, :uploaded_by, CAST(:options AS jsonb), :max_attempts)
+                    RETURNING {_JOB_COLUMNS}
+                """),
+                {
+                    "id": job_id or str(uuid4()),
+                    "document_id": document_id,
+                    "filename": filename,
+                    "status": JOB_PENDING,
+                    "file_path": file_path,
+                    "content_hash": content_hash,
+                    "uploaded_by": uploaded_by,
+                    "options": json.dumps(options or {}),
+                    "max_attempts": max_attempts,
+                }
+            ).fetchone()
+            session.commit()
+        job = IngestionJob.from_row(row)
+        logger.info(f"[INGESTION_QUEUE] Enqueued job {job.job_id} for {document_id}")
+        return job
+
+    def claim_next(self, worker_id: str) -> Optional[IngestionJob]:
+        """
+        Atomically claim the oldest pending job.
+
+        Args:
+            worker_id: Identifier of the claiming worker (host:pid)
+
+        Returns:
+            The claimed job (status processing), or None if the queue is empty
+        """
+        with self._session_factory() as session:
+            row = session.execute(
+                text(f"""
+                    UPDATE ingestion_jobs
+                    SET status = :processing,
+                        worker_id = :worker_id,
+                        attempts = attempts + 1,
+                        started_at = NOW(),
+                        heartbeat_at = NOW(),
+                        error_message = NULL
+                    WHERE id = (
+                        SELECT id FROM ingestion_jobs
+                        WHERE status = :pending
+                        ORDER BY created_at
+                        FOR UPDATE SKIP LOCKED
+                        LIMIT 1
+                    )
+                    RETURNING {_JOB_COLUMNS}
+                """),
+                {"processing": JOB_PROCESSING, "pending": JOB_PENDING, "worker_id": worker_id}
+            ).fetchone()
+            session.commit()
+        return IngestionJob.from_row(row) if row else None
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """
+        Refresh the heartbeat of a job this worker is processing.
+
+        Returns:
+            False if the claim was lost (job re-queued or claimed by another worker)
+        """
+        with self._session_factory() as session:
+            result = session.execute(
+                text("""
+                    UPDATE ingestion_jobs
+                    SET heartbeat_at = NOW()
+                    WHERE id = :id AND worker_id = :worker_id AND status = :processing
+                """),
+                {"id": job_id, "worker_id": worker_id, "processing": JOB_PROCESSING}
+            )
+            session.commit()
+        return result.rowcount > 0
+
+    def update_progress(self, job_id: str, worker_id: str, processed_pages: int, total_pages: int) -> bool:
+        """
+        Record page-level progress (also refreshes the heartbeat).
+
+        Returns:
+            False if the claim was lost
+        """
+        progress = int(processed_pages * 100 / total_pages) if total_pages else 0
+        with self._session_factory() as session:
+            result = session.execute(
+                text("""
+                    UPDATE ingestion_jobs
+                    SET processed_pages = :processed, total_pages = :total,
+                        progress = :progress, heartbeat_at = NOW()
+                    WHERE id = :id AND worker_id = :worker_id AND status = :processing
+                """),
+                {"id": job_id, "worker_id": worker_id, "processing": JOB_PROCESSING,
+                 "processed": processed_pages, "total": total_pages, "progress": min(progress, 100)}
+            )
+            session.commit()
+        return result.rowcount > 0
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any], nodes_created: int = 0) -> bool:
+        """
+        Mark a job completed with its ingestion summary.
+
+        Returns:
+            False if the claim was lost (the job's state was left untouched)
+        """
+        with self._session_factory() as session:
+            updated = session.execute(
+                text("""
+                    UPDATE ingestion_jobs
+                    SET status = :status, progress = 100, result = CAST(:result AS jsonb),
+                        nodes_created = :nodes_created, completed_at = NOW(), heartbeat_at = NOW()
+                    WHERE id = :id AND worker_id = :worker_id AND status = :processing
+                """),
+                {"id": job_id, "worker_id": worker_id, "processing": JOB_PROCESSING,
+                 "status": JOB_COMPLETED, "result": json.dumps(result, default=str),
+                 "nodes_created": nodes_created}
+            )
+            session.commit()
+        return updated.rowcount > 0
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> Optional[str]:
+        """
+        Record a failed attempt.
+
+        The job goes back to pending while attempts remain, otherwise it is
+        failed permanently.
+
+        Returns:
+            The job's new status, or None if the claim was lost
+        """
+        with self._session_factory() as session:
+            row = session.execute(
+                text("""
+                    UPDATE ingestion_jobs
+                    SET status = CASE WHEN attempts < max_attempts THEN :pending ELSE :failed END,
+                        completed_at = CASE WHEN attempts < max_attempts THEN NULL ELSE NOW() END,
+                        error_message = :error,
+                        worker_id = NULL
+                    WHERE id = :id AND worker_id = :worker_id AND status = :processing
+                    RETURNING status
+                """),
+                {"id": job_id, "worker_id": worker_id, "processing": JOB_PROCESSING,
+                 "error": error[:2000], "pending": JOB_PENDING, "failed": JOB_FAILED}
+            ).fetchone()
+            session.commit()
+        return row.status if row else None
+
+    def requeue_stale(self, stale_after_seconds: int) -> int:
+        """
+        Recover jobs whose worker stopped heartbeating (crash, OOM, deploy).
+
+        Returns:
+            Number of jobs re-queued or failed
+        """
+        with self._session_factory() as session:
+            result = session.execute(
+                text("""
+                    UPDATE ingestion_jobs
+                    SET status = CASE WHEN attempts < max_attempts THEN :pending ELSE :failed END,
+                        completed_at = CASE WHEN attempts < max_attempts THEN NULL ELSE NOW() END,
+                        error_message = 'Worker heartbeat lost (' || COALESCE(worker_id, 'unknown') || ')',
+                        worker_id = NULL
+                    WHERE status = :processing
+                    AND heartbeat_at < NOW() - (:stale * INTERVAL '1 second')
+                """),
+                {"pending": JOB_PENDING, "failed": JOB_FAILED, "processing": JOB_PROCESSING,
+                 "stale": stale_after_seconds}
+            )
+            session.commit()
+        if result.rowcount:
+            logger.warning(f"[INGESTION_QUEUE] Recovered {result.rowcount} stale jobs")
+        return result.rowcount
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        """Get a job by ID (None for unknown or malformed IDs)."""
+        try:
+            UUID(job_id)
+        except ValueError:
+            return None
+        with self._session_factory() as session:
+            row = session.execute(
+                text(f"SELECT {_JOB_COLUMNS} FROM ingestion_jobs WHERE id = :id"),
+                {"id": job_id}
+            ).fetchone()
+        return IngestionJob.from_row(row) if row else None
+
+    def list_recent(self, status: Optional[str] = None, limit: int = 50) -> List[IngestionJob]:
+        """Most recent jobs, optionally filtered by status."""
+        where = "WHERE status = :status" if status else ""
+        with self._session_factory() as session:
+            rows = session.execute(
+                text(f"""
+                    SELECT {_JOB_COLUMNS} FROM ingestion_jobs
+                    {where}
+                    ORDER BY created_at DESC
+                    LIMIT :limit
+                """),
+                {"status": status, "limit": limit}
+            ).fetchall()
+        return [IngestionJob.from_row(row) for row in rows]
+
+
+# Singleton instance
+_ingestion_job_repo: Optional[IngestionJobRepository] = None
+
+
+def get_ingestion_job_repository() -> IngestionJobRepository:
+    """Get or create IngestionJobRepository singleton."""
+    global _ingestion_job_repo
+    if _ingestion_job_repo is None:
+        _ingestion_job_repo = IngestionJobRepository()
+    return _ingestion_job_repo
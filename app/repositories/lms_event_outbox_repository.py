@@ -0,0 +1,284 @@
+"""
+LMS Event Outbox Repository - Durable queue for LMS event callbacks.
+
+Backs EventCallbackService with the ``lms_event_outbox`` table
+(scripts/migrations/create_lms_event_outbox_table.sql) instead of one
+fire-and-forget POST per event:
+
+- Events are appended (and coalesced with a pending event of the same
+  dedup key, latest payload wins) so they survive LMS outages and restarts
+- The outbox worker claims due events in batches with
+  FOR UPDATE SKIP LOCKED, so every API replica can flush concurrently
+- Failed events are rescheduled with backoff, then parked as 'dead'
+
+Feature: lms-event-outbox
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_PENDING = "pending"
+OUTBOX_SENDING = "sending"
+OUTBOX_DEAD = "dead"
+
+_OUTBOX_COLUMNS = "id, user_id, event_type, dedup_key, payload, attempts, coalesced_count, created_at"
+
+
+@dataclass
+class OutboxEvent:
+    """One claimed row of the lms_event_outbox table."""
+    event_id: int
+    user_id: str
+    event_type: str
+    dedup_key: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+    coalesced_count: int = 0
+    created_at: Optional[datetime] = None
+
+    @classmethod
+    def from_row(cls, row) -> "OutboxEvent":
+        payload = row.payload or {}
+        if isinstance(payload, str):
+            payload = json.loads(payload)
+        return cls(
+            event_id=row.id,
+            user_id=row.user_id,
+            event_type=row.event_type,
+            dedup_key=row.dedup_key,
+            payload=payload,
+            attempts=row.attempts or 0,
+            coalesced_count=row.coalesced_count or 0,
+            created_at=row.created_at,
+        )
+
+
+class LMSEventOutboxRepository:
+    """
+    Repository for the lms_event_outbox queue (PostgreSQL, SHARED engine).
+
+    All methods are short single-statement transactions (reschedule uses
+    two statements in one transaction).
+    """
+
+    def __init__(self):
+        """Initialize repository with SHARED database connection."""
+        self._session_factory = None
+        self._available = False
+        self._init_connection()
+
+    def _init_connection(self):
+        """Initialize database connection using SHARED engine."""
+        try:
+            from app.core.database import get_shared_session_factory
+
+            self._session_factory = get_shared_session_factory()
+            with self._session_factory() as session:
+                session.execute(text("SELECT 1 FROM lms_event_outbox LIMIT 1"))
+            self._available = True
+            logger.info("LMS event outbox repository using SHARED database engine")
+        except Exception as e:
+            logger.warning(f"LMS event outbox unavailable (run create_lms_event_outbox_table.sql?): {e}")
+            self._available = False
+
+    def is_available(self) -> bool:
+        """Check if repository is available."""
+        return self._available
+
+    def enqueue(self, user_id: str, event_type: str, dedup_key: str, payload: Dict[str, Any]) -> bool:
+        """
+        Append an event, coalescing it into a pending event with the same key.
+
+        Args:
+            user_id: User the event is about
+            event_type: AIEventType value
+            dedup_key: Coalescing key (see EventCallbackService.dedup_key)
+            payload: JSON body to POST to the LMS
+
+        Returns:
+            True if the event was merged into an already pending one
+        """
+        with self._session_factory() as session:
+            row = session.execute(
+                text("""
+                    INSERT INTO lms_event_outbox (user_id, event_type, dedup_key, payload)
+                    VALUES (:user_id, :event_type, :dedup_key, CAST(:payload AS jsonb))
+                    ON CONFLICT (dedup_key) WHERE status = 'pending'
+                    DO UPDATE SET payload = EXCLUDED.payload,
+                                  coalesced_count = lms_event_outbox.coalesced_count + 1
+                    RETURNING coalesced_count
+                """),
+                {
+                    "user_id": user_id,
+                    "event_type": event_type,
+                    "dedup_key": dedup_key[:512],
+                    "payload": json.dumps(payload, default=str),
+                }
+            ).fetchone()
+            session.commit()
+        return bool(row and row.coalesced_count)
+
+    def claim_batch(self, limit: int) -> List[OutboxEvent]:
+        """
+        Atomically claim up to ``limit`` due pending events, oldest first.
+
+        Returns:
+            Claimed events (status sending, attempts incremented)
+        """
+        with self._session_factory() as session:
+            rows = session.execute(
+                text(f"""
+                    UPDATE lms_event_outbox
+                    SET status = :sending, attempts = attempts + 1, locked_at = NOW()
+                    WHERE id IN (
+                        SELECT id FROM lms_event_outbox
+                        WHERE status = :pending AND next_attempt_at <= NOW()
+                        ORDER BY next_attempt_at, id
+                        FOR UPDATE SKIP LOCKED
+                        LIMIT :limit
+                    )
+                    RETURNING {_OUTBOX_COLUMNS}
+                """),
+                {"sending": OUTBOX_SENDING, "pending": OUTBOX_PENDING, "limit": limit}
+            ).fetchall()
+            session.commit()
+        events = [OutboxEvent.from_row(row) for row in rows]
+        events.sort(key=lambda event: event.event_id)
+        return events
+
+    def mark_sent(self, event_ids: List[int]) -> None:
+        """Delete delivered events."""
+        if not event_ids:
+            return
+        with self._session_factory() as session:
+            session.execute(
+                text("DELETE FROM lms_event_outbox WHERE id = ANY(:ids)"),
+                {"ids": list(event_ids)}
+            )
+            session.commit()
+
+    def reschedule(self, event_id: int, error: str, delay_seconds: float) -> bool:
+        """
+        Put a failed event back in the queue after ``delay_seconds``.
+
+        If a newer event with the same key was enqueued meanwhile, it
+        supersedes this one, which is dropped.
+
+        Returns:
+            True if the event was rescheduled, False if it was superseded
+        """
+        with self._session_factory() as session:
+            superseded = session.execute(
+                text("""
+                    DELETE FROM lms_event_outbox o
+                    WHERE o.id = :id AND EXISTS (
+                        SELECT 1 FROM lms_event_outbox p
+                        WHERE p.dedup_key = o.dedup_key AND p.status = :pending
+                    )
+                """),
+                {"id": event_id, "pending": OUTBOX_PENDING}
+            ).rowcount
+            if not superseded:
+                session.execute(
+                    text("""
+                        UPDATE lms_event_outbox
+                        SET status = :pending, locked_at = NULL, last_error = :error,
+                            next_attempt_at = NOW() + (:delay * INTERVAL '1 second')
+                        WHERE id = :id
+                    """),
+                    {"id": event_id, "pending": OUTBOX_PENDING, "error": error[:2000],
+                     "delay": delay_seconds}
+                )
+            session.commit()
+        return not superseded
+
+    def mark_dead(self, event_id: int, error: str) -> None:
+        """Stop retrying an event (kept for inspection)."""
+        with self._session_factory() as session:
+            session.execute(
+                text("""
+                    UPDATE lms_event_outbox
+                    SET status = :dead, locked_at = NULL, last_error = :error
+                    WHERE id = :id
+                """),
+                {"id": event_id, "dead": OUTBOX_DEAD, "error": error[:2000]}
+            )
+            session.commit()
+
+    def requeue_stale(self, stale_after_seconds: int) -> int:
+        """
+        Release events claimed by a worker that died before reporting back.
+
+        Stale claims superseded by a newer pending event are dropped.
+
+        Returns:
+            Number of events released or dropped
+        """
+        params = {"pending": OUTBOX_PENDING, "sending": OUTBOX_SENDING, "stale": stale_after_seconds}
+        stale_filter = "status = :sending AND locked_at < NOW() - (:stale * INTERVAL '1 second')"
+        with self._session_factory() as session:
+            dropped = session.execute(
+                text(f"""
+                    DELETE FROM lms_event_outbox o
+                    WHERE {stale_filter} AND EXISTS (
+                        SELECT 1 FROM lms_event_outbox p
+                        WHERE p.dedup_key = o.dedup_key AND p.status = :pending
+                    )
+                """),
+                params
+            ).rowcount
+            released = session.execute(
+                text(f"""
+                    UPDATE lms_event_outbox
+                    SET status = :pending, locked_at = NULL, next_attempt_at = NOW()
+                    WHERE {stale_filter}
+                """),
+                params
+            ).rowcount
+            session.commit()
+        if dropped or released:
+            logger.warning(f"[LMS_OUTBOX] Recovered {released} stale events ({dropped} superseded)")
+        return dropped + released
+
+    def get_backlog_stats(self) -> Dict[str, Any]:
+        """Queue depth per status and age of the oldest pending event."""
+        with self._session_factory() as session:
+            row = session.execute(
+                text("""
+                    SELECT
+                        COUNT(*) FILTER (WHERE status = 'pending') AS pending,
+                        COUNT(*) FILTER (WHERE status = 'sending') AS sending,
+                        COUNT(*) FILTER (WHERE status = 'dead') AS dead,
+                        COALESCE(SUM(coalesced_count) FILTER (WHERE status = 'pending'), 0) AS coalesced,
+                        EXTRACT(EPOCH FROM NOW() - MIN(created_at) FILTER (WHERE status = 'pending'))
+                            AS oldest_pending_age_seconds
+                    FROM lms_event_outbox
+                """)
+            ).fetchone()
+        age = row.oldest_pending_age_seconds
+        return {
+            "pending": row.pending,
+            "sending": row.sending,
+            "dead": row.dead,
+            "coalesced_pending": int(row.coalesced),
+            "oldest_pending_age_seconds": round(float(age), 3) if age is not None else 0.0,
+        }
+
+
+# Singleton instance
+_lms_event_outbox_repo: Optional[LMSEventOutboxRepository] = None
+
+
+def get_lms_event_outbox_repository() -> LMSEventOutboxRepository:
+    """Get or create LMSEventOutboxRepository singleton."""
+    global _lms_event_outbox_repo
+    if _lms_event_outbox_repo is None:
+        _lms_event_outbox_repo = LMSEventOutboxRepository()
+    return _lms_event_outbox_repo
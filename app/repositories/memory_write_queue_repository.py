@@ -0,0 +1,319 @@
+"""
+Memory Write Queue Repository - Durable spill-over for post-turn memory writes.
+
+Backs MemoryWriteQueue with the ``memory_write_queue`` table
+(scripts/migrations/create_memory_write_queue_table.sql):
+
+- Turns the in-process queue cannot hold (full, shutting down, or
+  MEMORY_QUEUE_INLINE=false) are appended here so they survive restarts
+- Workers claim all due turns of ONE user at a time with
+  FOR UPDATE SKIP LOCKED; a user with a claim in progress is skipped, so
+  every user's turns are processed in order even across processes
+- Failed turns are rescheduled with backoff, then parked as 'dead'
+
+Feature: memory-write-queue
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+QUEUE_PENDING = "pending"
+QUEUE_PROCESSING = "processing"
+QUEUE_DEAD = "dead"
+
+_QUEUE_COLUMNS = "id, user_id, session_id, message, response, attempts, enqueued_at, insights_extracted"
+
+
+@dataclass
+class MemoryTurn:
+    """One chat turn waiting for background memory processing."""
+    user_id: str
+    session_id: Optional[str]
+    message: str
+    response: str
+    enqueued_at: float  # time.time() when the turn finished
+    turn_id: Optional[int] = None  # Row id once spilled to memory_write_queue
+    attempts: int = 0
+    insights_extracted: bool = False  # Set once insights are stored: retries only redo the write
+
+    @classmethod
+    def from_row(cls, row) -> "MemoryTurn":
+        enqueued_at = row.enqueued_at.timestamp() if row.enqueued_at else time.time()
+        return cls(
+            user_id=row.user_id,
+            session_id=row.session_id,
+            message=row.message,
+            response=row.response,
+            enqueued_at=enqueued_at,
+            turn_id=row.id,
+            attempts=row.attempts or 0,
+            insights_extracted=bool(row.insights_extracted),
+        )
+
+
+class MemoryWriteQueueRepository:
+    """
+    Repository for the memory_write_queue table (PostgreSQL, SHARED engine).
+
+    All methods are short single-statement transactions.
+    """
+
+    def __init__(self):
+        """Initialize repository with SHARED database connection."""
+        self._session_factory = None
+        self._available = False
+        self._init_connection()
+
+    def _init_connection(self):
+        """Initialize database connection using SHARED engine."""
+        try:
+            from app.core.database import get_shared_session_factory
+
+            self._session_factory = get_shared_session_factory()
+            with self._session_factory() as session:
+                session.execute(text("SELECT 1 FROM memory_write_queue LIMIT 1"))
+            self._available = True
+            logger.info("Memory write queue repository using SHARED database engine")
+        except Exception as e:
+            logger.warning(f"Memory write queue unavailable (run create_memory_write_queue_table.sql?): {e}")
+            self._available = False
+
+    def is_available(self) -> bool:
+        """Check if repository is available."""
+        return self._available
+
+    def enqueue_many(self, turns: List[MemoryTurn], delay_seconds: float = 0.0, error: Optional[str] = None) -> int:
+        """
+        Append turns in one INSERT, preserving their order (ids ascend).
+
+        Args:
+            turns: Turns to persist (attempts and insights_extracted are carried over)
+            delay_seconds: Make the rows due this many seconds from now
+            error: Last error, when re-queuing failed turns
+
+        Returns:
+            Number of rows inserted
+        """
+        if not turns:
+            return 0
+        with self._session_factory() as session:
+            result = session.execute(
+                text("""
+                    INSERT INTO memory_write_queue
+                    (user_id, session_id, message, response, attempts, enqueued_at, insights_extracted,
+                     last_error, next_attempt_at)
+                    SELECT user_id, session_id, message, response, attempts, enqueued_at, insights_extracted,
+                           :error, NOW() + (:delay * INTERVAL '1 second')
+                    FROM unnest(
+                        CAST(:user_ids AS text[]), CAST(:session_ids AS text[]), CAST(:messages AS text[]),
+                        CAST(:responses AS text[]), CAST(:attempts AS int[]), CAST(:enqueued_at AS timestamptz[]),
+                        CAST(:insights_extracted AS boolean[])
+                    ) WITH ORDINALITY AS rows(user_id, session_id, message, response, attempts, enqueued_at,
+                                              insights_extracted, ord)
+                    ORDER BY ord
+                """),
+                {
+                    "user_ids": [t.user_id for t in turns],
+                    "session_ids": [t.session_id for t in turns],
+                    "messages": [t.message for t in turns],
+                    "responses": [t.response for t in turns],
+                    "attempts": [t.attempts for t in turns],
+                    "enqueued_at": [datetime.fromtimestamp(t.enqueued_at, tz=timezone.utc) for t in turns],
+                    "insights_extracted": [t.insights_extracted for t in turns],
+                    "error": error[:2000] if error else None,
+                    "delay": delay_seconds,
+                }
+            )
+            session.commit()
+        return result.rowcount or 0
+
+    def claim_user_batch(self, limit: int, exclude_users: Optional[List[str]] = None) -> List[MemoryTurn]:
+        """
+        Atomically claim up to ``limit`` pending turns of one user, oldest first.
+
+        The user is the one with the oldest due turn among users that have
+        no claim in progress and are not in ``exclude_users`` (users this
+        process is already handling in memory).
+
+        Returns:
+            Claimed turns in id order (status processing, attempts incremented)
+        """
+        with self._session_factory() as session:
+            rows = session.execute(
+                text(f"""
+                    WITH next_user AS (
+                        SELECT q.user_id FROM memory_write_queue q
+                        WHERE q.status = :pending
+                          AND q.next_attempt_at <= NOW()
+                          AND NOT (q.user_id = ANY(CAST(:exclude_users AS text[])))
+                          AND NOT EXISTS (
+                              SELECT 1 FROM memory_write_queue o
+                              WHERE o.user_id = q.user_id
+                                AND (o.status = :processing OR (o.status = :pending AND o.id < q.id))
+                          )
+                        ORDER BY q.next_attempt_at, q.id
+                        FOR UPDATE SKIP LOCKED
+                        LIMIT 1
+                    )
+                    UPDATE memory_write_queue
+                    SET status = :processing, attempts = attempts + 1, locked_at = NOW()
+                    WHERE id IN (
+                        SELECT id FROM memory_write_queue
+                        WHERE user_id = (SELECT user_id FROM next_user) AND status = :pending
+                        ORDER BY id
+                        FOR UPDATE SKIP LOCKED
+                        LIMIT :limit
+                    )
+                    RETURNING {_QUEUE_COLUMNS}
+                """),
+                {
+                    "pending": QUEUE_PENDING,
+                    "processing": QUEUE_PROCESSING,
+                    "exclude_users": list(exclude_users or []),
+                    "limit": limit,
+                }
+            ).fetchall()
+            session.commit()
+        turns = [MemoryTurn.from_row(row) for row in rows]
+        turns.sort(key=lambda turn: turn.turn_id)
+        return turns
+
+    def complete(self, turn_ids: List[int]) -> None:
+        """Delete processed turns."""
+        if not turn_ids:
+            return
+        with self._session_factory() as session:
+            session.execute(
+                text("DELETE FROM memory_write_queue WHERE id = ANY(:ids)"),
+                {"ids": list(turn_ids)}
+            )
+            session.commit()
+
+    def reschedule(
+        self,
+        turn_ids: List[int],
+        error: str,
+        delay_seconds: float,
+        extracted_ids: Optional[List[int]] = None
+    ) -> None:
+        """
+        Put failed turns back in the queue after ``delay_seconds``.
+
+        ``extracted_ids``: turns whose insights were already stored (the
+        retry skips insight extraction for them).
+        """
+        if not turn_ids:
+            return
+        with self._session_factory() as session:
+            session.execute(
+                text("""
+                    UPDATE memory_write_queue
+                    SET status = :pending, locked_at = NULL, last_error = :error,
+                        next_attempt_at = NOW() + (:delay * INTERVAL '1 second'),
+                        insights_extracted = insights_extracted OR id = ANY(:extracted_ids)
+                    WHERE id = ANY(:ids)
+                """),
+                {
+                    "ids": list(turn_ids),
+                    "extracted_ids": list(extracted_ids or []),
+                    "pending": QUEUE_PENDING,
+                    "error": error[:2000],
+                    "delay": delay_seconds,
+                }
+            )
+            session.commit()
+
+    def mark_dead(self, turn_ids: List[int], error: str) -> None:
+        """Stop retrying turns (kept for inspection)."""
+        if not turn_ids:
+            return
+        with self._session_factory() as session:
+            session.execute(
+                text("""
+                    UPDATE memory_write_queue
+                    SET status = :dead, locked_at = NULL, last_error = :error
+                    WHERE id = ANY(:ids)
+                """),
+                {"ids": list(turn_ids), "dead": QUEUE_DEAD, "error": error[:2000]}
+            )
+            session.commit()
+
+    def requeue_stale(self, stale_after_seconds: int) -> int:
+        """
+        Release turns claimed by a worker that died before reporting back.
+
+        Returns:
+            Number of turns released
+        """
+        with self._session_factory() as session:
+            released = session.execute(
+                text("""
+                    UPDATE memory_write_queue
+                    SET status = :pending, locked_at = NULL, next_attempt_at = NOW()
+                    WHERE status = :processing
+                      AND locked_at < NOW() - (:stale * INTERVAL '1 second')
+                """),
+                {"pending": QUEUE_PENDING, "processing": QUEUE_PROCESSING, "stale": stale_after_seconds}
+            ).rowcount
+            session.commit()
+        if released:
+            logger.warning(f"[MEMORY_QUEUE] Released {released} stale turns")
+        return released
+
+    def users_with_backlog(self, user_ids: List[str]) -> Set[str]:
+        """Subset of ``user_ids`` that still have pending or processing turns."""
+        if not user_ids:
+            return set()
+        with self._session_factory() as session:
+            rows = session.execute(
+                text("""
+                    SELECT DISTINCT user_id FROM memory_write_queue
+                    WHERE user_id = ANY(CAST(:user_ids AS text[]))
+                      AND status IN (:pending, :processing)
+                """),
+                {"user_ids": list(user_ids), "pending": QUEUE_PENDING, "processing": QUEUE_PROCESSING}
+            ).fetchall()
+        return {row.user_id for row in rows}
+
+    def get_backlog_stats(self) -> Dict[str, Any]:
+        """Queue depth per status and age of the oldest pending turn."""
+        with self._session_factory() as session:
+            row = session.execute(
+                text("""
+                    SELECT
+                        COUNT(*) FILTER (WHERE status = 'pending') AS pending,
+                        COUNT(*) FILTER (WHERE status = 'processing') AS processing,
+                        COUNT(*) FILTER (WHERE status = 'dead') AS dead,
+                        COUNT(DISTINCT user_id) FILTER (WHERE status = 'pending') AS pending_users,
+                        EXTRACT(EPOCH FROM NOW() - MIN(enqueued_at) FILTER (WHERE status = 'pending'))
+                            AS oldest_pending_age_seconds
+                    FROM memory_write_queue
+                """)
+            ).fetchone()
+        age = row.oldest_pending_age_seconds
+        return {
+            "pending": row.pending,
+            "processing": row.processing,
+            "dead": row.dead,
+            "pending_users": row.pending_users,
+            "oldest_pending_age_seconds": round(float(age), 3) if age is not None else 0.0,
+        }
+
+
+# Singleton instance
+_memory_write_queue_repo: Optional[MemoryWriteQueueRepository] = None
+
+
+def get_memory_write_queue_repository() -> MemoryWriteQueueRepository:
+    """Get or create MemoryWriteQueueRepository singleton."""
+    global _memory_write_queue_repo
+    if _memory_write_queue_repo is None:
+        _memory_write_queue_repo = MemoryWriteQueueRepository()
+    return _memory_write_queue_repo
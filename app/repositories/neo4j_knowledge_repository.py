@@ -21,7 +21,7 @@ import asyncio
 import logging
 from datetime import datetime
 from functools import wraps
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional
 
 from app.core.config import settings
 from app.models.knowledge_graph import (
@@ -1052,6 +1052,81 @@ class Neo4jKnowledgeRepository:
             logger.error(f"Failed to get entities for document {document_id}: {e}")
             raise  # Let retry decorator handle it
     
+    @neo4j_retry(max_attempts=2, backoff=1.0)
+    async def get_entities_for_documents(
+        self,
+        document_ids: List[str]
+    ) -> Dict[str, List[dict]]:
+        """
+        Get entities for many documents in ONE round-trip (UNWIND).
+        
+        Batched variant of get_document_entities() for GraphRAG result sets.
+        Documents without entities map to an empty list.
+        
+        **Feature: document-kg**
+        """
+        if not document_ids:
+            return {}
+        if not self._available:
+            logger.warning("Neo4j not available for get_entities_for_documents")
+            return {}
+        
+        try:
+            with self._driver.session() as session:
+                cypher = """
+                UNWIND $document_ids AS doc_id
+                OPTIONAL MATCH (e:Entity {document_id: doc_id})
+                WITH doc_id, e
+                ORDER BY e.id
+                RETURN doc_id,
+                       [x IN collect(e) | {
+                           id: x.id, name: x.name, name_vi: x.name_vi,
+                           type: x.type, description: x.description
+                       }] AS entities
+                """
+                result = session.run(cypher, document_ids=list(document_ids))
+                return {record["doc_id"]: list(record["entities"]) for record in result}
+                
+        except Exception as e:
+            logger.error(f"Failed to get entities for {len(document_ids)} documents: {e}")
+            raise  # Let retry decorator handle it
+    
+    async def get_relations_for_entities(
+        self,
+        entity_ids: List[str]
+    ) -> Dict[str, List[dict]]:
+        """
+        Get outgoing relations for many entities in ONE round-trip (UNWIND).
+        
+        Batched variant of get_entity_relations(); like it, returns an empty
+        result on error so graph context degrades instead of failing.
+        
+        **Feature: document-kg**
+        """
+        if not entity_ids:
+            return {}
+        if not self._available:
+            return {}
+        
+        try:
+            with self._driver.session() as session:
+                cypher = """
+                UNWIND $entity_ids AS entity_id
+                MATCH (e:Entity {id: entity_id})-[r]->(t:Entity)
+                RETURN entity_id, type(r) as relation_type, t.id as target_id,
+                       t.name as target_name, t.type as target_type
+                """
+                result = session.run(cypher, entity_ids=list(entity_ids))
+                relations: Dict[str, List[dict]] = {entity_id: [] for entity_id in entity_ids}
+                for record in result:
+                    data = dict(record)
+                    relations.setdefault(data.pop("entity_id"), []).append(data)
+                return relations
+                
+        except Exception as e:
+            logger.error(f"Failed to get relations for {len(entity_ids)} entities: {e}")
+            return {}
+    
     def close(self):
         """Close Neo4j connection."""
         if self._driver:
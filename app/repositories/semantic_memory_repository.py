@@ -16,6 +16,7 @@ from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.engine.token_counter import get_token_counter
 from app.models.semantic_memory import (
     MemoryType,
     Predicate,
@@ -52,6 +53,7 @@ class SemanticMemoryRepository:
         self._engine = None
         self._session_factory = None
         self._initialized = False
+        self._token_count_column: Optional[bool] = None
     
     def _ensure_initialized(self) -> None:
         """Lazy initialization using SHARED database engine."""
@@ -76,6 +78,39 @@ class SemanticMemoryRepository:
             return "[]"
         return f"[{','.join(str(x) for x in embedding)}]"
     
+    UNDEFINED_COLUMN_SQLSTATE = "42703"
+    
+    def _has_token_count_column(self) -> bool:
+        """
+        True once add_semantic_memory_token_count.sql has been applied.
+        
+        Only an undefined-column error caches False; other probe errors
+        (connection drops, timeouts) return False for this call and the
+        column is probed again next time.
+        """
+        if self._token_count_column is None:
+            try:
+                with self._session_factory() as session:
+                    session.execute(text(f"SELECT token_count FROM {self.TABLE_NAME} LIMIT 1"))
+                self._token_count_column = True
+            except Exception as e:
+                if not self._is_undefined_column(e):
+                    logger.warning(f"token_count probe failed, retrying on next write: {e}")
+                    return False
+                logger.warning(
+                    f"semantic_memories.token_count missing (run add_semantic_memory_token_count.sql?), "
+                    f"session token sums will be estimated: {e}"
+                )
+                self._token_count_column = False
+        return self._token_count_column
+    
+    @classmethod
+    def _is_undefined_column(cls, error: Exception) -> bool:
+        """True if a DBAPI error (wrapped by SQLAlchemy or not) is SQLSTATE 42703."""
+        orig = getattr(error, "orig", error)
+        code = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+        return code == cls.UNDEFINED_COLUMN_SQLSTATE
+    
     def save_memory(
         self,
         memory: SemanticMemoryCreate
@@ -94,15 +129,19 @@ class SemanticMemoryRepository:
         self._ensure_initialized()
         
         try:
+            # Token count is maintained on write so session sums never re-tokenize
+            token_column = ", token_count" if self._has_token_count_column() else ""
+            token_value = ", :token_count" if token_column else ""
+            
             with self._session_factory() as session:
                 embedding_str = self._format_embedding(memory.embedding)
                 metadata_json = json.dumps(memory.metadata)
                 
                 query = text(f"""
                     INSERT INTO {self.TABLE_NAME} 
-                    (user_id, content, embedding, memory_type, importance, metadata, session_id)
+                    (user_id, content, embedding, memory_type, importance, metadata, session_id{token_column})
                     VALUES 
-                    (:user_id, :content, CAST(:embedding AS vector), :memory_type, :importance, CAST(:metadata AS jsonb), :session_id)
+                    (:user_id, :content, CAST(:embedding AS vector), :memory_type, :importance, CAST(:metadata AS jsonb), :session_id{token_value})
                     RETURNING id, user_id, content, memory_type, importance, metadata, session_id, created_at, updated_at
                 """)
                 
@@ -113,7 +152,11 @@ class SemanticMemoryRepository:
                     "memory_type": memory.memory_type.value,
                     "importance": memory.importance,
                     "metadata": metadata_json,
-                    "session_id": memory.session_id
+                    "session_id": memory.session_id,
+                    "token_count": (
+                        memory.token_count if memory.token_count is not None
+                        else get_token_counter().count(memory.content, cache=True)
+                    )
                 })
                 
                 row = result.fetchone()
@@ -502,6 +545,200 @@ class SemanticMemoryRepository:
             logger.error(f"Failed to count memories: {e}")
             return 0
     
+    def list_memories(
+        self,
+        user_id: str,
+        memory_types: Optional[List[MemoryType]] = None,
+        session_id: Optional[str] = None,
+        limit: int = 100,
+        newest_first: bool = True
+    ) -> List[SemanticMemorySearchResult]:
+        """
+        List memories by user (and optionally type / session), ordered by time.
+        
+        Plain indexed listing (idx_semantic_memories_user_type_created /
+        idx_semantic_memories_user_session_type): no embedding, no
+        similarity computation.
+        
+        Args:
+            user_id: User ID
+            memory_types: Optional filter by memory types
+            session_id: Optional filter by session (column, not metadata)
+            limit: Maximum number of memories
+            newest_first: Order by created_at DESC (False = chronological)
+            
+        Returns:
+            List of memories (similarity fixed at 1.0)
+        """
+        self._ensure_initialized()
+        
+        try:
+            with self._session_factory() as session:
+                filters = ""
+                params = {"user_id": user_id, "limit": limit}
+                
+                if memory_types:
+                    filters += " AND memory_type = ANY(:memory_types)"
+                    params["memory_types"] = [t.value for t in memory_types]
+                if session_id is not None:
+                    filters += " AND session_id = :session_id"
+                    params["session_id"] = session_id
+                
+                query = text(f"""
+                    SELECT 
+                        id,
+                        content,
+                        memory_type,
+                        importance,
+                        metadata,
+                        created_at,
+                        updated_at
+                    FROM {self.TABLE_NAME}
+                    WHERE user_id = :user_id{filters}
+                    ORDER BY created_at {"DESC" if newest_first else "ASC"}
+                    LIMIT :limit
+                """)
+                
+                rows = session.execute(query, params).fetchall()
+                
+                return [
+                    SemanticMemorySearchResult(
+                        id=row.id,
+                        content=row.content,
+                        memory_type=MemoryType(row.memory_type),
+                        importance=row.importance,
+                        similarity=1.0,
+                        metadata=row.metadata or {},
+                        created_at=row.created_at,
+                        updated_at=row.updated_at
+                    )
+                    for row in rows
+                ]
+                
+        except Exception as e:
+            logger.error(f"Failed to list memories: {e}")
+            return []
+
+    def list_memories_with_embeddings(
+        self,
+        user_id: str,
+        memory_types: Optional[List[MemoryType]] = None,
+        limit: int = 100
+    ) -> List[SemanticMemory]:
+        """
+        List memories newest first together with their stored embeddings.
+
+        Used to build in-memory similarity matrices without re-embedding
+        content that is already in the database.
+
+        Args:
+            user_id: User ID
+            memory_types: Optional filter by memory types
+            limit: Maximum number of memories
+
+        Returns:
+            List of SemanticMemory objects (embedding filled from the vector column)
+        """
+        self._ensure_initialized()
+
+        try:
+            with self._session_factory() as session:
+                filters = ""
+                params = {"user_id": user_id, "limit": limit}
+
+                if memory_types:
+                    filters += " AND memory_type = ANY(:memory_types)"
+                    params["memory_types"] = [t.value for t in memory_types]
+
+                query = text(f"""
+                    SELECT
+                        id,
+                        user_id,
+                        content,
+                        CAST(embedding AS text) AS embedding,
+                        memory_type,
+                        importance,
+                        metadata,
+                        session_id,
+                        created_at,
+                        updated_at
+                    FROM {self.TABLE_NAME}
+                    WHERE user_id = :user_id{filters}
+                    ORDER BY created_at DESC
+                    LIMIT :limit
+                """)
+
+                rows = session.execute(query, params).fetchall()
+
+                return [
+                    SemanticMemory(
+                        id=row.id,
+                        user_id=row.user_id,
+                        content=row.content,
+                        embedding=json.loads(row.embedding) if row.embedding else [],
+                        memory_type=MemoryType(row.memory_type),
+                        importance=row.importance,
+                        metadata=row.metadata or {},
+                        session_id=row.session_id,
+                        created_at=row.created_at,
+                        updated_at=row.updated_at
+                    )
+                    for row in rows
+                ]
+
+        except Exception as e:
+            logger.error(f"Failed to list memories with embeddings: {e}")
+            return []
+
+    def sum_session_tokens(
+        self,
+        user_id: str,
+        session_id: str,
+        memory_type: MemoryType = MemoryType.MESSAGE
+    ) -> int:
+        """
+        Total stored token count of a session's memories.
+        
+        Rows written before token_count existed fall back to a
+        characters / 4 estimate.
+        
+        Args:
+            user_id: User ID
+            session_id: Session ID
+            memory_type: Memory type to sum (default: messages)
+            
+        Returns:
+            Token count (0 on error)
+        """
+        self._ensure_initialized()
+        
+        token_expr = (
+            "COALESCE(token_count, LENGTH(content) / 4)"
+            if self._has_token_count_column() else "LENGTH(content) / 4"
+        )
+        
+        try:
+            with self._session_factory() as session:
+                query = text(f"""
+                    SELECT COALESCE(SUM({token_expr}), 0) AS total
+                    FROM {self.TABLE_NAME}
+                    WHERE user_id = :user_id
+                      AND session_id = :session_id
+                      AND memory_type = :memory_type
+                """)
+                
+                row = session.execute(query, {
+                    "user_id": user_id,
+                    "session_id": session_id,
+                    "memory_type": memory_type.value
+                }).fetchone()
+                
+                return int(row.total) if row else 0
+                
+        except Exception as e:
+            logger.error(f"Failed to sum session tokens: {e}")
+            return 0
+    
     def is_available(self) -> bool:
         """
         Check if the repository is available and connected.
@@ -1011,6 +1248,241 @@ class SemanticMemoryRepository:
             logger.error(f"Failed to delete oldest facts: {e}")
             return 0
     
+    def _insert_memories(self, session, memories: List[SemanticMemoryCreate]) -> int:
+        """Insert many memories with one INSERT ... SELECT FROM unnest(...) statement."""
+        if not memories:
+            return 0
+
+        token_column = ", token_count" if self._has_token_count_column() else ""
+        token_array = ", CAST(:token_counts AS int[])" if token_column else ""
+
+        query = text(f"""
+            INSERT INTO {self.TABLE_NAME}
+            (user_id, content, embedding, memory_type, importance, metadata, session_id{token_column})
+            SELECT
+                user_id, content, CAST(embedding AS vector), memory_type, importance,
+                CAST(metadata AS jsonb), session_id{token_column}
+            FROM unnest(
+                CAST(:user_ids AS text[]), CAST(:contents AS text[]), CAST(:embeddings AS text[]),
+                CAST(:memory_types AS text[]), CAST(:importances AS float8[]),
+                CAST(:metadatas AS text[]), CAST(:session_ids AS text[]){token_array}
+            ) AS rows(user_id, content, embedding, memory_type, importance, metadata, session_id{token_column})
+        """)
+
+        result = session.execute(query, {
+            "user_ids": [m.user_id for m in memories],
+            "contents": [m.content for m in memories],
+            "embeddings": [self._format_embedding(m.embedding) for m in memories],
+            "memory_types": [m.memory_type.value for m in memories],
+            "importances": [m.importance for m in memories],
+            "metadatas": [json.dumps(m.metadata) for m in memories],
+            "session_ids": [m.session_id for m in memories],
+            "token_counts": [
+                m.token_count if m.token_count is not None else get_token_counter().count(m.content, cache=True)
+                for m in memories
+            ]
+        })
+        return result.rowcount or 0
+
+    def _upsert_facts(
+        self,
+        session,
+        user_id: str,
+        facts: List[SemanticMemoryCreate],
+        similarity_threshold: float,
+        max_facts: int
+    ) -> dict:
+        """
+        Upsert USER_FACT memories with one set-based statement, then trim to max_facts.
+
+        Each incoming fact updates the closest existing fact with similarity
+        >= similarity_threshold, else the newest fact with the same
+        metadata.fact_type, else it is inserted. When several incoming facts
+        target the same row, or several new facts share a fact_type, the
+        last one wins.
+        """
+        if not facts:
+            return {"updated": 0, "inserted": 0, "evicted": 0}
+
+        has_token_count = self._has_token_count_column()
+        token_column = ", token_count" if has_token_count else ""
+        token_update = "token_count = u.token_count," if has_token_count else ""
+
+        query = text(f"""
+            WITH incoming AS (
+                SELECT
+                    ord, content, CAST(embedding AS vector) AS embedding, fact_type,
+                    importance, CAST(metadata AS jsonb) AS metadata, token_count
+                FROM unnest(
+                    CAST(:contents AS text[]), CAST(:embeddings AS text[]), CAST(:fact_types AS text[]),
+                    CAST(:importances AS float8[]), CAST(:metadatas AS text[]), CAST(:token_counts AS int[])
+                ) WITH ORDINALITY AS rows(content, embedding, fact_type, importance, metadata, token_count, ord)
+            ),
+            matched AS (
+                SELECT
+                    i.*,
+                    COALESCE(
+                        (
+                            SELECT m.id FROM {self.TABLE_NAME} m
+                            WHERE m.user_id = :user_id
+                              AND m.memory_type = :memory_type
+                              AND m.embedding IS NOT NULL
+                              AND 1 - (m.embedding <=> i.embedding) >= :threshold
+                            ORDER BY m.embedding <=> i.embedding
+                            LIMIT 1
+                        ),
+                        (
+                            SELECT m.id FROM {self.TABLE_NAME} m
+                            WHERE m.user_id = :user_id
+                              AND m.memory_type = :memory_type
+                              AND m.metadata->>'fact_type' = i.fact_type
+                            ORDER BY m.created_at DESC
+                            LIMIT 1
+                        )
+                    ) AS target_id
+                FROM incoming i
+            ),
+            updated AS (
+                UPDATE {self.TABLE_NAME} AS s
+                SET content = u.content,
+                    embedding = u.embedding,
+                    metadata = u.metadata,
+                    {token_update}
+                    updated_at = NOW()
+                FROM (
+                    SELECT DISTINCT ON (target_id) *
+                    FROM matched
+                    WHERE target_id IS NOT NULL
+                    ORDER BY target_id, ord DESC
+                ) AS u
+                WHERE s.id = u.target_id
+                RETURNING s.id
+            ),
+            inserted AS (
+                INSERT INTO {self.TABLE_NAME}
+                (user_id, content, embedding, memory_type, importance, metadata, session_id{token_column})
+                SELECT
+                    :user_id, content, embedding, :memory_type, importance, metadata, :session_id{token_column}
+                FROM (
+                    SELECT DISTINCT ON (COALESCE(fact_type, CAST(ord AS text))) *
+                    FROM matched
+                    WHERE target_id IS NULL
+                    ORDER BY COALESCE(fact_type, CAST(ord AS text)), ord DESC
+                ) AS n
+                RETURNING id
+            )
+            SELECT
+                (SELECT COUNT(*) FROM updated) AS updated,
+                (SELECT COUNT(*) FROM inserted) AS inserted
+        """)
+
+        row = session.execute(query, {
+            "user_id": user_id,
+            "memory_type": MemoryType.USER_FACT.value,
+            "session_id": facts[0].session_id,
+            "threshold": similarity_threshold,
+            "contents": [f.content for f in facts],
+            "embeddings": [self._format_embedding(f.embedding) for f in facts],
+            "fact_types": [f.metadata.get("fact_type") for f in facts],
+            "importances": [f.importance for f in facts],
+            "metadatas": [json.dumps(f.metadata) for f in facts],
+            "token_counts": [
+                f.token_count if f.token_count is not None else get_token_counter().count(f.content, cache=True)
+                for f in facts
+            ]
+        }).fetchone()
+
+        counts = {"updated": int(row.updated), "inserted": int(row.inserted), "evicted": 0}
+
+        if counts["inserted"]:
+            # FIFO eviction beyond the cap, same transaction
+            evict = text(f"""
+                DELETE FROM {self.TABLE_NAME}
+                WHERE id IN (
+                    SELECT id FROM {self.TABLE_NAME}
+                    WHERE user_id = :user_id
+                      AND memory_type = :memory_type
+                    ORDER BY created_at DESC
+                    OFFSET :max_facts
+                )
+            """)
+            result = session.execute(evict, {
+                "user_id": user_id,
+                "memory_type": MemoryType.USER_FACT.value,
+                "max_facts": max_facts
+            })
+            counts["evicted"] = result.rowcount or 0
+
+        return counts
+
+    def upsert_user_facts(
+        self,
+        user_id: str,
+        facts: List[SemanticMemoryCreate],
+        similarity_threshold: float = 0.90,
+        max_facts: int = 50
+    ) -> Optional[dict]:
+        """
+        Upsert many user facts in one transaction.
+
+        Replaces the per-fact find_similar_fact_by_embedding /
+        find_fact_by_type / update_fact / save_memory / delete_oldest_facts
+        sequence with one set-based statement plus one eviction statement.
+
+        Args:
+            user_id: User ID
+            facts: USER_FACT memories (metadata must carry fact_type)
+            similarity_threshold: Minimum similarity for a semantic duplicate
+            max_facts: Memory cap; oldest facts beyond it are deleted
+
+        Returns:
+            {"updated", "inserted", "evicted"} counts, or None on failure
+        """
+        return self.save_turn([], facts, similarity_threshold, max_facts, user_id=user_id)
+
+    def save_turn(
+        self,
+        memories: List[SemanticMemoryCreate],
+        facts: List[SemanticMemoryCreate],
+        similarity_threshold: float = 0.90,
+        max_facts: int = 50,
+        user_id: Optional[str] = None
+    ) -> Optional[dict]:
+        """
+        Persist one conversation turn in a single transaction.
+
+        Round-trips: one multi-row INSERT for memories, one set-based fact
+        upsert, and one eviction DELETE only if new facts were inserted.
+
+        Args:
+            memories: Memories to insert as-is (message + response)
+            facts: USER_FACT memories to upsert (see upsert_user_facts)
+            similarity_threshold: Minimum similarity for a semantic duplicate
+            max_facts: Memory cap for USER_FACT entries
+            user_id: Owner of the facts (defaults to the first memory's user_id)
+
+        Returns:
+            {"memories", "updated", "inserted", "evicted"} counts, or None on failure
+        """
+        self._ensure_initialized()
+
+        if user_id is None and (facts or memories):
+            user_id = (facts or memories)[0].user_id
+
+        try:
+            with self._session_factory() as session:
+                saved = self._insert_memories(session, memories)
+                counts = self._upsert_facts(session, user_id, facts, similarity_threshold, max_facts)
+                session.commit()
+
+                counts["memories"] = saved
+                logger.debug(f"Saved turn for user {user_id}: {counts}")
+                return counts
+
+        except Exception as e:
+            logger.error(f"Failed to save turn: {e}")
+            return None
+
     def get_all_user_facts(
         self,
         user_id: str
@@ -1092,54 +1564,9 @@ class SemanticMemoryRepository:
             
         **Validates: Requirements 4.3, 4.4**
         """
-        self._ensure_initialized()
-        
-        try:
-            with self._session_factory() as session:
-                query = text(f"""
-                    SELECT 
-                        id,
-                        content,
-                        memory_type,
-                        importance,
-                        metadata,
-                        created_at,
-                        updated_at,
-                        1.0 AS similarity
-                    FROM {self.TABLE_NAME}
-                    WHERE user_id = :user_id
-                      AND memory_type = :memory_type
-                    ORDER BY created_at DESC
-                    LIMIT :limit
-                """)
-                
-                result = session.execute(query, {
-                    "user_id": user_id,
-                    "memory_type": MemoryType.INSIGHT.value if hasattr(MemoryType, 'INSIGHT') else 'insight',
-                    "limit": limit
-                })
-                
-                rows = result.fetchall()
-                
-                insights = []
-                for row in rows:
-                    insights.append(SemanticMemorySearchResult(
-                        id=row.id,
-                        content=row.content,
-                        memory_type=MemoryType.INSIGHT if hasattr(MemoryType, 'INSIGHT') else MemoryType.USER_FACT,
-                        importance=row.importance,
-                        similarity=1.0,
-                        metadata=row.metadata or {},
-                        created_at=row.created_at,
-                        updated_at=row.updated_at
-                    ))
-                
-                logger.debug(f"Retrieved {len(insights)} insights for user {user_id}")
-                return insights
-                
-        except Exception as e:
-            logger.error(f"Failed to get user insights: {e}")
-            return []
+        insights = self.list_memories(user_id, memory_types=[MemoryType.INSIGHT], limit=limit)
+        logger.debug(f"Retrieved {len(insights)} insights for user {user_id}")
+        return insights
 
     # ========== v0.5 Methods (CHỈ THỊ 23 CẢI TIẾN - Insight Engine) ==========
     
@@ -1175,7 +1602,148 @@ class SemanticMemoryRepository:
         except Exception as e:
             logger.error(f"Failed to update last_accessed: {e}")
             return False
-    
+
+    def touch_last_accessed(self, memory_ids: List[UUID]) -> int:
+        """
+        Set last_accessed = NOW() for many memories in one statement.
+
+        Args:
+            memory_ids: UUIDs of the memories
+
+        Returns:
+            Number of rows updated (0 on error)
+        """
+        if not memory_ids:
+            return 0
+
+        self._ensure_initialized()
+
+        try:
+            with self._session_factory() as session:
+                query = text(f"""
+                    UPDATE {self.TABLE_NAME}
+                    SET last_accessed = NOW()
+                    WHERE id = ANY(CAST(:memory_ids AS uuid[]))
+                """)
+
+                result = session.execute(query, {"memory_ids": [str(m) for m in memory_ids]})
+                session.commit()
+
+                return result.rowcount or 0
+
+        except Exception as e:
+            logger.error(f"Failed to batch update last_accessed: {e}")
+            return 0
+
+    def rank_insights(
+        self,
+        user_id: str,
+        query_embedding: Optional[List[float]],
+        priority_categories: List[str],
+        limit: int = 10,
+        similarity_weight: float = 0.5,
+        category_weight: float = 0.3,
+        recency_weight: float = 0.2,
+        recency_half_life_days: float = 14.0
+    ) -> Optional[List[SemanticMemorySearchResult]]:
+        """
+        Rank a user's insights for a query in a single query.
+
+        score = similarity_weight * cosine similarity to the query
+              + category_weight * (category in priority_categories)
+              + recency_weight * 0.5 ^ (days since last access / half life)
+
+        Args:
+            user_id: User ID
+            query_embedding: Query vector (None = rank by category and recency only)
+            priority_categories: Insight categories that get the category bonus
+            limit: Maximum number of insights
+            similarity_weight: Weight of query similarity
+            category_weight: Weight of the priority-category bonus
+            recency_weight: Weight of recency
+            recency_half_life_days: Age at which the recency term halves
+
+        Returns:
+            Insights ordered by score (similarity = cosine similarity,
+            last_accessed set), or None on error so callers can fall back
+        """
+        self._ensure_initialized()
+
+        params = {
+            "user_id": user_id,
+            "memory_type": MemoryType.INSIGHT.value,
+            "priority_categories": list(priority_categories),
+            "similarity_weight": similarity_weight,
+            "category_weight": category_weight,
+            "recency_weight": recency_weight,
+            "half_life_seconds": max(recency_half_life_days, 1e-3) * 86400.0,
+            "limit": limit
+        }
+        if query_embedding:
+            params["embedding"] = self._format_embedding(query_embedding)
+            distance_expr = "embedding <=> CAST(:embedding AS vector)"
+        else:
+            distance_expr = "NULL::float8"
+
+        try:
+            with self._session_factory() as session:
+                # pgvector returns NaN distance for zero vectors; treat as unrelated
+                query = text(f"""
+                    SELECT
+                        id, content, memory_type, importance, metadata,
+                        created_at, updated_at, last_accessed, similarity,
+                        :similarity_weight * similarity
+                          + :category_weight * is_priority
+                          + :recency_weight * POWER(0.5, age_seconds / :half_life_seconds) AS score
+                    FROM (
+                        SELECT
+                            id, content, memory_type, importance, metadata,
+                            created_at, updated_at, last_accessed,
+                            CASE
+                                WHEN distance IS NULL OR distance = 'NaN'::float8 THEN 0.0
+                                ELSE GREATEST(0.0, LEAST(1.0, 1 - distance))
+                            END AS similarity,
+                            CASE
+                                WHEN COALESCE(metadata->>'insight_category', metadata->>'category')
+                                     = ANY(:priority_categories) THEN 1.0
+                                ELSE 0.0
+                            END AS is_priority,
+                            GREATEST(0.0, EXTRACT(EPOCH FROM (NOW() - COALESCE(last_accessed, created_at)))) AS age_seconds
+                        FROM (
+                            SELECT
+                                id, content, memory_type, importance, metadata,
+                                created_at, updated_at, last_accessed,
+                                {distance_expr} AS distance
+                            FROM {self.TABLE_NAME}
+                            WHERE user_id = :user_id
+                              AND memory_type = :memory_type
+                        ) AS insights
+                    ) AS scored
+                    ORDER BY score DESC, created_at DESC
+                    LIMIT :limit
+                """)
+
+                rows = session.execute(query, params).fetchall()
+
+                return [
+                    SemanticMemorySearchResult(
+                        id=row.id,
+                        content=row.content,
+                        memory_type=MemoryType.INSIGHT,
+                        importance=row.importance,
+                        similarity=float(row.similarity),
+                        metadata=row.metadata or {},
+                        created_at=row.created_at,
+                        updated_at=row.updated_at,
+                        last_accessed=row.last_accessed
+                    )
+                    for row in rows
+                ]
+
+        except Exception as e:
+            logger.error(f"Failed to rank insights: {e}")
+            return None
+
     def delete_user_insights(self, user_id: str) -> int:
         """
         Delete all INSIGHT type memories for a user.
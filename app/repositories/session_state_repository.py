@@ -0,0 +1,143 @@
+"""
+Session State Repository - Postgres persistence for evicted session state.
+
+Backend for bounded SessionStore instances (app/cache/session_store.py):
+state evicted from memory is upserted into ``session_state_snapshots``
+(scripts/migrations/create_session_state_snapshots_table.sql) and loaded
+back when the session becomes active again.
+
+Feature: bounded-session-state
+"""
+
+import json
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Run the retention purge at most this often (piggybacks on save())
+_PURGE_INTERVAL_SECONDS = 3600
+
+
+class SessionStateRepository:
+    """Repository for session_state_snapshots (PostgreSQL, SHARED engine)."""
+
+    def __init__(self, retention_days: Optional[int] = None):
+        """
+        Args:
+            retention_days: Drop snapshots not updated for this long
+                (default: settings.session_store_retention_days)
+        """
+        self.retention_days = retention_days or settings.session_store_retention_days
+        self._session_factory = None
+        self._available = False
+        self._last_purge = 0.0
+        self._init_connection()
+
+    def _init_connection(self):
+        """Initialize database connection using SHARED engine."""
+        try:
+            from app.core.database import get_shared_session_factory
+
+            self._session_factory = get_shared_session_factory()
+            with self._session_factory() as session:
+                session.execute(text("SELECT 1 FROM session_state_snapshots LIMIT 1"))
+            self._available = True
+            logger.info("Session state repository using SHARED database engine")
+        except Exception as e:
+            logger.warning(f"Session state persistence unavailable (run create_session_state_snapshots_table.sql?): {e}")
+            self._available = False
+
+    def is_available(self) -> bool:
+        """Check if repository is available."""
+        return self._available
+
+    def save(self, namespace: str, key: str, state: Dict[str, Any]) -> None:
+        """Upsert the snapshot of one evicted entry."""
+        with self._session_factory() as session:
+            session.execute(
+                text("""
+                    INSERT INTO session_state_snapshots (namespace, state_key, state, updated_at)
+                    VALUES (:namespace, :key, CAST(:state AS jsonb), NOW())
+                    ON CONFLICT (namespace, state_key)
+                    DO UPDATE SET state = EXCLUDED.state, updated_at = NOW()
+                """),
+                {"namespace": namespace, "key": key, "state": json.dumps(state, default=str)}
+            )
+            session.commit()
+
+        if time.monotonic() - self._last_purge > _PURGE_INTERVAL_SECONDS:
+            self._last_purge = time.monotonic()
+            self.purge_expired()
+
+    def load(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        """Get a snapshot, or None if the entry was never evicted (or expired)."""
+        with self._session_factory() as session:
+            row = session.execute(
+                text("""
+                    SELECT state FROM session_state_snapshots
+                    WHERE namespace = :namespace AND state_key = :key
+                    AND updated_at > NOW() - (:days * INTERVAL '1 day')
+                """),
+                {"namespace": namespace, "key": key, "days": self.retention_days}
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row.state) if isinstance(row.state, str) else row.state
+
+    def delete(self, namespace: str, key: str) -> None:
+        """Remove a snapshot (session explicitly cleared)."""
+        with self._session_factory() as session:
+            session.execute(
+                text("DELETE FROM session_state_snapshots WHERE namespace = :namespace AND state_key = :key"),
+                {"namespace": namespace, "key": key}
+            )
+            session.commit()
+
+    def purge_expired(self) -> int:
+        """
+        Delete snapshots older than the retention window.
+
+        Returns:
+            Number of snapshots deleted
+        """
+        try:
+            with self._session_factory() as session:
+                result = session.execute(
+                    text("""
+                        DELETE FROM session_state_snapshots
+                        WHERE updated_at < NOW() - (:days * INTERVAL '1 day')
+                    """),
+                    {"days": self.retention_days}
+                )
+                session.commit()
+        except Exception as e:
+            logger.warning(f"[SESSION_STORE] Snapshot purge failed: {e}")
+            return 0
+        if result.rowcount:
+            logger.info(f"[SESSION_STORE] Purged {result.rowcount} expired session snapshots")
+        return result.rowcount
+
+
+# Singleton instance
+_session_state_repo: Optional[SessionStateRepository] = None
+
+
+def get_session_state_repository() -> SessionStateRepository:
+    """Get or create SessionStateRepository singleton."""
+    global _session_state_repo
+    if _session_state_repo is None:
+        _session_state_repo = SessionStateRepository()
+    return _session_state_repo
+
+
+def get_session_state_backend() -> Optional[SessionStateRepository]:
+    """Backend for SessionStore persistence, or None when disabled."""
+    if not settings.session_store_persist_evicted:
+        return None
+    return get_session_state_repository()
@@ -16,9 +16,40 @@ from typing import List, Optional
 import asyncpg
 
 from app.core.config import settings
+from app.engine.keyword_matcher import normalize_text
 
 logger = logging.getLogger(__name__)
 
+# Maritime term synonyms for tsquery expansion (NFC lowercase keys)
+MARITIME_SYNONYMS = {
+    "quy": ["rule", "regulation"],
+    "tắc": ["rule", "regulation"],
+    "rule": ["quy", "tắc", "regulation", "điều"],
+    "điều": ["rule", "quy", "tắc", "regulation"],
+    "cảnh": ["look", "watch"],
+    "giới": ["out", "watch"],
+    "look": ["cảnh", "watch"],
+    "out": ["giới", "watch"],
+    "lookout": ["cảnh", "giới", "watch"],
+    "tàu": ["vessel", "ship"],
+    "vessel": ["tàu", "ship"],
+    "ship": ["tàu", "vessel"],
+    "cắt": ["crossing", "cross"],
+    "hướng": ["crossing", "direction"],
+    "crossing": ["cắt", "hướng"],
+    "tầm": ["visibility", "range"],
+    "nhìn": ["visibility", "sight"],
+    "visibility": ["tầm", "nhìn"],
+    "đèn": ["light", "lighting"],
+    "light": ["đèn", "lighting"],
+    "âm": ["sound", "signal"],
+    "hiệu": ["signal", "sound"],
+    "sound": ["âm", "hiệu"],
+    "signal": ["âm", "hiệu"],
+    "neo": ["anchor", "anchoring"],
+    "anchor": ["neo", "anchoring"],
+}
+
 
 @dataclass
 class SparseSearchResult:
@@ -108,35 +139,7 @@ class SparseSearchRepository:
         Returns:
             List of synonyms
         """
-        SYNONYMS = {
-            "quy": ["rule", "regulation"],
-            "tắc": ["rule", "regulation"],
-            "rule": ["quy", "tắc", "regulation", "điều"],
-            "điều": ["rule", "quy", "tắc", "regulation"],
-            "cảnh": ["look", "watch"],
-            "giới": ["out", "watch"],
-            "look": ["cảnh", "watch"],
-            "out": ["giới", "watch"],
-            "lookout": ["cảnh", "giới", "watch"],
-            "tàu": ["vessel", "ship"],
-            "vessel": ["tàu", "ship"],
-            "ship": ["tàu", "vessel"],
-            "cắt": ["crossing", "cross"],
-            "hướng": ["crossing", "direction"],
-            "crossing": ["cắt", "hướng"],
-            "tầm": ["visibility", "range"],
-            "nhìn": ["visibility", "sight"],
-            "visibility": ["tầm", "nhìn"],
-            "đèn": ["light", "lighting"],
-            "light": ["đèn", "lighting"],
-            "âm": ["sound", "signal"],
-            "hiệu": ["signal", "sound"],
-            "sound": ["âm", "hiệu"],
-            "signal": ["âm", "hiệu"],
-            "neo": ["anchor", "anchoring"],
-            "anchor": ["neo", "anchoring"],
-        }
-        return SYNONYMS.get(word, [])
+        return MARITIME_SYNONYMS.get(normalize_text(word), [])
     
     def _build_tsquery(self, query: str) -> str:
         """
@@ -9,9 +9,13 @@ Centralizes all background task logic for chat processing.
 """
 
 import logging
-from typing import Callable, List, Optional
+import time
+from typing import Callable, List, Optional, Tuple
 from uuid import UUID
 
+from app.repositories.memory_write_queue_repository import MemoryTurn
+from app.services.memory_write_queue import get_running_memory_write_queue
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,6 +29,11 @@ class BackgroundTaskRunner:
     - Update learning profile stats
     - Memory summarization
     
+    Semantic memory and profile stats go to the MemoryWriteQueue when it is
+    running (API lifespan); otherwise they are scheduled on FastAPI
+    BackgroundTasks as before. Summarization always runs in this process:
+    MemorySummarizer state is in-memory and read by InputProcessor here.
+    
     **Pattern:** Task Runner with lazy initialization
     """
     
@@ -76,20 +85,32 @@ class BackgroundTaskRunner:
                 session_id, message, response
             )
         
-        # Task 2: Store semantic memory interaction
-        if self._semantic_memory and self._semantic_memory.is_available():
-            background_save(
-                self._store_semantic_interaction,
-                user_id, message, response, str(session_id)
-            )
-        
-        # Task 3: Summarize memory if needed
+        # Task 2: Summarize memory (in-process state, read back by InputProcessor)
         if self._memory_summarizer:
             background_save(
                 self._summarize_memory,
                 str(session_id), message, response
             )
         
+        # Tasks 3-4: bounded, per-user ordered memory queue (Feature: memory-write-queue)
+        memory_queue = get_running_memory_write_queue()
+        if memory_queue is not None:
+            memory_queue.submit(MemoryTurn(
+                user_id=user_id,
+                session_id=str(session_id),
+                message=message,
+                response=response,
+                enqueued_at=time.time()
+            ))
+            return
+        
+        # Task 3: Store semantic memory interaction
+        if self._semantic_memory and self._semantic_memory.is_available():
+            background_save(
+                self._store_semantic_interactions,
+                user_id, [(message, response)], str(session_id)
+            )
+        
         # Task 4: Update learning profile stats
         if self._profile_repo and self._profile_repo.is_available():
             background_save(
@@ -135,6 +156,41 @@ class BackgroundTaskRunner:
                     session_id, role, content
                 )
     
+    async def process_memory_turns(self, turns: List[MemoryTurn]) -> None:
+        """
+        Memory work for consecutive turns of one user and session.
+        
+        Called by MemoryWriteQueue: the batch shares one insight extraction,
+        one fact extraction, one embedding request and one profile update.
+        Semantic memory failures are raised so the queue retries the batch
+        (profile stats only run once that succeeded). Turns are marked
+        insights_extracted once their insights are stored, so a retry only
+        redoes the write and never stores the same insights twice.
+        
+        Args:
+            turns: Turns in chronological order (same user_id and session_id)
+        
+        Raises:
+            Exception: If the semantic memory write failed
+        """
+        if not turns:
+            return
+        user_id, session_id = turns[0].user_id, turns[0].session_id
+        
+        if self._semantic_memory and self._semantic_memory.is_available():
+            unextracted = [turn for turn in turns if not turn.insights_extracted]
+            if unextracted:
+                await self._extract_insights(user_id, [turn.message for turn in unextracted], session_id)
+                for turn in unextracted:
+                    turn.insights_extracted = True
+            await self._store_semantic_interactions(
+                user_id, [(turn.message, turn.response) for turn in turns], session_id,
+                raise_errors=True, extract_insights=False
+            )
+        
+        if self._profile_repo and self._profile_repo.is_available():
+            await self._update_profile_stats(user_id, messages=2 * len(turns))
+    
     # =========================================================================
     # PRIVATE TASK IMPLEMENTATIONS
     # =========================================================================
@@ -153,52 +209,38 @@ class BackgroundTaskRunner:
         except Exception as e:
             logger.error(f"Failed to save messages in background: {e}")
     
-    async def _store_semantic_interaction(
+    async def _store_semantic_interactions(
         self,
         user_id: str,
-        message: str,
-        response: str,
-        session_id: str
+        turns: List[Tuple[str, str]],
+        session_id: str,
+        raise_errors: bool = False,
+        extract_insights: bool = True
     ) -> None:
         """
-        Store interaction in Semantic Memory v0.5.
+        Store interactions in Semantic Memory v0.5.
         
         **Spec:** CHỈ THỊ KỸ THUẬT SỐ 06 + CHỈ THỊ 23 CẢI TIẾN
         
         v0.5 Update: Uses Insight Engine for behavioral insight extraction.
+        Coalesced turns (memory-write-queue) are extracted in one call over
+        their joined user messages. With raise_errors (queue path) failures
+        are re-raised instead of only logged; extract_insights=False skips
+        extraction (the queue runs it separately, once per turn).
         """
         try:
-            # Get conversation history for context
-            conversation_history = []
-            if self._chat_history and self._chat_history.is_available():
-                # Need to get session_id as UUID
-                from uuid import UUID as UUIDType
-                try:
-                    session_uuid = UUIDType(session_id)
-                    recent_messages = self._chat_history.get_recent_messages(session_uuid)
-                    conversation_history = [msg.content for msg in recent_messages[-5:]]
-                except ValueError:
-                    pass
-            
-            # Extract behavioral insights (CHỈ THỊ 23 CẢI TIẾN)
-            insights = await self._semantic_memory.extract_and_store_insights(
-                user_id=user_id,
-                message=message,
-                conversation_history=conversation_history,
-                session_id=session_id
-            )
-            
-            if insights:
-                logger.info(f"[INSIGHT ENGINE] Extracted {len(insights)} behavioral insights for user {user_id}")
+            if extract_insights:
+                await self._extract_insights(user_id, [message for message, _ in turns], session_id)
             
-            # Store interaction for message history (legacy compatibility)
-            await self._semantic_memory.store_interaction(
+            # Store interactions for message history (legacy compatibility)
+            stored = await self._semantic_memory.store_interactions(
                 user_id=user_id,
-                message=message,
-                response=response,
+                turns=turns,
                 session_id=session_id,
                 extract_facts=True
             )
+            if not stored:
+                raise RuntimeError(f"store_interactions failed for {len(turns)} turn(s)")
             
             # Check and summarize if needed
             await self._semantic_memory.check_and_summarize(
@@ -209,6 +251,32 @@ class BackgroundTaskRunner:
             logger.debug(f"Background stored semantic interaction for user {user_id}")
         except Exception as e:
             logger.error(f"Failed to store semantic interaction: {e}")
+            if raise_errors:
+                raise
+    
+    async def _extract_insights(self, user_id: str, messages: List[str], session_id: str) -> None:
+        """Extract and store behavioral insights from user messages (CHỈ THỊ 23 CẢI TIẾN)."""
+        # Get conversation history for context
+        conversation_history = []
+        if self._chat_history and self._chat_history.is_available():
+            # Need to get session_id as UUID
+            from uuid import UUID as UUIDType
+            try:
+                session_uuid = UUIDType(session_id)
+                recent_messages = self._chat_history.get_recent_messages(session_uuid)
+                conversation_history = [msg.content for msg in recent_messages[-5:]]
+            except ValueError:
+                pass
+        
+        insights = await self._semantic_memory.extract_and_store_insights(
+            user_id=user_id,
+            message="\n".join(messages),
+            conversation_history=conversation_history,
+            session_id=session_id
+        )
+        
+        if insights:
+            logger.info(f"[INSIGHT ENGINE] Extracted {len(insights)} behavioral insights for user {user_id}")
     
     async def _summarize_memory(
         self,
@@ -229,14 +297,14 @@ class BackgroundTaskRunner:
         except Exception as e:
             logger.error(f"Failed to summarize memory: {e}")
     
-    async def _update_profile_stats(self, user_id: str) -> None:
+    async def _update_profile_stats(self, user_id: str, messages: int = 2) -> None:
         """
         Update learning profile stats.
         
         **Spec:** CHỈ THỊ KỸ THUẬT SỐ 04
         """
         try:
-            await self._profile_repo.increment_stats(user_id, messages=2)  # user + assistant
+            await self._profile_repo.increment_stats(user_id, messages=messages)  # user + assistant per turn
             logger.debug(f"Background updated profile stats for user {user_id}")
         except Exception as e:
             logger.error(f"Failed to update profile stats in background: {e}")
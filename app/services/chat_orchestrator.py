@@ -131,7 +131,7 @@ class ChatOrchestrator:
         # ================================================================
         # STAGE 1: SESSION MANAGEMENT
         # ================================================================
-        session = self._session_manager.get_or_create_session(user_id, thread_id)
+        session = await self._session_manager.aget_or_create_session(user_id, thread_id)
         session_id = session.session_id
         
         logger.info(f"Processing request for user {user_id} with role: {user_role.value}")
@@ -161,7 +161,8 @@ class ChatOrchestrator:
         context = await self._input_processor.build_context(
             request=request,
             session_id=session_id,
-            user_name=session.user_name
+            user_name=session.user_name,
+            analysis_state=session.state.conversation_analysis
         )
         
         # Update session with extracted user name
@@ -222,7 +223,7 @@ class ChatOrchestrator:
         # Update session state
         used_name = context.user_name and context.user_name.lower() in result.message.lower() if context.user_name else False
         opening = result.message[:50].strip() if result.message else None
-        self._session_manager.update_state(
+        await self._session_manager.aupdate_state(
             session_id=session_id,
             phrase=opening,
             used_name=used_name
@@ -278,7 +279,8 @@ class ChatOrchestrator:
             name_usage_count=session.state.name_usage_count,
             total_responses=session.state.total_responses,
             pronoun_style=session.state.pronoun_style,
-            conversation_context=context.conversation_analysis
+            conversation_context=context.conversation_analysis,
+            lms_course=context.lms_course_name
         )
         
         # Get sources from tool_maritime_search
@@ -0,0 +1,164 @@
+"""
+Document Cache Sync - Cross-process cache invalidation after re-ingestion.
+
+Runs inside the API process (started in the lifespan). Ingestion runs in
+scripts/ingestion_worker.py by default, and invalidating caches there only
+clears the worker's own memory. The worker therefore publishes each
+rewritten document to ``document_cache_versions``
+(publish_document_update()); every API process polls that table and
+invalidates its response / retrieval caches (CacheInvalidationManager)
+and GraphRAG document entities for the documents that changed.
+
+Feature: semantic-cache
+"""
+
+import asyncio
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.repositories.document_cache_version_repository import (
+    DocumentCacheVersionRepository,
+    get_document_cache_version_repository,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def invalidate_document_locally(document_id: str, content: str) -> None:
+    """
+    Invalidate this process's caches for a document.
+
+    ``content`` identifies the edition; CacheInvalidationManager skips
+    editions it has already seen.
+    """
+    try:
+        from app.cache.invalidation import get_invalidation_manager
+        await get_invalidation_manager().on_document_updated(document_id, content)
+    except Exception as e:
+        logger.warning(f"Cache invalidation failed for {document_id}: {e}")
+
+    # Re-ingestion rewrites document entities - drop cached GraphRAG entities
+    try:
+        from app.services.graph_rag_service import invalidate_document_entity_cache
+        invalidate_document_entity_cache(document_id)
+    except Exception as e:
+        logger.debug(f"Graph entity cache invalidation skipped: {e}")
+
+
+async def publish_document_update(
+    document_id: str,
+    content: str,
+    repository: Optional[DocumentCacheVersionRepository] = None
+) -> None:
+    """
+    Invalidate local caches and tell other processes the document changed.
+
+    Args:
+        document_id: Re-ingested document
+        content: Edition identifier (e.g. the ordered page fingerprints)
+        repository: Version table (defaults to the shared repository)
+    """
+    # Same edition id as the pollers use, so this process skips its own bump
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+    await invalidate_document_locally(document_id, content_hash)
+
+    try:
+        repository = repository or get_document_cache_version_repository()
+        if not repository.is_available():
+            return
+        await asyncio.to_thread(repository.bump, document_id, content_hash)
+    except Exception as e:
+        logger.warning(f"[CACHE_SYNC] Failed to publish update of {document_id}: {e}")
+
+
+class DocumentCacheSync:
+    """
+    Polls document_cache_versions and invalidates local caches.
+
+    Usage:
+        sync = DocumentCacheSync()
+        await sync.run(stop_event)   # poll until stopped
+        await sync.sync_once()       # one poll
+    """
+
+    def __init__(
+        self,
+        repository: Optional[DocumentCacheVersionRepository] = None,
+        poll_interval: Optional[float] = None
+    ):
+        """
+        Args:
+            repository: Version table (defaults to the shared repository)
+            poll_interval: Seconds between polls
+        """
+        self.repository = repository or get_document_cache_version_repository()
+        self.poll_interval = (
+            poll_interval if poll_interval is not None
+            else settings.document_cache_sync_interval_seconds
+        )
+        self.last_version: Optional[int] = None
+        self.invalidated_total = 0
+
+    async def sync_once(self) -> int:
+        """
+        Invalidate documents bumped since the last poll.
+
+        The first poll only records the current version: caches of a fresh
+        process cannot hold older editions.
+
+        Returns:
+            Number of documents invalidated
+        """
+        if self.last_version is None:
+            self.last_version = await asyncio.to_thread(self.repository.latest_version)
+            return 0
+
+        # Recent rows are re-read (late commits); CacheInvalidationManager
+        # skips editions this process has already invalidated
+        changes = await asyncio.to_thread(
+            self.repository.changed_since, self.last_version, 2 * self.poll_interval
+        )
+        new = [change for change in changes if change.version > self.last_version]
+        for change in changes:
+            await invalidate_document_locally(change.document_id, change.content_hash)
+        if new:
+            self.last_version = max(change.version for change in new)
+            self.invalidated_total += len(new)
+            logger.info(f"[CACHE_SYNC] Invalidated caches of {len(new)} re-ingested document(s)")
+        return len(new)
+
+    async def run(self, stop_event: Optional[asyncio.Event] = None) -> None:
+        """Poll until stopped."""
+        stop_event = stop_event or asyncio.Event()
+        logger.info(f"[CACHE_SYNC] Polling document versions every {self.poll_interval}s")
+
+        while not stop_event.is_set():
+            try:
+                await self.sync_once()
+            except Exception as e:
+                logger.error(f"[CACHE_SYNC] Poll error: {e}")
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Poll position and invalidation count."""
+        return {
+            "last_version": self.last_version,
+            "invalidated_total": self.invalidated_total,
+        }
+
+
+# Singleton instance
+_document_cache_sync: Optional[DocumentCacheSync] = None
+
+
+def get_document_cache_sync() -> DocumentCacheSync:
+    """Get or create DocumentCacheSync singleton."""
+    global _document_cache_sync
+    if _document_cache_sync is None:
+        _document_cache_sync = DocumentCacheSync()
+    return _document_cache_sync
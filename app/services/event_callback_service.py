@@ -9,11 +9,16 @@ Event Types:
 - goal_evolution: User đổi mục tiêu học
 - module_completed_confidence: AI nghĩ user đã hiểu module
 - stuck_detected: User hỏi lặp lại topic
+
+Delivery goes through the durable outbox (lms-event-outbox): see
+app/repositories/lms_event_outbox_repository.py and
+app/services/event_outbox_worker.py.
 """
 
 import asyncio
 import logging
-from typing import Optional
+from dataclasses import dataclass
+from typing import Optional, Set
 
 import httpx
 
@@ -23,22 +28,48 @@ from app.models.schemas import AIEvent, AIEventData, AIEventType
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class DeliveryResult:
+    """Outcome of one POST to the LMS callback endpoint."""
+    ok: bool
+    retryable: bool = True  # False for client errors the LMS will keep rejecting
+    error: str = ""
+
+
 class EventCallbackService:
     """
     Service for sending AI events to LMS via webhook.
     
-    Runs callbacks in background to avoid blocking main request.
+    Events go to the durable outbox (lms_event_outbox table) and are
+    delivered in batches by EventOutboxWorker; when the outbox is disabled
+    or unavailable they are POSTed in a background task as before.
     """
     
-    def __init__(self):
-        self.callback_url = settings.lms_callback_url
-        self.callback_secret = settings.lms_callback_secret
+    def __init__(
+        self,
+        callback_url: Optional[str] = None,
+        callback_secret: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        outbox_repository=None
+    ):
+        """
+        Args:
+            callback_url: LMS endpoint (default: settings.lms_callback_url)
+            callback_secret: Shared secret (default: settings.lms_callback_secret)
+            transport: httpx transport override (tests / local stand-ins)
+            outbox_repository: Outbox override (default: shared repository)
+        """
+        self.callback_url = callback_url or settings.lms_callback_url
+        self.callback_secret = callback_secret or settings.lms_callback_secret
+        self._transport = transport
         self._client: Optional[httpx.AsyncClient] = None
+        self._outbox = outbox_repository
+        self._background_tasks: Set[asyncio.Task] = set()
     
     async def _get_client(self) -> httpx.AsyncClient:
         """Get or create async HTTP client."""
         if self._client is None or self._client.is_closed:
-            self._client = httpx.AsyncClient(timeout=10.0)
+            self._client = httpx.AsyncClient(timeout=10.0, transport=self._transport)
         return self._client
     
     async def close(self):
@@ -46,9 +77,68 @@ class EventCallbackService:
         if self._client and not self._client.is_closed:
             await self._client.aclose()
     
+    def _get_outbox(self):
+        """Outbox repository, or None to send directly."""
+        if not settings.lms_outbox_enabled:
+            return None
+        if self._outbox is None:
+            from app.repositories.lms_event_outbox_repository import get_lms_event_outbox_repository
+            self._outbox = get_lms_event_outbox_repository()
+        return self._outbox if self._outbox.is_available() else None
+    
+    @staticmethod
+    def dedup_key(event: AIEvent) -> str:
+        """
+        Coalescing key: a pending event is replaced by a newer one with the
+        same key (e.g. repeated stuck_detected for one topic keeps only the
+        latest repeat_count).
+        """
+        subject = event.data.module_id or event.data.topic or ""
+        if event.event_type == AIEventType.GOAL_EVOLUTION:
+            subject = ""  # Only the latest goal matters
+        return f"{event.user_id}:{event.event_type.value}:{subject.strip().lower()}"
+    
+    async def deliver(self, payload: dict) -> DeliveryResult:
+        """
+        POST one serialized event to the LMS callback endpoint.
+        
+        Args:
+            payload: JSON body (AIEvent.model_dump(mode="json"))
+            
+        Returns:
+            DeliveryResult (4xx other than 408/429 are not retryable)
+        """
+        if not self.callback_url:
+            return DeliveryResult(ok=False, retryable=False, error="No callback URL configured")
+        
+        headers = {
+            "Content-Type": "application/json",
+        }
+        
+        # Add callback secret if configured
+        if self.callback_secret:
+            headers["X-Callback-Secret"] = self.callback_secret
+        
+        try:
+            client = await self._get_client()
+            response = await client.post(self.callback_url, json=payload, headers=headers)
+        except httpx.TimeoutException:
+            return DeliveryResult(ok=False, error="timeout")
+        except httpx.HTTPError as e:
+            return DeliveryResult(ok=False, error=f"{type(e).__name__}: {e}")
+        
+        if 200 <= response.status_code < 300:
+            return DeliveryResult(ok=True)
+        retryable = response.status_code >= 500 or response.status_code in (408, 429)
+        return DeliveryResult(
+            ok=False,
+            retryable=retryable,
+            error=f"HTTP {response.status_code}: {response.text[:200]}"
+        )
+    
     async def send_event(self, event: AIEvent) -> bool:
         """
-        Send event to LMS callback endpoint.
+        Send event to LMS callback endpoint immediately (bypasses the outbox).
         
         Args:
             event: AIEvent to send
@@ -61,49 +151,65 @@ class EventCallbackService:
             return False
         
         try:
-            client = await self._get_client()
-            
-            headers = {
-                "Content-Type": "application/json",
-            }
-            
-            # Add callback secret if configured
-            if self.callback_secret:
-                headers["X-Callback-Secret"] = self.callback_secret
-            
-            response = await client.post(
-                self.callback_url,
-                json=event.model_dump(mode="json"),
-                headers=headers
-            )
-            
-            if response.status_code == 200:
-                logger.info(
-                    f"Event {event.event_type.value} sent successfully "
-                    f"for user {event.user_id}"
-                )
-                return True
-            else:
-                logger.warning(
-                    f"Event callback failed: {response.status_code} - "
-                    f"{response.text[:200]}"
-                )
-                return False
-                
-        except httpx.TimeoutException:
-            logger.warning(f"Event callback timeout for {event.event_type.value}")
-            return False
+            result = await self.deliver(event.model_dump(mode="json"))
         except Exception as e:
             logger.error(f"Event callback error: {e}")
             return False
+        
+        if result.ok:
+            logger.info(
+                f"Event {event.event_type.value} sent successfully "
+                f"for user {event.user_id}"
+            )
+        else:
+            logger.warning(f"Event callback failed for {event.event_type.value}: {result.error}")
+        return result.ok
+    
+    async def enqueue_event(self, event: AIEvent) -> bool:
+        """
+        Queue an event for delivery.
+        
+        Returns:
+            True if the event was stored in the outbox, False if it was
+            skipped (no callback URL) or handed to a background send
+            (no outbox)
+        """
+        if not self.callback_url:
+            logger.debug("No callback URL configured, skipping event")
+            return False
+        
+        outbox = self._get_outbox()
+        if outbox is not None:
+            try:
+                coalesced = await asyncio.to_thread(
+                    outbox.enqueue,
+                    event.user_id,
+                    event.event_type.value,
+                    self.dedup_key(event),
+                    event.model_dump(mode="json")
+                )
+                if coalesced:
+                    logger.debug(f"[LMS_OUTBOX] Coalesced {event.event_type.value} for user {event.user_id}")
+                return True
+            except Exception as e:
+                logger.warning(f"[LMS_OUTBOX] Enqueue failed, sending directly: {e}")
+        
+        self._spawn(self._send_event_safe(event))
+        return False
     
     def send_event_background(self, event: AIEvent):
         """
-        Send event in background (fire-and-forget).
+        Queue event in background (fire-and-forget).
         
-        Use this for non-blocking event emission.
+        Use this for non-blocking event emission from sync code.
         """
-        asyncio.create_task(self._send_event_safe(event))
+        self._spawn(self.enqueue_event(event))
+    
+    def _spawn(self, coro):
+        """Run a coroutine in the background, keeping a reference until done."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
     
     async def _send_event_safe(self, event: AIEvent):
         """Send event with exception handling for background task."""
@@ -145,7 +251,7 @@ class EventCallbackService:
                 module_id=module_id
             )
         )
-        self.send_event_background(event)
+        await self.enqueue_event(event)
     
     async def emit_goal_evolution(
         self,
@@ -164,7 +270,7 @@ class EventCallbackService:
                 details={"old_goal": old_goal, "new_goal": new_goal}
             )
         )
-        self.send_event_background(event)
+        await self.enqueue_event(event)
     
     async def emit_module_completed(
         self,
@@ -182,7 +288,7 @@ class EventCallbackService:
                 suggested_action="suggest_quiz"
             )
         )
-        self.send_event_background(event)
+        await self.enqueue_event(event)
     
     async def emit_stuck_detected(
         self,
@@ -200,7 +306,7 @@ class EventCallbackService:
                 details={"repeat_count": repeat_count}
             )
         )
-        self.send_event_background(event)
+        await self.enqueue_event(event)
 
 
 # =============================================================================
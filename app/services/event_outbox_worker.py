@@ -0,0 +1,207 @@
+"""
+Event Outbox Worker - Flushes the durable LMS event outbox.
+
+Runs inside the API process (started in the lifespan when
+LMS_CALLBACK_URL is set). Each flush claims a batch of due events, POSTs
+them to the LMS with a concurrency cap, deletes the delivered ones and
+reschedules failures with exponential backoff. Several API replicas can
+flush the same table: claims use FOR UPDATE SKIP LOCKED.
+
+Feature: lms-event-outbox
+"""
+
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.repositories.lms_event_outbox_repository import (
+    LMSEventOutboxRepository,
+    OutboxEvent,
+    get_lms_event_outbox_repository,
+)
+from app.services.event_callback_service import DeliveryResult, get_event_callback_service
+
+logger = logging.getLogger(__name__)
+
+
+class EventOutboxWorker:
+    """
+    Batches outbox events to the LMS callback endpoint.
+
+    Usage:
+        worker = EventOutboxWorker()
+        await worker.run(stop_event)   # flush until stopped
+        await worker.flush_once()      # one batch
+    """
+
+    def __init__(
+        self,
+        repository: Optional[LMSEventOutboxRepository] = None,
+        callback_service=None,
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        retry_base_seconds: Optional[float] = None,
+        retry_max_seconds: Optional[float] = None,
+        stale_after_seconds: Optional[int] = None
+    ):
+        """
+        Args:
+            repository: Outbox queue (defaults to the shared repository)
+            callback_service: EventCallbackService used to POST events
+            batch_size: Events claimed per flush
+            max_concurrency: Concurrent requests to the LMS
+            poll_interval: Seconds to wait when the outbox is empty
+            max_attempts: Attempts before an event is marked dead
+            retry_base_seconds: First retry delay (doubles per attempt)
+            retry_max_seconds: Retry delay cap
+            stale_after_seconds: Claim age after which events are released
+        """
+        self.repository = repository or get_lms_event_outbox_repository()
+        self._callback_service = callback_service
+        self.batch_size = batch_size or settings.lms_outbox_batch_size
+        self.max_concurrency = max_concurrency or settings.lms_outbox_max_concurrency
+        self.poll_interval = poll_interval if poll_interval is not None else settings.lms_outbox_flush_interval_seconds
+        self.max_attempts = max_attempts or settings.lms_outbox_max_attempts
+        self.retry_base_seconds = retry_base_seconds if retry_base_seconds is not None else settings.lms_outbox_retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds if retry_max_seconds is not None else settings.lms_outbox_retry_max_seconds
+        self.stale_after_seconds = stale_after_seconds or settings.lms_outbox_stale_seconds
+
+        # Metrics
+        self.sent_total = 0
+        self.retried_total = 0
+        self.dead_total = 0
+        self.superseded_total = 0
+        self.flushes = 0
+        self.last_flush_at: Optional[float] = None
+        self.last_flush_lag_seconds = 0.0  # Max enqueue -> delivered delay in the last batch
+        self._lag_sum = 0.0
+
+    @property
+    def callback_service(self):
+        if self._callback_service is None:
+            self._callback_service = get_event_callback_service()
+        return self._callback_service
+
+    def retry_delay(self, attempts: int) -> float:
+        """Exponential backoff with jitter for the given attempt count."""
+        delay = min(self.retry_base_seconds * (2 ** max(attempts - 1, 0)), self.retry_max_seconds)
+        return delay * random.uniform(0.5, 1.0)
+
+    async def flush_once(self) -> int:
+        """
+        Claim and deliver one batch.
+
+        Returns:
+            Number of events claimed
+        """
+        events = await asyncio.to_thread(self.repository.claim_batch, self.batch_size)
+        if not events:
+            return 0
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def deliver(event: OutboxEvent):
+            async with semaphore:
+                try:
+                    return await self.callback_service.deliver(event.payload)
+                except Exception as e:
+                    return DeliveryResult(ok=False, error=f"{type(e).__name__}: {e}")
+
+        results = await asyncio.gather(*(deliver(event) for event in events))
+
+        delivered: List[OutboxEvent] = []
+        for event, result in zip(events, results):
+            if result.ok:
+                delivered.append(event)
+            elif not result.retryable or event.attempts >= self.max_attempts:
+                await asyncio.to_thread(self.repository.mark_dead, event.event_id, result.error)
+                self.dead_total += 1
+                logger.error(
+                    f"[LMS_OUTBOX] Giving up on {event.event_type} for user {event.user_id} "
+                    f"after {event.attempts} attempts: {result.error}"
+                )
+            else:
+                rescheduled = await asyncio.to_thread(
+                    self.repository.reschedule, event.event_id, result.error, self.retry_delay(event.attempts)
+                )
+                if rescheduled:
+                    self.retried_total += 1
+                else:
+                    self.superseded_total += 1
+
+        if delivered:
+            await asyncio.to_thread(self.repository.mark_sent, [event.event_id for event in delivered])
+            now = datetime.now(timezone.utc)
+            lags = [(now - event.created_at).total_seconds() for event in delivered if event.created_at]
+            if lags:
+                self.last_flush_lag_seconds = max(lags)
+                self._lag_sum += sum(lags)
+            self.sent_total += len(delivered)
+
+        self.flushes += 1
+        self.last_flush_at = time.time()
+        logger.info(
+            f"[LMS_OUTBOX] Flushed {len(events)} events: {len(delivered)} sent, "
+            f"{len(events) - len(delivered)} failed"
+        )
+        return len(events)
+
+    async def run(self, stop_event: Optional[asyncio.Event] = None) -> None:
+        """
+        Flush the outbox until stopped.
+
+        Full batches are flushed back to back; otherwise the worker waits
+        poll_interval, so bursts are sent together.
+        """
+        stop_event = stop_event or asyncio.Event()
+        logger.info(
+            f"[LMS_OUTBOX] Worker started (batch {self.batch_size}, "
+            f"concurrency {self.max_concurrency}, poll every {self.poll_interval}s)"
+        )
+
+        while not stop_event.is_set():
+            try:
+                await asyncio.to_thread(self.repository.requeue_stale, self.stale_after_seconds)
+                claimed = await self.flush_once()
+            except Exception as e:
+                logger.error(f"[LMS_OUTBOX] Flush error: {e}")
+                claimed = 0
+
+            if claimed < self.batch_size:
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+        logger.info(f"[LMS_OUTBOX] Worker stopped after sending {self.sent_total} events")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Delivery counters and flush lag of this worker."""
+        return {
+            "sent_total": self.sent_total,
+            "retried_total": self.retried_total,
+            "dead_total": self.dead_total,
+            "superseded_total": self.superseded_total,
+            "flushes": self.flushes,
+            "last_flush_at": self.last_flush_at,
+            "last_flush_lag_seconds": round(self.last_flush_lag_seconds, 3),
+            "avg_flush_lag_seconds": round(self._lag_sum / self.sent_total, 3) if self.sent_total else 0.0,
+        }
+
+
+# Singleton instance
+_outbox_worker: Optional[EventOutboxWorker] = None
+
+
+def get_event_outbox_worker() -> EventOutboxWorker:
+    """Get or create EventOutboxWorker singleton."""
+    global _outbox_worker
+    if _outbox_worker is None:
+        _outbox_worker = EventOutboxWorker()
+    return _outbox_worker
@@ -11,8 +11,7 @@ for Microsoft-style GraphRAG retrieval.
 """
 import asyncio
 import logging
-import time
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any
 from dataclasses import dataclass, field
 
 from app.services.hybrid_search_service import HybridSearchService, get_hybrid_search_service
@@ -20,6 +19,7 @@ from app.engine.rrf_reranker import HybridSearchResult
 from app.repositories.neo4j_knowledge_repository import Neo4jKnowledgeRepository
 from app.engine.multi_agent.agents.kg_builder_agent import KGBuilderAgentNode, get_kg_builder_agent
 from app.core.config import settings
+from app.cache.lru_cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
@@ -28,8 +28,37 @@ logger = logging.getLogger(__name__)
 # Phase 2.2c: Entity Extraction Cache (TTL 5 minutes)
 # Caches expensive LLM entity extraction to avoid redundant calls
 # ============================================================
-_entity_cache: Dict[str, Tuple[List[str], float]] = {}
 _ENTITY_CACHE_TTL = 300  # 5 minutes
+_entity_cache = LRUCache("graph_rag.query_entities", max_size=1000, ttl_seconds=_ENTITY_CACHE_TTL)
+
+# ============================================================
+# Document-entity cache (TTL 10 minutes)
+# Entities of a document only change on (re-)ingestion, which
+# invalidates the entry via invalidate_document_entity_cache()
+# ============================================================
+_DOCUMENT_ENTITY_CACHE_TTL = 600  # 10 minutes
+_document_entity_cache = LRUCache(
+    "graph_rag.document_entities", max_size=2000, ttl_seconds=_DOCUMENT_ENTITY_CACHE_TTL
+)
+
+
+def invalidate_document_entity_cache(document_id: Optional[str] = None) -> int:
+    """
+    Drop cached entity lists for a document (or all documents).
+    
+    Called on re-ingestion so GraphRAG never serves stale entities.
+    
+    Returns:
+        Number of entries removed
+    """
+    if document_id is None:
+        return _document_entity_cache.clear()
+    return 1 if _document_entity_cache.pop(document_id) else 0
+
+
+async def _invalidate_document_entities_handler(document_id: str) -> int:
+    """CacheInvalidationManager handler for the graph entity tier."""
+    return invalidate_document_entity_cache(document_id)
 
 
 @dataclass
@@ -82,6 +111,15 @@ class GraphRAGService:
         # Check Neo4j availability
         self._neo4j_available = self._neo4j.is_available()
         
+        # Document-entity cache follows document updates
+        try:
+            from app.cache.invalidation import get_invalidation_manager
+            get_invalidation_manager().register_handler(
+                "graph_entities", _invalidate_document_entities_handler
+            )
+        except Exception as e:
+            logger.debug(f"Graph entity cache invalidation not registered: {e}")
+        
         logger.info(
             f"GraphRAGService initialized (Neo4j: {self._neo4j_available})"
         )
@@ -129,6 +167,17 @@ class GraphRAGService:
             return []
         
         # Step 3: Enrich results with entity context
+        # Batched: all documents + query entities resolved in 2 UNWIND queries
+        entity_contexts: Dict[Optional[str], Dict[str, Any]] = {}
+        if include_entity_context and self._neo4j_available:
+            try:
+                entity_contexts = await self._get_entity_context_batch(
+                    [r.document_id for r in hybrid_results],
+                    query_entities
+                )
+            except Exception as e:
+                logger.warning(f"Entity context enrichment failed: {e}")
+        
         enhanced_results = []
         
         for result in hybrid_results:
@@ -147,17 +196,11 @@ class GraphRAGService:
             )
             
             # Add entity context if Neo4j available
-            if include_entity_context and self._neo4j_available:
-                try:
-                    entity_context = await self._get_entity_context(
-                        result.document_id,
-                        query_entities
-                    )
-                    enhanced.related_entities = entity_context.get("entities", [])
-                    enhanced.related_regulations = entity_context.get("regulations", [])
-                    enhanced.entity_context = entity_context.get("summary", "")
-                except Exception as e:
-                    logger.warning(f"Entity context enrichment failed: {e}")
+            entity_context = entity_contexts.get(result.document_id)
+            if entity_context:
+                enhanced.related_entities = entity_context.get("entities", [])
+                enhanced.related_regulations = entity_context.get("regulations", [])
+                enhanced.entity_context = entity_context.get("summary", "")
             
             enhanced_results.append(enhanced)
         
@@ -177,84 +220,113 @@ class GraphRAGService:
         Returns:
             List of entity IDs
         """
-        global _entity_cache
-        
         # Create cache key (first 100 chars, lowercased, stripped)
         cache_key = query[:100].lower().strip()
         
-        # Check cache
-        if cache_key in _entity_cache:
-            entities, timestamp = _entity_cache[cache_key]
-            if time.time() - timestamp < _ENTITY_CACHE_TTL:
-                logger.info(f"[GraphRAG] Entity cache HIT: {len(entities)} entities")
-                return entities
-            else:
-                # Expired - remove from cache
-                del _entity_cache[cache_key]
+        async def extract() -> List[str]:
+            query_entities: List[str] = []
+            if self._kg_builder.is_available():
+                try:
+                    extraction = await self._kg_builder.extract(query, "user_query")
+                    query_entities = [e.id for e in extraction.entities]
+                    if query_entities:
+                        logger.info(f"[GraphRAG] Query entities: {query_entities}")
+                except Exception as e:
+                    logger.warning(f"Query entity extraction failed: {e}")
+            return query_entities
         
-        # Cache miss - extract entities
-        query_entities = []
-        if self._kg_builder.is_available():
-            try:
-                extraction = await self._kg_builder.extract(query, "user_query")
-                query_entities = [e.id for e in extraction.entities]
-                if query_entities:
-                    logger.info(f"[GraphRAG] Query entities: {query_entities}")
-                    # Cache the result
-                    _entity_cache[cache_key] = (query_entities, time.time())
-                    logger.info(f"[GraphRAG] Entity cache SET: {len(query_entities)} entities (TTL={_ENTITY_CACHE_TTL}s)")
-            except Exception as e:
-                logger.warning(f"Query entity extraction failed: {e}")
+        # Concurrent identical queries share one extraction (single-flight);
+        # only non-empty extractions are cached
+        return await _entity_cache.get_or_load(cache_key, extract, cache_if=bool)
+    
+    async def _get_document_entities_cached(
+        self,
+        document_ids: List[str]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get entity lists for documents, fetching only cache misses (1 query).
         
-        return query_entities
+        Args:
+            document_ids: Distinct document IDs
+            
+        Returns:
+            Dict document_id -> entity list
+        """
+        found: Dict[str, List[Dict[str, Any]]] = {}
+        missing: List[str] = []
+        
+        for document_id in document_ids:
+            entities = _document_entity_cache.get(document_id)
+            if entities is not None:
+                found[document_id] = entities
+            else:
+                missing.append(document_id)
+        
+        if missing:
+            fetched = await self._neo4j.get_entities_for_documents(missing)
+            for document_id in missing:
+                entities = fetched.get(document_id, [])
+                _document_entity_cache.set(document_id, entities)
+                found[document_id] = entities
+        
+        logger.debug(
+            f"[GraphRAG] Document entities: {len(document_ids) - len(missing)} cached, "
+            f"{len(missing)} fetched"
+        )
+        return found
     
-    async def _get_entity_context(
+    async def _get_entity_context_batch(
         self,
-        document_id: Optional[str],
+        document_ids: List[Optional[str]],
         query_entities: List[str]
-    ) -> Dict[str, Any]:
+    ) -> Dict[Optional[str], Dict[str, Any]]:
         """
-        Get entity context from Neo4j.
+        Get entity context for a whole result set.
+        
+        Uses at most two UNWIND queries instead of N+1 per-result round-trips:
+        document entities (cache misses only) and query-entity relations
+        (shared by every result; a failed relation lookup only drops those
+        regulations).
         
         Args:
-            document_id: Document to get entities from
+            document_ids: Document ID of each result (duplicates/None allowed)
             query_entities: Entities extracted from query
             
         Returns:
-            Dict with entities, regulations, and summary
+            Dict document_id -> {entities, regulations, summary}
         """
-        entities = []
-        regulations = []
-        
-        # Get entities from the document
-        if document_id:
-            doc_entities = await self._neo4j.get_document_entities(document_id)
-            entities.extend(doc_entities)
-        
-        # Get related regulations
-        for entity in entities:
-            if entity.get("type") == "ARTICLE":
-                regulations.append(entity.get("name", ""))
-        
-        # Get relations for query entities
-        for entity_id in query_entities[:3]:  # Limit to avoid too many queries
-            relations = await self._neo4j.get_entity_relations(entity_id)
-            for rel in relations:
-                if rel.get("target_type") == "ARTICLE":
-                    regulations.append(rel.get("target_name", ""))
-        
-        # Build summary
-        regulations = list(set(regulations))[:5]  # Dedupe and limit
-        
-        summary = ""
-        if regulations:
-            summary = f"Liên quan đến: {', '.join(regulations)}"
-        
-        return {
-            "entities": entities[:10],  # Limit
-            "regulations": regulations,
-            "summary": summary
-        }
+        distinct_ids = list(dict.fromkeys(d for d in document_ids if d))
+        
+        doc_entities_task = self._get_document_entities_cached(distinct_ids)
+        relations_task = self._neo4j.get_relations_for_entities(query_entities[:3])
+        doc_entities, relations = await asyncio.gather(doc_entities_task, relations_task)
+        
+        # Query-entity regulations are the same for every result
+        query_regulations = [
+            rel.get("target_name", "")
+            for entity_id in query_entities[:3]
+            for rel in relations.get(entity_id, [])
+            if rel.get("target_type") == "ARTICLE"
+        ]
+        
+        contexts: Dict[Optional[str], Dict[str, Any]] = {}
+        for document_id in list(dict.fromkeys(document_ids)):
+            entities = doc_entities.get(document_id, []) if document_id else []
+            regulations = [
+                entity.get("name", "")
+                for entity in entities
+                if entity.get("type") == "ARTICLE"
+            ]
+            regulations.extend(query_regulations)
+            regulations = list(set(regulations))[:5]  # Dedupe and limit
+            
+            contexts[document_id] = {
+                "entities": entities[:10],  # Limit
+                "regulations": regulations,
+                "summary": f"Liên quan đến: {', '.join(regulations)}" if regulations else ""
+            }
+        
+        return contexts
     
     async def search_with_graph_context(
         self,
@@ -19,6 +19,7 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage
 
 from app.core.config import settings
+from app.engine.llm_scheduler import scheduled_ainvoke
 
 logger = logging.getLogger(__name__)
 
@@ -179,7 +180,7 @@ class HyDEService:
                 prompt = HYDE_PROMPT_TEMPLATE_EN.format(question=question)
             
             # Generate hypothetical document
-            response = await llm.ainvoke([HumanMessage(content=prompt)])
+            response = await scheduled_ainvoke(llm, [HumanMessage(content=prompt)])
             
             # SOTA FIX: Handle Gemini 2.5 Flash content block format
             from app.services.output_processor import extract_thinking_from_response
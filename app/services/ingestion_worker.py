@@ -0,0 +1,219 @@
+"""
+Ingestion Worker - Processes the durable ingestion_jobs queue.
+
+Runs outside the API process (python scripts/ingestion_worker.py) so a
+heavy PDF never competes with chat traffic for the API event loop, and a
+restart of either side loses no job state. Scale horizontally by starting
+more workers: claims use FOR UPDATE SKIP LOCKED.
+
+Feature: durable-ingestion-queue
+"""
+
+import asyncio
+import logging
+import os
+import socket
+from dataclasses import asdict
+from typing import Optional
+
+from app.core.config import settings
+from app.engine.llm_scheduler import LLMPriority, llm_priority
+from app.repositories.ingestion_job_repository import (
+    IngestionJob,
+    IngestionJobRepository,
+    get_ingestion_job_repository,
+)
+
+logger = logging.getLogger(__name__)
+
+# ingest_pdf keyword arguments accepted from job options
+_INGEST_OPTIONS = ("resume", "max_pages", "start_page", "end_page", "incremental")
+
+
+class IngestionWorker:
+    """
+    Claims and runs ingestion jobs one at a time.
+
+    Usage:
+        worker = IngestionWorker()
+        await worker.run()          # poll forever
+        await worker.run_once()     # process at most one job
+    """
+
+    def __init__(
+        self,
+        repository: Optional[IngestionJobRepository] = None,
+        ingestion_service=None,
+        worker_id: Optional[str] = None,
+        poll_interval: Optional[float] = None,
+        stale_after_seconds: Optional[int] = None,
+        heartbeat_interval: Optional[float] = None
+    ):
+        """
+        Args:
+            repository: Job queue (defaults to the shared repository)
+            ingestion_service: MultimodalIngestionService (created lazily)
+            worker_id: Identifier stored on claimed jobs (default host:pid)
+            poll_interval: Seconds to sleep when the queue is empty
+            stale_after_seconds: Heartbeat age after which jobs are re-queued
+            heartbeat_interval: Seconds between heartbeats while a job runs
+        """
+        self.repository = repository or get_ingestion_job_repository()
+        self._ingestion_service = ingestion_service
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = poll_interval if poll_interval is not None else settings.ingestion_worker_poll_seconds
+        self.stale_after_seconds = stale_after_seconds or settings.ingestion_job_stale_seconds
+        self.heartbeat_interval = heartbeat_interval or settings.ingestion_job_heartbeat_seconds
+        self.jobs_processed = 0
+
+    @property
+    def ingestion_service(self):
+        if self._ingestion_service is None:
+            from app.services.multimodal_ingestion_service import get_ingestion_service
+            self._ingestion_service = get_ingestion_service()
+        return self._ingestion_service
+
+    async def process_job(self, job: IngestionJob) -> bool:
+        """
+        Run one claimed job to completion.
+
+        Returns:
+            True if the job completed
+        """
+        logger.info(
+            f"[INGESTION_WORKER] {self.worker_id} processing job {job.job_id} "
+            f"({job.document_id}, attempt {job.attempts}/{job.max_attempts})"
+        )
+
+        async def report_progress(processed_pages: int, total_pages: int) -> None:
+            try:
+                await asyncio.to_thread(
+                    self.repository.update_progress, job.job_id, self.worker_id,
+                    processed_pages, total_pages
+                )
+            except Exception as e:
+                # Progress is informational; never fail a page because of it
+                logger.warning(f"[INGESTION_WORKER] Progress update failed for {job.job_id}: {e}")
+
+        # A single slow page (vision + enrichment) must not look like a dead worker
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            if not job.file_path or not os.path.exists(job.file_path):
+                raise FileNotFoundError(f"Uploaded PDF not found: {job.file_path}")
+
+            ingest_kwargs = {k: job.options[k] for k in _INGEST_OPTIONS if k in job.options}
+            # LLM calls made while ingesting queue behind chat traffic
+            with llm_priority(LLMPriority.INGESTION):
+                result = await self.ingestion_service.ingest_pdf(
+                    pdf_path=job.file_path,
+                    document_id=job.document_id,
+                    progress_callback=report_progress,
+                    **ingest_kwargs
+                )
+
+            nodes_created = 0
+            if job.options.get("create_module_node", True):
+                nodes_created = self._ensure_module_node(job.document_id)
+
+            summary = asdict(result)
+            summary["success_rate"] = result.success_rate
+            completed = await asyncio.to_thread(
+                self.repository.complete, job.job_id, self.worker_id, summary, nodes_created
+            )
+            if not completed:
+                logger.warning(
+                    f"[INGESTION_WORKER] Lost claim on job {job.job_id}; result not recorded "
+                    f"(job was re-queued or claimed by another worker)"
+                )
+                return False
+            logger.info(
+                f"[INGESTION_WORKER] Job {job.job_id} completed: "
+                f"{result.successful_pages}/{result.total_pages} pages"
+            )
+        except Exception as e:
+            status = await asyncio.to_thread(self.repository.fail, job.job_id, self.worker_id, str(e))
+            if status is None:
+                logger.warning(f"[INGESTION_WORKER] Lost claim on job {job.job_id}; failure not recorded: {e}")
+            else:
+                logger.error(f"[INGESTION_WORKER] Job {job.job_id} failed ({status}): {e}")
+            return False
+        finally:
+            heartbeat.cancel()
+
+        # Keep the upload around for retries; remove it once ingested
+        try:
+            os.remove(job.file_path)
+        except OSError:
+            pass
+        return True
+
+    async def _heartbeat(self, job: IngestionJob) -> None:
+        """Refresh the job's heartbeat every heartbeat_interval until cancelled or the claim is lost."""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                owned = await asyncio.to_thread(self.repository.heartbeat, job.job_id, self.worker_id)
+            except Exception as e:
+                logger.warning(f"[INGESTION_WORKER] Heartbeat failed for {job.job_id}: {e}")
+                continue
+            if not owned:
+                logger.warning(f"[INGESTION_WORKER] Lost claim on job {job.job_id} (re-queued as stale)")
+                return
+
+    def _ensure_module_node(self, document_id: str) -> int:
+        """Create the Module node in Neo4j (Phase 4 + 6 integration)."""
+        from app.repositories.user_graph_repository import get_user_graph_repository
+
+        user_graph = get_user_graph_repository()
+        if not user_graph.is_available():
+            return 0
+        user_graph.ensure_module_node(
+            module_id=document_id,
+            title=document_id.replace("_", " ").title()
+        )
+        logger.info(f"[INGESTION_WORKER] Created Module node in Neo4j: {document_id}")
+        return 1
+
+    async def run_once(self) -> bool:
+        """
+        Claim and process at most one job.
+
+        Returns:
+            True if a job was claimed
+        """
+        job = await asyncio.to_thread(self.repository.claim_next, self.worker_id)
+        if job is None:
+            return False
+        await self.process_job(job)
+        self.jobs_processed += 1
+        return True
+
+    async def run(self, stop_event: Optional[asyncio.Event] = None, max_jobs: Optional[int] = None) -> None:
+        """
+        Poll the queue until stopped.
+
+        Args:
+            stop_event: Set to stop after the current job
+            max_jobs: Stop after this many jobs (None = unlimited)
+        """
+        stop_event = stop_event or asyncio.Event()
+        logger.info(f"[INGESTION_WORKER] {self.worker_id} started (poll every {self.poll_interval}s)")
+
+        while not stop_event.is_set():
+            try:
+                await asyncio.to_thread(self.repository.requeue_stale, self.stale_after_seconds)
+                claimed = await self.run_once()
+            except Exception as e:
+                logger.error(f"[INGESTION_WORKER] Queue error: {e}")
+                claimed = False
+
+            if max_jobs is not None and self.jobs_processed >= max_jobs:
+                break
+            if not claimed:
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+        logger.info(f"[INGESTION_WORKER] {self.worker_id} stopped after {self.jobs_processed} jobs")
+
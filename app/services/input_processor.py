@@ -15,6 +15,9 @@ from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from app.core.config import settings
+from app.engine.agentic_rag.adaptive_token_budget import get_adaptive_token_budget
+from app.engine.context_packer import ContextSegment, get_context_packer
+from app.engine.conversation_analyzer import ConversationState
 from app.models.schemas import ChatRequest, UserRole
 
 logger = logging.getLogger(__name__)
@@ -59,11 +62,16 @@ class ChatContext:
     # Analysis Context
     conversation_analysis: Any = None  # ConversationContext
     
+    # Prompt-context tokens per kind after packing (history, memory, insights, ...)
+    prompt_tokens: Dict[str, int] = None
+    
     def __post_init__(self):
         if self.history_list is None:
             self.history_list = []
         if self.user_facts is None:
             self.user_facts = []
+        if self.prompt_tokens is None:
+            self.prompt_tokens = {}
 
 
 # =============================================================================
@@ -188,7 +196,8 @@ class InputProcessor:
         self,
         request: ChatRequest,
         session_id: UUID,
-        user_name: Optional[str] = None
+        user_name: Optional[str] = None,
+        analysis_state: Optional[ConversationState] = None
     ) -> ChatContext:
         """
         Build complete context for chat processing.
@@ -203,6 +212,8 @@ class InputProcessor:
             request: ChatRequest from API
             session_id: Session UUID
             user_name: Optional pre-known user name
+            analysis_state: Session's rolling ConversationAnalyzer state
+                (SessionState.conversation_analysis); only new messages are analyzed
             
         Returns:
             ChatContext with all retrieved context
@@ -228,8 +239,8 @@ class InputProcessor:
         if context.lms_user_name and not context.user_name:
             context.user_name = context.lms_user_name
         
-        # Build semantic context
-        semantic_parts = []
+        # Build semantic context (segments packed with history into the turn's token budget)
+        semantic_segments = []
         
         # 1. Retrieve prioritized insights (v0.5)
         if self._semantic_memory and self._semantic_memory.is_available():
@@ -242,7 +253,11 @@ class InputProcessor:
                 
                 if insights:
                     insight_lines = [f"- [{i.category.value}] {i.content}" for i in insights[:5]]
-                    semantic_parts.append(f"=== Behavioral Insights ===\n" + "\n".join(insight_lines))
+                    semantic_segments.append(ContextSegment(
+                        f"=== Behavioral Insights ===\n" + "\n".join(insight_lines),
+                        kind="insights",
+                        priority=0.8
+                    ))
                     logger.info(f"[INSIGHT ENGINE] Retrieved {len(insights)} prioritized insights for user {user_id}")
                 
                 # Also get traditional context (facts + memories)
@@ -255,7 +270,7 @@ class InputProcessor:
                 )
                 traditional_context = mem_context.to_prompt_context()
                 if traditional_context:
-                    semantic_parts.append(traditional_context)
+                    semantic_segments.append(ContextSegment(traditional_context, kind="memory", priority=0.9))
                 
                 context.user_facts = mem_context.user_facts if mem_context.user_facts else []
                 
@@ -273,18 +288,24 @@ class InputProcessor:
                 
                 if graph_context.get("learning_path"):
                     path_items = [f"- {m['title']}" for m in graph_context["learning_path"][:5]]
-                    semantic_parts.append(f"=== Learning Path ===\n" + "\n".join(path_items))
+                    semantic_segments.append(ContextSegment(
+                        f"=== Learning Path ===\n" + "\n".join(path_items),
+                        kind="learning_path",
+                        priority=0.5
+                    ))
                 
                 if graph_context.get("knowledge_gaps"):
                     gap_items = [f"- {g['topic_name']}" for g in graph_context["knowledge_gaps"][:5]]
-                    semantic_parts.append(f"=== Knowledge Gaps ===\n" + "\n".join(gap_items))
+                    semantic_segments.append(ContextSegment(
+                        f"=== Knowledge Gaps ===\n" + "\n".join(gap_items),
+                        kind="knowledge_gaps",
+                        priority=0.6
+                    ))
                 
                 logger.info(f"[LEARNING GRAPH] Added graph context for {user_id}")
             except Exception as e:
                 logger.warning(f"Learning graph retrieval failed: {e}")
         
-        context.semantic_context = "\n\n".join(semantic_parts)
-        
         # 3. Get sliding window history
         if self._chat_history and self._chat_history.is_available():
             recent_messages = self._chat_history.get_recent_messages(session_id)
@@ -301,6 +322,23 @@ class InputProcessor:
             if not context.user_name:
                 context.user_name = self._chat_history.get_user_name(session_id)
         
+        # Fit semantic context and history into the turn's prompt-context budget
+        # The budget tier comes from a query heuristic; short follow-ups ("chi tiết hơn")
+        # land in MINIMAL, so history has its own floor
+        history_segment = ContextSegment(
+            context.conversation_history, kind="history", priority=0.95, keep="tail",
+            min_tokens=settings.context_history_min_tokens
+        )
+        packed = get_context_packer().pack(
+            semantic_segments + [history_segment],
+            get_adaptive_token_budget().get_budget(message).context_tokens,
+            label="chat_context"
+        )
+        context.semantic_context = "\n\n".join(s.text for s in packed.segments if s is not history_segment)
+        history_packed = any(s is history_segment for s in packed.segments)
+        context.conversation_history = history_segment.text if history_packed else ""
+        context.prompt_tokens = packed.breakdown
+        
         # 4. Get conversation summary
         if self._memory_summarizer:
             try:
@@ -311,7 +349,9 @@ class InputProcessor:
         # 5. Analyze conversation for deep reasoning
         if self._conversation_analyzer and context.history_list:
             try:
-                context.conversation_analysis = self._conversation_analyzer.analyze(context.history_list)
+                context.conversation_analysis = self._conversation_analyzer.analyze(
+                    context.history_list, state=analysis_state
+                )
                 logger.info(f"[CONTEXT ANALYZER] Question type: {context.conversation_analysis.question_type.value}")
             except Exception as e:
                 logger.warning(f"Failed to analyze conversation: {e}")
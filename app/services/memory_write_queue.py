@@ -0,0 +1,442 @@
+"""
+Memory Write Queue - Bounded, per-user ordered post-turn memory processing.
+
+Replaces the per-request FastAPI BackgroundTasks for insight/fact
+extraction, semantic memory writes and profile stats (BackgroundTaskRunner;
+conversation summarization stays in the API process):
+
+- Bounded concurrency: ``max_concurrency`` workers, each owning one user
+  at a time, so a user's turns are processed in order
+- Coalescing: consecutive queued turns of the same session are processed
+  as one batch (one extraction call, one embedding request, one write)
+- Durable spill-over: when ``max_pending`` turns are held in memory, at
+  shutdown, after a failure (the processor raises), or with MEMORY_QUEUE_INLINE=false, turns go to
+  the memory_write_queue table. Workers here or in scripts/memory_worker.py
+  claim them one user at a time (FOR UPDATE SKIP LOCKED)
+- Metrics: queue depth, spill/processing counters and enqueue -> processed lag
+
+Feature: memory-write-queue
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.repositories.memory_write_queue_repository import (
+    MemoryTurn,
+    MemoryWriteQueueRepository,
+    get_memory_write_queue_repository,
+)
+
+logger = logging.getLogger(__name__)
+
+MemoryProcessor = Callable[[List[MemoryTurn]], Awaitable[None]]
+
+
+class MemoryWriteQueue:
+    """
+    In-process queue of chat turns awaiting memory processing.
+
+    Usage:
+        queue = MemoryWriteQueue(processor=runner.process_memory_turns)
+        queue.start()
+        queue.submit(MemoryTurn(user_id, session_id, message, response, time.time()))
+        await queue.stop()          # spills what is still queued
+    """
+
+    def __init__(
+        self,
+        processor: Optional[MemoryProcessor] = None,
+        repository: Optional[MemoryWriteQueueRepository] = None,
+        max_concurrency: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        max_coalesce: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        inline: Optional[bool] = None,
+        max_attempts: Optional[int] = None,
+        retry_base_seconds: Optional[float] = None,
+        retry_max_seconds: Optional[float] = None,
+        stale_after_seconds: Optional[int] = None
+    ):
+        """
+        Args:
+            processor: Async callable handling one batch (same user and session,
+                oldest first); defaults to BackgroundTaskRunner.process_memory_turns
+            repository: Spill-over table (defaults to the shared repository)
+            max_concurrency: Workers (users processed concurrently)
+            max_pending: Turns held in memory before spilling
+            max_coalesce: Max turns per batch
+            poll_interval: Seconds between polls of the spill-over table
+            inline: Run workers in this process (False = spill every submitted
+                turn for scripts/memory_worker.py)
+            max_attempts: Attempts before a turn is marked dead
+            retry_base_seconds: First retry delay (doubles per attempt)
+            retry_max_seconds: Retry delay cap
+            stale_after_seconds: Claim age after which spilled turns are released
+        """
+        self._processor = processor
+        self.repository = repository or get_memory_write_queue_repository()
+        self.max_concurrency = max_concurrency or settings.memory_queue_max_concurrency
+        self.max_pending = max_pending or settings.memory_queue_max_pending
+        self.max_coalesce = max_coalesce or settings.memory_queue_max_coalesce
+        self.poll_interval = poll_interval if poll_interval is not None else settings.memory_queue_poll_seconds
+        self.inline = inline if inline is not None else settings.memory_queue_inline
+        self.max_attempts = max_attempts or settings.memory_queue_max_attempts
+        self.retry_base_seconds = retry_base_seconds if retry_base_seconds is not None else settings.memory_queue_retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds if retry_max_seconds is not None else settings.memory_queue_retry_max_seconds
+        self.stale_after_seconds = stale_after_seconds or settings.memory_queue_stale_seconds
+
+        self._lanes: Dict[str, Deque[MemoryTurn]] = {}
+        self._ready: asyncio.Queue = asyncio.Queue()
+        self._scheduled: Set[str] = set()  # Users in _ready or being processed
+        self._active: Set[str] = set()  # Users a worker is processing right now
+        self._spill_mode: Set[str] = set()  # Users whose turns go to the table until it is drained
+        self._spills_in_flight: Dict[str, int] = {}
+        self._workers: List[asyncio.Task] = []
+        self._background: Set[asyncio.Task] = set()
+        self._spill_lock = asyncio.Lock()  # FIFO: spills are written in submit order
+        self._stop = asyncio.Event()
+        self._last_drain = 0.0
+        self.running = False
+
+        # Metrics
+        self.submitted_total = 0
+        self.spilled_total = 0
+        self.dropped_total = 0
+        self.processed_turns = 0
+        self.processed_batches = 0
+        self.failed_batches = 0
+        self.dead_total = 0
+        self.last_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+        self._lag_sum = 0.0
+
+    @property
+    def processor(self) -> MemoryProcessor:
+        if self._processor is None:
+            from app.services.background_tasks import get_background_runner
+            self._processor = get_background_runner().process_memory_turns
+        return self._processor
+
+    @property
+    def pending(self) -> int:
+        """Turns held in memory."""
+        return sum(len(lane) for lane in self._lanes.values())
+
+    def _can_spill(self) -> bool:
+        return self.repository is not None and self.repository.is_available()
+
+    # =========================================================================
+    # Producer side
+    # =========================================================================
+
+    def submit(self, turn: MemoryTurn) -> None:
+        """
+        Queue a finished turn (never blocks the request).
+
+        The turn stays in memory unless the queue is full, not processing
+        inline, or the user already has spilled turns; then it is written to
+        the spill-over table together with the user's queued turns so their
+        order is kept.
+        """
+        self.submitted_total += 1
+        user_id = turn.user_id
+
+        if not (self.running and self.inline) or user_id in self._spill_mode or self.pending >= self.max_pending:
+            queued = self._lanes.pop(user_id, None) or ()
+            self._spill([*queued, turn])
+            return
+
+        self._lanes.setdefault(user_id, deque()).append(turn)
+        self._schedule(user_id)
+
+    def _schedule(self, user_id: str) -> None:
+        if user_id not in self._scheduled:
+            self._scheduled.add(user_id)
+            self._ready.put_nowait(user_id)
+
+    def _spill(self, turns: List[MemoryTurn], delay_seconds: float = 0.0, error: Optional[str] = None) -> None:
+        """Write turns to the spill-over table in the background."""
+        if not self._can_spill():
+            self.dropped_total += len(turns)
+            logger.warning(f"[MEMORY_QUEUE] Dropped {len(turns)} turns (queue full, spill-over table unavailable)")
+            return
+
+        users = {turn.user_id for turn in turns}
+        # Spill mode only matters while this process queues turns in memory;
+        # otherwise every turn is spilled and nothing would ever leave the set
+        track = self.running and self.inline
+        for user_id in users:
+            if track:
+                self._spill_mode.add(user_id)
+            self._spills_in_flight[user_id] = self._spills_in_flight.get(user_id, 0) + 1
+
+        async def write():
+            try:
+                async with self._spill_lock:
+                    await asyncio.to_thread(self.repository.enqueue_many, turns, delay_seconds, error)
+                self.spilled_total += len(turns)
+            except Exception as e:
+                self.dropped_total += len(turns)
+                logger.error(f"[MEMORY_QUEUE] Failed to spill {len(turns)} turns: {e}")
+            finally:
+                for user_id in users:
+                    self._spills_in_flight[user_id] -= 1
+                    if not self._spills_in_flight[user_id]:
+                        del self._spills_in_flight[user_id]
+
+        task = asyncio.create_task(write())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    # =========================================================================
+    # Workers
+    # =========================================================================
+
+    def start(self) -> None:
+        """Accept turns; start the workers on the running event loop if inline."""
+        if self.running:
+            return
+        self._stop.clear()
+        self.running = True
+        if self.inline:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)]
+        logger.info(
+            f"[MEMORY_QUEUE] Started {self.max_concurrency} workers (inline={self.inline}, "
+            f"max_pending={self.max_pending}, coalesce up to {self.max_coalesce} turns)"
+        )
+
+    async def stop(self, timeout: float = 15.0) -> None:
+        """
+        Let workers finish their current batch, then spill queued turns.
+        """
+        if not self.running:
+            return
+        self.running = False
+        self._stop.set()
+        if self._workers:
+            done, still_running = await asyncio.wait(self._workers, timeout=timeout)
+            for task in still_running:
+                task.cancel()
+        self._workers = []
+
+        queued = [turn for lane in self._lanes.values() for turn in lane]
+        self._lanes.clear()
+        if queued:
+            self._spill(queued)
+        if self._background:
+            await asyncio.wait(list(self._background), timeout=timeout)
+        logger.info(f"[MEMORY_QUEUE] Stopped ({len(queued)} queued turns spilled)")
+
+    async def run(self, stop_event: asyncio.Event) -> None:
+        """Run the workers until ``stop_event`` is set (scripts/memory_worker.py)."""
+        self.start()
+        await stop_event.wait()
+        await self.stop()
+
+    def retry_delay(self, attempts: int) -> float:
+        """Exponential backoff with jitter for the given attempt count."""
+        delay = min(self.retry_base_seconds * (2 ** max(attempts - 1, 0)), self.retry_max_seconds)
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _worker(self) -> None:
+        while not self._stop.is_set():
+            try:
+                user_id = await asyncio.wait_for(self._ready.get(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                await self._drain_spilled()
+                continue
+
+            await self._run_lane(user_id)
+            # Keep spilled turns moving while the in-memory queue is busy
+            if time.monotonic() - self._last_drain >= self.poll_interval:
+                await self._drain_spilled()
+
+    async def _run_lane(self, user_id: str) -> None:
+        """Process the next batch of one user's in-memory turns."""
+        if user_id in self._active:
+            return  # The worker holding this user reschedules it when done
+
+        lane = self._lanes.get(user_id)
+        if not lane:
+            self._scheduled.discard(user_id)
+            return
+
+        batch = [lane.popleft()]
+        while lane and len(batch) < self.max_coalesce and lane[0].session_id == batch[0].session_id:
+            batch.append(lane.popleft())
+        if not lane:
+            del self._lanes[user_id]
+
+        self._active.add(user_id)
+        try:
+            await self._process(batch)
+        finally:
+            self._release(user_id)
+
+    def _release(self, user_id: str) -> None:
+        self._active.discard(user_id)
+        if self._lanes.get(user_id):
+            self._scheduled.add(user_id)
+            self._ready.put_nowait(user_id)
+        else:
+            self._scheduled.discard(user_id)
+
+    async def _process(self, batch: List[MemoryTurn]) -> None:
+        """Run the processor on an in-memory batch; failures are spilled for retry."""
+        try:
+            await self.processor(batch)
+            self._record(batch)
+        except Exception as e:
+            self.failed_batches += 1
+            for turn in batch:
+                turn.attempts += 1
+            if batch[0].attempts >= self.max_attempts:
+                self.dead_total += len(batch)
+                logger.error(f"[MEMORY_QUEUE] Giving up on {len(batch)} turns for user {batch[0].user_id}: {e}")
+                return
+            logger.warning(f"[MEMORY_QUEUE] Batch failed for user {batch[0].user_id}, retrying later: {e}")
+            # Later queued turns of this user follow it into the table, in order
+            queued = self._lanes.pop(batch[0].user_id, None) or ()
+            self._spill([*batch, *queued], self.retry_delay(batch[0].attempts), f"{type(e).__name__}: {e}")
+
+    async def _drain_spilled(self) -> int:
+        """
+        Claim and process one user's spilled turns.
+
+        Returns:
+            Number of turns claimed
+        """
+        if not self._can_spill():
+            return 0
+        self._last_drain = time.monotonic()
+
+        try:
+            await asyncio.to_thread(self.repository.requeue_stale, self.stale_after_seconds)
+            exclude = list(self._active | set(self._lanes))
+            turns = await asyncio.to_thread(self.repository.claim_user_batch, self.max_coalesce, exclude)
+        except Exception as e:
+            logger.error(f"[MEMORY_QUEUE] Claim error: {e}")
+            return 0
+
+        if not turns:
+            await self._leave_spill_mode()
+            return 0
+
+        user_id = turns[0].user_id
+        self._active.add(user_id)
+        try:
+            # Consecutive turns of the same session form one batch
+            start = 0
+            for end in range(1, len(turns) + 1):
+                if end == len(turns) or turns[end].session_id != turns[start].session_id:
+                    await self._process_claimed(turns[start:end])
+                    start = end
+        finally:
+            self._release(user_id)
+        return len(turns)
+
+    async def _process_claimed(self, batch: List[MemoryTurn]) -> None:
+        ids = [turn.turn_id for turn in batch]
+        try:
+            await self.processor(batch)
+        except Exception as e:
+            self.failed_batches += 1
+            error = f"{type(e).__name__}: {e}"
+            attempts = max(turn.attempts for turn in batch)
+            try:
+                if attempts >= self.max_attempts:
+                    await asyncio.to_thread(self.repository.mark_dead, ids, error)
+                    self.dead_total += len(batch)
+                    logger.error(f"[MEMORY_QUEUE] Giving up on {len(batch)} spilled turns for user {batch[0].user_id}: {e}")
+                else:
+                    # Insights already stored are not extracted again on retry
+                    extracted = [turn.turn_id for turn in batch if turn.insights_extracted]
+                    await asyncio.to_thread(
+                        self.repository.reschedule, ids, error, self.retry_delay(attempts), extracted
+                    )
+            except Exception as db_error:
+                logger.error(f"[MEMORY_QUEUE] Failed to record failure (turns will be released as stale): {db_error}")
+            return
+
+        try:
+            await asyncio.to_thread(self.repository.complete, ids)
+        except Exception as e:
+            logger.error(f"[MEMORY_QUEUE] Failed to delete processed turns {ids}: {e}")
+        self._record(batch)
+
+    async def _leave_spill_mode(self) -> None:
+        """Return users to in-memory queuing once their spilled turns are gone."""
+        candidates = [user_id for user_id in self._spill_mode if user_id not in self._spills_in_flight]
+        if not candidates:
+            return
+        try:
+            backlog = await asyncio.to_thread(self.repository.users_with_backlog, candidates)
+        except Exception as e:
+            logger.debug(f"[MEMORY_QUEUE] Backlog check failed: {e}")
+            return
+        for user_id in candidates:
+            # A new spill may have started while we were checking
+            if user_id not in backlog and user_id not in self._spills_in_flight:
+                self._spill_mode.discard(user_id)
+
+    def _record(self, batch: List[MemoryTurn]) -> None:
+        now = time.time()
+        lags = [max(now - turn.enqueued_at, 0.0) for turn in batch]
+        self.processed_turns += len(batch)
+        self.processed_batches += 1
+        self.last_lag_seconds = max(lags)
+        self.max_lag_seconds = max(self.max_lag_seconds, self.last_lag_seconds)
+        self._lag_sum += sum(lags)
+
+    # =========================================================================
+    # Metrics
+    # =========================================================================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, counters and lag of this process's queue."""
+        heads = [lane[0].enqueued_at for lane in self._lanes.values() if lane]
+        return {
+            "running": self.running,
+            "inline": self.inline,
+            "max_concurrency": self.max_concurrency,
+            "pending": self.pending,
+            "pending_users": len(self._lanes),
+            "active_users": len(self._active),
+            "spill_mode_users": len(self._spill_mode),
+            "oldest_pending_age_seconds": round(time.time() - min(heads), 3) if heads else 0.0,
+            "submitted_total": self.submitted_total,
+            "spilled_total": self.spilled_total,
+            "dropped_total": self.dropped_total,
+            "processed_turns": self.processed_turns,
+            "processed_batches": self.processed_batches,
+            "coalesced_turns": self.processed_turns - self.processed_batches,
+            "failed_batches": self.failed_batches,
+            "dead_total": self.dead_total,
+            "last_lag_seconds": round(self.last_lag_seconds, 3),
+            "max_lag_seconds": round(self.max_lag_seconds, 3),
+            "avg_lag_seconds": round(self._lag_sum / self.processed_turns, 3) if self.processed_turns else 0.0,
+        }
+
+
+# Singleton instance
+_memory_write_queue: Optional[MemoryWriteQueue] = None
+
+
+def get_memory_write_queue() -> MemoryWriteQueue:
+    """Get or create MemoryWriteQueue singleton."""
+    global _memory_write_queue
+    if _memory_write_queue is None:
+        _memory_write_queue = MemoryWriteQueue()
+    return _memory_write_queue
+
+
+def get_running_memory_write_queue() -> Optional[MemoryWriteQueue]:
+    """The singleton if it was started (API lifespan), else None."""
+    if _memory_write_queue is not None and _memory_write_queue.running:
+        return _memory_write_queue
+    return None
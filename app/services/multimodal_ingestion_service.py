@@ -10,7 +10,7 @@ Full pipeline: PDF → Images → Supabase → Vision → Embeddings → Databas
 import logging
 import os
 import json
-from typing import List, Optional, TYPE_CHECKING
+from typing import Awaitable, Callable, List, Optional, TYPE_CHECKING
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -31,6 +31,7 @@ except ImportError:
 from app.core.config import settings
 from app.core.database import get_shared_session_factory
 from app.services.supabase_storage import SupabaseStorageClient, get_storage_client
+from app.services.pdf_page_source import PdfPageSource, LazyPage, PeakRSSTracker
 from app.services.chunking_service import SemanticChunker, get_semantic_chunker, ChunkResult
 from app.engine.vision_extractor import VisionExtractor, get_vision_extractor
 from app.engine.gemini_embedding import GeminiOptimizedEmbeddings
@@ -59,6 +60,14 @@ class IngestionResult:
     direct_pages: int = 0      # Pages processed via PyMuPDF direct extraction
     fallback_pages: int = 0    # Pages that fell back from direct to vision
     
+    # Streaming page source (lazy rasterization) tracking
+    rasterized_pages: int = 0  # Pages actually rendered to images
+    peak_rss_mb: float = 0.0   # Peak process RSS sampled during ingestion
+    
+    # Incremental re-ingestion tracking
+    unchanged_pages: int = 0   # Pages skipped because their fingerprint matched
+    deleted_chunks: int = 0    # Stale/orphaned chunks removed
+    
     @property
     def success_rate(self) -> float:
         """Calculate success rate percentage"""
@@ -90,6 +99,7 @@ class PageResult:
     error: Optional[str] = None
     extraction_method: str = "vision"  # "direct" or "vision" (Feature: hybrid-text-vision)
     was_fallback: bool = False  # True if fell back from direct to vision
+    deleted_chunks: int = 0  # Stale chunks removed after re-chunking
 
 
 class MultimodalIngestionService:
@@ -97,7 +107,7 @@ class MultimodalIngestionService:
     Service for multimodal document ingestion.
     
     Pipeline:
-    1. Rasterization: PDF → High-quality images (pdf2image)
+    1. Rasterization: PDF → High-quality images, one page at a time on demand
     2. Storage: Upload images to Supabase Storage
     3. Vision Extraction: Gemini Vision extracts text from images
     4. Indexing: Store text + embeddings + image_url in Neon
@@ -156,6 +166,9 @@ class MultimodalIngestionService:
         self.force_vision_mode = settings.force_vision_mode
         self.min_text_length = settings.min_text_length_for_direct
         
+        # Incremental re-ingestion: page_fingerprint column availability (lazy check)
+        self._fingerprint_column: Optional[bool] = None
+        
         logger.info(
             f"MultimodalIngestionService initialized: "
             f"hybrid_detection={self.hybrid_detection_enabled}, "
@@ -259,7 +272,8 @@ class MultimodalIngestionService:
         """
         Convert PDF pages to high-quality images.
         
-        MEMORY OPTIMIZED: Converts pages one at a time to reduce peak memory usage.
+        NOTE: Holds the whole page range in memory. ingest_pdf() streams pages
+        through PdfPageSource instead; use this only for small ranges.
         
         Args:
             pdf_path: Path to PDF file
@@ -323,7 +337,9 @@ class MultimodalIngestionService:
         resume: bool = True,
         max_pages: Optional[int] = None,
         start_page: Optional[int] = None,
-        end_page: Optional[int] = None
+        end_page: Optional[int] = None,
+        incremental: bool = True,
+        progress_callback: Optional[Callable[[int, int], Awaitable[None]]] = None
     ) -> IngestionResult:
         """
         Full ingestion pipeline: PDF → Images → Vision → Database.
@@ -335,6 +351,9 @@ class MultimodalIngestionService:
             max_pages: Maximum pages to process (for testing)
             start_page: Start from this page (1-indexed, for batch processing)
             end_page: Stop at this page (1-indexed, inclusive)
+            incremental: Skip pages whose content fingerprint is unchanged
+            progress_callback: Awaited after every page with
+                (pages_done, pages_in_batch), e.g. to persist job progress
             
         Returns:
             IngestionResult with summary statistics
@@ -365,15 +384,34 @@ class MultimodalIngestionService:
                 batch_start = resume_page
                 logger.info(f"Resuming from page {resume_page + 1}")
         
-        # Convert ONLY the pages we need (optimized for batch processing)
+        memory = PeakRSSTracker()
+        
+        # Content fingerprints of the previous ingestion (page_number -> hash)
+        previous_fingerprints = {}
+        if incremental and self._page_fingerprint_supported():
+            previous_fingerprints = self._load_page_fingerprints(document_id)
+            if previous_fingerprints:
+                logger.info(
+                    f"Incremental re-ingestion: {len(previous_fingerprints)} fingerprinted pages on record"
+                )
+        
+        # Evidence images already in storage (re-ingestion / resume): direct
+        # extraction pages reuse them and are never rasterized
+        existing_image_urls = {}
+        if self.hybrid_detection_enabled and not self.force_vision_mode:
+            existing_image_urls = await self.storage.list_page_image_urls(document_id)
+        
+        # Stream ONLY the pages we need - each page is rendered on demand
         try:
-            images, total_pages = self.convert_pdf_to_images(
+            page_source = PdfPageSource(
                 pdf_path,
-                start_page=batch_start,
-                end_page=batch_end
+                start=batch_start,
+                end=batch_end,
+                dpi=self.DEFAULT_DPI,
+                existing_image_urls=existing_image_urls
             )
         except Exception as e:
-            logger.error(f"Failed to convert PDF: {e}")
+            logger.error(f"Failed to open PDF: {e}")
             return IngestionResult(
                 document_id=document_id,
                 total_pages=0,
@@ -382,17 +420,15 @@ class MultimodalIngestionService:
                 errors=[f"PDF conversion failed: {e}"]
             )
         
-        # Finalize batch_end after knowing total_pages
-        if batch_end is None:
-            batch_end = total_pages
-        else:
-            batch_end = min(batch_end, total_pages)
+        total_pages = page_source.total_pages
+        batch_end = page_source.end
         
         # Limit pages if max_pages is set (for testing)
         pages_to_process = batch_end - batch_start
         if max_pages is not None and max_pages > 0:
             pages_to_process = min(max_pages, pages_to_process)
             batch_end = batch_start + pages_to_process
+            page_source.end = batch_end
             logger.info(f"Limiting to {pages_to_process} pages (test mode)")
         
         successful_pages = 0
@@ -404,87 +440,104 @@ class MultimodalIngestionService:
         direct_pages = 0
         fallback_pages = 0
         
+        # Incremental re-ingestion tracking
+        unchanged_pages = 0
+        deleted_chunks = 0
+        page_fingerprints = {}
+        
         logger.info(f"Processing pages {batch_start + 1} to {batch_end} of {total_pages}")
         
-        # Open PDF for hybrid detection (need page objects)
-        pdf_doc = None
-        if self.hybrid_detection_enabled and USE_PYMUPDF:
-            try:
-                pdf_doc = fitz.open(pdf_path)
-            except Exception as e:
-                logger.warning(f"Could not open PDF for hybrid detection: {e}")
-        
-        # Process each page in the batch
-        # Note: images list now only contains pages from batch_start to batch_end
-        # So enumerate index 0 = page batch_start, index 1 = page batch_start+1, etc.
-        for idx in range(len(images)):
-            # Get image and immediately remove from list to free memory
-            image = images[idx]
-            images[idx] = None  # Free memory immediately
-            
-            # Calculate actual page number (0-indexed)
-            page_num = batch_start + idx
-            
-            # Log progress
-            logger.info(f"Processing page {page_num + 1} of {total_pages} (batch: {batch_start + 1}-{batch_end})")
-            
-            # Get PDF page for hybrid detection
-            pdf_page = None
-            if pdf_doc is not None:
-                try:
-                    pdf_page = pdf_doc.load_page(page_num)
-                except Exception as e:
-                    logger.warning(f"Could not load PDF page {page_num}: {e}")
-            
-            try:
-                result = await self._process_page(
-                    image=image,
-                    document_id=document_id,
-                    page_number=page_num + 1,  # 1-indexed
-                    pdf_page=pdf_page
-                )
+        # Hybrid detection needs PyMuPDF page objects
+        use_pdf_pages = self.hybrid_detection_enabled and USE_PYMUPDF
+        
+        with page_source:
+            for page in page_source:
+                page_num = page.page_number - 1  # 0-indexed
                 
-                if result.success:
-                    successful_pages += 1
-                    self._save_progress(document_id, page_num + 1)
+                # Log progress
+                logger.info(f"Processing page {page_num + 1} of {total_pages} (batch: {batch_start + 1}-{batch_end})")
+                
+                try:
+                    # Analyzed once: the fingerprint and _process_page share it
+                    analysis = self._analyze_page(page)
+                    fingerprint = await page.fingerprint(
+                        prefer_text=self._prefers_direct_extraction(page, analysis),
+                        min_text_length=self.min_text_length
+                    )
+                    page_fingerprints[page.page_number] = fingerprint
+                    previous = previous_fingerprints.get(page.page_number)
                     
-                    # Track extraction method (Feature: hybrid-text-vision)
-                    if result.extraction_method == "vision":
-                        vision_pages += 1
-                    else:
-                        direct_pages += 1
+                    if fingerprint is not None and fingerprint == previous:
+                        # Unchanged page: chunks, embeddings and entities are current
+                        unchanged_pages += 1
+                        successful_pages += 1
+                        self._save_progress(document_id, page_num + 1)
+                        logger.info(f"Page {page_num + 1}: unchanged, skipped")
+                        continue
                     
-                    if result.was_fallback:
-                        fallback_pages += 1
-                else:
-                    failed_pages += 1
-                    if result.error:
-                        errors.append(f"Page {page_num + 1}: {result.error}")
+                    if previous is not None:
+                        # Content changed - the stored evidence image is stale
+                        page.existing_image_url = None
+                    
+                    result = await self._process_page(
+                        image=None,
+                        document_id=document_id,
+                        page_number=page_num + 1,  # 1-indexed
+                        pdf_page=page.pdf_page if use_pdf_pages else None,
+                        source_page=page,
+                        page_fingerprint=fingerprint,
+                        page_analysis=analysis
+                    )
+                    deleted_chunks += result.deleted_chunks
+                    
+                    if result.success:
+                        successful_pages += 1
+                        self._save_progress(document_id, page_num + 1)
                         
-            except Exception as e:
-                failed_pages += 1
-                errors.append(f"Page {page_num + 1}: {str(e)}")
-                logger.error(f"Failed to process page {page_num + 1}: {e}")
-            finally:
-                # Explicitly close and free image memory
-                if image is not None:
-                    try:
-                        image.close()
-                    except:
-                        pass
-                    del image
-                
-                # Force garbage collection after each page to prevent memory buildup
-                import gc
-                gc.collect()
-        
-        # Close PDF document
-        if pdf_doc is not None:
-            pdf_doc.close()
+                        # Track extraction method (Feature: hybrid-text-vision)
+                        if result.extraction_method == "vision":
+                            vision_pages += 1
+                        else:
+                            direct_pages += 1
+                        
+                        if result.was_fallback:
+                            fallback_pages += 1
+                    else:
+                        failed_pages += 1
+                        if result.error:
+                            errors.append(f"Page {page_num + 1}: {result.error}")
+                            
+                except Exception as e:
+                    failed_pages += 1
+                    errors.append(f"Page {page_num + 1}: {str(e)}")
+                    logger.error(f"Failed to process page {page_num + 1}: {e}")
+                finally:
+                    # Sample while the page image is still alive, then free it
+                    memory.sample()
+                    page.release()
+                    del page
+                    
+                    # Force garbage collection after each page to prevent memory buildup
+                    import gc
+                    gc.collect()
+                    
+                    if progress_callback is not None:
+                        await progress_callback(successful_pages + failed_pages, pages_to_process)
         
         # Clear progress file on completion
         self._clear_progress(document_id)
         
+        # Pages beyond the new page count are orphaned (full runs only)
+        if batch_start == 0 and batch_end == total_pages:
+            deleted_chunks += self._delete_orphaned_pages(document_id, total_pages)
+        
+        # Only pages whose chunks were rewritten change what caches hold
+        rewritten_pages = successful_pages - unchanged_pages
+        if rewritten_pages > 0 or deleted_chunks > 0:
+            await self._invalidate_document_caches(document_id, page_fingerprints)
+        else:
+            logger.info(f"Document {document_id} unchanged, caches kept")
+
         # Log summary with hybrid detection stats
         result = IngestionResult(
             document_id=document_id,
@@ -494,13 +547,26 @@ class MultimodalIngestionService:
             errors=errors,
             vision_pages=vision_pages,
             direct_pages=direct_pages,
-            fallback_pages=fallback_pages
+            fallback_pages=fallback_pages,
+            rasterized_pages=page_source.rasterized_pages,
+            peak_rss_mb=round(memory.peak_mb, 1),
+            unchanged_pages=unchanged_pages,
+            deleted_chunks=deleted_chunks
         )
         
         logger.info(
             f"Ingestion complete: {successful_pages}/{total_pages} pages successful "
             f"({result.success_rate:.1f}%)"
         )
+        if unchanged_pages or deleted_chunks:
+            logger.info(
+                f"Incremental re-ingestion: {unchanged_pages} unchanged pages skipped, "
+                f"{deleted_chunks} stale chunks deleted"
+            )
+        logger.info(
+            f"Ingestion memory: peak RSS {memory.peak_mb:.1f} MB "
+            f"(+{memory.growth_mb:.1f} MB), rasterized {page_source.rasterized_pages} pages"
+        )
         
         # Log hybrid detection savings (Feature: hybrid-text-vision)
         if self.hybrid_detection_enabled:
@@ -550,17 +616,22 @@ class MultimodalIngestionService:
     
     async def _process_page(
         self,
-        image: Image.Image,
+        image: Optional[Image.Image],
         document_id: str,
         page_number: int,
-        pdf_page: Optional["fitz.Page"] = None
+        pdf_page: Optional["fitz.Page"] = None,
+        source_page: Optional[LazyPage] = None,
+        page_fingerprint: Optional[str] = None,
+        page_analysis: Optional[PageAnalysisResult] = None
     ) -> PageResult:
         """
         Process a single page through the pipeline with semantic chunking.
         
         Steps:
-        1. Upload image to Supabase
-        2. Analyze page for hybrid detection (if enabled)
+        1. Analyze page for hybrid detection (if enabled; reuses
+           page_analysis when the caller already analyzed the page)
+        2. Rasterize (lazily, via source_page) and upload image to Supabase
+           - skipped for direct-extraction pages whose image is already stored
         3. Extract text using Vision OR Direct method
         4. Apply semantic chunking
         5. Generate embedding per chunk
@@ -572,28 +643,12 @@ class MultimodalIngestionService:
         extraction_method = "vision"
         was_fallback = False
         
-        # Step 1: Upload to Supabase
-        upload_result = await self.storage.upload_pil_image(
-            image=image,
-            document_id=document_id,
-            page_number=page_number
-        )
-        
-        if not upload_result.success:
-            return PageResult(
-                page_number=page_number,
-                success=False,
-                error=f"Upload failed: {upload_result.error}"
-            )
-        
-        image_url = upload_result.public_url
-        
-        # Step 2: Hybrid detection - decide extraction method
+        # Step 1: Hybrid detection - decide extraction method
         text = None
         
         if self.hybrid_detection_enabled and pdf_page is not None and not self.force_vision_mode:
             # Analyze page to determine best extraction method
-            analysis = self.page_analyzer.analyze_page(pdf_page, page_number)
+            analysis = page_analysis or self.page_analyzer.analyze_page(pdf_page, page_number)
             
             if not self.page_analyzer.should_use_vision(analysis):
                 # Try direct extraction first
@@ -615,6 +670,39 @@ class MultimodalIngestionService:
                         f"({len(text)} chars, reasons: {analysis.detection_reasons})"
                     )
         
+        # Step 2: Evidence image - reuse the stored one for direct pages,
+        # otherwise rasterize on demand and upload
+        existing_url = source_page.existing_image_url if source_page is not None else None
+        if text is not None and existing_url:
+            image_url = existing_url
+            logger.debug(f"Page {page_number}: Reusing stored image, rasterization skipped")
+        else:
+            if image is None and source_page is not None:
+                image = await source_page.render()
+            if image is None:
+                return PageResult(
+                    page_number=page_number,
+                    success=False,
+                    error="Rasterization failed",
+                    extraction_method=extraction_method,
+                    was_fallback=was_fallback
+                )
+            
+            upload_result = await self.storage.upload_pil_image(
+                image=image,
+                document_id=document_id,
+                page_number=page_number
+            )
+            
+            if not upload_result.success:
+                return PageResult(
+                    page_number=page_number,
+                    success=False,
+                    error=f"Upload failed: {upload_result.error}"
+                )
+            
+            image_url = upload_result.public_url
+        
         # Step 3: Extract text using Vision (if not already extracted)
         if text is None:
             extraction_method = "vision"
@@ -713,7 +801,8 @@ class MultimodalIngestionService:
                     content_type=chunk.content_type,
                     confidence_score=chunk.confidence_score,
                     metadata=chunk.metadata,
-                    bounding_boxes=bounding_boxes  # Feature: source-highlight-citation
+                    bounding_boxes=bounding_boxes,  # Feature: source-highlight-citation
+                    page_fingerprint=page_fingerprint
                 )
                 successful_chunks += 1
                 
@@ -743,6 +832,11 @@ class MultimodalIngestionService:
                 was_fallback=was_fallback
             )
         
+        # Re-chunked page may have fewer chunks than the previous edition
+        deleted_chunks = self._delete_stale_chunks(
+            document_id, page_number, max(chunk.chunk_index for chunk in chunks) + 1
+        )
+        
         return PageResult(
             page_number=page_number,
             success=True,
@@ -750,7 +844,8 @@ class MultimodalIngestionService:
             text_length=len(text),
             total_chunks=successful_chunks,
             extraction_method=extraction_method,
-            was_fallback=was_fallback
+            was_fallback=was_fallback,
+            deleted_chunks=deleted_chunks
         )
     
     async def _store_chunk_in_database(
@@ -765,7 +860,8 @@ class MultimodalIngestionService:
         content_type: str = 'text',
         confidence_score: float = 1.0,
         metadata: Optional[dict] = None,
-        bounding_boxes: Optional[List[dict]] = None  # Feature: source-highlight-citation
+        bounding_boxes: Optional[List[dict]] = None,  # Feature: source-highlight-citation
+        page_fingerprint: Optional[str] = None  # Feature: incremental-reingestion
     ):
         """
         Store a semantic chunk in Neon database.
@@ -786,6 +882,12 @@ class MultimodalIngestionService:
         # Convert bounding_boxes to JSON string (Feature: source-highlight-citation)
         bounding_boxes_json = json.dumps(bounding_boxes) if bounding_boxes else None
         
+        # page_fingerprint column exists only after add_page_fingerprint_column.sql
+        with_fingerprint = self._page_fingerprint_supported()
+        fingerprint_set = "page_fingerprint = :page_fingerprint," if with_fingerprint else ""
+        fingerprint_column = ", page_fingerprint" if with_fingerprint else ""
+        fingerprint_value = ", :page_fingerprint" if with_fingerprint else ""
+        
         with session_factory() as session:
             # Check if record exists (by document_id, page_number, chunk_index)
             result = session.execute(
@@ -801,7 +903,7 @@ class MultimodalIngestionService:
             if result:
                 # Update existing record
                 session.execute(
-                    sql_text("""
+                    sql_text(f"""
                         UPDATE knowledge_embeddings 
                         SET content = :content,
                             contextual_content = :contextual_content,
@@ -811,6 +913,7 @@ class MultimodalIngestionService:
                             confidence_score = :confidence_score,
                             metadata = :metadata,
                             bounding_boxes = :bounding_boxes,
+                            {fingerprint_set}
                             updated_at = NOW()
                         WHERE document_id = :doc_id 
                         AND page_number = :page_num 
@@ -825,6 +928,7 @@ class MultimodalIngestionService:
                         "confidence_score": confidence_score,
                         "metadata": metadata_json,
                         "bounding_boxes": bounding_boxes_json,
+                        "page_fingerprint": page_fingerprint,
                         "doc_id": document_id,
                         "page_num": page_number,
                         "chunk_idx": chunk_index
@@ -833,12 +937,12 @@ class MultimodalIngestionService:
             else:
                 # Insert new record
                 session.execute(
-                    sql_text("""
+                    sql_text(f"""
                         INSERT INTO knowledge_embeddings 
                         (id, content, contextual_content, embedding, document_id, page_number, chunk_index, 
-                         image_url, content_type, confidence_score, metadata, source, bounding_boxes)
+                         image_url, content_type, confidence_score, metadata, source, bounding_boxes{fingerprint_column})
                         VALUES (:id, :content, :contextual_content, :embedding, :doc_id, :page_num, :chunk_idx,
-                                :image_url, :content_type, :confidence_score, :metadata, :source, :bounding_boxes)
+                                :image_url, :content_type, :confidence_score, :metadata, :source, :bounding_boxes{fingerprint_value})
                     """),
                     {
                         "id": str(uuid.uuid4()),
@@ -853,7 +957,8 @@ class MultimodalIngestionService:
                         "confidence_score": confidence_score,
                         "metadata": metadata_json,
                         "source": f"{document_id}_page_{page_number}_chunk_{chunk_index}",
-                        "bounding_boxes": bounding_boxes_json
+                        "bounding_boxes": bounding_boxes_json,
+                        "page_fingerprint": page_fingerprint
                     }
                 )
             
@@ -861,6 +966,147 @@ class MultimodalIngestionService:
         
         logger.debug(f"Stored chunk {chunk_index} of page {page_number} in database")
     
+    # =========================================================================
+    # Incremental re-ingestion (Feature: incremental-reingestion)
+    # =========================================================================
+    
+    def _page_fingerprint_supported(self) -> bool:
+        """Check (once) whether knowledge_embeddings has the page_fingerprint column."""
+        supported = self._fingerprint_column
+        if supported is None:
+            from sqlalchemy import text as sql_text
+            try:
+                session_factory = get_shared_session_factory()
+                with session_factory() as session:
+                    supported = session.execute(
+                        sql_text("""
+                            SELECT 1 FROM information_schema.columns
+                            WHERE table_name = 'knowledge_embeddings'
+                            AND column_name = 'page_fingerprint'
+                        """)
+                    ).fetchone() is not None
+            except Exception as e:
+                logger.warning(f"Could not check page_fingerprint column: {e}")
+                supported = False
+            if not supported:
+                logger.warning(
+                    "page_fingerprint column missing - incremental re-ingestion disabled "
+                    "(run scripts/migrations/add_page_fingerprint_column.sql)"
+                )
+            self._fingerprint_column = supported
+        return supported
+    
+    def _load_page_fingerprints(self, document_id: str) -> dict:
+        """
+        Load stored page fingerprints for a document.
+        
+        Pages whose chunks disagree (partially re-ingested) are left out,
+        so they are always re-processed.
+        
+        Returns:
+            Dict page_number (1-indexed) -> fingerprint
+        """
+        from sqlalchemy import text as sql_text
+        
+        try:
+            session_factory = get_shared_session_factory()
+            with session_factory() as session:
+                rows = session.execute(
+                    sql_text("""
+                        SELECT page_number, MIN(page_fingerprint)
+                        FROM knowledge_embeddings
+                        WHERE document_id = :doc_id
+                        GROUP BY page_number
+                        HAVING COUNT(DISTINCT page_fingerprint) = 1
+                        AND COUNT(*) = COUNT(page_fingerprint)
+                    """),
+                    {"doc_id": document_id}
+                ).fetchall()
+            return {row[0]: row[1] for row in rows}
+        except Exception as e:
+            logger.warning(f"Failed to load page fingerprints for {document_id}: {e}")
+            return {}
+    
+    def _analyze_page(self, page: LazyPage) -> Optional[PageAnalysisResult]:
+        """Hybrid-detection analysis of a page (None if detection is off or fails)."""
+        if not self.hybrid_detection_enabled or self.force_vision_mode or page.pdf_page is None:
+            return None
+        try:
+            return self.page_analyzer.analyze_page(page.pdf_page, page.page_number)
+        except Exception as e:
+            logger.debug(f"Page {page.page_number}: analysis failed: {e}")
+            return None
+    
+    def _prefers_direct_extraction(
+        self,
+        page: LazyPage,
+        analysis: Optional[PageAnalysisResult] = None
+    ) -> bool:
+        """Whether hybrid detection will extract this page from its text layer."""
+        analysis = analysis or self._analyze_page(page)
+        return analysis is not None and not self.page_analyzer.should_use_vision(analysis)
+    
+    def _delete_stale_chunks(self, document_id: str, page_number: int, chunk_count: int) -> int:
+        """Delete chunks of a page left over from a longer previous chunking."""
+        from sqlalchemy import text as sql_text
+        
+        try:
+            session_factory = get_shared_session_factory()
+            with session_factory() as session:
+                result = session.execute(
+                    sql_text("""
+                        DELETE FROM knowledge_embeddings
+                        WHERE document_id = :doc_id
+                        AND page_number = :page_num
+                        AND chunk_index >= :chunk_count
+                    """),
+                    {"doc_id": document_id, "page_num": page_number, "chunk_count": chunk_count}
+                )
+                session.commit()
+                return result.rowcount or 0
+        except Exception as e:
+            logger.warning(f"Failed to delete stale chunks for page {page_number}: {e}")
+            return 0
+    
+    def _delete_orphaned_pages(self, document_id: str, total_pages: int) -> int:
+        """Delete chunks of pages that no longer exist in the new edition."""
+        from sqlalchemy import text as sql_text
+        
+        try:
+            session_factory = get_shared_session_factory()
+            with session_factory() as session:
+                result = session.execute(
+                    sql_text("""
+                        DELETE FROM knowledge_embeddings
+                        WHERE document_id = :doc_id
+                        AND page_number > :total_pages
+                    """),
+                    {"doc_id": document_id, "total_pages": total_pages}
+                )
+                session.commit()
+                deleted = result.rowcount or 0
+            if deleted:
+                logger.info(f"Deleted {deleted} chunks of pages beyond page {total_pages}")
+            return deleted
+        except Exception as e:
+            logger.warning(f"Failed to delete orphaned pages for {document_id}: {e}")
+            return 0
+    
+    async def _invalidate_document_caches(self, document_id: str, page_fingerprints: dict) -> None:
+        """
+        Invalidate caches for a document whose chunks changed.
+        
+        The edition is identified by the ordered page fingerprint list, so
+        identical editions never invalidate. Other processes (the API when
+        this runs in scripts/ingestion_worker.py) are signalled through
+        document_cache_versions.
+        """
+        from app.services.document_cache_sync import publish_document_update
+        content = "\n".join(
+            f"{page}:{fingerprint}" for page, fingerprint in sorted(page_fingerprints.items())
+        )
+        await publish_document_update(document_id, content)
+    
     async def _extract_and_store_entities(
         self,
         text: str,
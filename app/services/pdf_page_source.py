@@ -0,0 +1,258 @@
+"""
+PDF Page Source - Streaming, lazily rasterized pages for ingestion.
+
+Replaces "render the whole page range up front" with a page iterator:
+- One PDF handle for the whole ingestion
+- A page is rasterized only when a consumer asks for its image
+  (direct-extraction pages with an existing evidence image never are)
+- At most one rendered page alive at a time
+
+Also provides RSS sampling so each ingestion can report its peak memory.
+
+**Feature: multimodal-rag-vision, hybrid-text-vision**
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import sys
+from typing import TYPE_CHECKING, Dict, Iterator, Optional
+
+from PIL import Image
+
+if TYPE_CHECKING:
+    import fitz
+
+try:
+    import fitz  # PyMuPDF
+    USE_PYMUPDF = True
+except ImportError:
+    from pdf2image import convert_from_path
+    USE_PYMUPDF = False
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Memory sampling
+# =============================================================================
+
+def current_rss_mb() -> float:
+    """
+    Current resident set size of this process in MB.
+
+    Reads /proc/self/statm on Linux; elsewhere falls back to the
+    process-lifetime peak from getrusage (best available approximation).
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        import resource  # Unix only
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, KB on Linux
+        return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+
+class PeakRSSTracker:
+    """Track peak RSS across samples taken during one ingestion."""
+
+    def __init__(self):
+        self.start_mb = current_rss_mb()
+        self.peak_mb = self.start_mb
+
+    def sample(self) -> float:
+        """Take a sample, returning the current RSS in MB."""
+        rss = current_rss_mb()
+        if rss > self.peak_mb:
+            self.peak_mb = rss
+        return rss
+
+    @property
+    def growth_mb(self) -> float:
+        """Peak RSS above the level at ingestion start."""
+        return max(0.0, self.peak_mb - self.start_mb)
+
+
+# =============================================================================
+# Page source
+# =============================================================================
+
+class LazyPage:
+    """
+    A PDF page whose image is rendered on first request.
+
+    Attributes:
+        page_number: 1-indexed page number
+        pdf_page: PyMuPDF page (None with the pdf2image fallback)
+        existing_image_url: Public URL of an already stored page image, if any
+    """
+
+    def __init__(
+        self,
+        source: "PdfPageSource",
+        page_index: int,
+        pdf_page: Optional["fitz.Page"] = None,
+        existing_image_url: Optional[str] = None
+    ):
+        self._source = source
+        self._page_index = page_index
+        self.page_number = page_index + 1
+        self.pdf_page = pdf_page
+        self.existing_image_url = existing_image_url
+        self._image: Optional[Image.Image] = None
+        self.rasterized = False
+
+    async def render(self) -> Optional[Image.Image]:
+        """Rasterize the page (once) off the event loop. None on error."""
+        if self._image is None and not self.rasterized:
+            self.rasterized = True
+            self._image = await asyncio.to_thread(
+                self._source.render_page, self._page_index, self.pdf_page
+            )
+        return self._image
+
+    async def fingerprint(self, prefer_text: bool = True, min_text_length: int = 50) -> Optional[str]:
+        """
+        Content fingerprint of the page (incremental re-ingestion).
+
+        Text pages hash their whitespace-normalized text layer (no rendering);
+        scanned/visual pages hash the rendered image, which stays cached for
+        the rest of the pipeline.
+
+        Args:
+            prefer_text: Page is extracted from its text layer
+            min_text_length: Shorter text layers fall back to the image hash
+
+        Returns:
+            "text:<sha256>" / "image:<sha256>", or None if the page cannot be read
+        """
+        if prefer_text and self.pdf_page is not None:
+            try:
+                normalized = " ".join(self.pdf_page.get_text("text").split())
+            except Exception:
+                normalized = ""
+            if len(normalized) >= min_text_length:
+                return "text:" + hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+        image = await self.render()
+        if image is None:
+            return None
+        return "image:" + hashlib.sha256(image.tobytes()).hexdigest()
+
+    def release(self) -> None:
+        """Free the rendered image."""
+        if self._image is not None:
+            try:
+                self._image.close()
+            except Exception:
+                pass
+            self._image = None
+
+
+class PdfPageSource:
+    """
+    Iterate over a page range of a PDF without rasterizing ahead.
+
+    Usage:
+        with PdfPageSource(pdf_path, start=0, end=10) as source:
+            for page in source:
+                image = await page.render()  # only if needed
+                ...
+                page.release()
+    """
+
+    def __init__(
+        self,
+        pdf_path: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        dpi: int = 150,
+        existing_image_urls: Optional[Dict[int, str]] = None
+    ):
+        """
+        Args:
+            pdf_path: Path to PDF file
+            start: First page (0-indexed)
+            end: Stop before this page (0-indexed, exclusive), None = last page
+            dpi: Rasterization resolution
+            existing_image_urls: 1-indexed page number -> stored image URL
+        """
+        self.pdf_path = pdf_path
+        self.dpi = dpi
+        self._existing = existing_image_urls or {}
+        self._doc = fitz.open(pdf_path) if USE_PYMUPDF else None
+
+        if self._doc is not None:
+            self.total_pages = len(self._doc)
+        else:
+            from pdf2image import pdfinfo_from_path
+            self.total_pages = int(pdfinfo_from_path(pdf_path)["Pages"])
+
+        self.start = max(0, start)
+        self.end = min(end if end is not None else self.total_pages, self.total_pages)
+        self.rasterized_pages = 0
+
+    def __len__(self) -> int:
+        return max(0, self.end - self.start)
+
+    def __iter__(self) -> Iterator[LazyPage]:
+        for page_index in range(self.start, self.end):
+            pdf_page = None
+            if self._doc is not None:
+                try:
+                    pdf_page = self._doc.load_page(page_index)
+                except Exception as e:
+                    logger.warning(f"Could not load PDF page {page_index}: {e}")
+            yield LazyPage(
+                source=self,
+                page_index=page_index,
+                pdf_page=pdf_page,
+                existing_image_url=self._existing.get(page_index + 1)
+            )
+
+    def render_page(
+        self,
+        page_index: int,
+        pdf_page: Optional["fitz.Page"] = None
+    ) -> Optional[Image.Image]:
+        """Rasterize a single page (0-indexed). None on error."""
+        try:
+            if self._doc is not None:
+                page = pdf_page if pdf_page is not None else self._doc.load_page(page_index)
+                zoom = self.dpi / 72
+                pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+                img = Image.open(io.BytesIO(pix.tobytes("jpeg")))
+                del pix
+            else:
+                # pdf2image uses 1-indexed pages
+                images = convert_from_path(
+                    self.pdf_path,
+                    dpi=self.dpi,
+                    fmt='jpeg',
+                    first_page=page_index + 1,
+                    last_page=page_index + 1
+                )
+                img = images[0] if images else None
+
+            if img is not None:
+                self.rasterized_pages += 1
+            return img
+        except Exception as e:
+            logger.error(f"Failed to convert page {page_index}: {e}")
+            return None
+
+    def close(self) -> None:
+        """Close the PDF handle."""
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
+
+    def __enter__(self) -> "PdfPageSource":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
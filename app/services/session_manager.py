@@ -8,18 +8,31 @@ Handles session lifecycle and anti-repetition state tracking.
 **Spec:** CHỈ THỊ KỸ THUẬT SỐ 25 - Project Restructure
 """
 
+import asyncio
 import logging
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
-from uuid import UUID, uuid4
+from typing import Any, Dict, List, Optional
+from uuid import UUID, uuid5
 
+from app.cache.session_store import SessionStore
+from app.core.config import settings
+from app.engine.conversation_analyzer import ConversationState
 from app.repositories.chat_history_repository import (
     ChatHistoryRepository,
     get_chat_history_repository
 )
+from app.repositories.session_state_repository import get_session_state_backend
 
 logger = logging.getLogger(__name__)
 
+# Namespace for the stable fallback session id of a user (no chat history)
+_FALLBACK_SESSION_NAMESPACE = UUID("6f1c2d9e-5b7a-4c3e-9a12-3d8e4f6b7c01")
+
+
+def _fallback_session_id(user_id: str) -> UUID:
+    """Deterministic session id, so persisted state still matches after a restart."""
+    return uuid5(_FALLBACK_SESSION_NAMESPACE, user_id)
+
 
 # =============================================================================
 # DATA CLASSES
@@ -38,6 +51,8 @@ class SessionState:
     total_responses: int = 0
     is_first_message: bool = True
     pronoun_style: Optional[dict] = None  # CHỈ THỊ SỐ 20: Detected pronoun style
+    # CHỈ THỊ SỐ 21: Rolling ConversationAnalyzer state (updated with new messages only)
+    conversation_analysis: ConversationState = field(default_factory=ConversationState)
     
     def add_phrase(self, phrase: str) -> None:
         """Track a phrase that was used."""
@@ -69,6 +84,31 @@ class SessionState:
         if style:
             self.pronoun_style = style
             logger.debug(f"Updated pronoun style: {style}")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for session-state persistence."""
+        return {
+            "session_id": str(self.session_id),
+            "recent_phrases": list(self.recent_phrases),
+            "name_usage_count": self.name_usage_count,
+            "total_responses": self.total_responses,
+            "is_first_message": self.is_first_message,
+            "pronoun_style": self.pronoun_style,
+            "conversation_analysis": self.conversation_analysis.to_dict(),
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SessionState":
+        """Restore a persisted session state."""
+        return cls(
+            session_id=UUID(data["session_id"]),
+            recent_phrases=list(data.get("recent_phrases", [])),
+            name_usage_count=data.get("name_usage_count", 0),
+            total_responses=data.get("total_responses", 0),
+            is_first_message=data.get("is_first_message", True),
+            pronoun_style=data.get("pronoun_style"),
+            conversation_analysis=ConversationState.from_dict(data.get("conversation_analysis") or {}),
+        )
 
 
 @dataclass
@@ -112,8 +152,27 @@ class SessionManager:
             chat_history: ChatHistoryRepository instance (optional, uses singleton if not provided)
         """
         self._chat_history = chat_history or get_chat_history_repository()
-        self._sessions: Dict[str, UUID] = {}  # user_id -> session_id
-        self._session_states: Dict[str, SessionState] = {}  # session_id -> SessionState
+        # Bounded stores (idle + max-count eviction) instead of ever-growing dicts.
+        # Both share the persistence backend so an evicted user still maps to
+        # the session whose state was persisted.
+        self._sessions: SessionStore[UUID] = SessionStore(  # user_id -> session_id
+            "session_manager.sessions",
+            factory=_fallback_session_id,
+            max_size=settings.session_store_max_sessions,
+            idle_ttl_seconds=settings.session_store_idle_seconds,
+            backend=get_session_state_backend(),
+            serializer=lambda session_id: {"session_id": str(session_id)},
+            deserializer=lambda data: UUID(data["session_id"]),
+        )
+        self._session_states: SessionStore[SessionState] = SessionStore(  # session_id -> SessionState
+            "session_manager.states",
+            factory=lambda session_key: SessionState(session_id=UUID(session_key)),
+            max_size=settings.session_store_max_sessions,
+            idle_ttl_seconds=settings.session_store_idle_seconds,
+            backend=get_session_state_backend(),
+            serializer=SessionState.to_dict,
+            deserializer=SessionState.from_dict,
+        )
         
         logger.info("SessionManager initialized")
     
@@ -151,13 +210,26 @@ class SessionManager:
             user_name=user_name
         )
     
+    async def aget_or_create_session(
+        self,
+        user_id: str,
+        thread_id: Optional[str] = None
+    ) -> SessionContext:
+        """
+        get_or_create_session() off the event loop.
+        
+        Chat-history lookups and session-state resume/persist are blocking
+        Postgres calls.
+        """
+        return await asyncio.to_thread(self.get_or_create_session, user_id, thread_id)
+    
     def _resolve_session_id(self, user_id: str, thread_id: Optional[str]) -> UUID:
         """Resolve session_id from user_id and optional thread_id."""
         # v2.1: If thread_id provided, use it as session_id
         if thread_id:
             try:
                 session_uuid = UUID(thread_id)
-                self._sessions[user_id] = session_uuid
+                self._sessions.set(user_id, session_uuid)
                 return session_uuid
             except ValueError:
                 # Invalid UUID, create new session
@@ -167,20 +239,15 @@ class SessionManager:
         if self._chat_history.is_available():
             chat_session = self._chat_history.get_or_create_session(user_id)
             if chat_session:
-                self._sessions[user_id] = chat_session.session_id
+                self._sessions.set(user_id, chat_session.session_id)
                 return chat_session.session_id
         
-        # Fallback to in-memory session
-        if user_id not in self._sessions:
-            self._sessions[user_id] = uuid4()
-        return self._sessions[user_id]
+        # Fallback: last session of this user, else a stable per-user id
+        return self._sessions.get_or_create(user_id)
     
     def _get_or_create_state(self, session_id: UUID) -> SessionState:
         """Get or create session state for anti-repetition tracking."""
-        session_key = str(session_id)
-        if session_key not in self._session_states:
-            self._session_states[session_key] = SessionState(session_id=session_id)
-        return self._session_states[session_key]
+        return self._session_states.get_or_create(str(session_id))
     
     def _get_user_name(self, session_id: UUID) -> Optional[str]:
         """Get user name from chat history if available."""
@@ -223,6 +290,18 @@ class SessionManager:
         if pronoun_style:
             state.update_pronoun_style(pronoun_style)
     
+    async def aupdate_state(
+        self,
+        session_id: UUID,
+        phrase: Optional[str] = None,
+        used_name: bool = False,
+        pronoun_style: Optional[dict] = None
+    ) -> None:
+        """update_state() off the event loop (may resume or persist state)."""
+        await asyncio.to_thread(
+            self.update_state, session_id, phrase, used_name, pronoun_style
+        )
+    
     def is_available(self) -> bool:
         """Check if session manager is available."""
         return True
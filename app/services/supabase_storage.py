@@ -7,15 +7,17 @@ Handles image upload/download to Supabase Storage bucket for Evidence Images.
 **Feature: multimodal-rag-vision**
 **Validates: Requirements 2.2, 2.3, 4.3**
 """
+import asyncio
 import io
 import logging
-import time
-from typing import Optional
+import re
+from typing import Dict, Optional
 from dataclasses import dataclass
 
 from supabase import create_client, Client
 from PIL import Image
 
+from app.core.api_rate_limiter import get_api_rate_limiter
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -38,6 +40,10 @@ class SupabaseStorageClient:
     Images are stored in the 'maritime-docs' bucket with public access.
     
     Path structure: {document_id}/page_{number}.jpg
+    
+    The Supabase SDK is synchronous: every network call runs in a worker
+    thread (asyncio.to_thread) behind the shared "storage" rate limiter, so
+    uploads during ingestion never block the event loop.
     """
     
     BUCKET_NAME = "maritime-docs"
@@ -63,6 +69,7 @@ class SupabaseStorageClient:
         self.bucket = bucket or settings.supabase_storage_bucket or self.BUCKET_NAME
         
         self._client: Optional[Client] = None
+        self._rate_limiter = get_api_rate_limiter("storage")
         
     @property
     def client(self) -> Client:
@@ -76,6 +83,11 @@ class SupabaseStorageClient:
             self._client = create_client(self.url, self.key)
         return self._client
     
+    async def _call(self, fn, *args, **kwargs):
+        """Run a blocking SDK call in a worker thread after acquiring a rate limit token."""
+        await self._rate_limiter.acquire()
+        return await asyncio.to_thread(fn, *args, **kwargs)
+    
     def _build_path(self, document_id: str, page_number: int) -> str:
         """
         Build storage path for an image.
@@ -112,7 +124,8 @@ class SupabaseStorageClient:
         for attempt in range(self.MAX_RETRIES):
             try:
                 # Upload to Supabase Storage
-                response = self.client.storage.from_(self.bucket).upload(
+                await self._call(
+                    self.client.storage.from_(self.bucket).upload,
                     path=path,
                     file=image_data,
                     file_options={
@@ -137,7 +150,7 @@ class SupabaseStorageClient:
                     f"Upload attempt {attempt + 1}/{self.MAX_RETRIES} failed: {e}"
                 )
                 if attempt < self.MAX_RETRIES - 1:
-                    time.sleep(self.RETRY_DELAY * (attempt + 1))  # Exponential backoff
+                    await asyncio.sleep(self.RETRY_DELAY * (attempt + 1))  # Exponential backoff
                 else:
                     logger.error(f"Failed to upload image after {self.MAX_RETRIES} attempts")
                     return UploadResult(
@@ -166,10 +179,8 @@ class SupabaseStorageClient:
         Returns:
             UploadResult with success status and public URL
         """
-        # Convert PIL Image to bytes
-        buffer = io.BytesIO()
-        image.save(buffer, format="JPEG", quality=quality)
-        image_data = buffer.getvalue()
+        # Convert PIL Image to bytes (CPU-bound, off the event loop)
+        image_data = await asyncio.to_thread(self._encode_jpeg, image, quality)
         
         return await self.upload_image(
             image_data=image_data,
@@ -177,6 +188,12 @@ class SupabaseStorageClient:
             page_number=page_number
         )
     
+    @staticmethod
+    def _encode_jpeg(image: Image.Image, quality: int) -> bytes:
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=quality)
+        return buffer.getvalue()
+    
     def get_public_url(self, path: str) -> str:
         """
         Get public URL for a stored file.
@@ -190,6 +207,34 @@ class SupabaseStorageClient:
         response = self.client.storage.from_(self.bucket).get_public_url(path)
         return response
     
+    async def list_page_image_urls(self, document_id: str) -> Dict[int, str]:
+        """
+        Get public URLs of page images already stored for a document.
+        
+        Lets ingestion skip rasterizing pages whose evidence image exists.
+        
+        Args:
+            document_id: Document identifier
+            
+        Returns:
+            Dict mapping page number (1-indexed) to public URL
+        """
+        try:
+            files = await self._call(
+                self.client.storage.from_(self.bucket).list,
+                document_id, {"limit": 10000}
+            )
+        except Exception as e:
+            logger.warning(f"Failed to list images for {document_id}: {e}")
+            return {}
+        
+        urls = {}
+        for f in files or []:
+            match = re.fullmatch(r"page_(\d+)\.jpg", f.get("name", ""))
+            if match:
+                urls[int(match.group(1))] = self.get_public_url(f"{document_id}/{f['name']}")
+        return urls
+    
     async def delete_image(self, path: str) -> bool:
         """
         Delete image from storage.
@@ -201,7 +246,7 @@ class SupabaseStorageClient:
             True if deletion was successful
         """
         try:
-            self.client.storage.from_(self.bucket).remove([path])
+            await self._call(self.client.storage.from_(self.bucket).remove, [path])
             logger.info(f"Deleted image: {path}")
             return True
         except Exception as e:
@@ -220,7 +265,7 @@ class SupabaseStorageClient:
         """
         try:
             # List all files in the document folder
-            files = self.client.storage.from_(self.bucket).list(document_id)
+            files = await self._call(self.client.storage.from_(self.bucket).list, document_id)
             
             if not files:
                 return 0
@@ -229,7 +274,7 @@ class SupabaseStorageClient:
             paths = [f"{document_id}/{f['name']}" for f in files]
             
             # Delete all files
-            self.client.storage.from_(self.bucket).remove(paths)
+            await self._call(self.client.storage.from_(self.bucket).remove, paths)
             
             logger.info(f"Deleted {len(paths)} images for document {document_id}")
             return len(paths)
@@ -247,7 +292,7 @@ class SupabaseStorageClient:
         """
         try:
             # Try to list bucket contents (empty list is OK)
-            self.client.storage.from_(self.bucket).list(limit=1)
+            await self._call(self.client.storage.from_(self.bucket).list, limit=1)
             return True
         except Exception as e:
             logger.error(f"Supabase Storage health check failed: {e}")
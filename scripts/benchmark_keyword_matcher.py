@@ -0,0 +1,77 @@
+"""
+Keyword Matcher Microbenchmark.
+
+Compares the legacy per-keyword ``kw in text.lower()`` loops with the shared
+precompiled KeywordMatcher (app/engine/keyword_matcher.py) on the real
+vocabularies of the ported analyzers, and checks both return the same terms.
+
+Feature: keyword-matcher
+Usage:
+    python scripts/benchmark_keyword_matcher.py
+    python scripts/benchmark_keyword_matcher.py --number 5000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.engine.keyword_matcher import KeywordMatcher
+
+QUERY = "Quy tắc 15 về tình huống cắt hướng là gì? Tàu nào phải nhường đường khi có nguy cơ va chạm?"
+
+DOCUMENT = (
+    "Điều 15. Tình huống cắt hướng. Khi hai tàu máy đi cắt hướng nhau có nguy cơ va chạm, "
+    "tàu nào nhìn thấy tàu kia ở mạn phải của mình thì phải nhường đường cho tàu kia và nếu "
+    "hoàn cảnh cho phép, phải tránh đi qua phía trước mũi tàu kia. Đèn đỏ ở mạn trái, đèn xanh "
+    "ở mạn phải; tín hiệu âm thanh theo Rule 34 của COLREGs. "
+) * 6
+
+
+def _vocabularies():
+    from app.engine.agentic_rag.confidence_evaluator import MARITIME_CORE_TERMS
+    from app.engine.conversation_analyzer import ConversationAnalyzer
+    from app.engine.guardrails import HARMFUL_PATTERNS
+    from app.engine.page_analyzer import PageAnalyzer
+
+    topic_keywords = [kw for kws in ConversationAnalyzer.MARITIME_TOPICS.values() for kw in kws]
+    page_keywords = PageAnalyzer.DEFAULT_DIAGRAM_KEYWORDS + PageAnalyzer.DEFAULT_MARITIME_KEYWORDS
+    return [
+        ("confidence_evaluator: MARITIME_CORE_TERMS", sorted(MARITIME_CORE_TERMS), QUERY + " " + DOCUMENT),
+        ("conversation_analyzer: MARITIME_TOPICS", list(dict.fromkeys(topic_keywords)), QUERY),
+        ("page_analyzer: diagram + maritime", page_keywords, DOCUMENT),
+        ("guardrails: HARMFUL_PATTERNS", sorted(HARMFUL_PATTERNS), QUERY),
+        ("synthetic: 500 terms", [f"thuật ngữ {i}" for i in range(500)] + sorted(MARITIME_CORE_TERMS), DOCUMENT),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KeywordMatcher vs legacy substring loops")
+    parser.add_argument("--number", type=int, default=2000, help="Iterations per measurement")
+    args = parser.parse_args()
+
+    print(f"{'vocabulary':45} {'terms':>5} {'text':>6} {'legacy µs':>10} {'matcher µs':>11} {'speedup':>8}")
+    for name, keywords, text in _vocabularies():
+        matcher = KeywordMatcher(keywords)
+
+        def legacy():
+            text_lower = text.lower()
+            return [kw for kw in keywords if kw.lower() in text_lower]
+
+        def compiled():
+            return matcher.find_terms(text)
+
+        assert legacy() == compiled(), f"Result mismatch for {name}"
+
+        legacy_us = min(timeit.repeat(legacy, number=args.number, repeat=5)) / args.number * 1e6
+        matcher_us = min(timeit.repeat(compiled, number=args.number, repeat=5)) / args.number * 1e6
+        print(
+            f"{name:45} {len(keywords):>5} {len(text):>6} {legacy_us:>10.2f} "
+            f"{matcher_us:>11.2f} {legacy_us / matcher_us:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
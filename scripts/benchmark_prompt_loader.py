@@ -0,0 +1,67 @@
+"""
+Prompt Loader Microbenchmark.
+
+Compares the old per-request prompt build (walk the persona dicts and re-read
+base/_shared.yaml for the thinking instruction on every call) with the
+precompiled PersonaTemplate path of PromptLoader, per role, and checks both
+produce the same system prompt.
+
+Feature: maritime-ai-tutor
+Usage:
+    python scripts/benchmark_prompt_loader.py
+    python scripts/benchmark_prompt_loader.py --number 5000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.prompts.prompt_loader import PromptLoader
+
+ROLES = ["student", "teacher", "tutor_agent", "rag_agent"]
+
+USER_CONTEXT = {
+    "user_name": "Minh",
+    "user_facts": ["Sinh viên năm 3 ĐH Hàng hải", "Đang ôn thi COLREGs"],
+    "recent_phrases": ["Quy tắc 15 quy định rằng", "Theo COLREGs"],
+    "is_follow_up": True,
+    "name_usage_count": 1,
+    "total_responses": 4,
+    "lms_course": "COLREGs - Quy tắc phòng ngừa đâm va",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompiled persona templates vs per-request prompt build")
+    parser.add_argument("--number", type=int, default=2000, help="Iterations per measurement")
+    args = parser.parse_args()
+
+    loader = PromptLoader()
+
+    print(f"{'role':15} {'chars':>6} {'legacy µs':>10} {'compiled µs':>12} {'speedup':>8}")
+    for role in ROLES:
+        def legacy():
+            shared = loader._load_shared_config()
+            thinking = shared.get("thinking", {}).get("instruction", "").strip()
+            static = loader._compile_static_prompt(loader.get_persona(role))
+            dynamic = loader.build_dynamic_prompt(role, **USER_CONTEXT)
+            return f"{static}\n{dynamic}", thinking
+
+        def compiled():
+            return loader.build_system_prompt(role, **USER_CONTEXT), loader.get_thinking_instruction()
+
+        assert legacy()[0] == compiled()[0], f"Prompt mismatch for {role}"
+
+        legacy_us = min(timeit.repeat(legacy, number=args.number, repeat=5)) / args.number * 1e6
+        compiled_us = min(timeit.repeat(compiled, number=args.number, repeat=5)) / args.number * 1e6
+        print(
+            f"{role:15} {len(compiled()[0]):>6} {legacy_us:>10.2f} "
+            f"{compiled_us:>12.2f} {legacy_us / compiled_us:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
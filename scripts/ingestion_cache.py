@@ -0,0 +1,162 @@
+"""
+Ingestion Result Cache CLI.
+
+Inspect, prune or warm the persistent vision/context result cache used by
+multimodal ingestion (app/cache/ingestion_cache.py).
+
+Feature: ingestion-result-cache
+Usage:
+    python scripts/ingestion_cache.py stats
+    python scripts/ingestion_cache.py list --kind vision --limit 20
+    python scripts/ingestion_cache.py clear [--kind context]
+    python scripts/ingestion_cache.py evict --max-mb 256
+    python scripts/ingestion_cache.py warm data/COLREGs.pdf --document-id colregs [--with-context]
+
+Warming runs vision extraction (and optionally contextual enrichment) for a
+PDF without touching the database or storage, so a later ingestion - or a
+re-chunking experiment - replays with zero vision API calls.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+
+def _get_cache():
+    from app.cache.ingestion_cache import get_ingestion_cache
+
+    cache = get_ingestion_cache()
+    if cache is None:
+        print("❌ Ingestion cache is disabled (INGESTION_CACHE_ENABLED=false) or cannot be opened")
+        sys.exit(1)
+    return cache
+
+
+def cmd_stats(args):
+    print(json.dumps(_get_cache().get_stats(), indent=2))
+
+
+def cmd_list(args):
+    for entry in _get_cache().list_entries(kind=args.kind, limit=args.limit):
+        last = datetime.fromtimestamp(entry["last_accessed"]).strftime("%Y-%m-%d %H:%M")
+        print(f"{entry['kind']:8} {entry['key'][:16]}…  {entry['size']:>8} B  hits={entry['hits']:<4} last={last}")
+
+
+def cmd_clear(args):
+    removed = _get_cache().clear(kind=args.kind)
+    print(f"✅ Removed {removed} entries")
+
+
+def cmd_evict(args):
+    max_bytes = args.max_mb * 1024 * 1024 if args.max_mb is not None else None
+    evicted = _get_cache().evict(max_bytes)
+    print(f"✅ Evicted {evicted} entries")
+
+
+async def _warm(args):
+    from app.core.config import settings
+    from app.services.multimodal_ingestion_service import get_ingestion_service
+    from app.services.pdf_page_source import PdfPageSource
+
+    cache = _get_cache()
+    service = get_ingestion_service()
+    before = cache.get_stats()
+
+    start = (args.start_page - 1) if args.start_page else 0
+    with PdfPageSource(args.pdf_path, start=start, end=args.end_page, dpi=service.DEFAULT_DPI) as source:
+        print(f"📄 Warming pages {source.start + 1}-{source.end} of {source.total_pages}")
+
+        for page in source:
+            text = None
+            if service._prefers_direct_extraction(page):
+                text = service._extract_direct(page.pdf_page)
+                if len(text.strip()) < service.min_text_length:
+                    text = None
+
+            if text is None:
+                image = await page.render()
+                if image is None:
+                    print(f"  page {page.page_number}: ❌ rasterization failed")
+                    continue
+                extraction = await service.vision.extract_from_image(image)
+                if not extraction.success:
+                    print(f"  page {page.page_number}: ❌ {extraction.error}")
+                    page.release()
+                    continue
+                text = extraction.text
+                print(f"  page {page.page_number}: vision ({len(text)} chars)")
+            else:
+                print(f"  page {page.page_number}: direct (no vision needed)")
+
+            if args.with_context and settings.contextual_rag_enabled:
+                # Same metadata as ingestion so context cache keys match
+                page_metadata = {
+                    'document_id': args.document_id,
+                    'page_number': page.page_number,
+                    'source_type': 'pdf'
+                }
+                chunks = await service.chunker.chunk_page_content(text, page_metadata)
+                await service.context_enricher.enrich_chunks(
+                    chunks=chunks,
+                    document_id=args.document_id,
+                    document_title=args.document_id,
+                    total_pages=page_metadata.get('total_pages', 1),
+                    batch_size=settings.contextual_rag_batch_size
+                )
+
+            page.release()
+
+    after = cache.get_stats()
+    print(f"\n✅ Cache hits this run: {after['hits'] - before['hits']}, misses: {after['misses'] - before['misses']}")
+    print(json.dumps(after["kinds"], indent=2))
+
+
+def cmd_warm(args):
+    if not os.path.exists(args.pdf_path):
+        print(f"❌ PDF not found: {args.pdf_path}")
+        sys.exit(1)
+    asyncio.run(_warm(args))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestion result cache tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("stats", help="Show entry counts, sizes and budget").set_defaults(func=cmd_stats)
+
+    list_parser = subparsers.add_parser("list", help="List most recently used entries")
+    list_parser.add_argument("--kind", choices=["vision", "context"])
+    list_parser.add_argument("--limit", type=int, default=20)
+    list_parser.set_defaults(func=cmd_list)
+
+    clear_parser = subparsers.add_parser("clear", help="Delete entries")
+    clear_parser.add_argument("--kind", choices=["vision", "context"])
+    clear_parser.set_defaults(func=cmd_clear)
+
+    evict_parser = subparsers.add_parser("evict", help="Evict LRU entries down to a size budget")
+    evict_parser.add_argument("--max-mb", type=int, default=None, help="Budget (default: INGESTION_CACHE_MAX_MB)")
+    evict_parser.set_defaults(func=cmd_evict)
+
+    warm_parser = subparsers.add_parser("warm", help="Pre-compute vision (and context) results for a PDF")
+    warm_parser.add_argument("pdf_path")
+    warm_parser.add_argument("--document-id", required=True, help="Document ID used at ingestion")
+    warm_parser.add_argument("--start-page", type=int, default=None, help="1-indexed")
+    warm_parser.add_argument("--end-page", type=int, default=None, help="1-indexed, inclusive")
+    warm_parser.add_argument("--with-context", action="store_true", help="Also warm contextual enrichment")
+    warm_parser.set_defaults(func=cmd_warm)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Ingestion Worker entry point.
+
+Processes document ingestion jobs queued by POST /api/v1/admin/documents
+(table ingestion_jobs). Run one or more of these next to the API; each
+claims jobs with SELECT ... FOR UPDATE SKIP LOCKED, so workers can be
+scaled horizontally without coordination.
+
+Feature: durable-ingestion-queue
+Usage:
+    python scripts/ingestion_worker.py              # poll forever
+    python scripts/ingestion_worker.py --once       # drain one job and exit
+    python scripts/ingestion_worker.py --list       # show recent jobs
+
+Requires migrations:
+    scripts/migrations/create_ingestion_jobs_table.sql
+    scripts/migrations/upgrade_ingestion_jobs_queue.sql
+
+Uploaded PDFs are read from INGESTION_UPLOAD_DIR, which must be shared
+with the API (same host or a shared volume).
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+
+def cmd_list(args):
+    from app.repositories.ingestion_job_repository import get_ingestion_job_repository
+
+    repository = get_ingestion_job_repository()
+    if not repository.is_available():
+        print("❌ ingestion_jobs table not reachable (run the migrations?)")
+        sys.exit(1)
+    for job in repository.list_recent(status=args.status, limit=args.limit):
+        print(
+            f"{job.job_id}  {job.status:10} {job.progress:>3}%  "
+            f"{job.processed_pages}/{job.total_pages} pages  {job.document_id}  "
+            f"attempts={job.attempts}/{job.max_attempts}  worker={job.worker_id or '-'}"
+        )
+
+
+async def _run(args):
+    from app.services.ingestion_worker import IngestionWorker
+
+    worker = IngestionWorker(poll_interval=args.poll_interval)
+    if not worker.repository.is_available():
+        print("❌ ingestion_jobs table not reachable (run the migrations?)")
+        sys.exit(1)
+
+    if args.once:
+        claimed = await worker.run_once()
+        print("✅ Processed 1 job" if claimed else "Queue is empty")
+        return
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            # Finish the current job, then exit (deploys don't orphan jobs)
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:  # Windows
+            pass
+
+    await worker.run(stop_event=stop_event, max_jobs=args.max_jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Durable ingestion queue worker")
+    parser.add_argument("--once", action="store_true", help="Process at most one job and exit")
+    parser.add_argument("--max-jobs", type=int, default=None, help="Exit after this many jobs")
+    parser.add_argument("--poll-interval", type=float, default=None, help="Seconds between polls when idle")
+    parser.add_argument("--list", action="store_true", help="List recent jobs and exit")
+    parser.add_argument("--status", choices=["pending", "processing", "completed", "failed"])
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    if args.list:
+        cmd_list(args)
+    else:
+        asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Memory Worker entry point.
+
+Processes chat turns spilled to the memory_write_queue table by the API's
+MemoryWriteQueue: insight and fact extraction, semantic memory writes and
+profile stats. Run one or more of these next to the API (set
+MEMORY_QUEUE_INLINE=false on the API to move that work here); each claims one user's turns at a
+time with SELECT ... FOR UPDATE SKIP LOCKED, so a user's turns stay in order
+across workers. Conversation summarization stays in the API process, whose
+InputProcessor reads the in-memory MemorySummarizer state.
+
+Feature: memory-write-queue
+Usage:
+    python scripts/memory_worker.py                  # process until SIGTERM
+    python scripts/memory_worker.py --concurrency 8  # users processed at once
+    python scripts/memory_worker.py --stats          # show the backlog
+
+Requires migration:
+    scripts/migrations/create_memory_write_queue_table.sql
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+
+def cmd_stats(args):
+    from app.repositories.memory_write_queue_repository import get_memory_write_queue_repository
+
+    repository = get_memory_write_queue_repository()
+    if not repository.is_available():
+        print("❌ memory_write_queue table not reachable (run the migration?)")
+        sys.exit(1)
+    for key, value in repository.get_backlog_stats().items():
+        print(f"{key:28} {value}")
+
+
+def _build_runner():
+    """BackgroundTaskRunner with the queued memory dependencies of ChatService."""
+    from app.engine.semantic_memory import get_semantic_memory_engine
+    from app.repositories.chat_history_repository import get_chat_history_repository
+    from app.repositories.learning_profile_repository import get_learning_profile_repository
+    from app.services.background_tasks import BackgroundTaskRunner
+
+    return BackgroundTaskRunner(
+        chat_history=get_chat_history_repository(),
+        semantic_memory=get_semantic_memory_engine(),
+        profile_repo=get_learning_profile_repository()
+    )
+
+
+async def _run(args):
+    from app.services.memory_write_queue import MemoryWriteQueue
+
+    queue = MemoryWriteQueue(
+        processor=_build_runner().process_memory_turns,
+        max_concurrency=args.concurrency,
+        poll_interval=args.poll_interval,
+        inline=True
+    )
+    if not queue.repository.is_available():
+        print("❌ memory_write_queue table not reachable (run the migration?)")
+        sys.exit(1)
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            # Finish the current batches, then exit (claimed turns are not orphaned)
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:  # Windows
+            pass
+
+    await queue.run(stop_event)
+    print(f"Processed {queue.processed_turns} turns in {queue.processed_batches} batches")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory write queue worker")
+    parser.add_argument("--concurrency", type=int, default=None, help="Users processed concurrently")
+    parser.add_argument("--poll-interval", type=float, default=None, help="Seconds between polls when idle")
+    parser.add_argument("--stats", action="store_true", help="Show the queue backlog and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    if args.stats:
+        cmd_stats(args)
+    else:
+        asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+-- Migration: Add page_fingerprint column to knowledge_embeddings
+-- Feature: incremental-reingestion
+-- Date: 2026-10-18
+--
+-- Stores a content fingerprint of the source page for every chunk
+-- (sha256 of the direct-extracted text, or of the rendered image for
+-- scanned pages). Re-ingesting an updated edition compares fingerprints
+-- and re-processes only pages whose content actually changed.
+
+-- Add page_fingerprint column if it doesn't exist
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'knowledge_embeddings'
+        AND column_name = 'page_fingerprint'
+    ) THEN
+        ALTER TABLE knowledge_embeddings
+        ADD COLUMN page_fingerprint VARCHAR(80) DEFAULT NULL;
+
+        -- Add comment for documentation
+        COMMENT ON COLUMN knowledge_embeddings.page_fingerprint IS
+            'Content fingerprint of the source page (incremental re-ingestion)';
+
+        RAISE NOTICE 'Added page_fingerprint column to knowledge_embeddings';
+    ELSE
+        RAISE NOTICE 'Column page_fingerprint already exists';
+    END IF;
+END $$;
+
+-- Fingerprint diff reads all pages of one document
+CREATE INDEX IF NOT EXISTS idx_knowledge_embeddings_doc_page
+ON knowledge_embeddings (document_id, page_number);
+
+-- Verify the column was added
+SELECT column_name, data_type, is_nullable, column_default
+FROM information_schema.columns
+WHERE table_name = 'knowledge_embeddings'
+AND column_name = 'page_fingerprint';
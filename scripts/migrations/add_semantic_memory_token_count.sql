@@ -0,0 +1,54 @@
+-- Migration: Add token_count column and listing indexes to semantic_memories
+-- Feature: semantic-memory-listing
+-- Date: 2026-10-18
+--
+-- Session token counting and session/insight listing used to run a
+-- "similarity search" against a zero vector for up to 1000 rows and then
+-- filter session_id in Python. They are now plain indexed queries:
+-- - token_count is stored on write, so the per-session sum is one aggregate
+-- - composite indexes serve "list by user/type/session ordered by time"
+
+-- Add token_count column if it doesn't exist
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'semantic_memories'
+        AND column_name = 'token_count'
+    ) THEN
+        ALTER TABLE semantic_memories
+        ADD COLUMN token_count INTEGER DEFAULT NULL;
+
+        COMMENT ON COLUMN semantic_memories.token_count IS
+            'Token count of content, maintained on write (session summarization threshold)';
+
+        RAISE NOTICE 'Added token_count column to semantic_memories';
+    ELSE
+        RAISE NOTICE 'Column token_count already exists';
+    END IF;
+END $$;
+
+-- Backfill existing rows with the characters / 4 estimate
+UPDATE semantic_memories
+SET token_count = LENGTH(content) / 4
+WHERE token_count IS NULL;
+
+-- List by user + type ordered by time (insights, facts, messages)
+CREATE INDEX IF NOT EXISTS idx_semantic_memories_user_type_created
+ON semantic_memories (user_id, memory_type, created_at DESC);
+
+-- Session messages in order + token sum without touching the heap
+CREATE INDEX IF NOT EXISTS idx_semantic_memories_user_session_type
+ON semantic_memories (user_id, session_id, memory_type, created_at)
+INCLUDE (token_count);
+
+-- Verify the column and indexes
+SELECT column_name, data_type, is_nullable, column_default
+FROM information_schema.columns
+WHERE table_name = 'semantic_memories'
+AND column_name = 'token_count';
+
+SELECT indexname, indexdef
+FROM pg_indexes
+WHERE tablename = 'semantic_memories'
+AND indexname IN ('idx_semantic_memories_user_type_created', 'idx_semantic_memories_user_session_type');
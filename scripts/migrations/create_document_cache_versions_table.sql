@@ -0,0 +1,32 @@
+-- Migration: Document versions for cross-process cache invalidation
+-- Feature: semantic-cache
+-- Date: 2026-10-19
+--
+-- Ingestion runs in scripts/ingestion_worker.py, a separate process from the
+-- API, so invalidating in-memory caches there does not reach the API's
+-- response / retrieval / GraphRAG entity caches. The worker bumps a
+-- document's row here after rewriting its chunks; every API process polls
+-- for versions above the last one it has seen (DocumentCacheSync) and
+-- invalidates its own caches for those documents.
+
+CREATE SEQUENCE IF NOT EXISTS document_cache_version_seq;
+
+CREATE TABLE IF NOT EXISTS document_cache_versions (
+    document_id VARCHAR(255) PRIMARY KEY,
+    content_hash VARCHAR(64) NOT NULL,
+    version BIGINT NOT NULL DEFAULT nextval('document_cache_version_seq'),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+COMMENT ON TABLE document_cache_versions IS 'Latest ingested edition per document, polled by API processes to invalidate caches';
+COMMENT ON COLUMN document_cache_versions.version IS 'Global, increasing on every bump; pollers read version > last seen';
+
+-- Poll scan
+CREATE INDEX IF NOT EXISTS idx_document_cache_versions_version
+ON document_cache_versions (version);
+
+-- Verify
+SELECT column_name, data_type
+FROM information_schema.columns
+WHERE table_name = 'document_cache_versions'
+ORDER BY ordinal_position;
@@ -0,0 +1,49 @@
+-- Migration: Durable outbox for LMS event callbacks
+-- Feature: lms-event-outbox
+-- Date: 2026-10-18
+--
+-- AI events (knowledge_gap_detected, stuck_detected, ...) are appended here
+-- instead of being POSTed inline. The API's outbox worker claims due rows
+-- in batches (FOR UPDATE SKIP LOCKED), sends them with a concurrency cap and
+-- reschedules failures with exponential backoff. Delivered rows are deleted.
+
+CREATE TABLE IF NOT EXISTS lms_event_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    user_id VARCHAR(255) NOT NULL,
+    event_type VARCHAR(64) NOT NULL,
+    dedup_key VARCHAR(512) NOT NULL,
+    payload JSONB NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'sending', 'dead')),
+    attempts INT NOT NULL DEFAULT 0,
+    coalesced_count INT NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    next_attempt_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    locked_at TIMESTAMP WITH TIME ZONE
+);
+
+COMMENT ON TABLE lms_event_outbox IS 'AI events waiting to be delivered to the LMS callback URL';
+COMMENT ON COLUMN lms_event_outbox.dedup_key IS 'Pending events with the same key are coalesced (latest payload wins)';
+COMMENT ON COLUMN lms_event_outbox.status IS 'pending (due at next_attempt_at), sending (claimed by a worker), dead (gave up)';
+COMMENT ON COLUMN lms_event_outbox.coalesced_count IS 'Number of newer events merged into this row';
+
+-- Coalescing target: at most one pending row per key
+CREATE UNIQUE INDEX IF NOT EXISTS uq_lms_event_outbox_pending_key
+ON lms_event_outbox (dedup_key)
+WHERE status = 'pending';
+
+-- Flush scan: due pending rows first
+CREATE INDEX IF NOT EXISTS idx_lms_event_outbox_due
+ON lms_event_outbox (next_attempt_at, id)
+WHERE status = 'pending';
+
+-- Stale claim recovery scan
+CREATE INDEX IF NOT EXISTS idx_lms_event_outbox_sending
+ON lms_event_outbox (locked_at)
+WHERE status = 'sending';
+
+-- Verify
+SELECT column_name, data_type
+FROM information_schema.columns
+WHERE table_name = 'lms_event_outbox'
+ORDER BY ordinal_position;
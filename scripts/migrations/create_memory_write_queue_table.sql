@@ -0,0 +1,54 @@
+-- Migration: Durable spill-over for post-turn memory writes
+-- Feature: memory-write-queue
+-- Date: 2026-10-18
+--
+-- After each chat turn the API queues insight/fact extraction, summarization
+-- and profile stat updates in an in-process MemoryWriteQueue. Turns it cannot
+-- hold (queue full, shutdown, MEMORY_QUEUE_INLINE=false) are written here and
+-- claimed one user at a time (FOR UPDATE SKIP LOCKED) by the API's queue
+-- workers or by scripts/memory_worker.py. Processed rows are deleted.
+
+CREATE TABLE IF NOT EXISTS memory_write_queue (
+    id BIGSERIAL PRIMARY KEY,
+    user_id VARCHAR(255) NOT NULL,
+    session_id VARCHAR(255),
+    message TEXT NOT NULL,
+    response TEXT NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'processing', 'dead')),
+    attempts INT NOT NULL DEFAULT 0,
+    insights_extracted BOOLEAN NOT NULL DEFAULT FALSE,
+    last_error TEXT,
+    enqueued_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    next_attempt_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    locked_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Tables created before insights_extracted existed
+ALTER TABLE memory_write_queue ADD COLUMN IF NOT EXISTS insights_extracted BOOLEAN NOT NULL DEFAULT FALSE;
+
+COMMENT ON TABLE memory_write_queue IS 'Chat turns waiting for background memory processing';
+COMMENT ON COLUMN memory_write_queue.enqueued_at IS 'When the turn finished (lag is measured from here, not from the spill)';
+COMMENT ON COLUMN memory_write_queue.insights_extracted IS 'Insights already stored: a retry only redoes the semantic memory write';
+COMMENT ON COLUMN memory_write_queue.status IS 'pending (due at next_attempt_at), processing (claimed by a worker), dead (gave up)';
+
+-- Claim scan: due pending rows, oldest first
+CREATE INDEX IF NOT EXISTS idx_memory_write_queue_due
+ON memory_write_queue (next_attempt_at, id)
+WHERE status = 'pending';
+
+-- Per-user ordering: a user's pending rows in id order
+CREATE INDEX IF NOT EXISTS idx_memory_write_queue_user
+ON memory_write_queue (user_id, id)
+WHERE status IN ('pending', 'processing');
+
+-- Stale claim recovery scan
+CREATE INDEX IF NOT EXISTS idx_memory_write_queue_processing
+ON memory_write_queue (locked_at)
+WHERE status = 'processing';
+
+-- Verify
+SELECT column_name, data_type
+FROM information_schema.columns
+WHERE table_name = 'memory_write_queue'
+ORDER BY ordinal_position;
@@ -0,0 +1,30 @@
+-- Migration: Snapshots of evicted in-process session state
+-- Feature: bounded-session-state
+-- Date: 2026-10-18
+--
+-- Bounded SessionStore instances (SessionManager, MemorySummarizer,
+-- MemoryCompressionEngine) evict idle sessions from memory. With
+-- SESSION_STORE_PERSIST_EVICTED=true the evicted state is saved here and
+-- resumed on the session's next request. Snapshots older than
+-- SESSION_STORE_RETENTION_DAYS are purged by the repository.
+
+CREATE TABLE IF NOT EXISTS session_state_snapshots (
+    namespace VARCHAR(100) NOT NULL,
+    state_key VARCHAR(255) NOT NULL,
+    state JSONB NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (namespace, state_key)
+);
+
+COMMENT ON TABLE session_state_snapshots IS 'Evicted-but-resumable in-process session state';
+COMMENT ON COLUMN session_state_snapshots.namespace IS 'SessionStore name, e.g. memory_summarizer.states';
+
+-- Retention purge scan
+CREATE INDEX IF NOT EXISTS idx_session_state_snapshots_updated_at
+ON session_state_snapshots (updated_at);
+
+-- Verify
+SELECT column_name, data_type
+FROM information_schema.columns
+WHERE table_name = 'session_state_snapshots'
+ORDER BY ordinal_position;
@@ -0,0 +1,41 @@
+-- Migration: Turn ingestion_jobs into a durable work queue
+-- Feature: durable-ingestion-queue
+-- Date: 2026-10-18
+-- Requires: create_ingestion_jobs_table.sql
+--
+-- The admin API enqueues a job; out-of-process workers
+-- (python scripts/ingestion_worker.py) claim it with
+-- SELECT ... FOR UPDATE SKIP LOCKED, report page-level progress and
+-- heartbeat while running. Any number of workers can poll the same table.
+
+ALTER TABLE ingestion_jobs ADD COLUMN IF NOT EXISTS document_id VARCHAR(255);
+ALTER TABLE ingestion_jobs ADD COLUMN IF NOT EXISTS options JSONB DEFAULT '{}'::jsonb;
+ALTER TABLE ingestion_jobs ADD COLUMN IF NOT EXISTS total_pages INT DEFAULT 0;
+ALTER TABLE ingestion_jobs ADD COLUMN IF NOT EXISTS processed_pages INT DEFAULT 0;
+ALTER TABLE ingestion_jobs ADD COLUMN IF NOT EXISTS result JSONB;
+ALTER TABLE ingestion_jobs ADD COLUMN IF NOT EXISTS attempts INT DEFAULT 0;
+ALTER TABLE ingestion_jobs ADD COLUMN IF NOT EXISTS max_attempts INT DEFAULT 3;
+ALTER TABLE ingestion_jobs ADD COLUMN IF NOT EXISTS worker_id VARCHAR(100);
+ALTER TABLE ingestion_jobs ADD COLUMN IF NOT EXISTS started_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE ingestion_jobs ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP WITH TIME ZONE;
+
+COMMENT ON COLUMN ingestion_jobs.document_id IS 'Knowledge base document identifier being ingested';
+COMMENT ON COLUMN ingestion_jobs.options IS 'Ingestion options (resume, page range, create_module_node)';
+COMMENT ON COLUMN ingestion_jobs.worker_id IS 'host:pid of the worker holding the job';
+COMMENT ON COLUMN ingestion_jobs.heartbeat_at IS 'Last worker heartbeat or progress report; stale processing jobs are re-queued';
+
+-- Queue scan: oldest pending job first
+CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_pending
+ON ingestion_jobs (created_at)
+WHERE status = 'pending';
+
+-- Stale job recovery scan
+CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_processing_heartbeat
+ON ingestion_jobs (heartbeat_at)
+WHERE status = 'processing';
+
+-- Verify
+SELECT column_name, data_type
+FROM information_schema.columns
+WHERE table_name = 'ingestion_jobs'
+ORDER BY ordinal_position;
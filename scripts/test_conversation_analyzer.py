@@ -73,7 +73,7 @@ def test_topic_extraction():
         MockMessage("assistant", "Đèn đỏ là đèn mạn trái. Khi bạn thấy đèn đỏ..."),
         MockMessage("user", "Còn đèn xanh thì sao?"),
     ]
-    topic1 = analyzer._extract_current_topic(messages1)
+    topic1 = analyzer.analyze(messages1).current_topic
     print(f"Navigation lights conversation -> Topic: {topic1}")
     assert topic1 == "navigation_lights", f"Expected 'navigation_lights', got '{topic1}'"
     print("✅ Correct!")
@@ -84,7 +84,7 @@ def test_topic_extraction():
         MockMessage("assistant", "Để đăng ký tàu biển, bạn cần..."),
         MockMessage("user", "Cần những giấy tờ gì?"),
     ]
-    topic2 = analyzer._extract_current_topic(messages2)
+    topic2 = analyzer.analyze(messages2).current_topic
     print(f"Ship registration conversation -> Topic: {topic2}")
     assert topic2 == "ship_registration", f"Expected 'ship_registration', got '{topic2}'"
     print("✅ Correct!")
@@ -95,7 +95,7 @@ def test_topic_extraction():
         MockMessage("assistant", "Quy tắc 15 về tình huống cắt hướng..."),
         MockMessage("user", "Còn quy tắc 16?"),
     ]
-    topic3 = analyzer._extract_current_topic(messages3)
+    topic3 = analyzer.analyze(messages3).current_topic
     print(f"COLREGs rules conversation -> Topic: {topic3}")
     assert topic3 == "colregs_rules", f"Expected 'colregs_rules', got '{topic3}'"
     print("✅ Correct!")
@@ -0,0 +1,108 @@
+"""
+Test async outbound API rate limiting.
+
+Verify:
+1. Token bucket allows the burst, then spaces requests at the configured rate
+2. Throttled callers do not block the event loop
+3. Supabase uploads retry with asyncio.sleep and run the SDK off the loop
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.core import api_rate_limiter
+from app.core.api_rate_limiter import AsyncTokenBucket, get_api_rate_limiter
+
+
+@pytest.mark.asyncio
+async def test_burst_then_rate():
+    bucket = AsyncTokenBucket("test", rate=20.0, capacity=2)
+
+    assert await bucket.acquire() == 0.0
+    assert await bucket.acquire() == 0.0
+    assert not bucket.try_acquire()
+
+    start = time.monotonic()
+    waited = await bucket.acquire()
+    assert waited > 0
+    assert time.monotonic() - start >= 0.04
+
+    stats = bucket.get_stats()
+    assert stats["acquired"] == 3
+    assert stats["throttled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_throttling_does_not_block_event_loop():
+    bucket = AsyncTokenBucket("test", rate=10.0, capacity=1)
+    ticks = []
+
+    async def heartbeat():
+        for _ in range(5):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.02)
+
+    # Three acquires need ~0.2s of waiting; the heartbeat keeps running meanwhile
+    await asyncio.gather(heartbeat(), *(bucket.acquire() for _ in range(3)))
+
+    assert len(ticks) == 5
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.1
+
+
+@pytest.mark.asyncio
+async def test_disabled_limiter_never_waits(monkeypatch):
+    monkeypatch.setattr(api_rate_limiter.settings, "api_rate_limits_enabled", False)
+    api_rate_limiter.reset_api_rate_limiters()
+    try:
+        limiter = get_api_rate_limiter("vision")
+        assert not limiter.enabled
+        assert all([await limiter.acquire() == 0.0 for _ in range(5)])
+    finally:
+        api_rate_limiter.reset_api_rate_limiters()
+
+
+class _FlakyBucket:
+    def __init__(self, loop_thread):
+        self.loop_thread = loop_thread
+        self.calls = 0
+
+    def upload(self, path, file, file_options):
+        assert threading.get_ident() != self.loop_thread, "SDK call ran on the event loop"
+        self.calls += 1
+        if self.calls == 1:
+            raise ConnectionError("transient")
+
+    def get_public_url(self, path):
+        return f"https://cdn/{path}"
+
+
+class _FakeStorageClient:
+    def __init__(self, bucket):
+        self.storage = self
+        self.bucket = bucket
+
+    def from_(self, name):
+        return self.bucket
+
+
+@pytest.mark.asyncio
+async def test_storage_upload_runs_off_loop_and_retries(monkeypatch):
+    from app.services.supabase_storage import SupabaseStorageClient
+
+    storage = SupabaseStorageClient(url="https://example.supabase.co", key="test", bucket="docs")
+    bucket = _FlakyBucket(threading.get_ident())
+    storage._client = _FakeStorageClient(bucket)
+    storage._rate_limiter = AsyncTokenBucket("storage", rate=0)
+    monkeypatch.setattr(SupabaseStorageClient, "RETRY_DELAY", 0.01)
+
+    result = await storage.upload_image(b"jpeg", "doc_1", 3)
+
+    assert result.success
+    assert result.public_url == "https://cdn/doc_1/page_3.jpg"
+    assert bucket.calls == 2
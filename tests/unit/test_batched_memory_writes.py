@@ -0,0 +1,133 @@
+"""
+Test the batched per-turn memory write path.
+
+Verify:
+1. store_interaction embeds message + response + facts in ONE request and
+   persists them with ONE repository transaction
+2. select_facts drops ignored types and keeps the last fact per type
+3. embed_documents sends one API request per MAX_BATCH_SIZE texts and
+   falls back to per-text calls when a batch fails
+"""
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.engine.gemini_embedding import GeminiOptimizedEmbeddings
+from app.engine.semantic_memory.core import SemanticMemoryEngine
+from app.models.semantic_memory import FactType, MemoryType, UserFact, UserFactExtraction
+
+
+def _fact(fact_type, value, confidence=0.9):
+    return UserFact(fact_type=fact_type, value=value, confidence=confidence)
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.requests = []
+
+    async def aembed_documents(self, texts):
+        self.requests.append(list(texts))
+        return [[float(i + 1)] * 3 for i in range(len(texts))]
+
+
+class FakeRepository:
+    def __init__(self):
+        self.turns = []
+
+    def save_turn(self, memories, facts, similarity_threshold=0.9, max_facts=50, user_id=None):
+        self.turns.append((memories, facts, max_facts, user_id))
+        return {"memories": len(memories), "updated": 0, "inserted": len(facts), "evicted": 0}
+
+
+@pytest.mark.asyncio
+async def test_store_interaction_uses_one_embedding_request_and_one_transaction():
+    embeddings, repo = FakeEmbeddings(), FakeRepository()
+    engine = SemanticMemoryEngine(embeddings=embeddings, repository=repo)
+
+    async def extract(user_id, message):
+        return UserFactExtraction(
+            facts=[_fact(FactType.NAME, "Minh"), _fact(FactType.GOAL, "COLREGs")],
+            raw_message=message
+        )
+
+    engine._fact_extractor.extract_user_facts = extract
+
+    ok = await engine.store_interaction("u1", "Tôi là Minh", "Chào Minh", session_id="s1")
+
+    assert ok
+    assert embeddings.requests == [["Tôi là Minh", "Chào Minh", "name: Minh", "goal: COLREGs"]]
+    assert len(repo.turns) == 1
+    memories, facts, max_facts, user_id = repo.turns[0]
+    assert [m.content for m in memories] == ["User: Tôi là Minh", "AI: Chào Minh"]
+    assert all(m.memory_type == MemoryType.MESSAGE for m in memories)
+    assert [f.metadata["fact_type"] for f in facts] == ["name", "goal"]
+    assert facts[0].embedding == [3.0, 3.0, 3.0]
+    assert max_facts == engine.MAX_USER_FACTS and user_id == "u1"
+
+
+@pytest.mark.asyncio
+async def test_store_interaction_without_facts_embeds_two_texts():
+    embeddings, repo = FakeEmbeddings(), FakeRepository()
+    engine = SemanticMemoryEngine(embeddings=embeddings, repository=repo)
+
+    ok = await engine.store_interaction("u1", "hi", "hello", extract_facts=False)
+
+    assert ok and embeddings.requests == [["hi", "hello"]]
+    assert repo.turns[0][1] == []
+
+
+def test_select_facts_keeps_last_fact_per_type():
+    engine = SemanticMemoryEngine(embeddings=FakeEmbeddings(), repository=FakeRepository())
+
+    selected = engine._fact_extractor.select_facts([
+        _fact(FactType.NAME, "Minh"),
+        _fact(FactType.GOAL, "COLREGs"),
+        _fact(FactType.NAME, "Minh Anh"),
+    ])
+
+    assert [(f.value, t) for f, t in selected] == [("COLREGs", "goal"), ("Minh Anh", "name")]
+
+
+class FakeModels:
+    def __init__(self, fail_batches=False):
+        self.calls = []
+        self.fail_batches = fail_batches
+
+    def embed_content(self, model, contents, config):
+        self.calls.append(contents)
+        if isinstance(contents, list):
+            if self.fail_batches:
+                raise RuntimeError("batch rejected")
+            return SimpleNamespace(embeddings=[SimpleNamespace(values=[1.0, 0.0]) for _ in contents])
+        return SimpleNamespace(embeddings=[SimpleNamespace(values=[0.0, 2.0])])
+
+
+def _embeddings_with(models):
+    embeddings = GeminiOptimizedEmbeddings(api_key="test", model_name="test-model", dimensions=2)
+    embeddings._client = SimpleNamespace(models=models)
+    embeddings.MAX_BATCH_SIZE = 2
+    return embeddings
+
+
+def test_embed_documents_batches_requests():
+    models = FakeModels()
+    embeddings = _embeddings_with(models)
+
+    vectors = embeddings.embed_documents(["a", "b", "c"])
+
+    assert models.calls == [["a", "b"], "c"]
+    assert len(vectors) == 3
+
+
+def test_embed_documents_falls_back_per_text_when_batch_fails():
+    models = FakeModels(fail_batches=True)
+    embeddings = _embeddings_with(models)
+
+    vectors = embeddings.embed_documents(["a", "b"])
+
+    assert models.calls == [["a", "b"], "a", "b"]
+    assert vectors == [[0.0, 1.0], [0.0, 1.0]]
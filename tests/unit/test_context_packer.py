@@ -0,0 +1,144 @@
+"""
+Test token-budgeted prompt context packing.
+
+Verify:
+1. Segments are filled by priority within the budget and returned in
+   input order with a per-kind token breakdown
+2. Overlapping chunks are dropped; a segment that does not fit is cut on
+   sentence boundaries (head for documents, tail for history)
+3. RAGAgent packs chunks, entities and history and cites only packed chunks
+4. History keeps its min_tokens floor when a short follow-up gets the
+   MINIMAL adaptive budget
+5. UnifiedAgent keeps a contiguous run of the newest history messages,
+   with the same floor
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.engine.context_packer import ContextPacker, ContextSegment, TRUNCATION_MARK
+from app.engine.token_counter import get_token_counter
+
+
+def _packer():
+    return ContextPacker(dedup_threshold=0.8, min_truncated_tokens=5)
+
+
+def _tokens(text):
+    return get_token_counter().estimate(text)
+
+
+def test_fills_by_priority_and_keeps_input_order():
+    low = ContextSegment("a" * 40, kind="memory", priority=0.2)
+    high = ContextSegment("b" * 40, kind="chunks", priority=1.0)
+    mid = ContextSegment("c" * 40, kind="history", priority=0.5)
+
+    packer = _packer()
+    packed = packer.pack([low, high, mid, ContextSegment("", kind="memory")], budget=20, label="test")
+
+    assert packed.segments == [high, mid]
+    assert packed.breakdown == {"chunks": 10, "history": 10}
+    assert packed.used_tokens == 20
+    assert packed.dropped == 1
+    assert packer.get_stats()["test"]["avg_tokens_by_kind"] == {"chunks": 10.0, "history": 10.0}
+
+
+def test_overlapping_chunks_are_deduplicated():
+    text = "Rule 15 applies when two power driven vessels are crossing so as to involve risk of collision"
+    first = ContextSegment(text, kind="chunks", priority=1.0, dedupe=True)
+    copy = ContextSegment(text + " at sea", kind="chunks", priority=0.9, dedupe=True)
+    other = ContextSegment("Rule 13 covers overtaking vessels in any condition of visibility", kind="chunks",
+                           priority=0.8, dedupe=True)
+
+    packer = _packer()
+    packed = packer.pack([first, copy, other], budget=1000, label="rag")
+
+    assert packed.segments == [first, other]
+    assert packed.deduplicated == 1
+    assert packer.get_stats()["rag"]["deduplicated"] == 1
+
+
+def test_truncates_on_sentence_boundaries():
+    document = "First sentence here. Second sentence here. Third sentence here."
+    history = "user: one\nassistant: two\nuser: three\n"
+    budget = _tokens("First sentence here.") + _tokens(" " + TRUNCATION_MARK) + 1
+
+    head = ContextSegment(document, kind="chunks", priority=1.0)
+    packed = _packer().pack([head], budget=budget)
+    assert head.truncated and head.text == "First sentence here. " + TRUNCATION_MARK
+    assert packed.truncated == 1 and packed.used_tokens <= budget
+
+    tail = ContextSegment(history, kind="history", keep="tail")
+    _packer().pack([tail], budget=_tokens("user: three\n") + _tokens(TRUNCATION_MARK) + 2)
+    assert tail.text.startswith(TRUNCATION_MARK)
+    assert tail.text.rstrip().endswith("user: three")
+    assert "one" not in tail.text
+
+
+def test_rag_agent_cites_only_packed_chunks():
+    from app.engine.agentic_rag.rag_agent import RAGAgent
+    from app.models.knowledge_graph import KnowledgeNode, NodeType
+
+    node_type = list(NodeType)[0]
+    nodes = [
+        KnowledgeNode(id="1", node_type=node_type, title="Rule 15", content="Crossing situation rules. " * 5,
+                      source="COLREGs p.15"),
+        KnowledgeNode(id="2", node_type=node_type, title="Rule 15", content="Crossing situation rules. " * 5,
+                      source="COLREGs copy"),
+        KnowledgeNode(id="3", node_type=node_type, title="Rule 13", content="Overtaking vessel keeps clear.",
+                      source="COLREGs p.13"),
+    ]
+    agent = RAGAgent.__new__(RAGAgent)
+
+    context, history, entities, sources = agent._pack_context(
+        "Quy tắc 15 là gì?", nodes, conversation_history="user: hi\n", entity_context="Rule 15 -> crossing"
+    )
+
+    assert "Rule 13" in context and context.count("### Rule 15") == 1
+    assert sources == ["- Rule 15 (COLREGs p.15)", "- Rule 13 (COLREGs p.13)"]
+    assert history == "user: hi\n" and entities == "Rule 15 -> crossing"
+
+
+def test_history_floor_survives_minimal_budget():
+    from app.engine.agentic_rag.adaptive_token_budget import BudgetTier, get_adaptive_token_budget
+
+    follow_up = "chi tiết hơn"  # Contains "hi": classified as a greeting
+    budget = get_adaptive_token_budget().get_budget(follow_up)
+    assert budget.tier == BudgetTier.MINIMAL
+
+    chunks = [ContextSegment(f"Chunk {i}. " + "x" * 4000, kind="chunks", priority=1.0) for i in range(2)]
+    history = ContextSegment("user: Rule 15 là gì?\n" * 400, kind="history", priority=0.5, keep="tail",
+                             min_tokens=1500)
+    packed = _packer().pack(chunks + [history], budget=budget.context_tokens)
+
+    assert history in packed.segments
+    assert 1200 <= packed.breakdown["history"] <= 1500
+    assert packed.budget == 1500 and packed.used_tokens <= packed.budget
+
+    # Short history is not padded and leaves the rest of the budget to chunks
+    short = ContextSegment("user: hi\n", kind="history", priority=0.1, min_tokens=1500)
+    packed = _packer().pack([chunks[0], short], budget=1100)
+    assert packed.budget == 1100
+    assert short in packed.segments and packed.breakdown["chunks"] > 1000
+
+
+def test_unified_agent_keeps_contiguous_newest_history():
+    from app.core.config import settings
+    from app.engine.unified_agent import UnifiedAgent
+
+    history = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"Turn {i}. " + "Rule 15 crossing. " * 60}
+        for i in range(10)
+    ]
+    history[5]["content"] = "Turn 5. " + "Long answer sentence here. " * 600
+    agent = UnifiedAgent.__new__(UnifiedAgent)
+
+    messages = agent._build_messages("chi tiết hơn", conversation_history=history)
+
+    kept = [m.content for m in messages[1:-1]]
+    assert [text.split(".")[0] for text in kept[1:]] == ["Turn 6", "Turn 7", "Turn 8", "Turn 9"]
+    assert kept[0].startswith(TRUNCATION_MARK)  # Turn 5, truncated to the remaining budget
+    assert "Turn 4" not in " ".join(kept)
+    assert sum(_tokens(text) for text in kept) <= settings.context_history_min_tokens
+    assert messages[-1].content == "chi tiết hơn"
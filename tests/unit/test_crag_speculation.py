@@ -0,0 +1,189 @@
+"""
+Test CRAG speculative generation bookkeeping.
+
+Verify:
+1. Speculative answer is reused on HIT and latency saved is recorded
+2. Cancelled speculation is recorded as MISS
+3. Failed speculation returns None so the caller regenerates
+4. Speculation is cancelled when the pipeline raises or the stream is closed
+5. A speculative stream failing mid-answer ends the answer without an error
+"""
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.engine.agentic_rag.corrective_rag import CorrectiveRAG, SpeculationStats
+from app.engine.reasoning_tracer import get_reasoning_tracer
+
+DOCS = [{"content": "Quy tắc 15", "title": "COLREGs"}]
+
+
+def _make_crag(generate):
+    crag = CorrectiveRAG.__new__(CorrectiveRAG)
+    crag._speculative_enabled = True
+    crag._speculation = SpeculationStats()
+    crag._generate = generate
+    return crag
+
+
+@pytest.mark.asyncio
+async def test_speculation_hit_reuses_answer_and_records_saving():
+    async def generate(query, documents, context):
+        await asyncio.sleep(0.05)
+        return "answer", documents, None
+
+    crag = _make_crag(generate)
+    task = crag._start_speculation("q", [{"content": "doc"}], {})
+    await asyncio.sleep(0.04)  # grading runs concurrently
+
+    result = await crag._finish_speculation(task)
+
+    assert result == ("answer", [{"content": "doc"}], None)
+    stats = crag.get_speculation_stats()
+    assert stats["attempts"] == 1 and stats["hits"] == 1
+    assert crag._speculation.saved_ms_total > 20
+
+
+@pytest.mark.asyncio
+async def test_speculation_miss_cancels_task():
+    async def generate(query, documents, context):
+        await asyncio.sleep(10)
+
+    crag = _make_crag(generate)
+    task = crag._start_speculation("q", [{"content": "doc"}], {})
+    crag._cancel_speculation(task)
+    await asyncio.sleep(0)
+
+    assert task.cancelled() or task.cancelling()
+    assert crag._speculation.misses == 1
+    assert crag._speculation.hit_rate == 0.0
+
+
+@pytest.mark.asyncio
+async def test_speculation_failure_falls_back():
+    async def generate(query, documents, context):
+        raise RuntimeError("quota")
+
+    crag = _make_crag(generate)
+    task = crag._start_speculation("q", [{"content": "doc"}], {})
+
+    assert await crag._finish_speculation(task) is None
+    assert crag._speculation.failures == 1
+
+
+class FakeAnalyzer:
+    async def analyze(self, query):
+        return SimpleNamespace(
+            complexity=SimpleNamespace(value="simple"), is_maritime_related=True,
+            confidence=0.9, detected_topics=[]
+        )
+
+
+class FakeGrader:
+    def __init__(self, error=None):
+        self.error = error
+
+    async def grade_documents(self, query, documents, query_embedding=None):
+        if self.error:
+            raise self.error
+        return SimpleNamespace(avg_score=9.0, relevant_count=1, llm_calls=1, feedback="")
+
+
+def _make_pipeline_crag(grader, rag=None, generate=None):
+    crag = _make_crag(generate)
+    crag._analyzer = FakeAnalyzer()
+    crag._grader = grader
+    crag._rewriter = None
+    crag._rag = rag
+    crag._max_iterations = 2
+    crag._grade_threshold = 7.0
+
+    async def retrieve(query, context):
+        return DOCS
+
+    crag._retrieve = retrieve
+    return crag
+
+
+@pytest.mark.asyncio
+async def test_pipeline_error_cancels_speculation():
+    async def generate(query, documents, context):
+        await asyncio.sleep(10)
+
+    crag = _make_pipeline_crag(FakeGrader(error=RuntimeError("grader down")), generate=generate)
+    started = []
+    start = crag._start_speculation
+    crag._start_speculation = lambda *args: started.append(start(*args)) or started[-1]
+
+    with pytest.raises(RuntimeError):
+        await crag._run_pipeline("q", {}, get_reasoning_tracer(), query_embedding=[0.1])
+    await asyncio.sleep(0)
+
+    assert len(started) == 1 and started[0].cancelled()
+    assert crag._speculation.misses == 0  # Not counted as a rewrite
+
+
+class FakeStreamingRAG:
+    def __init__(self, fail_after=None, chunks=3):
+        self.fail_after = fail_after
+        self.chunks = chunks
+        self.calls = 0
+        self.cancelled = False
+
+    async def _generate_response_streaming(self, **kwargs):
+        self.calls += 1
+        try:
+            for i in range(self.chunks):
+                if self.fail_after is not None and i == self.fail_after:
+                    raise RuntimeError("stream broke")
+                await asyncio.sleep(0.01)
+                yield f"t{i} "
+            await asyncio.sleep(10 if self.chunks > 3 else 0)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+@pytest.mark.asyncio
+async def test_closed_stream_cancels_speculative_producer():
+    rag = FakeStreamingRAG(chunks=5)
+    crag = _make_pipeline_crag(FakeGrader(), rag=rag)
+
+    stream = crag._process_streaming("q", {})
+    async for event in stream:
+        if event["type"] == "answer":
+            break  # Client disconnects mid-answer
+    await stream.aclose()
+    await asyncio.sleep(0.05)
+
+    assert rag.cancelled
+
+
+@pytest.mark.asyncio
+async def test_speculative_stream_failure_after_tokens_ends_cleanly():
+    rag = FakeStreamingRAG(fail_after=2)
+    crag = _make_pipeline_crag(FakeGrader(), rag=rag)
+
+    events = [event async for event in crag._process_streaming("q", {})]
+    answers = [e["content"] for e in events if e["type"] == "answer"]
+
+    assert answers == ["t0 ", "t1 "]  # No error appended, no regenerated answer
+    assert events[-1]["type"] == "done"
+    assert rag.calls == 1 and crag._speculation.failures == 1
+
+
+@pytest.mark.asyncio
+async def test_speculative_stream_failure_before_tokens_regenerates():
+    rag = FakeStreamingRAG(fail_after=0)
+    crag = _make_pipeline_crag(FakeGrader(), rag=rag)
+
+    events = [event async for event in crag._process_streaming("q", {})]
+
+    assert rag.calls == 2  # Fallback generation ran (and failed the same way)
+    assert crag._speculation.failures == 1
+    assert events[-1]["type"] == "done"
@@ -0,0 +1,106 @@
+"""
+Test cross-process cache invalidation after re-ingestion.
+
+Verify:
+1. publish_document_update() invalidates local caches once per edition and
+   bumps the document's version
+2. An API-side poller invalidates its own caches for documents bumped by
+   another process, starting from the version current at startup
+"""
+import os
+import sys
+from dataclasses import dataclass
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.cache.invalidation import CacheInvalidationManager
+from app.repositories.document_cache_version_repository import DocumentCacheVersion
+from app.services.document_cache_sync import DocumentCacheSync, publish_document_update
+
+
+class FakeVersionRepository:
+    """Shared document_cache_versions table seen by every process."""
+
+    def __init__(self):
+        self.rows = {}
+        self.version = 0
+
+    def is_available(self):
+        return True
+
+    def bump(self, document_id, content_hash):
+        self.version += 1
+        self.rows[document_id] = DocumentCacheVersion(document_id, content_hash, self.version)
+        return self.version
+
+    def latest_version(self):
+        return self.version
+
+    def changed_since(self, version, lookback_seconds=0.0, limit=500):
+        return sorted((r for r in self.rows.values() if r.version > version), key=lambda r: r.version)
+
+
+@dataclass
+class Process:
+    """Per-process invalidation manager with one recording cache tier."""
+    manager: CacheInvalidationManager
+    invalidated: list
+
+
+def _process():
+    process = Process(CacheInvalidationManager(), [])
+
+    async def handler(document_id):
+        process.invalidated.append(document_id)
+        return 1
+
+    process.manager.register_handler("response", handler)
+    return process
+
+
+def _use(monkeypatch, process):
+    from app.cache import invalidation
+    monkeypatch.setattr(invalidation, "get_invalidation_manager", lambda: process.manager)
+
+
+@pytest.mark.asyncio
+async def test_publish_invalidates_locally_and_bumps_version(monkeypatch):
+    repository = FakeVersionRepository()
+    worker = _process()
+    _use(monkeypatch, worker)
+
+    await publish_document_update("colregs", "1:aaa\n2:bbb", repository=repository)
+    await publish_document_update("colregs", "1:aaa\n2:bbb", repository=repository)
+
+    assert worker.invalidated == ["colregs"]  # Same edition twice
+    assert repository.rows["colregs"].version == 2
+
+
+@pytest.mark.asyncio
+async def test_api_poller_invalidates_documents_reingested_elsewhere(monkeypatch):
+    repository = FakeVersionRepository()
+    repository.bump("old-doc", "h0")  # Before the API started
+    dropped_entities = []
+    monkeypatch.setattr(
+        "app.services.graph_rag_service.invalidate_document_entity_cache",
+        lambda document_id: dropped_entities.append(document_id) or 1
+    )
+
+    api = _process()
+    sync = DocumentCacheSync(repository=repository, poll_interval=0.01)
+    _use(monkeypatch, api)
+    assert await sync.sync_once() == 0
+
+    # The ingestion worker process re-ingests a document
+    worker = _process()
+    _use(monkeypatch, worker)
+    await publish_document_update("colregs", "1:new", repository=repository)
+
+    _use(monkeypatch, api)
+    assert await sync.sync_once() == 1
+    assert await sync.sync_once() == 0
+    assert api.invalidated == ["colregs"]
+    assert "colregs" in dropped_entities and "old-doc" not in dropped_entities
+    assert sync.get_stats() == {"last_version": 2, "invalidated_total": 1}
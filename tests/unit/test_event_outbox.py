@@ -0,0 +1,156 @@
+"""
+Test LMS event outbox delivery.
+
+Verify:
+1. Repeated events are coalesced and flushed as one batch to a local LMS
+   stand-in, with the concurrency cap respected
+2. Server errors are retried with backoff, client errors go to dead
+3. Without an outbox, events are still sent directly
+"""
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.repositories.lms_event_outbox_repository import OutboxEvent
+from app.services.event_callback_service import EventCallbackService
+from app.services.event_outbox_worker import EventOutboxWorker
+
+CALLBACK_URL = "http://lms.local/api/ai-events"
+
+
+class FakeOutbox:
+    """In-memory lms_event_outbox with the repository's coalescing rules."""
+
+    def __init__(self, available=True):
+        self.available = available
+        self.pending = {}  # dedup_key -> OutboxEvent
+        self.dead = {}
+        self.sent = []
+        self.rescheduled = []
+        self._next_id = 1
+
+    def is_available(self):
+        return self.available
+
+    def enqueue(self, user_id, event_type, dedup_key, payload):
+        if dedup_key in self.pending:
+            event = self.pending[dedup_key]
+            event.payload = payload
+            event.coalesced_count += 1
+            return True
+        self.pending[dedup_key] = OutboxEvent(
+            event_id=self._next_id, user_id=user_id, event_type=event_type, dedup_key=dedup_key,
+            payload=payload, created_at=datetime.now(timezone.utc)
+        )
+        self._next_id += 1
+        return False
+
+    def claim_batch(self, limit):
+        claimed = list(self.pending.values())[:limit]
+        for event in claimed:
+            del self.pending[event.dedup_key]
+            event.attempts += 1
+        self.in_flight = {event.event_id: event for event in claimed}
+        return claimed
+
+    def mark_sent(self, event_ids):
+        self.sent.extend(self.in_flight.pop(event_id) for event_id in event_ids)
+
+    def reschedule(self, event_id, error, delay_seconds):
+        event = self.in_flight.pop(event_id)
+        self.rescheduled.append((event_id, delay_seconds))
+        self.pending[event.dedup_key] = event
+        return True
+
+    def mark_dead(self, event_id, error):
+        self.dead[event_id] = error
+
+    def requeue_stale(self, stale_after_seconds):
+        return 0
+
+
+class LMSStandIn:
+    """Local LMS callback endpoint (httpx mock transport)."""
+
+    def __init__(self, status_codes=None):
+        self.status_codes = list(status_codes or [])
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        self.requests.append(request)
+        status = self.status_codes.pop(0) if self.status_codes else 200
+        return httpx.Response(status, json={"ok": status == 200})
+
+
+def _service(outbox, lms):
+    return EventCallbackService(
+        callback_url=CALLBACK_URL,
+        callback_secret="s3cret",
+        transport=httpx.MockTransport(lms.handler),
+        outbox_repository=outbox,
+    )
+
+
+@pytest.mark.asyncio
+async def test_coalesced_events_flushed_in_one_capped_batch():
+    outbox, lms = FakeOutbox(), LMSStandIn()
+    service = _service(outbox, lms)
+
+    for repeat_count in (2, 3, 4):
+        await service.emit_stuck_detected("user-1", "Rule 15", repeat_count)
+    for i in range(5):
+        await service.emit_knowledge_gap(f"user-{i}", "Rule 13", 0.9)
+
+    worker = EventOutboxWorker(repository=outbox, callback_service=service, max_concurrency=2)
+    assert await worker.flush_once() == 6
+
+    assert len(lms.requests) == 6
+    assert lms.max_in_flight <= 2
+    assert lms.requests[0].headers["X-Callback-Secret"] == "s3cret"
+    stuck = [e for e in outbox.sent if e.event_type == "stuck_detected"]
+    assert stuck[0].payload["data"]["details"]["repeat_count"] == 4
+    assert stuck[0].coalesced_count == 2
+    assert worker.get_stats()["sent_total"] == 6
+
+
+@pytest.mark.asyncio
+async def test_server_errors_retried_client_errors_dead():
+    outbox, lms = FakeOutbox(), LMSStandIn(status_codes=[503, 400])
+    service = _service(outbox, lms)
+    await service.emit_module_completed("user-1", "rule_13_15", 0.9)
+    await service.emit_goal_evolution("user-2", "Deck officer", "Captain")
+
+    worker = EventOutboxWorker(
+        repository=outbox, callback_service=service, max_concurrency=1, retry_base_seconds=10
+    )
+    await worker.flush_once()
+
+    assert outbox.rescheduled and 5 <= outbox.rescheduled[0][1] <= 10
+    assert list(outbox.dead.values())[0].startswith("HTTP 400")
+
+    await worker.flush_once()
+    assert [e.event_type for e in outbox.sent] == ["module_completed_confidence"]
+    assert worker.get_stats()["retried_total"] == 1
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_direct_send_without_outbox():
+    lms = LMSStandIn()
+    service = _service(FakeOutbox(available=False), lms)
+
+    await service.emit_knowledge_gap("user-1", "Rule 5", 0.7)
+    await asyncio.gather(*service._background_tasks)
+
+    assert len(lms.requests) == 1
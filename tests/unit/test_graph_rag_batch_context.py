@@ -0,0 +1,104 @@
+"""
+Test GraphRAG batched entity context.
+
+Verify:
+1. A result set is enriched with at most 2 Neo4j round-trips (no N+1)
+2. Document entity lists are cached and re-fetched after invalidation
+3. A failed relation lookup keeps the document entity context
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services import graph_rag_service
+from app.services.graph_rag_service import GraphRAGService, invalidate_document_entity_cache
+
+
+class FakeNeo4j:
+    def __init__(self):
+        self.document_calls = []
+        self.relation_calls = []
+
+    async def get_entities_for_documents(self, document_ids):
+        self.document_calls.append(list(document_ids))
+        return {
+            doc_id: [{"id": f"{doc_id}_rule15", "name": "Rule 15", "type": "ARTICLE"}]
+            for doc_id in document_ids
+        }
+
+    async def get_relations_for_entities(self, entity_ids):
+        self.relation_calls.append(list(entity_ids))
+        return {
+            entity_id: [{"relation_type": "REFERENCES", "target_name": "Rule 17", "target_type": "ARTICLE"}]
+            for entity_id in entity_ids
+        }
+
+
+def _make_service(neo4j):
+    service = GraphRAGService.__new__(GraphRAGService)
+    service._neo4j = neo4j
+    service._neo4j_available = True
+    return service
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    invalidate_document_entity_cache()
+    yield
+    invalidate_document_entity_cache()
+
+
+@pytest.mark.asyncio
+async def test_batch_context_uses_two_queries_for_result_set():
+    neo4j = FakeNeo4j()
+    service = _make_service(neo4j)
+
+    contexts = await service._get_entity_context_batch(
+        ["doc_a", "doc_b", "doc_a", None, "doc_c"],
+        ["colregs", "rule_15", "rule_17", "rule_19"]
+    )
+
+    assert neo4j.document_calls == [["doc_a", "doc_b", "doc_c"]]
+    assert neo4j.relation_calls == [["colregs", "rule_15", "rule_17"]]
+    assert set(contexts) == {"doc_a", "doc_b", "doc_c", None}
+    assert sorted(contexts["doc_a"]["regulations"]) == ["Rule 15", "Rule 17"]
+    assert contexts[None]["entities"] == []
+    assert contexts[None]["regulations"] == ["Rule 17"]
+
+
+@pytest.mark.asyncio
+async def test_document_entities_cached_until_invalidated():
+    neo4j = FakeNeo4j()
+    service = _make_service(neo4j)
+
+    await service._get_entity_context_batch(["doc_a", "doc_b"], [])
+    await service._get_entity_context_batch(["doc_a", "doc_b"], [])
+    assert neo4j.document_calls == [["doc_a", "doc_b"]]
+
+    assert invalidate_document_entity_cache("doc_a") == 1
+    await service._get_entity_context_batch(["doc_a", "doc_b"], [])
+    assert neo4j.document_calls[-1] == ["doc_a"]
+    assert await graph_rag_service._invalidate_document_entities_handler("missing") == 0
+
+
+@pytest.mark.asyncio
+async def test_relation_lookup_failure_keeps_document_context():
+    from app.repositories.neo4j_knowledge_repository import Neo4jKnowledgeRepository
+
+    class BrokenDriver:
+        def session(self):
+            raise RuntimeError("neo4j down")
+
+    repository = Neo4jKnowledgeRepository.__new__(Neo4jKnowledgeRepository)
+    repository._available = True
+    repository._driver = BrokenDriver()
+    assert await repository.get_relations_for_entities(["rule_15"]) == {}
+
+    neo4j = FakeNeo4j()
+    neo4j.get_relations_for_entities = repository.get_relations_for_entities
+    contexts = await _make_service(neo4j)._get_entity_context_batch(["doc_a"], ["rule_15"])
+
+    assert contexts["doc_a"]["regulations"] == ["Rule 15"]
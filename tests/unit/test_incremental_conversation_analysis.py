@@ -0,0 +1,113 @@
+"""
+Test incremental ConversationAnalyzer state.
+
+Verify:
+1. Analysis with a session state equals analysis from scratch
+2. Only messages not yet seen are processed, also when the history window
+   slides or repeats the same message
+3. A history that does not continue the state rebuilds it
+4. The state survives SessionState persistence
+"""
+import os
+import sys
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.engine.conversation_analyzer import ConversationAnalyzer, ConversationState, QuestionType
+
+CONVERSATION = [
+    {"role": "user", "content": "Quy tắc 15 COLREGs nói về gì?"},
+    {"role": "assistant", "content": "Quy tắc 15 về tình huống cắt hướng, tàu thấy tàu kia ở mạn phải phải nhường đường."},
+    {"role": "user", "content": "Khi thấy đèn đỏ trên tàu khác thì sao?"},
+    {"role": "assistant", "content": "Về đèn đỏ: đó là đèn mạn trái của tàu kia."},
+    {"role": "user", "content": "Còn đèn xanh thì sao?"},
+    {"role": "assistant", "content": "Đèn xanh là đèn mạn phải."},
+    {"role": "user", "content": "ok"},
+    {"role": "assistant", "content": "Bạn cần hỏi thêm gì không?"},
+    {"role": "user", "content": "ok"},
+]
+
+
+def _fields(context):
+    return (
+        context.question_type, context.current_topic, context.recent_keywords,
+        context.inferred_context, context.confidence,
+        context.should_offer_continuation, context.last_explanation_topic,
+    )
+
+
+def _counting_analyzer():
+    analyzer = ConversationAnalyzer()
+    folded = []
+    fold = analyzer._fold_message
+
+    def counting_fold(state, msg):
+        folded.append(msg["content"])
+        fold(state, msg)
+
+    analyzer._fold_message = counting_fold
+    return analyzer, folded
+
+
+def test_incremental_matches_full_analysis():
+    analyzer = ConversationAnalyzer()
+    state = ConversationState()
+
+    for end in range(1, len(CONVERSATION) + 1, 2):
+        history = CONVERSATION[:end]
+        assert _fields(analyzer.analyze(history, state)) == _fields(analyzer.analyze(history))
+
+    context = analyzer.analyze(CONVERSATION[:5], ConversationState())
+    assert context.question_type == QuestionType.AMBIGUOUS
+    assert context.current_topic == "navigation_lights"
+    assert "Khi thấy đèn đỏ" in context.inferred_context
+    assert context.should_offer_continuation and context.last_explanation_topic == "đèn đỏ"
+
+
+def test_only_new_messages_are_processed():
+    analyzer, folded = _counting_analyzer()
+    state = ConversationState()
+
+    analyzer.analyze(CONVERSATION[:3], state)
+    assert len(folded) == 3
+
+    # Growing history, including a repeated "ok"
+    folded.clear()
+    analyzer.analyze(CONVERSATION[:7], state)
+    analyzer.analyze(CONVERSATION[:9], state)
+    assert folded == [m["content"] for m in CONVERSATION[3:9]]
+
+    # Sliding window of the last 4 messages: nothing new, then one new message
+    folded.clear()
+    analyzer.analyze(CONVERSATION[5:9], state)
+    analyzer.analyze(CONVERSATION[6:9] + [{"role": "assistant", "content": "Quy tắc 16 nói về tàu nhường đường."}], state)
+    assert folded == ["Quy tắc 16 nói về tàu nhường đường."]
+    assert state.message_count == 10
+
+
+def test_unrelated_history_rebuilds_state():
+    analyzer, folded = _counting_analyzer()
+    state = ConversationState()
+    analyzer.analyze(CONVERSATION[:4], state)
+
+    other = [{"role": "user", "content": "Điều kiện đăng ký tàu biển là gì?"}]
+    context = analyzer.analyze(other, state)
+
+    assert state.message_count == 1 and folded[-1] == other[0]["content"]
+    assert context.current_topic == "ship_registration"
+    assert not context.should_offer_continuation
+
+
+def test_state_survives_session_persistence():
+    from app.services.session_manager import SessionState
+
+    analyzer = ConversationAnalyzer()
+    session = SessionState(session_id=uuid4())
+    analyzer.analyze(CONVERSATION[:5], session.conversation_analysis)
+
+    restored = SessionState.from_dict(session.to_dict())
+    assert restored.conversation_analysis == session.conversation_analysis
+
+    history = CONVERSATION[:7]
+    assert _fields(analyzer.analyze(history, restored.conversation_analysis)) == _fields(analyzer.analyze(history))
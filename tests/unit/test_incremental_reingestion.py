@@ -0,0 +1,121 @@
+"""
+Test content-addressed incremental re-ingestion.
+
+Verify:
+1. Pages are fingerprinted and fingerprints are passed to storage
+2. Re-ingesting an unchanged document processes no page and keeps caches
+3. Only changed pages are re-processed (and do not reuse stale images)
+4. Each page is analyzed once; a run where every page failed keeps caches
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+fitz = pytest.importorskip("fitz")
+
+from app.services.multimodal_ingestion_service import MultimodalIngestionService, PageResult
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    doc = fitz.open()
+    for i in range(3):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Rule {i + 1}: every vessel shall at all times maintain a proper look-out.")
+    path = tmp_path / "sample.pdf"
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+class FakeStorage:
+    async def list_page_image_urls(self, document_id):
+        return {1: "https://cdn/doc/page_1.jpg", 2: "https://cdn/doc/page_2.jpg", 3: "https://cdn/doc/page_3.jpg"}
+
+
+class TextAnalyzer:
+    def __init__(self):
+        self.calls = []
+
+    def analyze_page(self, pdf_page, page_number):
+        self.calls.append(page_number)
+        return f"analysis-{page_number}"
+
+    def should_use_vision(self, analysis):
+        return False
+
+
+def _make_service(previous_fingerprints, page_success=True):
+    service = MultimodalIngestionService.__new__(MultimodalIngestionService)
+    service.storage = FakeStorage()
+    service.page_analyzer = TextAnalyzer()
+    service.hybrid_detection_enabled = True
+    service.force_vision_mode = False
+    service.min_text_length = 10
+    service._fingerprint_column = True
+    service.processed = []
+    service.invalidations = []
+
+    async def process_page(image, document_id, page_number, pdf_page=None, source_page=None,
+                           page_fingerprint=None, page_analysis=None):
+        assert page_analysis == f"analysis-{page_number}"  # Passed through, not re-analyzed
+        service.processed.append((page_number, page_fingerprint, source_page.existing_image_url))
+        return PageResult(page_number=page_number, success=page_success, extraction_method="direct")
+
+    async def invalidate(document_id, page_fingerprints):
+        service.invalidations.append(dict(page_fingerprints))
+
+    service._process_page = process_page
+    service._load_page_fingerprints = lambda document_id: dict(previous_fingerprints)
+    service._delete_orphaned_pages = lambda document_id, total_pages: 0
+    service._invalidate_document_caches = invalidate
+    return service
+
+
+@pytest.mark.asyncio
+async def test_unchanged_document_is_skipped(pdf_path):
+    first = _make_service({})
+    result = await first.ingest_pdf(pdf_path, "doc_incremental", resume=False)
+
+    assert [p[0] for p in first.processed] == [1, 2, 3]
+    assert all(p[1].startswith("text:") for p in first.processed)
+    assert len(first.invalidations) == 1
+    fingerprints = {page: fp for page, fp, _ in first.processed}
+
+    second = _make_service(fingerprints)
+    result = await second.ingest_pdf(pdf_path, "doc_incremental", resume=False)
+
+    assert second.processed == []
+    assert second.invalidations == []
+    assert result.unchanged_pages == 3
+    assert result.successful_pages == 3
+    assert result.rasterized_pages == 0
+
+
+@pytest.mark.asyncio
+async def test_only_changed_pages_are_reprocessed(pdf_path):
+    first = _make_service({})
+    await first.ingest_pdf(pdf_path, "doc_incremental", resume=False)
+    fingerprints = {page: fp for page, fp, _ in first.processed}
+    fingerprints[2] = "text:previous-edition"
+
+    second = _make_service(fingerprints)
+    result = await second.ingest_pdf(pdf_path, "doc_incremental", resume=False)
+
+    # Page 2 changed: re-processed without reusing its stale stored image
+    assert second.processed == [(2, first.processed[1][1], None)]
+    assert result.unchanged_pages == 2
+    assert len(second.invalidations) == 1
+
+
+@pytest.mark.asyncio
+async def test_pages_analyzed_once_and_failed_run_keeps_caches(pdf_path):
+    service = _make_service({}, page_success=False)
+    result = await service.ingest_pdf(pdf_path, "doc_incremental", resume=False)
+
+    assert service.page_analyzer.calls == [1, 2, 3]
+    assert result.failed_pages == 3
+    assert service.invalidations == []
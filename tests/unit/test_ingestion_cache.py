@@ -0,0 +1,116 @@
+"""
+Test persistent ingestion result cache.
+
+Verify:
+1. Round-trip, persistence across instances and per-kind stats
+2. Size-bounded LRU eviction
+3. VisionExtractor serves cached extractions without an API call
+4. A broken cache falls through to the LLM instead of failing enrichment
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from PIL import Image
+
+from app.cache import ingestion_cache
+from app.cache.ingestion_cache import KIND_CONTEXT, KIND_VISION, IngestionResultCache
+
+
+def test_round_trip_and_persistence(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = IngestionResultCache(path, max_bytes=1024 * 1024)
+    cache.put(KIND_VISION, "k1", {"text": "Điều 15. Tình huống cắt hướng"})
+    assert cache.get(KIND_VISION, "k1") == {"text": "Điều 15. Tình huống cắt hướng"}
+    assert cache.get(KIND_CONTEXT, "k1") is None
+    cache.close()
+
+    reopened = IngestionResultCache(path, max_bytes=1024 * 1024)
+    assert reopened.get(KIND_VISION, "k1")["text"].startswith("Điều 15")
+    stats = reopened.get_stats()
+    assert stats["kinds"][KIND_VISION]["entries"] == 1
+    assert stats["hits"] == 1
+
+
+def test_lru_eviction_by_size(tmp_path):
+    cache = IngestionResultCache(str(tmp_path / "cache.sqlite3"), max_bytes=200)
+    payload = {"text": "x" * 80}
+    cache.put(KIND_VISION, "a", payload)
+    cache.put(KIND_VISION, "b", payload)
+    cache.get(KIND_VISION, "a")  # "a" becomes most recent
+    cache.put(KIND_VISION, "c", payload)  # over budget: evicts "b"
+
+    assert cache.get(KIND_VISION, "b") is None
+    assert cache.get(KIND_VISION, "a") is not None
+    assert cache.get(KIND_VISION, "c") is not None
+    assert cache.get_stats()["total_bytes"] <= 200
+
+
+class _ExplodingClient:
+    @property
+    def models(self):
+        raise AssertionError("Vision API must not be called on cache hit")
+
+
+@pytest.mark.asyncio
+async def test_vision_extractor_uses_cache(tmp_path, monkeypatch):
+    from app.engine.vision_extractor import VisionExtractor
+
+    cache = IngestionResultCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024 * 1024)
+    monkeypatch.setattr("app.engine.vision_extractor.get_ingestion_cache", lambda: cache)
+
+    extractor = VisionExtractor(model="test-model", api_key="test")
+    extractor._client = _ExplodingClient()
+    image = Image.new("RGB", (32, 32), "white")
+    cache.put(KIND_VISION, extractor.cache_key(image), {"text": "## Rule 15\nCrossing situation"})
+
+    result = await extractor.extract_from_image(image)
+
+    assert result.success
+    assert "Rule 15" in result.headings_found
+    # A different prompt version must not hit the same entry
+    monkeypatch.setattr(VisionExtractor, "MARITIME_EXTRACTION_PROMPT", "new prompt")
+    assert cache.get(KIND_VISION, extractor.cache_key(image)) is None
+
+
+def test_disabled_cache_returns_none(monkeypatch):
+    monkeypatch.setattr(ingestion_cache.settings, "ingestion_cache_enabled", False)
+    assert ingestion_cache.get_ingestion_cache() is None
+
+
+class _BrokenCache:
+    def get(self, kind, key):
+        raise RuntimeError("database disk image is malformed")
+
+    def put(self, kind, key, value):
+        raise RuntimeError("database is locked")
+
+    aget = IngestionResultCache.aget
+    aput = IngestionResultCache.aput
+
+
+@pytest.mark.asyncio
+async def test_broken_cache_falls_through_to_llm(monkeypatch):
+    from types import SimpleNamespace
+
+    from app.engine import context_enricher
+    from app.engine.context_enricher import ContextEnricher
+
+    calls = []
+
+    async def fake_ainvoke(llm, messages, **kwargs):
+        calls.append(messages)
+        return SimpleNamespace(content="Chương II, Quy tắc 15 về tình huống cắt hướng.")
+
+    monkeypatch.setattr(context_enricher, "get_ingestion_cache", lambda: _BrokenCache())
+    monkeypatch.setattr(context_enricher, "scheduled_ainvoke", fake_ainvoke)
+    enricher = ContextEnricher(llm=object())
+    enricher._initialized = True
+
+    result = await enricher.generate_context("Tàu thấy tàu kia ở mạn phải phải nhường đường.", "colregs")
+
+    assert result.success and len(calls) == 1
+    assert result.contextual_content.startswith("[Context: Chương II")
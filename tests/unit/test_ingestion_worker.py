@@ -0,0 +1,169 @@
+"""
+Test durable ingestion queue worker.
+
+Verify:
+1. A claimed job runs ingest_pdf with its options and reports page progress
+2. Failures are recorded on the job and the upload is kept for retries
+3. run() drains the queue and stops
+4. A slow page keeps the claim alive with timer heartbeats
+5. A worker whose claim was lost does not record its result
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.repositories.ingestion_job_repository import JOB_PENDING, IngestionJob
+from app.services.ingestion_worker import IngestionWorker
+from app.services.multimodal_ingestion_service import IngestionResult
+
+
+class FakeRepository:
+    def __init__(self, jobs):
+        self.pending = list(jobs)
+        self.progress = []
+        self.completed = {}
+        self.failed = {}
+        self.heartbeats = 0
+        self.owner = {}
+
+    def _owns(self, job_id, worker_id):
+        return self.owner.get(job_id) == worker_id
+
+    def claim_next(self, worker_id):
+        if not self.pending:
+            return None
+        job = self.pending.pop(0)
+        job.worker_id = worker_id
+        job.attempts += 1
+        self.owner[job.job_id] = worker_id
+        return job
+
+    def heartbeat(self, job_id, worker_id):
+        self.heartbeats += 1
+        return self._owns(job_id, worker_id)
+
+    def update_progress(self, job_id, worker_id, processed_pages, total_pages):
+        self.progress.append((job_id, processed_pages, total_pages))
+        return self._owns(job_id, worker_id)
+
+    def complete(self, job_id, worker_id, result, nodes_created=0):
+        if not self._owns(job_id, worker_id):
+            return False
+        self.completed[job_id] = result
+        return True
+
+    def fail(self, job_id, worker_id, error):
+        if not self._owns(job_id, worker_id):
+            return None
+        self.failed[job_id] = error
+        return JOB_PENDING
+
+    def requeue_stale(self, stale_after_seconds):
+        return 0
+
+
+class FakeIngestionService:
+    def __init__(self, fail=False, page_seconds=0.0, on_page=None):
+        self.fail = fail
+        self.page_seconds = page_seconds
+        self.on_page = on_page
+        self.calls = []
+
+    async def ingest_pdf(self, pdf_path, document_id, progress_callback=None, **kwargs):
+        self.calls.append((document_id, kwargs))
+        await asyncio.sleep(self.page_seconds)
+        if self.on_page:
+            self.on_page()
+        if self.fail:
+            raise RuntimeError("vision quota exhausted")
+        for done in (1, 2):
+            await progress_callback(done, 2)
+        return IngestionResult(document_id=document_id, total_pages=2, successful_pages=2, failed_pages=0)
+
+
+def _job(tmp_path, job_id="job-1"):
+    pdf = tmp_path / f"{job_id}.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    return IngestionJob(
+        job_id=job_id,
+        document_id="colregs",
+        filename="COLREGs.pdf",
+        status=JOB_PENDING,
+        file_path=str(pdf),
+        uploaded_by="admin-1",
+        options={"resume": True, "create_module_node": False, "unknown": 1},
+    )
+
+
+@pytest.mark.asyncio
+async def test_job_reports_progress_and_completes(tmp_path):
+    job = _job(tmp_path)
+    repository = FakeRepository([job])
+    service = FakeIngestionService()
+    worker = IngestionWorker(repository=repository, ingestion_service=service, worker_id="w1")
+
+    assert await worker.run_once()
+
+    assert service.calls == [("colregs", {"resume": True})]
+    assert repository.progress == [("job-1", 1, 2), ("job-1", 2, 2)]
+    assert repository.completed["job-1"]["successful_pages"] == 2
+    assert job.worker_id == "w1"
+    assert not os.path.exists(job.file_path)
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_recorded_and_upload_kept(tmp_path):
+    job = _job(tmp_path)
+    repository = FakeRepository([job])
+    worker = IngestionWorker(repository=repository, ingestion_service=FakeIngestionService(fail=True))
+
+    assert await worker.run_once()
+
+    assert "quota" in repository.failed["job-1"]
+    assert repository.completed == {}
+    assert os.path.exists(job.file_path)
+
+
+@pytest.mark.asyncio
+async def test_run_drains_queue(tmp_path):
+    repository = FakeRepository([_job(tmp_path, "a"), _job(tmp_path, "b")])
+    worker = IngestionWorker(repository=repository, ingestion_service=FakeIngestionService(), poll_interval=0.01)
+
+    await worker.run(max_jobs=2)
+
+    assert set(repository.completed) == {"a", "b"}
+    assert worker.jobs_processed == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_page_keeps_heartbeating(tmp_path):
+    repository = FakeRepository([_job(tmp_path)])
+    service = FakeIngestionService(page_seconds=0.2)
+    worker = IngestionWorker(repository=repository, ingestion_service=service, heartbeat_interval=0.05)
+
+    assert await worker.run_once()
+
+    assert repository.heartbeats >= 2
+    assert "job-1" in repository.completed
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fail", [False, True])
+async def test_lost_claim_does_not_overwrite_new_owner(tmp_path, fail):
+    job = _job(tmp_path)
+    repository = FakeRepository([job])
+
+    def reclaimed():
+        repository.owner["job-1"] = "other-worker"  # Stale claim re-queued and claimed again
+
+    service = FakeIngestionService(fail=fail, on_page=reclaimed)
+    worker = IngestionWorker(repository=repository, ingestion_service=service, worker_id="w1")
+
+    assert await worker.run_once()
+
+    assert repository.completed == {} and repository.failed == {}
+    assert os.path.exists(job.file_path)  # The new owner still needs the upload
@@ -0,0 +1,237 @@
+"""
+Test vectorized insight validation (InsightMatrix).
+
+Verify:
+1. A batch of new insights is embedded in one request and stored insights
+   are never re-embedded; duplicates merge into the closest stored insight
+2. An insight stored earlier in the batch is a duplicate candidate for
+   later ones; contradictions need the same category and sub_topic
+3. SemanticMemoryEngine builds the matrix from stored embeddings once,
+   reuses validation embeddings for storage and keeps the matrix current
+4. Jaccard fallback and consolidator padding use one matrix product
+5. The matrix cache is shared by engines; a merge into an insight deleted
+   elsewhere reloads the matrix and stores the insight as new
+"""
+import asyncio
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.engine.insight_validator import InsightMatrix, InsightValidator, jaccard_matrix
+from app.engine.memory_consolidator import MemoryConsolidator
+from app.engine.semantic_memory.core import SemanticMemoryEngine, invalidate_insight_matrix
+from app.models.semantic_memory import Insight, InsightCategory, MemoryType, SemanticMemory
+
+STYLE = InsightCategory.LEARNING_STYLE
+GAP = InsightCategory.KNOWLEDGE_GAP
+
+EXAMPLES = "User thích học qua ví dụ thực tế"
+EXAMPLES_AGAIN = "User thường thích học qua ví dụ thực tế hơn"
+THEORY = "User không thích ví dụ, thích đọc lý thuyết"
+RULE_GAP = "User chưa hiểu Rule 15 về tình huống cắt hướng"
+
+VECTORS = {
+    EXAMPLES: [1.0, 0.0, 0.0],
+    EXAMPLES_AGAIN: [0.95, 0.1, 0.0],
+    THEORY: [0.6, 0.8, 0.0],
+    RULE_GAP: [0.9, 0.0, 0.1],
+}
+
+
+class FakeEmbeddings:
+    dimensions = 3
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [VECTORS[t] for t in texts]
+
+
+def _insight(content, category=STYLE, sub_topic=None, stored=False):
+    return Insight(
+        id=uuid4() if stored else None,
+        user_id="u1",
+        content=content,
+        category=category,
+        sub_topic=sub_topic,
+        confidence=0.8
+    )
+
+
+def test_batch_uses_one_embedding_call_and_stored_vectors():
+    embeddings = FakeEmbeddings()
+    validator = InsightValidator(embeddings=embeddings)
+    stored = _insight(EXAMPLES, stored=True)
+    matrix = InsightMatrix([stored], [VECTORS[EXAMPLES]])
+
+    results = validator.validate_batch(
+        [_insight(EXAMPLES_AGAIN), _insight(RULE_GAP, category=GAP), _insight("short")],
+        matrix
+    )
+
+    assert embeddings.calls == [[EXAMPLES_AGAIN, RULE_GAP]]
+    assert results[0].action == "merge"
+    assert results[0].target_insight is stored
+    assert results[0].similarity_score >= 0.85
+    # Similar vector but different category -> new insight
+    assert results[1].action == "store"
+    assert results[1].embedding.dtype == np.float32
+    assert results[2].action == "reject"
+    assert len(matrix) == 1  # validate_batch never mutates the matrix
+
+
+def test_stored_batch_insight_is_candidate_and_contradiction_needs_sub_topic():
+    validator = InsightValidator(embeddings=FakeEmbeddings())
+    first = _insight(EXAMPLES, sub_topic="practical_learning")
+
+    results = validator.validate_batch(
+        [first, _insight(EXAMPLES_AGAIN), _insight(THEORY, sub_topic="Practical_Learning")],
+        InsightMatrix()
+    )
+
+    assert [r.action for r in results] == ["store", "merge", "update"]
+    assert results[1].target_insight is first
+    assert results[2].target_insight is first
+
+    no_topic = validator.validate_batch([_insight(THEORY)], InsightMatrix([first], [VECTORS[EXAMPLES]]))
+    assert no_topic[0].action == "store"
+
+
+def test_validate_without_embeddings_falls_back_to_jaccard():
+    validator = InsightValidator()
+    existing = [_insight("User thích học qua ví dụ thực tế và case studies", stored=True)]
+
+    result = validator.validate(_insight("User thích học qua ví dụ thực tế và case study"), existing)
+
+    assert result.action == "merge"
+    assert result.embedding is None
+    scores = jaccard_matrix(["a b", "c"], ["a b", "b c", ""])
+    assert scores.shape == (2, 3)
+    assert scores[0, 0] == 1.0 and scores[1, 2] == 0.0
+
+
+class FakeRepository:
+    def __init__(self, memories):
+        self.memories = memories
+        self.list_calls = 0
+        self.saved = []
+        self.metadata_updates = []
+        self.deleted = set()
+
+    def list_memories_with_embeddings(self, user_id, memory_types=None, limit=100):
+        self.list_calls += 1
+        assert memory_types == [MemoryType.INSIGHT]
+        return [m for m in self.memories if m.id not in self.deleted]
+
+    def get_by_id(self, memory_id, user_id):
+        return next((m for m in self.memories if m.id == memory_id and m.id not in self.deleted), None)
+
+    def save_memory(self, memory):
+        self.saved.append(memory)
+        return SimpleNamespace(id=uuid4())
+
+    def update_metadata_only(self, fact_id, metadata):
+        if fact_id in self.deleted:
+            return False
+        self.metadata_updates.append((fact_id, metadata))
+        return True
+
+
+class FakeExtractor:
+    def __init__(self, batches):
+        self.batches = list(batches)
+
+    async def extract_insights(self, user_id, message, conversation_history=None):
+        return self.batches.pop(0)
+
+
+def _stored_examples(user_id):
+    return SemanticMemory(
+        id=uuid4(),
+        user_id=user_id,
+        content=EXAMPLES,
+        embedding=VECTORS[EXAMPLES],
+        memory_type=MemoryType.INSIGHT,
+        metadata={"insight_category": STYLE.value, "confidence": 0.6},
+        created_at=datetime.now()
+    )
+
+
+def _engine(repository, embeddings, batches):
+    engine = SemanticMemoryEngine(embeddings=embeddings, repository=repository)
+    engine._insight_extractor = FakeExtractor(batches)
+    engine._insight_validator = InsightValidator(embeddings=embeddings)
+    engine._memory_consolidator = None
+    return engine
+
+
+def test_engine_reuses_matrix_and_validation_embeddings():
+    invalidate_insight_matrix("u1")
+    stored = _stored_examples("u1")
+    stored_id = stored.id
+    repository = FakeRepository([stored])
+    embeddings = FakeEmbeddings()
+    engine = _engine(repository, embeddings, [
+        [_insight(RULE_GAP, category=GAP)],
+        [_insight(EXAMPLES_AGAIN)],
+    ])
+
+    first = asyncio.run(engine.extract_and_store_insights("u1", "msg"))
+    second = asyncio.run(engine.extract_and_store_insights("u1", "msg"))
+
+    assert len(first) == 1 and len(second) == 1
+    assert repository.list_calls == 1
+    assert embeddings.calls == [[RULE_GAP], [EXAMPLES_AGAIN]]
+    assert np.allclose(repository.saved[0].embedding, np.array(VECTORS[RULE_GAP]) / np.linalg.norm(VECTORS[RULE_GAP]))
+    assert repository.metadata_updates[0][0] == stored_id
+
+    matrix = engine._insight_matrices.get("u1")
+    assert len(matrix) == 2
+    assert matrix.insights[0].confidence == 0.7
+    assert matrix.insights[1].id is not None
+
+
+def test_merge_into_deleted_insight_reloads_shared_matrix_and_stores_new():
+    invalidate_insight_matrix("u2")
+    stored = _stored_examples("u2")
+    repository = FakeRepository([stored])
+    embeddings = FakeEmbeddings()
+    first = _engine(repository, embeddings, [[_insight(RULE_GAP, category=GAP)]])
+    asyncio.run(first.extract_and_store_insights("u2", "msg"))
+
+    # Deleted outside the engine (e.g. admin API) without invalidation
+    repository.deleted.add(stored.id)
+    second = _engine(repository, embeddings, [[_insight(EXAMPLES_AGAIN)]])
+    stored_insights = asyncio.run(second.extract_and_store_insights("u2", "msg"))
+
+    assert len(stored_insights) == 1
+    assert repository.list_calls == 2
+    assert repository.metadata_updates == []
+    assert [m.content for m in repository.saved] == [RULE_GAP, EXAMPLES_AGAIN]
+    matrix = second._insight_matrices.get("u2")
+    assert matrix is first._insight_matrices.get("u2")
+    assert stored.id not in [i.id for i in matrix.insights]
+    assert EXAMPLES_AGAIN in [i.content for i in matrix.insights]
+
+
+def test_consolidator_pads_with_unrepresented_originals():
+    consolidator = MemoryConsolidator.__new__(MemoryConsolidator)
+    consolidated = [_insight("User thích học qua ví dụ thực tế")]
+    originals = [
+        _insight("User thích học qua ví dụ thực tế nhiều"),
+        _insight("User thích học qua ví dụ thực tế nhiều", category=GAP),
+        _insight("User hay hỏi về Rule 15"),
+        _insight("User hay hỏi về Rule 15"),
+    ]
+
+    kept = consolidator._unrepresented(originals, consolidated)
+
+    assert kept == [originals[1], originals[2]]
@@ -0,0 +1,125 @@
+"""
+Test query-aware insight ranking and deferred last_accessed writes.
+
+Verify:
+1. Insights are ranked by the repository's single SQL query, with the
+   query embedding and configured weights, off the event loop;
+   last_accessed is not written on the request path
+2. Marks within the flush window collapse into one batched UPDATE
+3. If ranking fails, insights fall back to category-then-recency order
+"""
+import asyncio
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.engine.semantic_memory.access_tracker import AccessTracker
+from app.engine.semantic_memory.context import ContextRetriever
+from app.models.semantic_memory import InsightCategory, MemoryType, SemanticMemorySearchResult
+
+
+def _memory(category, days_ago=0.0, content=None):
+    created = datetime.now() - timedelta(days=days_ago)
+    return SemanticMemorySearchResult(
+        id=uuid4(),
+        content=content or f"{category} insight",
+        memory_type=MemoryType.INSIGHT,
+        importance=0.8,
+        similarity=1.0,
+        metadata={"insight_category": category, "confidence": 0.9},
+        created_at=created,
+        last_accessed=created
+    )
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.queries = []
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return [0.1, 0.2, 0.3]
+
+    async def aembed_query(self, text):
+        return self.embed_query(text)
+
+
+class FakeRepository:
+    def __init__(self, memories, rank_fails=False):
+        self.memories = memories
+        self.rank_fails = rank_fails
+        self.rank_calls = []
+        self.touched = []
+
+    def rank_insights(self, user_id, query_embedding, priority_categories, limit, **weights):
+        self.rank_calls.append((query_embedding, priority_categories, limit, weights))
+        self.rank_thread = threading.current_thread()
+        return None if self.rank_fails else self.memories[:limit]
+
+    def get_user_insights(self, user_id, limit=50):
+        return self.memories[:limit]
+
+    def touch_last_accessed(self, memory_ids):
+        self.touched.append(sorted(memory_ids))
+        return len(memory_ids)
+
+
+@pytest.mark.asyncio
+async def test_ranking_uses_query_embedding_and_defers_access_writes():
+    memories = [_memory("habit"), _memory("knowledge_gap", 3), _memory("preference", 9)]
+    repo = FakeRepository(memories)
+    embeddings = FakeEmbeddings()
+    tracker = AccessTracker(repo, flush_delay_seconds=0.05)
+    retriever = ContextRetriever(embeddings, repo)
+
+    insights = await retriever.retrieve_insights_prioritized("u1", "Rule 15", limit=2, on_accessed=tracker.mark)
+
+    assert [i.id for i in insights] == [m.id for m in memories[:2]]
+    assert insights[1].category == InsightCategory.KNOWLEDGE_GAP
+    assert embeddings.queries == ["Rule 15"]
+    query_embedding, priority, limit, weights = repo.rank_calls[0]
+    assert query_embedding == [0.1, 0.2, 0.3] and limit == 2
+    assert set(priority) == {"knowledge_gap", "learning_style"}
+    assert weights["similarity_weight"] > 0
+    assert repo.rank_thread is not threading.main_thread()  # Off the event loop
+    assert repo.touched == [] and tracker.pending == 2
+
+    await asyncio.sleep(0.1)
+    assert repo.touched == [sorted(m.id for m in memories[:2])]
+
+
+@pytest.mark.asyncio
+async def test_marks_within_window_collapse_into_one_update():
+    repo = FakeRepository([])
+    tracker = AccessTracker(repo, flush_delay_seconds=0.05)
+    a, b, c = uuid4(), uuid4(), uuid4()
+
+    tracker.mark([a, b])
+    tracker.mark([b, c, None])
+    await asyncio.sleep(0.1)
+
+    assert repo.touched == [sorted([a, b, c])]
+    assert tracker.get_stats()["flushes"] == 1
+
+    tracker.mark([a])
+    await tracker.close()
+    assert repo.touched[-1] == [a] and tracker.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_category_then_recency_when_ranking_fails():
+    recent_habit = _memory("habit", 0)
+    old_gap = _memory("knowledge_gap", 20)
+    new_style = _memory("learning_style", 1)
+    repo = FakeRepository([recent_habit, old_gap, new_style], rank_fails=True)
+    retriever = ContextRetriever(FakeEmbeddings(), repo)
+
+    insights = await retriever.retrieve_insights_prioritized("u1", "anything", limit=3)
+
+    assert [i.id for i in insights] == [new_style.id, old_gap.id, recent_habit.id]
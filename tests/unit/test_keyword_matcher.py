@@ -0,0 +1,67 @@
+"""
+Test shared precompiled keyword matcher.
+
+Verify:
+1. Results equal the legacy ``kw in text.lower()`` loop (both strategies)
+2. Contained and overlapping terms are all reported
+3. Categories keep registration order
+4. NFD input and fold_diacritics match Vietnamese keywords
+"""
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.engine.keyword_matcher import SUBSTRING_SCAN_MAX_TERMS, KeywordMatcher
+
+
+def _legacy(keywords, text):
+    text_lower = text.lower()
+    return [kw for kw in keywords if kw.lower() in text_lower]
+
+
+@pytest.mark.parametrize("size", [8, SUBSTRING_SCAN_MAX_TERMS + 20])
+def test_matches_legacy_substring_loop(size):
+    rng = random.Random(size)
+    alphabet = "abđè "
+    for _ in range(300):
+        keywords = list(dict.fromkeys(
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(size)
+        ))
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        matcher = KeywordMatcher(keywords)
+
+        assert matcher.find_terms(text) == _legacy(keywords, text)
+        assert matcher.contains_any(text) == bool(_legacy(keywords, text))
+
+
+def test_contained_and_overlapping_terms():
+    filler = [f"term {i}" for i in range(SUBSTRING_SCAN_MAX_TERMS)]
+    matcher = KeywordMatcher(["đèn", "đèn đỏ", "đỏ trái", "mạn"] + filler)
+
+    assert matcher.find_terms("Đèn đỏ trái ở mạn") == ["đèn", "đèn đỏ", "đỏ trái", "mạn"]
+    assert matcher.first_match("không có gì") is None
+
+
+def test_scan_categories_in_registration_order():
+    matcher = KeywordMatcher({"rules": ["rule", "colregs"], "lights": ["đèn", "rule"]})
+
+    scan = matcher.scan("Đèn theo Rule 21 COLREGs")
+
+    assert scan.terms == ["rule", "colregs", "đèn"]
+    assert list(scan.categories) == ["rules", "lights"]
+    assert scan.category_counts() == {"rules": 2, "lights": 2}
+    assert "đèn" in scan
+
+
+def test_unicode_normalization_and_diacritic_folding():
+    import unicodedata
+
+    nfd_text = unicodedata.normalize("NFD", "Tàu phải nhường đường")
+    assert KeywordMatcher(["nhường đường"]).contains_any(nfd_text)
+
+    folded = KeywordMatcher(["nhường đường"], fold_diacritics=True)
+    assert folded.find_terms("tau phai nhuong duong") == ["nhường đường"]
@@ -0,0 +1,171 @@
+"""
+Test LLM request scheduler.
+
+Verify:
+1. Queued calls are admitted interactive first, then background, then ingestion
+2. Background calls never take more than their share of a tier
+3. A 429 with a retry-after hint pauses the tier and the call is retried
+4. Token budget delays admission; stats report queue depth and waits
+5. Closing a stream early closes the provider stream and frees the slot
+"""
+import asyncio
+import os
+import sys
+import time
+from contextlib import aclosing
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.engine.llm_scheduler import (
+    LLMPriority,
+    LLMScheduler,
+    llm_priority,
+    retry_after_seconds,
+)
+
+
+class RateLimited(Exception):
+    """Stand-in for google.api_core.exceptions.ResourceExhausted."""
+    code = 429
+
+
+class FakeLLM:
+    """Runnable with an ainvoke that can fail with 429 a few times."""
+
+    def __init__(self, failures=0, delay=0.0):
+        self.failures = failures
+        self.delay = delay
+        self.calls = []
+
+    async def ainvoke(self, llm_input, **kwargs):
+        self.calls.append(time.monotonic())
+        if self.failures:
+            self.failures -= 1
+            raise RateLimited("429 Resource has been exhausted. Please retry in 0.05s.")
+        await asyncio.sleep(self.delay)
+        return f"echo:{llm_input}"
+
+
+def _scheduler(concurrency=1, **kwargs):
+    kwargs.setdefault("tokens_per_minute", 0)
+    kwargs.setdefault("background_share", 1.0)
+    return LLMScheduler(concurrency={"light": concurrency}, enabled=True, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_priority_order_when_tier_is_busy():
+    scheduler = _scheduler()
+    order = []
+
+    async def call(name, priority):
+        async with scheduler.slot("light", priority):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    blocker = asyncio.create_task(call("first", LLMPriority.INTERACTIVE))
+    await asyncio.sleep(0)
+    queued = [
+        asyncio.create_task(call("ingest", LLMPriority.INGESTION)),
+        asyncio.create_task(call("background", LLMPriority.BACKGROUND)),
+        asyncio.create_task(call("chat", LLMPriority.INTERACTIVE)),
+    ]
+    await asyncio.gather(blocker, *queued)
+
+    assert order == ["first", "chat", "background", "ingest"]
+
+
+@pytest.mark.asyncio
+async def test_background_share_leaves_headroom_for_chat():
+    scheduler = _scheduler(concurrency=4, background_share=0.5)
+    running = {"background": 0, "max_background": 0}
+
+    async def background():
+        async with scheduler.slot("light", LLMPriority.BACKGROUND):
+            running["background"] += 1
+            running["max_background"] = max(running["max_background"], running["background"])
+            await asyncio.sleep(0.02)
+            running["background"] -= 1
+
+    tasks = [asyncio.create_task(background()) for _ in range(6)]
+    await asyncio.sleep(0.005)
+
+    # Chat is admitted immediately although background work is queued
+    start = time.monotonic()
+    async with scheduler.slot("light", LLMPriority.INTERACTIVE):
+        assert time.monotonic() - start < 0.01
+    await asyncio.gather(*tasks)
+
+    assert running["max_background"] == 2
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_pauses_tier_and_retries():
+    assert retry_after_seconds(RateLimited("Please retry in 1.5s")) == 1.5
+    assert retry_after_seconds(ValueError("bad input")) is None
+
+    scheduler = _scheduler(max_retries=2, max_retry_wait_seconds=5)
+    llm = FakeLLM(failures=1)
+
+    with llm_priority(LLMPriority.BACKGROUND):
+        result = await scheduler.ainvoke(llm, "hi", tier="light")
+
+    assert result == "echo:hi"
+    assert len(llm.calls) == 2
+    assert llm.calls[1] - llm.calls[0] >= 0.04
+    stats = scheduler.get_stats()["tiers"]["light"]
+    assert stats["throttled"] == 1 and stats["retries"] == 1
+    assert stats["priorities"]["background"]["admitted"] == 2
+
+    with pytest.raises(RateLimited):
+        await _scheduler(max_retries=0).ainvoke(FakeLLM(failures=1), "hi", tier="light")
+
+
+@pytest.mark.asyncio
+async def test_token_budget_delays_admission_and_stats():
+    # 600 tokens/minute = 10 tokens/s; the second call waits for ~1 token refill
+    scheduler = _scheduler(concurrency=4, tokens_per_minute=600)
+
+    async with scheduler.slot("light", LLMPriority.INTERACTIVE, estimated_tokens=600) as ticket:
+        ticket.record_usage(599)
+
+    start = time.monotonic()
+    async with scheduler.slot("light", LLMPriority.INTERACTIVE, estimated_tokens=2):
+        waited = time.monotonic() - start
+
+    assert 0.05 <= waited < 0.5
+    stats = scheduler.get_stats()["tiers"]["light"]
+    assert stats["tokens_used"] == 601
+    assert stats["queue_depth"] == 0 and stats["in_flight"] == 0
+    assert stats["priorities"]["interactive"]["admitted"] == 2
+    assert stats["priorities"]["interactive"]["max_wait_ms"] >= 50
+
+
+class FakeStreamingLLM:
+    def __init__(self):
+        self.closed = False
+
+    async def astream(self, llm_input, **kwargs):
+        try:
+            for token in ("a", "b", "c"):
+                yield token
+        finally:
+            self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_closed_stream_releases_slot():
+    scheduler = _scheduler()
+    llm = FakeStreamingLLM()
+
+    async with aclosing(scheduler.astream(llm, "hi", tier="light")) as stream:
+        async for chunk in stream:
+            assert scheduler.get_stats()["tiers"]["light"]["in_flight"] == 1
+            break
+
+    assert llm.closed
+    assert scheduler.get_stats()["tiers"]["light"]["in_flight"] == 0
+    # The next call is admitted without waiting on the abandoned stream
+    result = await asyncio.wait_for(scheduler.ainvoke(FakeLLM(), "next", tier="light"), 1)
+    assert result == "echo:next"
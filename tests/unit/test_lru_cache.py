@@ -0,0 +1,115 @@
+"""
+Test bounded LRU + TTL cache.
+
+Verify:
+1. LRU eviction order and hit/miss/eviction metrics
+2. TTL expiry
+3. Single-flight: concurrent misses share one load; a cancelled leader
+   hands the load to a waiting caller
+4. Registry exports stats for the admin API
+"""
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.cache.lru_cache import LRUCache, get_all_cache_stats
+
+
+def test_lru_eviction_and_metrics():
+    cache = LRUCache("test.lru", max_size=2, register=False)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" becomes most recent
+    cache.set("c", 3)  # evicts "b"
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    stats = cache.get_stats()
+    assert (stats.size, stats.hits, stats.misses, stats.evictions) == (2, 2, 1, 1)
+
+
+def test_ttl_expiry():
+    cache = LRUCache("test.ttl", max_size=10, ttl_seconds=0.01, register=False)
+    cache.set("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.get_stats().expirations == 1
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_coalesces_concurrent_misses():
+    cache = LRUCache("test.single_flight", max_size=10, register=False)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return "value"
+
+    results = await asyncio.gather(*[cache.get_or_load("k", loader) for _ in range(5)])
+
+    assert results == ["value"] * 5
+    assert calls == 1
+    assert cache.get_stats().coalesced == 4
+    assert await cache.get_or_load("k", loader) == "value"
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_cancel_followers():
+    cache = LRUCache("test.cancel_leader", max_size=10, register=False)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return f"value{calls}"
+
+    leader = asyncio.create_task(cache.get_or_load("k", loader))
+    await asyncio.sleep(0.01)
+    followers = [asyncio.create_task(cache.get_or_load("k", loader)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    results = await asyncio.gather(*followers)
+
+    assert leader.cancelled()
+    assert results == ["value2"] * 3  # One follower re-ran the load for all
+    assert calls == 2
+    assert cache.get_stats().misses == 4
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_respects_cache_if_and_errors():
+    cache = LRUCache("test.cache_if", max_size=10, register=False)
+
+    async def empty():
+        return []
+
+    async def failing():
+        raise RuntimeError("boom")
+
+    assert await cache.get_or_load("k", empty, cache_if=bool) == []
+    assert "k" not in cache
+    with pytest.raises(RuntimeError):
+        await cache.get_or_load("k", failing)
+    assert "k" not in cache
+
+
+def test_registry_exports_stats():
+    cache = LRUCache("test.registry", max_size=4)
+    cache.set("a", 1)
+
+    stats = {s["name"]: s for s in get_all_cache_stats()}
+    assert stats["test.registry"]["size"] == 1
+    assert stats["test.registry"]["max_size"] == 4
@@ -0,0 +1,241 @@
+"""
+Test the post-turn memory write queue.
+
+Verify:
+1. A user's turns are processed in order; turns of one session queued
+   behind a running batch are coalesced into one batch
+2. No more than max_concurrency users are processed at once
+3. Turns spill to the table when the queue is full (with the user's queued
+   turns, keeping order) and at shutdown
+4. Spilled turns are claimed, processed and deleted
+5. A failed semantic memory write reschedules spilled turns instead of
+   deleting them; the retry does not extract their insights again
+6. With MEMORY_QUEUE_INLINE=false no user is tracked in spill mode
+"""
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.repositories.memory_write_queue_repository import MemoryTurn
+from app.services.memory_write_queue import MemoryWriteQueue
+
+
+def _turn(user_id, message, session_id="s1"):
+    return MemoryTurn(user_id=user_id, session_id=session_id, message=message,
+                      response=f"re: {message}", enqueued_at=time.time())
+
+
+class FakeRepository:
+    def __init__(self, available=True):
+        self.available = available
+        self.rows = []
+        self.completed = []
+        self.rescheduled = []
+        self.extracted = set()
+        self._next_id = 1
+
+    def is_available(self):
+        return self.available
+
+    def enqueue_many(self, turns, delay_seconds=0.0, error=None):
+        for turn in turns:
+            turn.turn_id = self._next_id
+            self._next_id += 1
+            self.rows.append(turn)
+        return len(turns)
+
+    def claim_user_batch(self, limit, exclude_users=None):
+        candidates = [t for t in self.rows if t.user_id not in (exclude_users or [])]
+        if not candidates:
+            return []
+        user_id = candidates[0].user_id
+        claimed = [t for t in self.rows if t.user_id == user_id][:limit]
+        self.rows = [t for t in self.rows if t not in claimed]
+        return claimed
+
+    def complete(self, turn_ids):
+        self.completed.extend(turn_ids)
+
+    def reschedule(self, turn_ids, error, delay_seconds, extracted_ids=None):
+        self.rescheduled.extend(turn_ids)
+        self.extracted.update(extracted_ids or [])
+
+    def mark_dead(self, turn_ids, error):
+        pass
+
+    def requeue_stale(self, stale_after_seconds):
+        return 0
+
+    def users_with_backlog(self, user_ids):
+        return {t.user_id for t in self.rows if t.user_id in user_ids}
+
+
+class RecordingProcessor:
+    def __init__(self, delay=0.0):
+        self.batches = []
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self, turns):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(self.delay)
+        self.batches.append([t.message for t in turns])
+        self.running -= 1
+
+
+def _queue(processor, repository=None, **kwargs):
+    kwargs.setdefault("max_concurrency", 2)
+    kwargs.setdefault("max_pending", 100)
+    kwargs.setdefault("max_coalesce", 5)
+    return MemoryWriteQueue(
+        processor=processor, repository=repository or FakeRepository(available=False),
+        poll_interval=0.02, inline=True, **kwargs
+    )
+
+
+async def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_turns_of_one_session_are_ordered_and_coalesced():
+    processor = RecordingProcessor(delay=0.05)
+    queue = _queue(processor)
+    queue.start()
+
+    queue.submit(_turn("u1", "m1"))
+    await asyncio.sleep(0.01)  # m1 is being processed
+    queue.submit(_turn("u1", "m2"))
+    queue.submit(_turn("u1", "m3"))
+    queue.submit(_turn("u1", "m4", session_id="s2"))
+    await _wait_for(lambda: queue.processed_turns == 4)
+    await queue.stop()
+
+    assert processor.batches == [["m1"], ["m2", "m3"], ["m4"]]
+    stats = queue.get_stats()
+    assert stats["coalesced_turns"] == 1 and stats["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded():
+    processor = RecordingProcessor(delay=0.03)
+    queue = _queue(processor, max_concurrency=2)
+    queue.start()
+
+    for user_id in ("u1", "u2", "u3", "u4"):
+        queue.submit(_turn(user_id, f"hi from {user_id}"))
+    await _wait_for(lambda: queue.processed_turns == 4)
+    await queue.stop()
+
+    assert processor.max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_full_queue_spills_user_lane_in_order_and_drains_it():
+    processor = RecordingProcessor()
+    repository = FakeRepository()
+    queue = _queue(processor, repository, max_pending=1)
+    queue.running = True  # Accept turns without workers
+
+    queue.submit(_turn("u1", "m1"))
+    queue.submit(_turn("u1", "m2"))  # Full: m1 and m2 move to the table together
+    queue.submit(_turn("u1", "m3"))  # u1 now has spilled turns: keep order
+    await _wait_for(lambda: len(repository.rows) == 3)
+
+    assert [t.message for t in repository.rows] == ["m1", "m2", "m3"]
+    assert queue.pending == 0 and queue.spilled_total == 3
+
+    claimed = await queue._drain_spilled()
+    assert claimed == 3
+    assert processor.batches == [["m1", "m2", "m3"]]
+    assert repository.completed == [1, 2, 3]
+
+    await queue._drain_spilled()  # Table drained: u1 is queued in memory again
+    assert "u1" not in queue._spill_mode
+
+
+@pytest.mark.asyncio
+async def test_stop_spills_queued_turns():
+    repository = FakeRepository()
+    queue = _queue(RecordingProcessor(), repository)
+    queue.running = True
+
+    queue.submit(_turn("u1", "m1"))
+    queue.submit(_turn("u2", "m2"))
+    await queue.stop()
+
+    assert sorted(t.message for t in repository.rows) == ["m1", "m2"]
+
+
+@pytest.mark.asyncio
+async def test_failed_store_reschedules_spilled_turns():
+    from app.services.background_tasks import BackgroundTaskRunner
+
+    class FailingSemanticMemory:
+        def __init__(self):
+            self.extracted = []
+
+        def is_available(self):
+            return True
+
+        async def extract_and_store_insights(self, **kwargs):
+            self.extracted.append(kwargs["message"])
+            return []
+
+        async def store_interactions(self, **kwargs):
+            return False  # Swallowed error inside SemanticMemoryEngine
+
+    class ProfileRepository:
+        def __init__(self):
+            self.increments = 0
+
+        def is_available(self):
+            return True
+
+        async def increment_stats(self, user_id, messages=2):
+            self.increments += 1
+
+    profiles = ProfileRepository()
+    semantic_memory = FailingSemanticMemory()
+    runner = BackgroundTaskRunner(semantic_memory=semantic_memory, profile_repo=profiles)
+    repository = FakeRepository()
+    queue = _queue(runner.process_memory_turns, repository)
+    repository.enqueue_many([_turn("u1", "m1")])
+
+    await queue._drain_spilled()
+
+    assert repository.rescheduled == [1] and repository.extracted == {1}
+    assert repository.completed == []
+    assert queue.failed_batches == 1 and queue.processed_turns == 0
+    assert profiles.increments == 0
+
+    # Retry (the turn comes back marked): only the write is redone
+    retry = _turn("u1", "m1")
+    retry.turn_id, retry.insights_extracted = 1, True
+    with pytest.raises(RuntimeError):
+        await runner.process_memory_turns([retry])
+    assert semantic_memory.extracted == ["m1"]
+
+
+@pytest.mark.asyncio
+async def test_spill_only_mode_does_not_track_users():
+    repository = FakeRepository()
+    queue = MemoryWriteQueue(processor=RecordingProcessor(), repository=repository, inline=False)
+    queue.start()
+
+    for i in range(3):
+        queue.submit(_turn(f"u{i}", "m"))
+    await _wait_for(lambda: len(repository.rows) == 3)
+    await queue.stop()
+
+    assert queue._spill_mode == set() and queue._spills_in_flight == {}
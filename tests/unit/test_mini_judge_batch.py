@@ -0,0 +1,116 @@
+"""
+Test Mini-Judge single-call batch grading.
+
+Verify:
+1. All documents judged in ONE streamed LLM call
+2. Early stop once enough relevant docs are confirmed
+3. Per-doc fallback when the batch output cannot be parsed
+"""
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.engine.agentic_rag.mini_judge_grader import MiniJudgeGrader, MiniJudgeConfig
+
+
+class _Chunk:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeStreamingLLM:
+    """Streams a canned response in small chunks and counts calls."""
+
+    def __init__(self, stream_text: str, single_answer: str = "yes"):
+        self.stream_text = stream_text
+        self.single_answer = single_answer
+        self.astream_calls = 0
+        self.ainvoke_calls = 0
+        self.chunks_sent = 0
+
+    async def astream(self, prompt):
+        self.astream_calls += 1
+        for i in range(0, len(self.stream_text), 7):
+            self.chunks_sent += 1
+            yield _Chunk(self.stream_text[i:i + 7])
+
+    async def ainvoke(self, prompt):
+        self.ainvoke_calls += 1
+        return _Chunk(self.single_answer)
+
+
+def _make_judge(llm) -> MiniJudgeGrader:
+    judge = MiniJudgeGrader(MiniJudgeConfig())
+    judge._llm = llm
+    judge._initialized = True
+    return judge
+
+
+DOCS = [{"id": f"d{i}", "content": f"Rule {i} content"} for i in range(4)]
+
+
+@pytest.mark.asyncio
+async def test_single_call_judges_all_documents():
+    llm = FakeStreamingLLM(
+        '{"i": 0, "relevant": true, "score": 9, "reason": "direct"}\n'
+        '{"i": 1, "relevant": false, "score": 2, "reason": "off"}\n'
+        '{"i": 2, "relevant": false, "score": 3, "reason": "off"}\n'
+        '{"i": 3, "relevant": true, "score": 8, "reason": "strong"}'
+    )
+    judge = _make_judge(llm)
+
+    batch = await judge.judge_batch("Rule 15?", DOCS)
+
+    assert llm.astream_calls == 1
+    assert llm.ainvoke_calls == 0
+    assert batch.llm_calls == 1
+    assert batch.judged_indices == [0, 1, 2, 3]
+    assert batch.relevant_count == 2
+    assert batch.results[0].score == 9.0
+    assert not batch.fallback_used
+
+
+@pytest.mark.asyncio
+async def test_early_stop_after_enough_relevant_docs():
+    llm = FakeStreamingLLM(
+        '{"i": 0, "relevant": true, "score": 9, "reason": "a"}\n'
+        '{"i": 1, "relevant": true, "score": 8, "reason": "b"}\n'
+        '{"i": 2, "relevant": false, "score": 1, "reason": "c"}\n'
+        '{"i": 3, "relevant": false, "score": 1, "reason": "d"}\n'
+    )
+    judge = _make_judge(llm)
+
+    batch = await judge.judge_batch("Rule 15?", DOCS, stop_after_relevant=2)
+
+    assert batch.early_stopped
+    assert batch.judged_indices == [0, 1]
+    assert batch.skipped_indices == [2, 3]
+    assert llm.chunks_sent < len(llm.stream_text) // 7
+
+
+@pytest.mark.asyncio
+async def test_zero_target_skips_llm_call():
+    llm = FakeStreamingLLM("")
+    judge = _make_judge(llm)
+
+    batch = await judge.judge_batch("Rule 15?", DOCS, stop_after_relevant=0)
+
+    assert llm.astream_calls == 0
+    assert batch.llm_calls == 0
+    assert batch.skipped_indices == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_parse_failure_falls_back_to_per_doc_calls():
+    llm = FakeStreamingLLM('Sorry, here is a table:\n| doc | yes |\n{"i": 0, "relevant": true}')
+    judge = _make_judge(llm)
+
+    batch = await judge.judge_batch("Rule 15?", DOCS)
+
+    assert batch.fallback_used
+    assert llm.ainvoke_calls == 3
+    assert batch.llm_calls == 4
+    assert batch.judged_indices == [0, 1, 2, 3]
@@ -0,0 +1,128 @@
+"""
+Test streaming PDF page source for ingestion.
+
+Verify:
+1. Pages are rasterized only on demand
+2. Direct-extraction pages with a stored image skip rasterization
+3. Peak RSS tracking
+"""
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+fitz = pytest.importorskip("fitz")
+
+from app.services.pdf_page_source import PdfPageSource, PeakRSSTracker
+from app.services.multimodal_ingestion_service import MultimodalIngestionService
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    doc = fitz.open()
+    for i in range(3):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Rule {i + 1}: every vessel shall at all times maintain a proper look-out.")
+    path = tmp_path / "sample.pdf"
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+@pytest.mark.asyncio
+async def test_pages_render_lazily(pdf_path):
+    with PdfPageSource(pdf_path, start=1, dpi=50) as source:
+        assert source.total_pages == 3
+        pages = []
+        for page in source:
+            pages.append(page.page_number)
+            if page.page_number == 2:
+                image = await page.render()
+                assert image.size[0] > 0
+                page.release()
+
+        assert pages == [2, 3]
+        assert source.rasterized_pages == 1
+
+
+class FakeStorage:
+    def __init__(self):
+        self.uploads = []
+
+    async def upload_pil_image(self, image, document_id, page_number):
+        from app.services.supabase_storage import UploadResult
+        self.uploads.append(page_number)
+        return UploadResult(success=True, public_url=f"https://cdn/{document_id}/page_{page_number}.jpg")
+
+
+class DirectAnalyzer:
+    def analyze_page(self, pdf_page, page_number):
+        return SimpleNamespace(detection_reasons=[])
+
+    def should_use_vision(self, analysis):
+        return False
+
+
+class FakeChunker:
+    async def chunk_page_content(self, text, metadata):
+        raise RuntimeError("single chunk fallback")
+
+
+class FakeEmbeddings:
+    async def aembed_query(self, text):
+        return [0.0]
+
+
+def _make_service():
+    service = MultimodalIngestionService.__new__(MultimodalIngestionService)
+    service.storage = FakeStorage()
+    service.page_analyzer = DirectAnalyzer()
+    service.chunker = FakeChunker()
+    service.embeddings = FakeEmbeddings()
+    service.bbox_extractor = None
+    service.hybrid_detection_enabled = True
+    service.force_vision_mode = False
+    service.min_text_length = 10
+    service.entity_extraction_enabled = False
+    service.stored = []
+
+    async def store(**kwargs):
+        service.stored.append(kwargs)
+
+    service._store_chunk_in_database = store
+    return service
+
+
+@pytest.mark.asyncio
+async def test_direct_page_with_stored_image_is_not_rasterized(pdf_path, monkeypatch):
+    monkeypatch.setattr("app.services.multimodal_ingestion_service.settings.contextual_rag_enabled", False)
+    service = _make_service()
+    stored_url = "https://cdn/doc/page_1.jpg"
+
+    with PdfPageSource(pdf_path, end=2, dpi=50, existing_image_urls={1: stored_url}) as source:
+        for page in source:
+            result = await service._process_page(
+                image=None,
+                document_id="doc",
+                page_number=page.page_number,
+                pdf_page=page.pdf_page,
+                source_page=page
+            )
+            assert result.success
+            assert result.extraction_method == "direct"
+            page.release()
+
+        # Page 1 reused its stored image, page 2 had to be rendered + uploaded
+        assert source.rasterized_pages == 1
+    assert service.storage.uploads == [2]
+    assert service.stored[0]["image_url"] == stored_url
+
+
+def test_peak_rss_tracker():
+    tracker = PeakRSSTracker()
+    assert tracker.start_mb > 0
+    assert tracker.sample() <= tracker.peak_mb
+    assert tracker.growth_mb >= 0
@@ -0,0 +1,178 @@
+"""
+Test prefix-stable prompt assembly and prompt caching.
+
+Verify:
+1. The static persona prefix is byte-identical per role; per-user data
+   (name, course, pronouns) only appears after it
+2. LLMPool creates one explicit cache handle per prefix, reuses it, renews
+   it when the prefix changes and remembers failures
+3. The scheduler reports the share of prompt tokens read from cache
+4. RAG synthesis sends only the per-turn part when a handle is used
+5. Creating a handle does not hold the pool lock: other slots proceed and
+   callers of the same slot use the previous handle meanwhile
+6. UnifiedAgent puts the LMS course in the per-user part of the prompt
+"""
+import asyncio
+import hashlib
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from app.core.config import settings
+from app.engine.llm_pool import LLMPool
+from app.engine.llm_scheduler import LLMScheduler
+from app.prompts.prompt_loader import PromptLoader
+
+
+@pytest.fixture
+def explicit_cache(monkeypatch):
+    """Enable explicit caching with a fake cache-creation call."""
+    created = []
+
+    def fake_create(tier, key, prefix, ttl):
+        created.append((tier, key, prefix))
+        if prefix == "fail":
+            raise RuntimeError("quota")
+        return f"cachedContents/{len(created)}"
+
+    monkeypatch.setattr(settings, "llm_explicit_cache_enabled", True)
+    monkeypatch.setattr(settings, "llm_explicit_cache_min_tokens", 0)
+    monkeypatch.setattr(LLMPool, "_create_cached_content", staticmethod(fake_create))
+    monkeypatch.setattr(LLMPool, "_prefix_caches", {})
+    monkeypatch.setattr(LLMPool, "_prefix_cache_failures", {})
+    monkeypatch.setattr(LLMPool, "_prefix_cache_pending", {})
+    return created
+
+
+def test_static_prefix_is_identical_across_users():
+    loader = PromptLoader()
+
+    first = loader.build_system_prompt(
+        "student", user_name="Minh", lms_course="COLREGs", is_follow_up=True
+    )
+    second = loader.build_system_prompt(
+        "student", user_name="Lan", pronoun_style={"user_self": "em", "user_called": "anh", "ai_self": "anh"}
+    )
+    static = loader.build_static_prompt("student")
+
+    assert first.startswith(static + "\n") and second.startswith(static + "\n")
+    assert "Minh" not in static and "{{user_name}}" not in static
+    assert "COLREGs" in first[len(static):]
+    assert loader.build_static_prompt("student") is static
+    assert loader.build_system_prompt("teacher") == loader.build_static_prompt("teacher")
+
+
+def test_explicit_cache_handle_is_reused_per_prefix(explicit_cache):
+    assert LLMPool.get_cached_prefix("moderate", "rag:student", "persona v1") == "cachedContents/1"
+    assert LLMPool.get_cached_prefix("moderate", "rag:student", "persona v1") == "cachedContents/1"
+    assert LLMPool.get_cached_prefix("deep", "rag:student", "persona v1") == "cachedContents/2"
+    # Prefix changed (persona edited): new handle for the same slot
+    assert LLMPool.get_cached_prefix("moderate", "rag:student", "persona v2") == "cachedContents/3"
+
+    # Failures are not retried until the TTL passes
+    assert LLMPool.get_cached_prefix("moderate", "rag:teacher", "fail") is None
+    assert LLMPool.get_cached_prefix("moderate", "rag:teacher", "fail") is None
+    assert len(explicit_cache) == 4
+
+
+def test_explicit_cache_disabled_or_prefix_too_short(explicit_cache, monkeypatch):
+    monkeypatch.setattr(settings, "llm_explicit_cache_min_tokens", 1000)
+    assert LLMPool.get_cached_prefix("moderate", "rag:student", "short prefix") is None
+
+    monkeypatch.setattr(settings, "llm_explicit_cache_enabled", False)
+    assert LLMPool.get_cached_prefix("moderate", "rag:student", "x" * 10_000) is None
+    assert explicit_cache == []
+
+
+def test_scheduler_reports_cached_token_ratio():
+    scheduler = LLMScheduler(concurrency={"moderate": 2}, tokens_per_minute=0, enabled=True)
+
+    class FakeLLM:
+        async def ainvoke(self, llm_input, **kwargs):
+            return SimpleNamespace(usage_metadata={
+                "input_tokens": 1000, "output_tokens": 10, "total_tokens": 1010,
+                "input_token_details": {"cache_read": 750},
+            })
+
+    asyncio.run(scheduler.ainvoke(FakeLLM(), "hi", tier="moderate"))
+    scheduler.record_prompt_usage(SimpleNamespace(usage_metadata={"input_tokens": 1000}), "moderate")
+
+    stats = scheduler.get_stats()["tiers"]["moderate"]
+    assert stats["prompt_tokens"] == 2000
+    assert stats["cached_tokens"] == 750
+    assert stats["cached_token_ratio"] == 0.375
+
+
+def test_rag_sends_only_per_turn_part_with_cache_handle(explicit_cache):
+    from app.engine.agentic_rag.rag_agent import RAGAgent
+
+    class FakeGemini:
+        cached_content = None
+
+        def bind(self, **kwargs):
+            return ("bound", kwargs)
+
+    agent = RAGAgent.__new__(RAGAgent)
+    agent._llm = FakeGemini()
+
+    llm, messages = agent._generation_messages("rag:student", "STATIC", "DYNAMIC", "QUESTION")
+    assert llm == ("bound", {"cached_content": "cachedContents/1"})
+    assert len(messages) == 1 and isinstance(messages[0], HumanMessage)
+    assert messages[0].content == "DYNAMIC\nQUESTION"
+
+    settings.llm_explicit_cache_enabled = False
+    llm, messages = agent._generation_messages("rag:student", "STATIC", "DYNAMIC", "QUESTION")
+    assert llm is agent._llm
+    assert isinstance(messages[0], SystemMessage) and messages[0].content == "STATIC\nDYNAMIC"
+
+
+def test_cache_creation_does_not_hold_pool_lock(explicit_cache, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def slow_create(tier, key, prefix, ttl):
+        explicit_cache.append((tier, key, prefix))
+        name = f"cachedContents/{len(explicit_cache)}"
+        if key == "rag:student":
+            started.set()
+            release.wait(5)
+        return name
+
+    monkeypatch.setattr(LLMPool, "_create_cached_content", staticmethod(slow_create))
+    slot = ("moderate", "rag:student")
+    LLMPool._prefix_caches[slot] = (hashlib.sha256(b"persona").hexdigest(), "cachedContents/old", 0.0)  # Due for renewal
+
+    results = []
+    renewer = threading.Thread(
+        target=lambda: results.append(LLMPool.get_cached_prefix("moderate", "rag:student", "persona"))
+    )
+    renewer.start()
+    assert started.wait(5)
+
+    # While the renewal is in flight
+    assert LLMPool.get_cached_prefix("moderate", "rag:student", "persona") == "cachedContents/old"
+    assert LLMPool.get_cached_prefix("moderate", "rag:teacher", "other") == "cachedContents/2"
+
+    release.set()
+    renewer.join(5)
+    assert results == ["cachedContents/1"]
+    assert LLMPool.get_cached_prefix("moderate", "rag:student", "persona") == "cachedContents/1"
+    assert len(explicit_cache) == 2
+
+
+def test_unified_agent_passes_lms_course(monkeypatch):
+    from app.engine import unified_agent
+    from app.engine.unified_agent import UnifiedAgent
+
+    monkeypatch.setattr(unified_agent, "_prompt_loader", PromptLoader())
+    agent = UnifiedAgent.__new__(UnifiedAgent)
+
+    messages = agent._build_messages("Rule 15?", user_name="Minh", lms_course="COLREGs")
+
+    assert "COLREGs" in messages[0].content
@@ -0,0 +1,107 @@
+"""
+Test precompiled persona templates in PromptLoader.
+
+Verify:
+1. Prompts are rendered from templates compiled at load time; the shared
+   config is not re-read per call
+2. Editing a persona YAML hot-reloads it (mtime check), throttled by
+   PROMPT_RELOAD_CHECK_SECONDS
+3. Empathy keywords are matched with the precompiled matchers
+4. A hot reload of an invalid or half-written YAML keeps the previously
+   loaded persona, and the file is reloaded once it is complete
+"""
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.core.config import settings
+from app.prompts.prompt_loader import PromptLoader
+
+PROMPTS_DIR = Path(__file__).resolve().parents[2] / "app" / "prompts"
+
+TUTOR_YAML = """
+profile:
+  name: "{name}"
+  role: "Gia sư hàng hải"
+empathy_patterns:
+  frustration_keywords: ["mệt", "khó quá"]
+  basic_needs_keywords: ["đói"]
+"""
+
+
+@pytest.fixture
+def prompts_dir(tmp_path):
+    """Copy of app/prompts with a small tutor persona."""
+    for sub in ("agents", "base"):
+        shutil.copytree(PROMPTS_DIR / sub, tmp_path / sub)
+    (tmp_path / "agents" / "tutor.yaml").write_text(TUTOR_YAML.format(name="Captain A"), encoding="utf-8")
+    return tmp_path
+
+
+def _touch_later(path: Path, text: str) -> None:
+    path.write_text(text, encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+
+def test_renders_from_precompiled_templates(prompts_dir, monkeypatch):
+    loader = PromptLoader(str(prompts_dir))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("recompiled or re-read per request")
+
+    monkeypatch.setattr(loader, "_compile_static_prompt", fail)
+    monkeypatch.setattr(loader, "_load_shared_config", fail)
+    monkeypatch.setattr(settings, "prompt_reload_check_seconds", -1)
+
+    prompt = loader.build_system_prompt("student", user_name="Lan")
+    assert "**Captain A**" in prompt and "Lan" in prompt
+    assert loader.get_thinking_instruction()
+    assert loader.build_static_prompt("unknown-role") == loader.build_static_prompt("student")
+
+
+def test_hot_reload_on_file_change(prompts_dir, monkeypatch):
+    monkeypatch.setattr(settings, "prompt_reload_check_seconds", 0)
+    loader = PromptLoader(str(prompts_dir))
+    tutor_yaml = prompts_dir / "agents" / "tutor.yaml"
+
+    _touch_later(tutor_yaml, TUTOR_YAML.format(name="Captain B"))
+    assert "**Captain B**" in loader.build_static_prompt("student")
+
+    # Checks are throttled
+    monkeypatch.setattr(settings, "prompt_reload_check_seconds", 3600)
+    loader._next_reload_check = 0.0
+    loader.build_static_prompt("student")
+    _touch_later(tutor_yaml, TUTOR_YAML.format(name="Captain C"))
+    assert "**Captain B**" in loader.build_static_prompt("student")
+
+
+def test_hot_reload_keeps_persona_when_yaml_is_invalid(prompts_dir, monkeypatch):
+    monkeypatch.setattr(settings, "prompt_reload_check_seconds", 0)
+    loader = PromptLoader(str(prompts_dir))
+    tutor_yaml = prompts_dir / "agents" / "tutor.yaml"
+    rag_yaml = prompts_dir / "agents" / "rag.yaml"
+    rag_prompt = loader.build_static_prompt("rag_agent")
+
+    _touch_later(tutor_yaml, 'profile:\n  name: "Captain')  # Half-written
+    _touch_later(rag_yaml, "")
+    assert "**Captain A**" in loader.build_static_prompt("student")
+    assert "**Captain A**" in loader.build_static_prompt("tutor_agent")
+    assert loader.build_static_prompt("rag_agent") == rag_prompt
+
+    _touch_later(tutor_yaml, TUTOR_YAML.format(name="Captain B"))
+    assert "**Captain B**" in loader.build_static_prompt("student")
+
+
+def test_empathy_detection_uses_compiled_matchers(prompts_dir, monkeypatch):
+    monkeypatch.setattr(settings, "prompt_reload_check_seconds", -1)
+    loader = PromptLoader(str(prompts_dir))
+
+    assert loader.detect_empathy_needed("Học KHÓ QUÁ, em mệt rồi", "student")
+    assert loader.detect_empathy_needed("Đói bụng quá", "student")
+    assert not loader.detect_empathy_needed("Quy tắc 15 là gì?", "student")
@@ -0,0 +1,85 @@
+"""
+Test QueryAnalyzer fast path (local classifier + memo cache).
+
+Verify:
+1. Near-duplicate of a labeled query is classified locally (no LLM call)
+2. Unfamiliar query falls through to the LLM and is learned afterwards
+3. Repeated query is served from the memo cache
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.cache.lru_cache import LRUCache
+from app.engine.agentic_rag.query_analyzer import QueryAnalyzer, QueryComplexity
+from app.engine.agentic_rag.query_classifier import LocalQueryClassifier, normalize_query
+
+
+class _Response:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeLLM:
+    def __init__(self, content):
+        self.content = content
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        return _Response(self.content)
+
+
+def _make_analyzer(llm) -> QueryAnalyzer:
+    analyzer = QueryAnalyzer.__new__(QueryAnalyzer)
+    analyzer._llm = llm
+    analyzer._cache = LRUCache("test.query_analyzer", max_size=16, register=False)
+    analyzer._local_enabled = True
+    analyzer._local_confidence = 0.75
+    analyzer._classifier = LocalQueryClassifier()
+    analyzer._stats = {
+        "requests": 0, "cache_hits": 0, "local_hits": 0, "llm_calls": 0,
+        "local_ms_total": 0.0, "llm_ms_total": 0.0,
+    }
+    return analyzer
+
+
+def test_normalize_query_keeps_diacritics():
+    assert normalize_query("  Quy tắc 15   là gì?? ") == "quy tắc 15 là gì"
+    assert normalize_query("tàu") != normalize_query("tau")
+
+
+@pytest.mark.asyncio
+async def test_local_classifier_bypasses_llm():
+    llm = FakeLLM("{}")
+    analyzer = _make_analyzer(llm)
+
+    analysis = await analyzer.analyze("Quy tắc 14 là gì?")
+
+    assert llm.calls == 0
+    assert analysis.complexity == QueryComplexity.SIMPLE
+    assert analysis.is_maritime_related
+    assert analyzer.get_stats()["local_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_low_confidence_uses_llm_then_learns_and_caches():
+    llm = FakeLLM(
+        '{"complexity": "complex", "requires_multi_step": true, "requires_verification": true, '
+        '"is_maritime_related": true, "detected_topics": ["ISPS"], "confidence": 0.9}'
+    )
+    analyzer = _make_analyzer(llm)
+    before = analyzer._classifier.example_count
+
+    first = await analyzer.analyze("Đánh giá an ninh cảng biển ISPS Code cho cảng container")
+    second = await analyzer.analyze("đánh giá an ninh cảng biển ISPS code cho cảng container!")
+
+    assert llm.calls == 1
+    assert first.complexity == QueryComplexity.COMPLEX
+    assert second.complexity == QueryComplexity.COMPLEX
+    assert analyzer._classifier.example_count == before + 1
+    stats = analyzer.get_stats()
+    assert stats["cache_hits"] == 1 and stats["llm_calls"] == 1
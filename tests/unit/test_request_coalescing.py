@@ -0,0 +1,159 @@
+"""
+Test in-flight RAG request coalescing.
+
+Verify:
+1. Requests match by normalized text or embedding proximity, per namespace
+2. Followers fall back to running themselves when the leader fails
+3. Concurrent identical CRAG questions run the pipeline once; followers are
+   adapted to their own context
+4. Streaming followers replay the leader's events; a stalled shared stream
+   makes followers run the pipeline themselves
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.cache.inflight import InflightCoalescer
+from app.engine.agentic_rag.corrective_rag import CorrectiveRAG, CorrectiveRAGResult
+
+
+@pytest.mark.asyncio
+async def test_join_matches_normalized_text_and_embeddings():
+    coalescer = InflightCoalescer("test.match", similarity_threshold=0.95, register=False)
+
+    leader, is_leader, _ = coalescer.join("Rule 15 là gì?", [1.0, 0.0, 0.0], namespace="student")
+    assert is_leader
+
+    same, is_leader, similarity = coalescer.join("  rule 15 LÀ GÌ ", namespace="student")
+    assert same is leader and not is_leader and similarity == 1.0
+
+    close, is_leader, similarity = coalescer.join("Quy tắc 15?", [0.99, 0.1, 0.0], namespace="student")
+    assert close is leader and not is_leader and 0.95 <= similarity < 1.0
+
+    _, is_leader, _ = coalescer.join("Quy tắc 15?", [0.99, 0.1, 0.0], namespace="teacher")
+    assert is_leader  # Different namespace never coalesces
+
+    coalescer.complete(leader, {"answer": "A"})
+    assert await coalescer.wait(same) == {"answer": "A"}
+    stats = coalescer.get_stats()
+    assert stats.followers == 2 and stats.semantic_matches == 1 and stats.active == 1
+
+
+@pytest.mark.asyncio
+async def test_follower_falls_back_when_leader_fails():
+    coalescer = InflightCoalescer("test.fail", register=False)
+    leader, _, _ = coalescer.join("q")
+    follower, _, _ = coalescer.join("q")
+
+    waiter = asyncio.create_task(coalescer.wait(follower))
+    await asyncio.sleep(0)
+    coalescer.fail(leader, RuntimeError("quota"))
+
+    assert await waiter is None
+    assert coalescer.get_stats().follower_fallbacks == 1
+    _, is_leader, _ = coalescer.join("q")
+    assert is_leader  # Failed flight was retired
+
+
+def _make_crag():
+    crag = CorrectiveRAG.__new__(CorrectiveRAG)
+    crag._cache_enabled = False
+    crag._cache = None
+    crag._coalescer = InflightCoalescer("test.crag", register=False)
+    crag._stream_coalescer = InflightCoalescer("test.crag.stream", register=False)
+    crag._stream_tasks = set()
+    return crag
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_questions_run_pipeline_once():
+    crag = _make_crag()
+    runs = []
+    adapted = []
+
+    async def run_pipeline(query, context, tracer, query_embedding):
+        runs.append(context["user_id"])
+        await asyncio.sleep(0.02)
+        return CorrectiveRAGResult(answer="Rule 15: crossing", sources=[{"title": "COLREGs"}], confidence=85)
+
+    async def adapt(query, shared, context, similarity, label):
+        adapted.append((context["user_id"], shared["answer"], label))
+        return CorrectiveRAGResult(answer=f"{shared['answer']} ({context['user_id']})", sources=shared["sources"])
+
+    crag._run_pipeline = run_pipeline
+    crag._adapt_shared_answer = adapt
+
+    results = await asyncio.gather(*(
+        crag.process("What is Rule 15?", {"user_id": f"u{i}"}) for i in range(3)
+    ))
+
+    assert runs == ["u0"]
+    assert results[0].answer == "Rule 15: crossing"
+    assert [a[0] for a in adapted] == ["u1", "u2"]
+    assert results[2].answer == "Rule 15: crossing (u2)"
+    assert results[2].sources == [{"title": "COLREGs"}]
+
+
+@pytest.mark.asyncio
+async def test_streaming_followers_replay_leader_events():
+    crag = _make_crag()
+    runs = 0
+
+    async def process_streaming(query, context):
+        nonlocal runs
+        runs += 1
+        for token in ("Rule ", "15"):
+            await asyncio.sleep(0.01)
+            yield {"type": "answer", "content": token}
+        yield {"type": "metadata", "content": {"confidence": 80}}
+        yield {"type": "done", "content": ""}
+
+    crag._process_streaming = process_streaming
+
+    async def consume(context):
+        return [event async for event in crag.process_streaming("Rule 15?", context)]
+
+    leader_events, follower_events, own_events = await asyncio.gather(
+        consume({}), consume({}), consume({"conversation_history": "earlier turn"})
+    )
+
+    assert runs == 2  # Shared run + the request with history
+    assert "".join(e["content"] for e in follower_events if e["type"] == "answer") == "Rule 15"
+    assert follower_events[-2]["content"]["coalesced"] is True
+    assert "coalesced" not in leader_events[-2]["content"]
+    assert own_events[-1]["type"] == "done"
+
+
+@pytest.mark.asyncio
+async def test_stalled_shared_stream_falls_back_to_own_run():
+    crag = _make_crag()
+    crag._stream_coalescer.max_wait_seconds = 0.05
+    release = asyncio.Event()
+    runs = 0
+
+    async def process_streaming(query, context):
+        nonlocal runs
+        runs += 1
+        if runs == 1:
+            yield {"type": "status", "content": "Analyzing"}
+            await release.wait()  # Shared run hangs before any answer token
+        yield {"type": "answer", "content": f"run {runs}"}
+        yield {"type": "done", "content": ""}
+
+    crag._process_streaming = process_streaming
+
+    async def consume():
+        return [event async for event in crag.process_streaming("Rule 15?", {})]
+
+    leader_events, follower_events = await asyncio.wait_for(asyncio.gather(consume(), consume()), 1)
+    release.set()
+
+    answers = sorted(
+        e["content"] for events in (leader_events, follower_events) for e in events if e["type"] == "answer"
+    )
+    assert answers == ["run 2", "run 3"]
+    assert crag._stream_coalescer.get_stats().follower_fallbacks == 2
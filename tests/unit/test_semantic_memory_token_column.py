@@ -0,0 +1,103 @@
+"""
+Test the semantic_memories.token_count column probe.
+
+Verify:
+1. An undefined-column error (SQLSTATE 42703) caches "no column"
+2. Any other probe error is not cached and the column is probed again
+3. Fact upserts keep token_count in step on update (when the column
+   exists) and insert one new fact per fact type
+"""
+import os
+import sys
+
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.models.semantic_memory import MemoryType, SemanticMemoryCreate
+from app.repositories.semantic_memory_repository import SemanticMemoryRepository
+
+
+class FakeDBAPIError(Exception):
+    def __init__(self, pgcode):
+        super().__init__(pgcode)
+        self.pgcode = pgcode
+
+
+class FakeSession:
+    def __init__(self, errors):
+        self.errors = errors
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement):
+        if self.errors:
+            raise self.errors.pop(0)
+
+
+def _repository(errors):
+    repository = SemanticMemoryRepository()
+    repository.probes = 0
+
+    def session_factory():
+        repository.probes += 1
+        return FakeSession(errors)
+
+    repository._session_factory = session_factory
+    return repository
+
+
+def test_undefined_column_is_cached():
+    repository = _repository([
+        ProgrammingError("SELECT token_count", {}, FakeDBAPIError("42703")),
+    ])
+
+    assert repository._has_token_count_column() is False
+    assert repository._has_token_count_column() is False
+    assert repository.probes == 1
+
+
+def test_transient_probe_error_is_retried():
+    repository = _repository([
+        OperationalError("SELECT token_count", {}, FakeDBAPIError("08006")),
+    ])
+
+    assert repository._has_token_count_column() is False
+    assert repository._has_token_count_column() is True
+    assert repository._has_token_count_column() is True
+    assert repository.probes == 2
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+        return self
+
+    def fetchone(self):
+        return type("Row", (), {"updated": 1, "inserted": 0})()
+
+
+def test_fact_upsert_updates_token_count_and_dedupes_new_facts():
+    facts = [
+        SemanticMemoryCreate(user_id="u1", content=f"Tên: {name}", embedding=[0.1, 0.2],
+                             memory_type=MemoryType.USER_FACT, metadata={"fact_type": "name"})
+        for name in ("Minh", "Lan")
+    ]
+    sql = {}
+    for has_column in (True, False):
+        repository = SemanticMemoryRepository()
+        repository._has_token_count_column = lambda: has_column
+        session = RecordingSession()
+        repository._upsert_facts(session, "u1", facts, similarity_threshold=0.9, max_facts=50)
+        sql[has_column] = session.statements[0]
+
+    assert "token_count = u.token_count" in sql[True]
+    assert "token_count = u.token_count" not in sql[False]
+    assert "DISTINCT ON (COALESCE(fact_type, CAST(ord AS text)))" in sql[True]
@@ -0,0 +1,186 @@
+"""
+Test bounded session-state store.
+
+Verify:
+1. Idle and max-count eviction with metrics
+2. Evicted entries are persisted and resumed with their mutations
+3. pop() forgets persisted snapshots; registry exports memory estimates
+4. SessionManager maps a user to the same session after a restart or an
+   eviction, so persisted SessionState is resumed; async access runs off
+   the event loop
+5. Async store access resumes from the backend in a worker thread and
+   serves resident entries inline (MemorySummarizer async path)
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.cache.session_store import SessionStore, get_all_session_store_stats
+from app.engine.memory_summarizer import TieredMemoryState
+
+
+class FakeBackend:
+    def __init__(self):
+        self.rows = {}
+
+    def is_available(self):
+        return True
+
+    def save(self, namespace, key, state):
+        self.rows[(namespace, key)] = state
+
+    def load(self, namespace, key):
+        return self.rows.get((namespace, key))
+
+    def delete(self, namespace, key):
+        self.rows.pop((namespace, key), None)
+
+
+def _store(backend=None, **kwargs):
+    return SessionStore(
+        "test.states",
+        factory=lambda key: TieredMemoryState(),
+        backend=backend,
+        serializer=TieredMemoryState.to_dict,
+        deserializer=TieredMemoryState.from_dict,
+        register=False,
+        **kwargs
+    )
+
+
+def test_idle_and_capacity_eviction():
+    store = _store(max_size=2, idle_ttl_seconds=0.05)
+    store.get_or_create("a")
+    store.get_or_create("b")
+    store.get_or_create("a")  # "a" becomes most recent
+    store.get_or_create("c")  # evicts "b"
+
+    assert "b" not in store and "a" in store
+
+    time.sleep(0.06)
+    assert store.sweep() == 2
+    stats = store.get_stats()
+    assert (stats.size, stats.created, stats.hits, stats.evicted_capacity, stats.evicted_idle) == (0, 3, 1, 1, 2)
+
+
+def test_evicted_state_is_persisted_and_resumed():
+    backend = FakeBackend()
+    store = _store(backend=backend, max_size=1)
+    store.get_or_create("s1").raw_messages.append({"role": "user", "content": "Rule 15?"})
+    store.get_or_create("s2")  # evicts s1 to the backend
+
+    assert "s1" not in store
+    resumed = store.get_or_create("s1")
+
+    assert resumed.raw_messages == [{"role": "user", "content": "Rule 15?"}]
+    stats = store.get_stats()
+    assert (stats.persisted, stats.resumed) == (2, 1)  # s1, then s2 on resume
+
+
+def test_pop_deletes_snapshot_and_stats_exported():
+    backend = FakeBackend()
+    store = SessionStore("test.exported", factory=lambda key: TieredMemoryState(), backend=backend,
+                         serializer=TieredMemoryState.to_dict, deserializer=TieredMemoryState.from_dict,
+                         max_size=1)
+    store.get_or_create("s1")
+    store.get_or_create("s2")
+    assert ("test.exported", "s1") in backend.rows
+
+    store.pop("s1")
+    assert store.get("s1") is None
+
+    exported = {s["name"]: s for s in get_all_session_store_stats()}
+    assert exported["test.exported"]["size"] == 1
+    assert exported["test.exported"]["estimated_bytes"] > 0
+
+
+class UnavailableChatHistory:
+    def is_available(self):
+        return False
+
+
+def _session_manager(monkeypatch, backend):
+    from app.services import session_manager
+
+    monkeypatch.setattr(session_manager, "get_session_state_backend", lambda: backend)
+    monkeypatch.setattr(session_manager.settings, "session_store_max_sessions", 1)
+    return session_manager.SessionManager(chat_history=UnavailableChatHistory())
+
+
+def test_session_manager_resumes_user_session(monkeypatch):
+    backend = FakeBackend()
+    manager = _session_manager(monkeypatch, backend)
+    thread_id = uuid4()
+
+    manager.get_or_create_session("u1", str(thread_id))
+    manager.update_state(thread_id, phrase="Chào bạn")
+    manager.get_or_create_session("u2")  # evicts u1's mapping and state
+
+    session = manager.get_or_create_session("u1")
+    assert session.session_id == thread_id
+    assert session.state.recent_phrases == ["Chào bạn"]
+
+    # A restarted process without the mapping uses the same fallback session
+    fallback = manager.get_or_create_session("u3").session_id
+    restarted = _session_manager(monkeypatch, backend)
+    assert restarted.get_or_create_session("u3").session_id == fallback
+
+
+def test_session_manager_async_access_runs_off_loop(monkeypatch):
+    manager = _session_manager(monkeypatch, FakeBackend())
+    threads = []
+    original = manager._get_or_create_state
+
+    def record(session_id):
+        threads.append(threading.current_thread())
+        return original(session_id)
+
+    manager._get_or_create_state = record
+
+    async def run():
+        session = await manager.aget_or_create_session("u1")
+        await manager.aupdate_state(session.session_id, phrase="Xin chào")
+        return session
+
+    session = asyncio.run(run())
+
+    assert session.state.recent_phrases == ["Xin chào"]
+    assert threading.main_thread() not in threads and len(threads) == 2
+
+
+class ThreadRecordingBackend(FakeBackend):
+    def __init__(self):
+        super().__init__()
+        self.threads = []
+
+    def load(self, namespace, key):
+        self.threads.append(threading.current_thread())
+        return super().load(namespace, key)
+
+
+def test_async_access_resumes_off_loop():
+    from app.engine.memory_summarizer import MemorySummarizer
+
+    backend = ThreadRecordingBackend()
+    summarizer = MemorySummarizer.__new__(MemorySummarizer)
+    summarizer._llm = None
+    summarizer._states = _store(backend=backend, max_size=1)
+
+    async def run():
+        await summarizer.add_message_async("s1", "user", "Rule 15?")
+        await summarizer.add_message_async("s2", "user", "Rule 16?")  # evicts s1
+        resumed = await summarizer.aget_state("s1")
+        again = await summarizer.aget_state("s1")  # resident: no backend load
+        return resumed, again
+
+    resumed, again = asyncio.run(run())
+
+    assert resumed is again
+    assert [m["content"] for m in resumed.raw_messages] == ["Rule 15?"]
+    assert len(backend.threads) == 3  # s1, s2 created, s1 resumed
+    assert threading.main_thread() not in backend.threads
@@ -0,0 +1,87 @@
+"""
+Test the shared TokenCounter.
+
+Verify:
+1. The encoder is loaded once; a load failure is remembered and counts
+   fall back to the estimate without retrying
+2. Batch counts encode only cache misses, in one batch call
+3. The estimate charges Vietnamese words per word, ASCII per character
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.engine import token_counter as token_counter_module
+from app.engine.token_counter import TokenCounter
+
+
+class FakeEncoder:
+    def __init__(self):
+        self.single_calls = 0
+        self.batch_calls = []
+
+    def encode_ordinary(self, text):
+        self.single_calls += 1
+        return text.split()
+
+    def encode_ordinary_batch(self, texts):
+        self.batch_calls.append(list(texts))
+        return [text.split() for text in texts]
+
+
+def _counter(encoder=None):
+    counter = TokenCounter(cache_size=100, chars_per_token=4.0, tokens_per_non_ascii_word=1.5)
+    counter._encoder = encoder
+    counter._encoder_failed = encoder is None
+    return counter
+
+
+def test_encoder_load_failure_is_remembered(monkeypatch):
+    import tiktoken
+
+    attempts = []
+
+    def failing_get_encoding(name):
+        attempts.append(name)
+        raise OSError("offline")
+
+    monkeypatch.setattr(tiktoken, "get_encoding", failing_get_encoding)
+    counter = TokenCounter(cache_size=10, chars_per_token=4.0, tokens_per_non_ascii_word=1.5)
+
+    assert counter.count("abcdefgh") == 2
+    assert counter.count("abcdefghijkl") == 3
+    assert attempts == ["cl100k_base"]
+
+
+def test_count_many_encodes_only_misses_in_one_batch():
+    encoder = FakeEncoder()
+    counter = _counter(encoder)
+
+    assert counter.count_many(["a b c", "d e"]) == [3, 2]
+    assert counter.count_many(["d e", "f g h i", "a b c", "j"]) == [2, 4, 3, 1]
+
+    assert encoder.batch_calls == [["a b c", "d e"], ["f g h i", "j"]]
+    # Uncached counts always encode
+    assert counter.count("x y") == 2 and counter.count("x y") == 2
+    assert encoder.single_calls == 2
+    assert counter.count("", cache=True) == 0
+
+
+def test_estimate_counts_vietnamese_words_separately():
+    counter = _counter()
+
+    assert counter.estimate("") == 0
+    assert counter.estimate("Rule 15 crossing") == 4  # 16 ASCII chars / 4
+    # "tắc", "cắt", "hướng" cost 1.5 each; "Quy" + 3 spaces are 6 ASCII chars
+    text = "Quy tắc cắt hướng"
+    assert counter.estimate(text) == 6  # ceil(6 / 4 + 3 * 1.5)
+    assert counter.estimate_many([text, "abcd"]) == 7
+
+
+def test_singleton_is_shared():
+    token_counter_module._token_counter = None
+    try:
+        assert token_counter_module.get_token_counter() is token_counter_module.get_token_counter()
+    finally:
+        token_counter_module._token_counter = None